@@ -0,0 +1,296 @@
+import logging
+import sys
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from backend.app.config import config
+from backend.app.database import database
+from backend.app.routes.user_routes import register_user, login_user, refresh_session
+from backend.app.services.auth_service import AuthService
+from backend.app.services.async_location_service import AsyncLocationService
+from backend.app.services.async_weather_service import AsyncWeatherService
+from backend.app.services.prewarm_service import PrewarmService
+from backend.app.services.weather_service import WeatherService, CACHE_DEGRADED
+from backend.app.utils.async_http_client import AsyncHttpClient
+from backend.app.utils import metrics
+from backend.app.utils.auth import bearer_token
+from backend.app.utils.http_cache import cache_headers, is_not_modified
+from backend.app.utils.quota import QuotaExhaustedError
+from backend.app.utils.request_limits import RateLimitMiddleware
+from backend.app.utils.request_metrics import MetricsMiddleware
+from backend.app.utils.structured_logging import RequestIdMiddleware, configure_logging
+from backend.app.utils.tokens import TokenError
+from backend.app.utils.validators import parse_coordinates
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = f"/api/{config.API_VERSION}"
+
+router = APIRouter()
+
+async def _json_body(request: Request) -> Any:
+    """Parse a JSON body, returning None for an empty or invalid one like Flask's get_json"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+@router.get("/weather", tags=["weather"])
+async def get_weather(request: Request, city: str = "", lat: Optional[str] = None, lon: Optional[str] = None,
+                      units: str = "metric", lang: str = "en") -> Response:
+    """
+    Get current weather data for a city or coordinates
+    
+    Query Parameters:
+        city (str, optional): Name of the city
+        lat (float, optional): Latitude, with lon, instead of city
+        lon (float, optional): Longitude
+        units (str, optional): Units of measurement (metric/imperial)
+        lang (str, optional): Language code for weather descriptions
+    """
+    try:
+        city = city.strip()
+        if not city and lat is None and lon is None:
+            return JSONResponse({
+                "error": "City or lat and lon parameters are required",
+                "status": "error"
+            }, status_code=400)
+            
+        if units not in ["metric", "imperial", "standard"]:
+            return JSONResponse({
+                "error": "Invalid units parameter. Use 'metric', 'imperial', or 'standard'",
+                "status": "error"
+            }, status_code=400)
+
+        if city:
+            try:
+                location = await AsyncLocationService.get_coordinates(city)
+            except QuotaExhaustedError as e:
+                return JSONResponse({
+                    "error": "Geocoding call budget is used up",
+                    "status": "error"
+                }, status_code=503, headers={"Retry-After": str(max(1, e.retry_after))})
+            if not location:
+                return JSONResponse({
+                    "error": f"Could not find coordinates for {city}",
+                    "status": "error"
+                }, status_code=404)
+            place = city
+        else:
+            try:
+                lat, lon = parse_coordinates(lat, lon)
+            except (TypeError, ValueError):
+                return JSONResponse({
+                    "error": "lat and lon must be valid coordinates",
+                    "status": "error"
+                }, status_code=400)
+            location = {"lat": lat, "lon": lon}
+            place = f"{lat},{lon}"
+
+        observation, cache_status = await AsyncWeatherService.get_observation_with_status(
+            lat=location["lat"],
+            lon=location["lon"],
+            city_name=city,
+            country=location.get("country")
+        )
+        headers = {"X-Cache": cache_status}
+
+        if observation:
+            if city:
+                # Counting prevented misses reaches the shared store
+                await run_in_threadpool(PrewarmService.record, city, location, cache_status)
+            etag = WeatherService.etag(observation, units, lang)
+            headers.update(cache_headers(etag, observation.observed_at, observation.fresh_until))
+            if is_not_modified(etag, observation.observed_at, request.headers.get("If-None-Match"),
+                               request.headers.get("If-Modified-Since")):
+                return Response(status_code=304, headers=headers)
+            body = {"data": observation.render(units, lang), "status": "success"}
+            if cache_status == CACHE_DEGRADED:
+                body["degraded"] = True
+            return JSONResponse(body, headers=headers)
+
+        if cache_status == CACHE_DEGRADED:
+            headers["Retry-After"] = str(WeatherService.providers.resets_in())
+            return JSONResponse({
+                "error": "Weather providers' call budget is used up",
+                "status": "error"
+            }, status_code=503, headers=headers)
+
+        return JSONResponse({
+            "error": f"Weather data not found for {place}",
+            "status": "error"
+        }, status_code=404, headers=headers)
+        
+    except Exception as e:
+        logger.error("Error getting weather data: %s", e)
+        return JSONResponse({
+            "error": "Failed to fetch weather data",
+            "status": "error"
+        }, status_code=500)
+
+@router.post("/register", tags=["user"])
+async def register(request: Request) -> JSONResponse:
+    """Register a new user"""
+    try:
+        # User lookups use the blocking Mongo driver, keep them off the event loop
+        body, status = await run_in_threadpool(register_user, await _json_body(request))
+    except Exception as e:
+        logger.error("Registration error: %s", e)
+        body, status = {"error": "Internal server error", "status": "error"}, 500
+    return JSONResponse(body, status_code=status)
+
+@router.post("/login", tags=["user"])
+async def login(request: Request) -> JSONResponse:
+    """Handle user login"""
+    try:
+        body, status = await run_in_threadpool(login_user, await _json_body(request))
+    except Exception as e:
+        logger.error("Login error: %s", e)
+        body, status = {"error": "Internal server error", "status": "error"}, 500
+    return JSONResponse(body, status_code=status)
+
+async def token_claims(request: Request) -> dict:
+    """Dependency requiring a valid access token, verified in-process"""
+    token = bearer_token(request.headers.get("Authorization"))
+    if not token:
+        raise StarletteHTTPException(401, "Authorization token is required", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return AuthService.verify(token)
+    except TokenError as e:
+        raise StarletteHTTPException(401, str(e), headers={"WWW-Authenticate": 'Bearer error="invalid_token"'})
+
+@router.post("/token/refresh", tags=["user"])
+async def refresh_token(request: Request) -> JSONResponse:
+    """Get a new access token"""
+    # Rotating the refresh token writes the revocation to Mongo
+    body, status = await run_in_threadpool(refresh_session, await _json_body(request))
+    return JSONResponse(body, status_code=status)
+
+@router.post("/logout", tags=["user"])
+async def logout(request: Request, claims: dict = Depends(token_claims)) -> JSONResponse:
+    """Revoke the access token, and the refresh token if one is given"""
+    await run_in_threadpool(AuthService.revoke, claims)
+    data = await _json_body(request)
+    if isinstance(data, dict) and data.get("refresh_token"):
+        try:
+            await run_in_threadpool(AuthService.revoke, AuthService.verify(data["refresh_token"], "refresh"))
+        except TokenError:
+            pass  # Already expired or revoked
+    return JSONResponse({"message": "Logged out", "status": "success"})
+
+@router.get("/me", tags=["user"])
+async def current_user(claims: dict = Depends(token_claims)) -> JSONResponse:
+    """Get the authenticated user from the access token"""
+    return JSONResponse({"username": claims["sub"], "expires_at": claims["exp"], "status": "success"})
+
+@router.get("/health", tags=["admin"])
+async def health() -> JSONResponse:
+    """Check that the service and its database are up"""
+    mongo = await run_in_threadpool(database.ping)
+    healthy = mongo["status"] == "ok"
+    return JSONResponse({"mongo": mongo, "status": "success" if healthy else "error"},
+                        status_code=200 if healthy else 503)
+
+@router.get("/routes", tags=["user"])
+async def list_routes() -> JSONResponse:
+    """
+    List all registered routes in the application, grouped by module
+    """
+    route_groups = defaultdict(list)
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        module = route.tags[0] if route.tags else "misc"
+        route_groups[module].append({
+            "endpoint": f"{module}.{route.name}",
+            "methods": sorted(route.methods - {"OPTIONS", "HEAD"}),
+            "path": API_PREFIX + route.path,
+            "description": route.endpoint.__doc__
+        })
+
+    formatted_routes = {
+        module: sorted(routes, key=lambda x: x["path"])
+        for module, routes in route_groups.items()
+    }
+    return JSONResponse({
+        "routes": formatted_routes,
+        "total_routes": sum(len(routes) for routes in route_groups.values()),
+        "status": "success"
+    })
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client per process, shared by both services
+    client = AsyncHttpClient()
+    AsyncLocationService.http_client = client
+    AsyncWeatherService.http_client = client
+    yield
+    AsyncLocationService.http_client = None
+    AsyncWeatherService.http_client = None
+    await client.aclose()
+
+def create_asgi_app() -> FastAPI:
+    """Create and configure the ASGI application"""
+    # JSON logs written off the event loop
+    configure_logging()
+
+    app = FastAPI(title="MeteorCloud", lifespan=lifespan)
+    
+    # Enable CORS
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    
+    app.include_router(router, prefix=API_PREFIX)
+    
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint() -> Response:
+        """Export request, upstream, database and cache metrics"""
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+    
+    # Per-client rate limits; rejected requests are still timed and logged
+    if config.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware)
+    
+    # Added last so it wraps CORS and the exception handlers
+    app.add_middleware(MetricsMiddleware, mounts=[(router, API_PREFIX)])
+    app.add_middleware(RequestIdMiddleware)
+    
+    @app.exception_handler(StarletteHTTPException)
+    async def http_error(request: Request, error: StarletteHTTPException) -> JSONResponse:
+        if error.status_code == 404:
+            return JSONResponse({"error": "Resource not found", "status": "error"}, status_code=404)
+        return JSONResponse({"error": error.detail, "status": "error"}, status_code=error.status_code,
+                            headers=getattr(error, "headers", None))
+        
+    @app.exception_handler(Exception)
+    async def server_error(request: Request, error: Exception) -> JSONResponse:
+        logger.error("Server error: %s", error)
+        return JSONResponse({"error": "Internal server error", "status": "error"}, status_code=500)
+    
+    return app
+
+def main():
+    """Serve the ASGI application with uvicorn"""
+    try:
+        import uvicorn
+        logger.info("Starting ASGI server in %s mode", config.ENV)
+        uvicorn.run(
+            "backend.app.asgi:create_asgi_app",
+            factory=True,
+            host="0.0.0.0",
+            port=8000,
+            proxy_headers=True
+        )
+    except Exception as e:
+        logger.error("Failed to start server: %s", e)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env
@@ -12,14 +13,146 @@ class Config:
     # API settings
     WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
     API_VERSION = "v1"
+    OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+    OPEN_METEO_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+    NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+    NOMINATIM_REVERSE_URL = os.getenv("NOMINATIM_REVERSE_URL", "https://nominatim.openstreetmap.org/reverse")
     
     # Database settings
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     DB_NAME = os.getenv("DB_NAME", "meteorcloud")
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "2000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000"))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
     
     # Security settings
     SECRET_KEY = os.getenv("SECRET_KEY")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+    JWT_ACCESS_TTL = int(os.getenv("JWT_ACCESS_TTL", "900"))  # 15 minutes
+    JWT_REFRESH_TTL = int(os.getenv("JWT_REFRESH_TTL", "1209600"))  # 14 days
+    JWT_LEEWAY = int(os.getenv("JWT_LEEWAY", "30"))  # clock skew tolerated, seconds
+    AUTH_DENYLIST_SYNC = float(os.getenv("AUTH_DENYLIST_SYNC", "30"))
+    ADMIN_USERS = os.getenv("ADMIN_USERS", "")  # comma-separated usernames allowed on /admin endpoints
+
+    # Cache settings
+    REDIS_URL = os.getenv("REDIS_URL")
+    GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "10000"))
+    GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", "604800"))  # 7 days
+    GEOCODE_NEGATIVE_TTL = int(os.getenv("GEOCODE_NEGATIVE_TTL", "300"))
+    GEO_INDEX_PATH = os.getenv("GEO_INDEX_PATH", "")  # built by scripts/build_geo_index.py
+    GEO_REVERSE_RADIUS = float(os.getenv("GEO_REVERSE_RADIUS", "25"))  # km; farther places go to Nominatim
+    WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "10000"))
+    WEATHER_CACHE_GRID = float(os.getenv("WEATHER_CACHE_GRID", "0.01"))  # degrees
+    WEATHER_OBSERVATION_INTERVAL = int(os.getenv("WEATHER_OBSERVATION_INTERVAL", "600"))
+    WEATHER_MIN_TTL = int(os.getenv("WEATHER_MIN_TTL", "60"))
+    WEATHER_STALE_TTL = int(os.getenv("WEATHER_STALE_TTL", "1800"))
+    WEATHER_NEARBY_RADIUS = float(os.getenv("WEATHER_NEARBY_RADIUS", "2"))  # km; 0 disables
+
+    # Weather providers and hedged requests
+    WEATHER_PROVIDERS = os.getenv("WEATHER_PROVIDERS", "openweathermap,openmeteo")  # preferred first
+    WEATHER_HEDGE_ENABLED = os.getenv("WEATHER_HEDGE_ENABLED", "True").lower() == "true"
+    WEATHER_HEDGE_PERCENTILE = float(os.getenv("WEATHER_HEDGE_PERCENTILE", "0.95"))
+    WEATHER_HEDGE_MIN_DELAY = float(os.getenv("WEATHER_HEDGE_MIN_DELAY", "0.05"))  # seconds
+    WEATHER_HEDGE_MAX_DELAY = float(os.getenv("WEATHER_HEDGE_MAX_DELAY", "2"))  # also used until measured
+    WEATHER_HEDGE_WORKERS = int(os.getenv("WEATHER_HEDGE_WORKERS", "32"))  # threads for Flask requests
+    WEATHER_PROVIDER_WINDOW = int(os.getenv("WEATHER_PROVIDER_WINDOW", "200"))  # recent calls per provider
+    WEATHER_PROVIDER_MIN_SAMPLES = int(os.getenv("WEATHER_PROVIDER_MIN_SAMPLES", "20"))
+    WEATHER_PROVIDER_MAX_ERROR_RATE = float(os.getenv("WEATHER_PROVIDER_MAX_ERROR_RATE", "0.2"))
+
+    # Observation storage
+    OBSERVATION_TTL_DAYS = int(os.getenv("OBSERVATION_TTL_DAYS", "365"))
+    OBSERVATION_BATCH_SIZE = int(os.getenv("OBSERVATION_BATCH_SIZE", "500"))
+    OBSERVATION_FLUSH_INTERVAL = float(os.getenv("OBSERVATION_FLUSH_INTERVAL", "1"))
+    OBSERVATION_QUEUE_SIZE = int(os.getenv("OBSERVATION_QUEUE_SIZE", "10000"))
+
+    # Weather history
+    HISTORY_MAX_POINTS = int(os.getenv("HISTORY_MAX_POINTS", "1000"))
+    HISTORY_DEFAULT_DAYS = int(os.getenv("HISTORY_DEFAULT_DAYS", "7"))
+
+    # City autocomplete
+    SUGGEST_MAX_RESULTS = int(os.getenv("SUGGEST_MAX_RESULTS", "20"))
+    SUGGEST_SEED_LIMIT = int(os.getenv("SUGGEST_SEED_LIMIT", "100000"))  # places taken from the geo index
+    SUGGEST_FLUSH_INTERVAL = float(os.getenv("SUGGEST_FLUSH_INTERVAL", "30"))
+
+    # Cache pre-warming of popular cities
+    PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "True").lower() == "true"
+    PREWARM_TOP_K = int(os.getenv("PREWARM_TOP_K", "50"))
+    PREWARM_SKETCH_SIZE = int(os.getenv("PREWARM_SKETCH_SIZE", "1000"))  # cities tracked
+    PREWARM_LEAD_TIME = float(os.getenv("PREWARM_LEAD_TIME", "30"))  # seconds before expiry
+    PREWARM_QPS = float(os.getenv("PREWARM_QPS", "1"))
+    PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL", "10"))
+    PREWARM_DECAY_INTERVAL = float(os.getenv("PREWARM_DECAY_INTERVAL", "3600"))
+    PREWARM_LEASE_TTL = float(os.getenv("PREWARM_LEASE_TTL", "30"))
+
+    # Response compression (brotli is used when the package is installed)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+    # Weather alerts
+    ALERTS_ENABLED = os.getenv("ALERTS_ENABLED", "True").lower() == "true"
+    ALERT_INTERVAL = float(os.getenv("ALERT_INTERVAL", "60"))  # seconds between evaluations
+    ALERT_CELL_SIZE = float(os.getenv("ALERT_CELL_SIZE", "0.1"))  # degrees; one fetch per cell
+    ALERT_RELOAD_INTERVAL = float(os.getenv("ALERT_RELOAD_INTERVAL", "300"))
+    ALERT_DEFAULT_COOLDOWN = int(os.getenv("ALERT_DEFAULT_COOLDOWN", "3600"))
+    ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", "500"))  # notifications per sink call
+    ALERT_FETCH_QPS = float(os.getenv("ALERT_FETCH_QPS", "5"))
+    ALERT_LEASE_TTL = float(os.getenv("ALERT_LEASE_TTL", "120"))
+    ALERT_MAX_PER_USER = int(os.getenv("ALERT_MAX_PER_USER", "100"))
+    ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL", "")
+
+    # Bulk export of observations
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))  # documents per cursor batch and chunk
+    EXPORT_MAX_PARTITIONS = int(os.getenv("EXPORT_MAX_PARTITIONS", "64"))
+
+    # Batch weather endpoint
+    WEATHER_BATCH_MAX = int(os.getenv("WEATHER_BATCH_MAX", "100"))
+    WEATHER_BATCH_WORKERS = int(os.getenv("WEATHER_BATCH_WORKERS", "16"))
+
+    # Logging (written by a background thread)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json or text
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records; more are dropped and counted
+    LOG_SAMPLING = os.getenv("LOG_SAMPLING", "meteorcloud.access=0.1")  # logger=fraction kept below WARNING
+
+    # Inbound rate limits per client (IP address, or user for a valid bearer token);
+    # counted per worker process unless REDIS_URL is set
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMITS = os.getenv(
+        "RATE_LIMITS",
+        "/api/v1/weather=120/60,/api/v1/register=5/300,/api/v1/login=10/60,/api/v1=600/60"
+    )  # path prefix=requests/seconds; the longest matching prefix applies
+    RATE_LIMIT_SYNC = float(os.getenv("RATE_LIMIT_SYNC", "0.5"))  # seconds between shared count updates per client
+    RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))  # tracked per rule and worker
+
+    # Cross-process coordination (lock and rate limit state shared by all workers on a host)
+    LOCK_DIR = os.getenv("LOCK_DIR", os.path.join(tempfile.gettempdir(), "meteorcloud"))
+    SINGLEFLIGHT_SHARED = os.getenv("SINGLEFLIGHT_SHARED", "False").lower() == "true"
+
+    # Outbound HTTP client
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # hosts kept pooled
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))  # connections per host
+    HTTP_ASYNC_SHARDS = int(os.getenv("HTTP_ASYNC_SHARDS", "16"))  # httpx pools in the ASGI app
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+    HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))
+    HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "4"))
+    HTTP_BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+    HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", "30"))
+    # Upstream call budgets, counted per provider and API key by all workers
+    PROVIDER_QUOTAS = os.getenv("PROVIDER_QUOTAS", "openweathermap=33000,openmeteo=10000,nominatim=86400")
+    QUOTA_PERIOD = int(os.getenv("QUOTA_PERIOD", "86400"))  # seconds; a day resets at UTC midnight
+    QUOTA_REFRESH = float(os.getenv("QUOTA_REFRESH", "5"))  # seconds between reads of the shared count
+    QUOTA_RATE_WINDOW = float(os.getenv("QUOTA_RATE_WINDOW", "900"))  # seconds the call rate is averaged over
+    QUOTA_MAX_TTL_FACTOR = float(os.getenv("QUOTA_MAX_TTL_FACTOR", "12"))  # most cache TTLs are stretched
+    NOMINATIM_RATE_LIMIT = float(os.getenv("NOMINATIM_RATE_LIMIT", "1"))
+    NOMINATIM_BURST = float(os.getenv("NOMINATIM_BURST", "1"))
     
     def validate(self):
         required_vars = ["WEATHER_API_KEY", "MONGO_URI", "SECRET_KEY"]
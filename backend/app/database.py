@@ -1,24 +1,106 @@
-from pymongo import MongoClient
 import os
-from pathlib import Path
-from typing import Optional
-
-# Get the project root directory
-ROOT_DIR = Path(__file__).parent.parent.parent
-import sys
-sys.path.append(str(ROOT_DIR))
+import threading
+import time
+from typing import Any, Dict
 
 from backend.app.config import config
 
+DATABASE_NAME = "MeteorCloudDB"
+
 class Database:
-    def __init__(self):
-        """Initialize the database connection."""
-        self.client = MongoClient(config.MONGO_URI)
-        self.db = self.client["MeteorCloudDB"]  # Explicitly define your database name
+    """
+    Per-process MongoDB handle, created on first use
+
+    Importing this module neither imports pymongo nor connects, so the app
+    starts quickly and without Mongo being reachable. A process forked
+    after the client was created (e.g. gunicorn --preload) drops the
+    parent's client and builds its own on next use, since MongoClient is
+    not fork-safe. Pool size, timeouts and read preference come from
+    Config.
+    """
+
+    def __init__(self, name: str = DATABASE_NAME):
+        self.name = name
+        self._client = None
+        self._db = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forget)
+
+    @property
+    def client(self):
+        """The process's MongoClient, created on first access"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._connect()
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+        self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = self.client[self.name]
+        return self._db
+
+    @db.setter
+    def db(self, db) -> None:
+        self._db = db
 
     def get_collection(self, name):
         """Retrieve a specific collection from the database."""
         return self.db[name]
 
+    def ping(self) -> Dict[str, Any]:
+        """
+        Check that the database answers
+
+        Returns:
+            Dict[str, Any]: "ok" and the round-trip time, or "unavailable"
+            and the error; waits at most MONGO_SERVER_SELECTION_TIMEOUT_MS
+        """
+        started = time.perf_counter()
+        try:
+            self.client.admin.command("ping")
+        except Exception as e:
+            return {"status": "unavailable", "error": str(e)}
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
+            self._db = None
+
+    def _forget(self) -> None:
+        # The parent still owns the client's sockets and threads; never use or close them here
+        self._client = None
+        self._db = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _connect():
+        # Deferred: importing pymongo is close to a third of the app's import time
+        from pymongo import MongoClient
+        from backend.app.utils.mongo_metrics import CommandMetrics
+        return MongoClient(
+            config.MONGO_URI,
+            appname="meteorcloud",
+            event_listeners=[CommandMetrics()],
+            maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+            minPoolSize=config.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=config.MONGO_MAX_IDLE_TIME_MS,
+            connectTimeoutMS=config.MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            socketTimeoutMS=config.MONGO_SOCKET_TIMEOUT_MS,
+            readPreference=config.MONGO_READ_PREFERENCE,
+            connect=False
+        )
+
 # Create a global database instance
 database = Database()
@@ -1,27 +1,27 @@
-from pathlib import Path
 import sys
 import logging
 from flask import Flask
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Add the root directory to Python path
-ROOT_DIR = Path(__file__).parent.parent.parent
-sys.path.append(str(ROOT_DIR))
-
 from backend.app.routes.weather_routes import weather_bp
 from backend.app.routes.user_routes import user_bp
+from backend.app.routes.city_routes import city_bp
+from backend.app.routes.admin_routes import admin_bp, metrics_bp
+from backend.app.routes.alert_routes import alert_bp
 from backend.app.config import config
+from backend.app.services.notification_service import AlertService
+from backend.app.utils.request_limits import limit_flask
+from backend.app.utils.request_metrics import instrument_flask
+from backend.app.utils.structured_logging import assign_request_ids, configure_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 def create_app():
     """Create and configure the Flask application"""
+    # JSON logs written off the request thread
+    configure_logging()
+
     app = Flask(__name__)
     
     # Configure app
@@ -31,12 +31,29 @@ def create_app():
     # Enable CORS
     CORS(app)
     
+    # Per-client rate limits, inside ProxyFix so they see the client's address
+    if config.RATE_LIMIT_ENABLED:
+        limit_flask(app)
+    
     # Fix for proxy headers
     app.wsgi_app = ProxyFix(app.wsgi_app)
     
     # Register blueprints
     app.register_blueprint(weather_bp, url_prefix="/api/v1")
     app.register_blueprint(user_bp, url_prefix="/api/v1")
+    app.register_blueprint(city_bp, url_prefix="/api/v1")
+    app.register_blueprint(admin_bp, url_prefix="/api/v1")
+    app.register_blueprint(alert_bp, url_prefix="/api/v1")
+    app.register_blueprint(metrics_bp)
+    
+    # Per-route latency, exported at /metrics
+    instrument_flask(app)
+    
+    # Request IDs for log records and the access log
+    assign_request_ids(app)
+    
+    # Threshold alert evaluation (runs on one elected worker)
+    AlertService.start()
     
     @app.errorhandler(404)
     def not_found(error):
@@ -44,7 +61,7 @@ def create_app():
         
     @app.errorhandler(500)
     def server_error(error):
-        logger.error(f"Server error: {error}")
+        logger.error("Server error: %s", error)
         return {"error": "Internal server error", "status": "error"}, 500
     
     return app
@@ -53,14 +70,14 @@ def main():
     """Main entry point for the application"""
     try:
         app = create_app()
-        logger.info(f"Starting server in {config.ENV} mode")
+        logger.info("Starting server in %s mode", config.ENV)
         app.run(
             host="0.0.0.0",
             port=5000,
             debug=config.DEBUG
         )
     except Exception as e:
-        logger.error(f"Failed to start server: {e}")
+        logger.error("Failed to start server: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Dict, Iterable
+
+from backend.app.database import database
+
+class GeocodeHistory:
+    """Cities resolved by the geocoder and how often they were asked for"""
+
+    @staticmethod
+    def record_many(lookups: Dict[str, Dict]) -> None:
+        """
+        Upsert a batch of lookups in one round trip
+
+        Args:
+            lookups (Dict[str, Dict]): Normalized city -> location with a
+                "count" of lookups since the last write
+        """
+        if not lookups:
+            return
+        from pymongo import UpdateOne
+        now = datetime.utcnow()
+        collection = database.get_collection("geocode_history")
+        collection.bulk_write([
+            UpdateOne(
+                {"_id": key},
+                {
+                    "$inc": {"lookups": lookup["count"]},
+                    "$set": {
+                        "display_name": lookup["display_name"],
+                        "lat": lookup["lat"],
+                        "lon": lookup["lon"],
+                        "last_seen": now
+                    }
+                },
+                upsert=True
+            )
+            for key, lookup in lookups.items()
+        ], ordered=False)
+
+    @staticmethod
+    def all() -> Iterable[Dict]:
+        collection = database.get_collection("geocode_history")
+        return collection.find({}, {"display_name": 1, "lat": 1, "lon": 1, "lookups": 1})
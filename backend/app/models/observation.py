@@ -0,0 +1,156 @@
+import time
+from typing import Dict, List, Optional
+
+from backend.app.utils.http_cache import make_etag
+from backend.app.utils.localization import CONDITIONS, describe, language
+
+KELVIN_OFFSET = 273.15
+METRES_PER_SECOND_PER_MPH = 0.44704
+
+TEMPERATURE_SYMBOLS = {"metric": "°C", "imperial": "°F", "standard": " K"}
+SPEED_SYMBOLS = {"metric": " m/s", "imperial": " mph", "standard": " m/s"}
+
+
+def convert_temperature(kelvin: float, units: str) -> float:
+    if units == "metric":
+        return round(kelvin - KELVIN_OFFSET, 2)
+    if units == "imperial":
+        return round((kelvin - KELVIN_OFFSET) * 9 / 5 + 32, 2)
+    return kelvin
+
+
+def convert_speed(metres_per_second: float, units: str) -> float:
+    if units == "imperial":
+        return round(metres_per_second / METRES_PER_SECOND_PER_MPH, 2)
+    return metres_per_second
+
+
+class Observation:
+    """
+    A provider observation in canonical units
+
+    Temperatures are in kelvin, wind speed in m/s, pressure in hPa and
+    humidity in percent; the condition is an OpenWeatherMap condition
+    code. One observation serves every units/lang combination: values are
+    converted and descriptions localized when a response is rendered.
+
+    Cached in the local tier as is and in the shared tier as a JSON list
+    (``to_list``/``from_list``).
+    """
+
+    __slots__ = ("observed_at", "temperature", "feels_like", "humidity", "pressure", "wind_speed",
+                 "condition", "description", "city_name", "country", "etag", "fresh_until", "prewarmed_over")
+
+    def __init__(self, observed_at: float, temperature: float, feels_like: float, humidity: float,
+                 pressure: Optional[float], wind_speed: float, condition: Optional[int],
+                 description: Optional[str], city_name: str, country: Optional[str]):
+        self.observed_at = observed_at
+        self.temperature = temperature
+        self.feels_like = feels_like
+        self.humidity = humidity
+        self.pressure = pressure
+        self.wind_speed = wind_speed
+        self.condition = condition
+        # Only kept for codes the localization table does not know
+        self.description = None if condition in CONDITIONS else description
+        self.city_name = city_name
+        self.country = country
+        # Identifies the observation; each rendering's ETag adds units and lang (see ``tag``)
+        self.etag = make_etag({name: getattr(self, name) for name in Observation.__slots__[:10]},
+                              observed_at).strip('"')
+        self.fresh_until = 0.0
+        self.prewarmed_over = None
+
+    @staticmethod
+    def from_provider(data: Dict) -> "Observation":
+        """
+        Build an observation from an OpenWeatherMap response in standard units
+
+        Raises:
+            KeyError: If the response is missing expected fields
+        """
+        return Observation(
+            observed_at=data.get("dt", time.time()),
+            temperature=data["main"]["temp"],
+            feels_like=data["main"]["feels_like"],
+            humidity=data["main"]["humidity"],
+            pressure=data["main"].get("pressure"),
+            wind_speed=data["wind"]["speed"],
+            condition=data["weather"][0].get("id"),
+            description=data["weather"][0]["description"],
+            city_name=data["name"],
+            country=data["sys"].get("country")
+        )
+
+    def at_place(self, city_name: str, country: Optional[str]) -> "Observation":
+        """
+        The observation with the place filled in where the provider gave none
+
+        Open-Meteo does not name the place it reports on, so the requested
+        city is used instead.
+        """
+        if (self.city_name or not city_name) and (self.country or not country):
+            return self
+        observation = Observation(self.observed_at, self.temperature, self.feels_like, self.humidity,
+                                  self.pressure, self.wind_speed, self.condition, self.description,
+                                  self.city_name or city_name, self.country or country)
+        observation.fresh_until = self.fresh_until
+        observation.prewarmed_over = self.prewarmed_over
+        return observation
+
+    def values(self, units: str = "metric") -> Dict[str, Optional[float]]:
+        """Numeric readings in the given units (metric/imperial/standard)"""
+        return {
+            "temperature": convert_temperature(self.temperature, units),
+            "feels_like": convert_temperature(self.feels_like, units),
+            "humidity": self.humidity,
+            "pressure": self.pressure,
+            "wind_speed": convert_speed(self.wind_speed, units)
+        }
+
+    def render(self, units: str = "metric", lang: str = "en") -> Dict[str, str]:
+        """
+        Format the observation for an API response
+
+        Args:
+            units (str): metric, imperial or standard
+            lang (str): Language for the description; unsupported
+                languages get English
+
+        Returns:
+            Dict[str, str]: Weather data as served by /weather
+        """
+        return {
+            "temperature": f"{convert_temperature(self.temperature, units)}{TEMPERATURE_SYMBOLS[units]}",
+            "feels_like": f"{convert_temperature(self.feels_like, units)}{TEMPERATURE_SYMBOLS[units]}",
+            "humidity": f"{self.humidity}%",
+            "description": describe(self.condition, lang, self.description or ""),
+            "wind_speed": f"{convert_speed(self.wind_speed, units)}{SPEED_SYMBOLS[units]}",
+            "city_name": self.city_name,
+            "country": self.country
+        }
+
+    def tag(self, units: str, lang: str) -> str:
+        """Quoted ETag of the rendering for units and lang"""
+        return f'"{self.etag}-{units}-{language(lang)}"'
+
+    def to_list(self) -> List:
+        return [getattr(self, name) for name in Observation.__slots__]
+
+    @staticmethod
+    def from_list(values: List) -> "Observation":
+        """
+        Rebuild an observation from ``to_list`` output
+
+        Raises:
+            ValueError: If values is not a serialized observation
+        """
+        if not isinstance(values, list) or len(values) != len(Observation.__slots__):
+            raise ValueError("Not a serialized observation")
+        observation = Observation.__new__(Observation)
+        for name, value in zip(Observation.__slots__, values):
+            setattr(observation, name, value)
+        return observation
+
+    def __repr__(self):
+        return f"Observation(city_name='{self.city_name}', temperature={self.temperature}, observed_at={self.observed_at})"
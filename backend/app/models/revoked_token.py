@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Dict, Iterable
+
+from backend.app.database import database
+
+class RevokedToken:
+    """Token ids revoked before their expiry, removed by a TTL index once expired"""
+
+    _indexes_ready = False
+
+    @staticmethod
+    def collection():
+        collection = database.get_collection("revoked_tokens")
+        if not RevokedToken._indexes_ready:
+            collection.create_index("exp", expireAfterSeconds=0)
+            collection.create_index("revoked_at")
+            RevokedToken._indexes_ready = True
+        return collection
+
+    @staticmethod
+    def add(jti: str, exp: float) -> bool:
+        """
+        Record a revoked token id until the token's own expiry (a Unix time)
+
+        Returns:
+            bool: True if this call revoked it, False if it already was
+        """
+        result = RevokedToken.collection().update_one(
+            {"_id": jti},
+            {"$setOnInsert": {"exp": datetime.utcfromtimestamp(exp), "revoked_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return result.upserted_id is not None
+
+    @staticmethod
+    def since(revoked_after: datetime) -> Iterable[Dict]:
+        """Revocations recorded after a point in time that have not expired yet"""
+        return RevokedToken.collection().find(
+            {"revoked_at": {"$gt": revoked_after}, "exp": {"$gt": datetime.utcnow()}},
+            {"exp": 1, "revoked_at": 1}
+        )
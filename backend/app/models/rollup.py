@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from backend.app.database import database
+
+# Rollup resolutions in seconds, finest first
+RESOLUTIONS = {"hour": 3600, "day": 86400}
+
+# Observation fields aggregated into every bucket
+METRICS = ("temperature", "feels_like", "humidity", "pressure", "wind_speed")
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def bucket_start(timestamp: datetime, seconds: int) -> datetime:
+    """Floor a naive UTC timestamp to the start of its bucket"""
+    offset = int((timestamp - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=offset - offset % seconds)
+
+
+class WeatherRollup:
+    """
+    Hourly and daily min/max/mean aggregates per city
+
+    Each bucket stores count, sum, min and max per metric, so buckets can
+    be updated incrementally with $inc/$min/$max and merged into coarser
+    ones without going back to the raw observations.
+    """
+
+    _indexes_ready = False
+
+    @staticmethod
+    def collection(resolution: str):
+        if not WeatherRollup._indexes_ready:
+            WeatherRollup.ensure_indexes()
+        return database.get_collection(f"weather_rollup_{resolution}")
+
+    @staticmethod
+    def ensure_indexes() -> None:
+        for resolution in RESOLUTIONS:
+            database.get_collection(f"weather_rollup_{resolution}").create_index(
+                [("city", 1), ("bucket", 1)], unique=True
+            )
+        WeatherRollup._indexes_ready = True
+
+    @staticmethod
+    def aggregate(observations: Iterable[Dict], seconds: int) -> Dict[Tuple[str, datetime], Dict]:
+        """
+        Fold observations into buckets in memory
+
+        Args:
+            observations (Iterable[Dict]): Stored observation documents
+            seconds (int): Bucket width
+
+        Returns:
+            Dict[Tuple[str, datetime], Dict]: (city, bucket start) -> bucket
+        """
+        buckets = {}
+        for observation in observations:
+            key = (observation["city"], bucket_start(observation["timestamp"], seconds))
+            bucket = buckets.setdefault(key, {"count": 0})
+            bucket["count"] += 1
+            for metric in METRICS:
+                value = observation.get(metric)
+                if value is None:
+                    continue
+                stats = bucket.get(metric)
+                if stats is None:
+                    bucket[metric] = {"n": 1, "sum": value, "min": value, "max": value}
+                else:
+                    stats["n"] += 1
+                    stats["sum"] += value
+                    stats["min"] = min(stats["min"], value)
+                    stats["max"] = max(stats["max"], value)
+        return buckets
+
+    @staticmethod
+    def apply(observations: List[Dict]) -> None:
+        """
+        Fold a batch of newly stored observations into every rollup
+
+        Only the buckets touched by the batch are written, one upsert per
+        (city, bucket) per resolution.
+        """
+        from pymongo import UpdateOne
+        for resolution, seconds in RESOLUTIONS.items():
+            updates = []
+            for (city, bucket), stats in WeatherRollup.aggregate(observations, seconds).items():
+                update = {"$inc": {"count": stats.pop("count")}, "$min": {}, "$max": {}}
+                for metric, values in stats.items():
+                    update["$inc"][f"{metric}.n"] = values["n"]
+                    update["$inc"][f"{metric}.sum"] = values["sum"]
+                    update["$min"][f"{metric}.min"] = values["min"]
+                    update["$max"][f"{metric}.max"] = values["max"]
+                updates.append(UpdateOne(
+                    {"city": city, "bucket": bucket},
+                    {op: fields for op, fields in update.items() if fields},
+                    upsert=True
+                ))
+            if updates:
+                WeatherRollup.collection(resolution).bulk_write(updates, ordered=False)
+
+    @staticmethod
+    def find_range(city: str, resolution: str, start: datetime, end: datetime) -> List[Dict]:
+        """Get a city's buckets starting in [start, end), oldest first"""
+        cursor = WeatherRollup.collection(resolution).find(
+            {"city": city, "bucket": {"$gte": bucket_start(start, RESOLUTIONS[resolution]), "$lt": end}},
+            {"_id": 0, "city": 0}
+        ).sort("bucket", 1)
+        return list(cursor)
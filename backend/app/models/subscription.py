@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from backend.app.database import database
+from backend.app.models.rollup import METRICS
+from backend.app.utils.validators import normalize_city
+
+COLLECTION = "alert_subscriptions"
+
+# Comparison operators a threshold can use
+OPERATORS = (">", ">=", "<", "<=")
+
+# Fields the alert engine loads for every active subscription
+ENGINE_FIELDS = {"username": 1, "city": 1, "lat": 1, "lon": 1, "metric": 1,
+                 "operator": 1, "threshold": 1, "cooldown": 1}
+
+
+class AlertSubscription:
+    """
+    A weather threshold alert, e.g. wind_speed > 15 in Lagos
+
+    Metrics are compared in metric units: temperatures in °C, wind speed in
+    m/s, pressure in hPa and humidity in percent.
+    """
+
+    _indexes_ready = False
+
+    def __init__(self, username: str, city: str, lat: float, lon: float, metric: str,
+                 operator: str, threshold: float, cooldown: int):
+        self.username = username
+        self.city = normalize_city(city)
+        self.lat = lat
+        self.lon = lon
+        self.metric = metric
+        self.operator = operator
+        self.threshold = float(threshold)
+        self.cooldown = int(cooldown)
+        self.created_at = datetime.utcnow()
+        self.active = True
+
+    @staticmethod
+    def validate(metric: str, operator: str, threshold) -> Optional[str]:
+        """Check a rule, returning an error message or None if it is valid"""
+        if metric not in METRICS:
+            return f"Invalid metric. Use one of: {', '.join(METRICS)}"
+        if operator not in OPERATORS:
+            return f"Invalid operator. Use one of: {', '.join(OPERATORS)}"
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+            return "Threshold must be a number"
+        return None
+
+    def save(self) -> Optional[str]:
+        """
+        Insert the subscription
+
+        Returns:
+            Optional[str]: The new subscription id, or None if the user
+            already has an identical rule for the city
+        """
+        from pymongo.errors import DuplicateKeyError
+        try:
+            return str(AlertSubscription.collection().insert_one(dict(self.__dict__)).inserted_id)
+        except DuplicateKeyError:
+            return None
+
+    @staticmethod
+    def collection():
+        collection = database.get_collection(COLLECTION)
+        if not AlertSubscription._indexes_ready:
+            # Identical rules would only ever send duplicate notifications
+            collection.create_index([("username", 1), ("city", 1), ("metric", 1), ("operator", 1),
+                                     ("threshold", 1)], unique=True)
+            collection.create_index("active")
+            AlertSubscription._indexes_ready = True
+        return collection
+
+    @staticmethod
+    def find_by_user(username: str) -> List[Dict]:
+        """Get a user's subscriptions, oldest first"""
+        cursor = AlertSubscription.collection().find({"username": username}).sort("created_at", 1)
+        return [dict(subscription, _id=str(subscription["_id"])) for subscription in cursor]
+
+    @staticmethod
+    def count_by_user(username: str) -> int:
+        return AlertSubscription.collection().count_documents({"username": username})
+
+    @staticmethod
+    def delete(username: str, subscription_id: str) -> bool:
+        """Delete one of a user's subscriptions, returning whether it existed"""
+        from bson import ObjectId
+        from bson.errors import InvalidId
+        try:
+            object_id = ObjectId(subscription_id)
+        except InvalidId:
+            return False
+        result = AlertSubscription.collection().delete_one({"_id": object_id, "username": username})
+        return result.deleted_count == 1
+
+    @staticmethod
+    def load_active() -> Iterable[Dict]:
+        """Stream every active subscription with the fields the alert engine needs"""
+        return AlertSubscription.collection().find({"active": True}, ENGINE_FIELDS)
@@ -1,17 +1,13 @@
-import os
-from pathlib import Path
-import sys
 import hashlib
 import secrets
 from typing import Optional, Dict
 from datetime import datetime
-
-# Add the root directory to Python path
-ROOT_DIR = Path(__file__).parent.parent.parent.parent
-sys.path.append(str(ROOT_DIR))
+import logging
 
 from backend.app.database import database
 
+logger = logging.getLogger(__name__)
+
 class User:
     def __init__(self, username: str, password: str):
         self.username = username
@@ -29,7 +25,7 @@ class User:
             collection.insert_one(self.__dict__)
             return True
         except Exception as e:
-            print(f"Error saving user: {e}")
+            logger.error("Error saving user: %s", e)
             return False
 
     @staticmethod
@@ -42,12 +38,19 @@ class User:
         """Verify password against stored hash"""
         return self.password == self._hash_password(password, self.salt)
 
+    @staticmethod
+    def check_password(user: Dict, password: str) -> bool:
+        """Verify password against a user document loaded from the database"""
+        expected = User._hash_password(password, user.get("salt", ""))
+        return secrets.compare_digest(user.get("password", ""), expected)
+
     @staticmethod
     def _generate_salt(length: int = 16) -> str:
         """Generate random salt for password hashing"""
         return secrets.token_hex(length)
 
-    def _hash_password(self, password: str, salt: str) -> str:
+    @staticmethod
+    def _hash_password(password: str, salt: str) -> str:
         """Hash password with salt using SHA-256"""
         salted = password + salt
         return hashlib.sha256(salted.encode()).hexdigest()
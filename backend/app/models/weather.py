@@ -1,28 +1,137 @@
-import os
-from pathlib import Path
-import sys
-
-# Add the root directory to Python path
-ROOT_DIR = Path(__file__).parent.parent.parent.parent
-sys.path.append(str(ROOT_DIR))
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import logging
 
+from backend.app.config import config
 from backend.app.database import database
+from backend.app.models.rollup import WeatherRollup
+from backend.app.utils.bulk_writer import BulkWriter, register_writer
+from backend.app.utils.localization import describe
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "weather_observations"
 
 class Weather:
-    def __init__(self, city, temperature, condition, timestamp):
-        self.city = city
+    """
+    A weather observation
+
+    Observations are stored in metric units in a time-series collection
+    (city as the meta field) and written in batches by ``writer``.
+    """
+
+    _collection_ready = False
+
+    def __init__(self, city, temperature, condition, timestamp, **measurements):
+        self.city = normalize_city(city)
         self.temperature = temperature
         self.condition = condition
         self.timestamp = timestamp
+        for name, value in measurements.items():
+            setattr(self, name, value)
 
-    def save(self):
-        collection = database.get_collection("weather")
-        collection.insert_one(self.__dict__)
+    @staticmethod
+    def from_observation(observation, lat: float, lon: float, city: str = "") -> "Weather":
+        """
+        Build an observation from a provider-neutral Observation
+
+        Args:
+            observation (Observation): Observation in canonical units
+            lat (float): Latitude the observation was requested for
+            lon (float): Longitude the observation was requested for
+            city (str): City the observation was requested for; stored
+                under it rather than under the provider's place name, so
+                one city's series does not depend on the provider
+        """
+        values = observation.values("metric")
+        return Weather(
+            city or observation.city_name or f"{lat:.2f},{lon:.2f}",
+            values["temperature"],
+            describe(observation.condition, "en", observation.description or ""),
+            datetime.fromtimestamp(observation.observed_at, timezone.utc).replace(tzinfo=None),
+            lat=lat,
+            lon=lon,
+            feels_like=values["feels_like"],
+            humidity=values["humidity"],
+            pressure=values["pressure"],
+            wind_speed=values["wind_speed"],
+            country=observation.country
+        )
+
+    def save(self) -> bool:
+        """Queue the observation for the next bulk insert"""
+        return writer.add(dict(self.__dict__))
+
+    @staticmethod
+    def collection():
+        """Get the observations collection, creating it and its indexes on first use"""
+        if not Weather._collection_ready:
+            Weather.ensure_collection()
+        return database.get_collection(COLLECTION)
+
+    @staticmethod
+    def ensure_collection() -> None:
+        """
+        Create the time-series collection and indexes if missing
+
+        Falls back to a regular collection with a TTL index when the server
+        does not support time-series collections (MongoDB < 5.0).
+        """
+        from pymongo.errors import CollectionInvalid, OperationFailure
+        ttl = config.OBSERVATION_TTL_DAYS * 24 * 3600
+        try:
+            database.db.create_collection(
+                COLLECTION,
+                timeseries={"timeField": "timestamp", "metaField": "city", "granularity": "minutes"},
+                expireAfterSeconds=ttl
+            )
+        except CollectionInvalid:
+            pass  # Already exists
+        except (OperationFailure, NotImplementedError, TypeError) as e:
+            logger.warning("Time-series collections unavailable, using TTL index: %s", e)
+            database.get_collection(COLLECTION).create_index("timestamp", expireAfterSeconds=ttl)
+
+        database.get_collection(COLLECTION).create_index([("city", 1), ("timestamp", -1)])
+        Weather._collection_ready = True
+
+    @staticmethod
+    def find_latest(city: str) -> Optional[Dict]:
+        """Get the most recent observation for a city"""
+        return Weather.collection().find_one(
+            {"city": normalize_city(city)},
+            {"_id": 0},
+            sort=[("timestamp", -1)]
+        )
+
+    @staticmethod
+    def find_range(city: str, start: datetime, end: datetime, limit: int = 0) -> List[Dict]:
+        """
+        Get a city's observations with start <= timestamp < end, oldest first
+
+        Args:
+            city (str): City name
+            start (datetime): Inclusive lower bound (UTC)
+            end (datetime): Exclusive upper bound (UTC)
+            limit (int): Maximum number of observations, 0 for no limit
+        """
+        cursor = Weather.collection().find(
+            {"city": normalize_city(city), "timestamp": {"$gte": start, "$lt": end}},
+            {"_id": 0}
+        ).sort("timestamp", 1)
+        return list(cursor.limit(limit) if limit else cursor)
 
     @staticmethod
     def find_by_city(city):
-        collection = database.get_collection("weather")
-        return collection.find_one({"city": city})
+        return Weather.find_latest(city)
 
     def __repr__(self):
-        return f"Weather(city='{self.city}', temperature={self.temperature}, condition='{self.condition}')"
\ No newline at end of file
+        return f"Weather(city='{self.city}', temperature={self.temperature}, condition='{self.condition}')"
+
+writer = register_writer(BulkWriter(
+    Weather.collection,
+    batch_size=config.OBSERVATION_BATCH_SIZE,
+    flush_interval=config.OBSERVATION_FLUSH_INTERVAL,
+    max_queue=config.OBSERVATION_QUEUE_SIZE
+))
+writer.add_listener(WeatherRollup.apply)
@@ -0,0 +1,93 @@
+from flask import Blueprint, Response, jsonify
+from typing import Tuple, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+from backend.app.database import database
+from backend.app.services.notification_service import AlertService
+from backend.app.services.prewarm_service import PrewarmService
+from backend.app.services.weather_service import WeatherService
+from backend.app.utils import metrics
+from backend.app.utils.auth import admin_required
+from backend.app.utils.quota import budgets
+
+admin_bp = Blueprint("admin", __name__)
+
+# Served at the root, where Prometheus scrapes by default
+metrics_bp = Blueprint("metrics", __name__)
+
+@admin_bp.route("/health", methods=["GET"])
+def health() -> Tuple[Dict[str, Any], int]:
+    """
+    Check that the service and its database are up
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: Database status, 200 if healthy or 503
+    """
+    mongo = database.ping()
+    healthy = mongo["status"] == "ok"
+    return jsonify({
+        "mongo": mongo,
+        "status": "success" if healthy else "error"
+    }), 200 if healthy else 503
+
+@admin_bp.route("/admin/prewarm", methods=["GET"])
+@admin_required
+def prewarm_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Get cache pre-warmer statistics
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: Tracked cities, refresh counters, the
+        number of user-facing misses prevented and HTTP status code
+    """
+    return jsonify({
+        "data": PrewarmService.stats(),
+        "status": "success"
+    }), 200
+
+@admin_bp.route("/admin/alerts", methods=["GET"])
+@admin_required
+def alert_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Get alert engine statistics
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: Subscription and cell counts, dispatch
+        counters and HTTP status code
+    """
+    return jsonify({
+        "data": AlertService.stats(),
+        "status": "success"
+    }), 200
+
+@admin_bp.route("/admin/budget", methods=["GET"])
+@admin_required
+def budget_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Get upstream call budgets
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: Usage, projected usage, TTL factor and
+        status per provider, the weather providers in the order they are
+        tried and HTTP status code
+    """
+    return jsonify({
+        "data": {
+            "budgets": [budget.state() for budget in budgets.values()],
+            "ttl_factor": WeatherService.providers.ttl_factor(),
+            "weather_providers": WeatherService.providers.stats()
+        },
+        "status": "success"
+    }), 200
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics_endpoint() -> Response:
+    """
+    Export request, upstream, database and cache metrics
+
+    Returns:
+        Response: Metrics in the Prometheus text exposition format
+    """
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,138 @@
+from flask import Blueprint, request, jsonify, g
+from typing import Tuple, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+from backend.app.config import config
+from backend.app.models.subscription import AlertSubscription
+from backend.app.services.location_service import LocationService
+from backend.app.utils.auth import token_required
+from backend.app.utils.quota import QuotaExhaustedError
+
+alert_bp = Blueprint("alert", __name__)
+
+@alert_bp.route("/alerts", methods=["POST"])
+@token_required
+def create_alert() -> Tuple[Dict[str, Any], int]:
+    """
+    Subscribe to a weather threshold alert
+    
+    Request Body:
+        city (str): Name of the city
+        metric (str): temperature, feels_like, humidity, pressure or wind_speed
+        operator (str): >, >=, < or <=
+        threshold (float): Value in metric units (°C, %, hPa, m/s)
+        cooldown (int, optional): Minimum seconds between notifications
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: Subscription id and HTTP status code
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({
+            "error": "Invalid request body",
+            "status": "error"
+        }), 400
+
+    city = str(data.get("city", "")).strip()
+    cooldown = data.get("cooldown", config.ALERT_DEFAULT_COOLDOWN)
+    error = AlertSubscription.validate(data.get("metric"), data.get("operator"), data.get("threshold"))
+    if not city:
+        error = "City is required"
+    elif error is None and (not isinstance(cooldown, int) or isinstance(cooldown, bool) or cooldown < 0):
+        error = "Cooldown must be a non-negative number of seconds"
+    if error:
+        return jsonify({
+            "error": error,
+            "status": "error"
+        }), 400
+
+    try:
+        if AlertSubscription.count_by_user(g.username) >= config.ALERT_MAX_PER_USER:
+            return jsonify({
+                "error": f"At most {config.ALERT_MAX_PER_USER} alerts per user",
+                "status": "error"
+            }), 400
+
+        location = LocationService.get_coordinates(city)
+        if not location:
+            return jsonify({
+                "error": f"Could not find coordinates for {city}",
+                "status": "error"
+            }), 404
+
+        subscription_id = AlertSubscription(
+            g.username, city, location["lat"], location["lon"],
+            data["metric"], data["operator"], data["threshold"], cooldown
+        ).save()
+    except QuotaExhaustedError as e:
+        return jsonify({
+            "error": "Geocoding call budget is used up",
+            "status": "error"
+        }), 503, {"Retry-After": str(max(1, e.retry_after))}
+    except Exception as e:
+        logger.error("Error creating alert: %s", e)
+        return jsonify({
+            "error": "Failed to create alert",
+            "status": "error"
+        }), 500
+
+    if subscription_id is None:
+        return jsonify({
+            "error": "An identical alert already exists",
+            "status": "error"
+        }), 409
+    return jsonify({
+        "id": subscription_id,
+        "status": "success"
+    }), 201
+
+@alert_bp.route("/alerts", methods=["GET"])
+@token_required
+def list_alerts() -> Tuple[Dict[str, Any], int]:
+    """
+    List the authenticated user's alerts
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: Subscriptions and HTTP status code
+    """
+    try:
+        subscriptions = AlertSubscription.find_by_user(g.username)
+    except Exception as e:
+        logger.error("Error listing alerts: %s", e)
+        return jsonify({
+            "error": "Failed to list alerts",
+            "status": "error"
+        }), 500
+    return jsonify({
+        "data": subscriptions,
+        "status": "success"
+    }), 200
+
+@alert_bp.route("/alerts/<subscription_id>", methods=["DELETE"])
+@token_required
+def delete_alert(subscription_id: str) -> Tuple[Dict[str, Any], int]:
+    """
+    Delete one of the authenticated user's alerts
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: Confirmation and HTTP status code
+    """
+    try:
+        deleted = AlertSubscription.delete(g.username, subscription_id)
+    except Exception as e:
+        logger.error("Error deleting alert: %s", e)
+        return jsonify({
+            "error": "Failed to delete alert",
+            "status": "error"
+        }), 500
+    if not deleted:
+        return jsonify({
+            "error": "Alert not found",
+            "status": "error"
+        }), 404
+    return jsonify({
+        "message": "Alert deleted",
+        "status": "success"
+    }), 200
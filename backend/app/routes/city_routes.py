@@ -0,0 +1,85 @@
+from flask import Blueprint, request, jsonify
+from typing import Tuple, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+from backend.app.services.location_service import LocationService
+from backend.app.services.suggest_service import CitySuggestService
+from backend.app.utils.quota import QuotaExhaustedError
+from backend.app.utils.validators import parse_coordinates
+
+city_bp = Blueprint("city", __name__)
+
+@city_bp.route("/cities/suggest", methods=["GET"])
+def suggest_cities() -> Tuple[Dict[str, Any], int]:
+    """
+    Suggest city names for a partial query
+    
+    Query Parameters:
+        q (str): Beginning of a city name
+        limit (int, optional): Maximum number of suggestions (default 10)
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: Suggestions and HTTP status code
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({
+            "error": "q parameter is required",
+            "status": "error"
+        }), 400
+
+    try:
+        limit = int(request.args.get("limit", "10"))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return jsonify({
+            "error": "limit must be a positive integer",
+            "status": "error"
+        }), 400
+
+    return jsonify({
+        "suggestions": CitySuggestService.suggest(query, limit),
+        "status": "success"
+    }), 200
+
+@city_bp.route("/cities/reverse", methods=["GET"])
+def reverse_geocode() -> Tuple[Dict[str, Any], int]:
+    """
+    Find the place nearest to coordinates
+    
+    Query Parameters:
+        lat (float): Latitude
+        lon (float): Longitude
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: Place with lat, lon, display_name and
+        distance_km, and HTTP status code
+    """
+    try:
+        lat, lon = parse_coordinates(request.args.get("lat"), request.args.get("lon"))
+    except (TypeError, ValueError):
+        return jsonify({
+            "error": "lat and lon must be valid coordinates",
+            "status": "error"
+        }), 400
+
+    try:
+        place = LocationService.reverse(lat, lon)
+    except QuotaExhaustedError as e:
+        return jsonify({
+            "error": "Geocoding call budget is used up",
+            "status": "error"
+        }), 503, {"Retry-After": str(max(1, e.retry_after))}
+    if not place:
+        return jsonify({
+            "error": f"No place found near {lat},{lon}",
+            "status": "error"
+        }), 404
+
+    return jsonify({
+        "data": place,
+        "status": "success"
+    }), 200
@@ -1,26 +1,17 @@
-from pathlib import Path
-import sys
 from flask import Blueprint, request, jsonify
-from flask import current_app
+from flask import current_app, g
 
 from collections import defaultdict
 from typing import Tuple, Dict, Any
 import re
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-
-# Add the root directory to Python path
-ROOT_DIR = Path(__file__).parent.parent.parent.parent
-sys.path.append(str(ROOT_DIR))
-
 from backend.app.models.user import User
+from backend.app.services.auth_service import AuthService
+from backend.app.utils.auth import token_required
+from backend.app.utils.tokens import TokenError
 
 user_bp = Blueprint("user", __name__)
 
@@ -45,6 +36,140 @@ def validate_password(password: str) -> bool:
     return True
 
 
+def register_user(data: Any) -> Tuple[Dict[str, Any], int]:
+    """
+    Validate a registration request and create the user
+    
+    Shared by the Flask and ASGI apps.
+    
+    Args:
+        data (Any): Parsed JSON request body
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: Response data and HTTP status code
+    """
+    if not data:
+        return {
+            "error": "Invalid request body",
+            "status": "error"
+        }, 400
+        
+    username = data.get("username", "").strip()
+    password = data.get("password", "")
+
+    # Validate input
+    if not username or not password:
+        return {
+            "error": "Username and password are required",
+            "status": "error"
+        }, 400
+        
+    if len(username) < 3:
+        return {
+            "error": "Username must be at least 3 characters",
+            "status": "error"
+        }, 400
+        
+    if not validate_password(password):
+        return {
+            "error": "Password must be at least 8 characters and contain uppercase, lowercase, numbers, and special characters",
+            "status": "error"
+        }, 400
+
+    # Check if user exists
+    if User.find_by_username(username):
+        return {
+            "error": "Username already exists",
+            "status": "error"
+        }, 409
+
+    # Create and save user
+    user = User(username, password)
+    if user.save():
+        return {
+            "message": "User registered successfully",
+            "username": username,
+            "status": "success"
+        }, 201
+        
+    return {
+        "error": "Failed to create user",
+        "status": "error"
+    }, 500
+
+
+def login_user(data: Any) -> Tuple[Dict[str, Any], int]:
+    """
+    Check a login request's credentials
+    
+    Shared by the Flask and ASGI apps.
+    
+    Args:
+        data (Any): Parsed JSON request body
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: Response data and HTTP status code
+    """
+    if not isinstance(data, dict):
+        return {
+            "error": "Invalid request body",
+            "status": "error"
+        }, 400
+
+    username = data.get("username", "").strip()
+    password = data.get("password", "")
+    
+    if not username or not password:
+        return {
+            "error": "Username and password are required",
+            "status": "error"
+        }, 400
+        
+    user = User.find_by_username(username)
+    if not user or not User.check_password(user, password):
+        return {
+            "error": "Invalid username or password",
+            "status": "error"
+        }, 401
+        
+    return {
+        "message": "Login successful",
+        "username": username,
+        **AuthService.issue_tokens(username),
+        "status": "success"
+    }, 200
+
+
+def refresh_session(data: Any) -> Tuple[Dict[str, Any], int]:
+    """
+    Exchange a refresh token for a new access/refresh token pair
+    
+    Shared by the Flask and ASGI apps.
+    
+    Args:
+        data (Any): Parsed JSON request body with refresh_token
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: Response data and HTTP status code
+    """
+    refresh_token = data.get("refresh_token", "") if isinstance(data, dict) else ""
+    if not refresh_token:
+        return {
+            "error": "refresh_token is required",
+            "status": "error"
+        }, 400
+
+    try:
+        session = AuthService.refresh(refresh_token)
+    except TokenError as e:
+        return {
+            "error": str(e),
+            "status": "error"
+        }, 401
+
+    return {**session, "status": "success"}, 200
+
+
 @user_bp.route("/register", methods=["POST"])
 def register() -> Tuple[Dict[str, Any], int]:
     """
@@ -58,59 +183,11 @@ def register() -> Tuple[Dict[str, Any], int]:
         Tuple[Dict[str, Any], int]: Response data and HTTP status code
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                "error": "Invalid request body",
-                "status": "error"
-            }), 400
-            
-        username = data.get("username", "").strip()
-        password = data.get("password", "")
-
-        # Validate input
-        if not username or not password:
-            return jsonify({
-                "error": "Username and password are required",
-                "status": "error"
-            }), 400
-            
-        if len(username) < 3:
-            return jsonify({
-                "error": "Username must be at least 3 characters",
-                "status": "error"
-            }), 400
-            
-        if not validate_password(password):
-            return jsonify({
-                "error": "Password must be at least 8 characters and contain uppercase, lowercase, numbers, and special characters",
-                "status": "error"
-            }), 400
-
-        # Check if user exists
-        if User.find_by_username(username):
-            return jsonify({
-                "error": "Username already exists",
-                "status": "error"
-            }), 409
-
-        # Create and save user
-        user = User(username, password)
-        if user.save():
-            return jsonify({
-                "message": "User registered successfully",
-                "username": username,
-                "status": "success"
-            }), 201
-            
-        return jsonify({
-            "error": "Failed to create user",
-            "status": "error"
-        }), 500
+        body, status = register_user(request.get_json())
+        return jsonify(body), status
         
     except Exception as e:
-        logging.error(f"Registration error: {str(e)}")
+        logger.error("Registration error: %s", e)
         return jsonify({
             "error": "Internal server error",
             "status": "error"
@@ -121,36 +198,63 @@ def register() -> Tuple[Dict[str, Any], int]:
 def login() -> Tuple[Dict[str, Any], int]:
     """Handle user login"""
     try:
-        data = request.get_json()
-        
-        username = data.get("username", "").strip()
-        password = data.get("password", "")
-        
-        if not username or not password:
-            return jsonify({
-                "error": "Username and password are required",
-                "status": "error"
-            }), 400
-            
-        user = User.find_by_username(username)
-        if not user or not User.verify_password(password):
-            return jsonify({
-                "error": "Invalid username or password",
-                "status": "error"
-            }), 401
-            
-        return jsonify({
-            "message": "Login successful",
-            "username": username,
-            "status": "success"
-        }), 200
+        body, status = login_user(request.get_json())
+        return jsonify(body), status
         
     except Exception as e:
-        logging.error(f"Login error: {str(e)}")
+        logger.error("Login error: %s", e)
         return jsonify({
             "error": "Internal server error",
             "status": "error"
         }), 500
+
+
+@user_bp.route("/token/refresh", methods=["POST"])
+def refresh_token() -> Tuple[Dict[str, Any], int]:
+    """
+    Get a new access token
+    
+    Request Body:
+        refresh_token (str): Refresh token from login or a previous refresh
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: New token pair and HTTP status code
+    """
+    body, status = refresh_session(request.get_json(silent=True))
+    return jsonify(body), status
+
+
+@user_bp.route("/logout", methods=["POST"])
+@token_required
+def logout() -> Tuple[Dict[str, Any], int]:
+    """
+    Revoke the access token, and the refresh token if one is given
+    
+    Request Body:
+        refresh_token (str, optional): Refresh token to revoke as well
+    """
+    AuthService.revoke(g.token_claims)
+    data = request.get_json(silent=True) or {}
+    if data.get("refresh_token"):
+        try:
+            AuthService.revoke(AuthService.verify(data["refresh_token"], "refresh"))
+        except TokenError:
+            pass  # Already expired or revoked
+    return jsonify({
+        "message": "Logged out",
+        "status": "success"
+    }), 200
+
+
+@user_bp.route("/me", methods=["GET"])
+@token_required
+def current_user() -> Tuple[Dict[str, Any], int]:
+    """Get the authenticated user from the access token"""
+    return jsonify({
+        "username": g.username,
+        "expires_at": g.token_claims["exp"],
+        "status": "success"
+    }), 200
     
 
 @user_bp.route("/routes", methods=["GET"])
@@ -178,7 +282,7 @@ def list_routes() -> Tuple[Dict[str, Any], int]:
             for module, routes in route_groups.items()
         }
         
-        logger.info(f"Retrieved routes from {len(route_groups)} modules")
+        logger.info("Retrieved routes from %s modules", len(route_groups))
         return jsonify({
             "routes": formatted_routes,
             "total_routes": sum(len(routes) for routes in route_groups.values()),
@@ -186,7 +290,7 @@ def list_routes() -> Tuple[Dict[str, Any], int]:
         }), 200
         
     except Exception as e:
-        logger.error(f"Error listing routes: {str(e)}")
+        logger.error("Error listing routes: %s", e)
         return jsonify({
             "error": "Failed to list routes",
             "status": "error"
@@ -1,33 +1,56 @@
-from pathlib import Path
-import sys
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from datetime import datetime, timedelta
 from typing import Tuple, Dict, Any
+import json
 import logging
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Add the root directory to Python path
-ROOT_DIR = Path(__file__).parent.parent.parent.parent
-sys.path.append(str(ROOT_DIR))
-
-from backend.app.services.weather_service import WeatherService
+from backend.app.services.weather_service import WeatherService, CACHE_DEGRADED
 from backend.app.services.location_service import LocationService
+from backend.app.services.batch_service import BatchWeatherService
+from backend.app.services.download_service import CONTENT_TYPES, DownloadService
+from backend.app.services.history_service import HistoryService
+from backend.app.services.prewarm_service import PrewarmService
+from backend.app.utils.auth import token_required
+from backend.app.utils.compression import choose_encoding, compress, compress_stream
+from backend.app.utils.http_cache import cache_headers, is_not_modified
+from backend.app.utils.quota import QuotaExhaustedError
+from backend.app.utils.validators import normalize_city, parse_coordinates, parse_timestamp
+from backend.app.config import config
 
 weather_bp = Blueprint("weather", __name__)
 
 @weather_bp.route("/weather", methods=["GET"])
 def get_weather() -> Tuple[Dict[str, Any], int]:
     """
-    Get current weather data for a city
+    Get current weather data for a city or coordinates
     
     Query Parameters:
-        city (str): Name of the city
-        units (str, optional): Units of measurement (metric/imperial)
+        city (str, optional): Name of the city
+        lat (float, optional): Latitude, with lon, instead of city
+        lon (float, optional): Longitude
+        units (str, optional): Units of measurement (metric/imperial/standard)
         lang (str, optional): Language code for weather descriptions
+            (en, fr, es, de or pt; others get English)
         
     Returns:
         Tuple[Dict[str, Any], int]: Weather data and HTTP status code
+        
+    One cached observation per location serves every units and lang, and
+    a request within WEATHER_NEARBY_RADIUS km of a fresh observation is
+    answered from it without calling the provider.
+    The X-Cache response header reports whether the weather data was
+    served fresh from cache (HIT), stale while refreshing (STALE) or
+    fetched from the provider (MISS). Once every provider's call budget
+    is used up, stale data is served as DEGRADED with "degraded": true in
+    the body, and a location without cached data gets a 503 with a
+    Retry-After of when the first budget starts again. A city that is not
+    cached gets the same once Nominatim's budget is used up. Responses carry an ETag and
+    Last-Modified for the observation and a Cache-Control max-age for
+    its remaining freshness; a matching If-None-Match or
+    If-Modified-Since gets an empty 304.
     """
     try:
         # Validate input parameters
@@ -35,9 +58,9 @@ def get_weather() -> Tuple[Dict[str, Any], int]:
         units = request.args.get("units", "metric")
         lang = request.args.get("lang", "en")
         
-        if not city:
+        if not city and "lat" not in request.args and "lon" not in request.args:
             return jsonify({
-                "error": "City parameter is required",
+                "error": "City or lat and lon parameters are required",
                 "status": "error"
             }), 400
             
@@ -47,36 +70,229 @@ def get_weather() -> Tuple[Dict[str, Any], int]:
                 "status": "error"
             }), 400
 
-        # Get coordinates for the city
-        location = LocationService.get_coordinates(city)
-        if not location:
-            return jsonify({
-                "error": f"Could not find coordinates for {city}",
-                "status": "error"
-            }), 404
+        if city:
+            # Get coordinates for the city
+            try:
+                location = LocationService.get_coordinates(city)
+            except QuotaExhaustedError as e:
+                return jsonify({
+                    "error": "Geocoding call budget is used up",
+                    "status": "error"
+                }), 503, {"Retry-After": str(max(1, e.retry_after))}
+            if not location:
+                return jsonify({
+                    "error": f"Could not find coordinates for {city}",
+                    "status": "error"
+                }), 404
+            place = city
+        else:
+            try:
+                lat, lon = parse_coordinates(request.args.get("lat"), request.args.get("lon"))
+            except (TypeError, ValueError):
+                return jsonify({
+                    "error": "lat and lon must be valid coordinates",
+                    "status": "error"
+                }), 400
+            location = {"lat": lat, "lon": lon}
+            place = f"{lat},{lon}"
 
         # Get weather data using coordinates
-        weather = WeatherService.get_weather(
+        observation, cache_status = WeatherService.get_observation_with_status(
             lat=location["lat"],
             lon=location["lon"],
-            units=units,
-            lang=lang
+            city_name=city,
+            country=location.get("country")
         )
+        headers = {"X-Cache": cache_status}
         
-        if weather:
+        if observation:
+            if city:
+                PrewarmService.record(city, location, cache_status)
+            etag = WeatherService.etag(observation, units, lang)
+            headers.update(cache_headers(etag, observation.observed_at, observation.fresh_until))
+            if is_not_modified(etag, observation.observed_at, request.headers.get("If-None-Match"),
+                               request.headers.get("If-Modified-Since")):
+                return Response(status=304, headers=headers)
+            body = {"data": observation.render(units, lang), "status": "success"}
+            if cache_status == CACHE_DEGRADED:
+                body["degraded"] = True
+            return jsonify(body), 200, headers
+
+        if cache_status == CACHE_DEGRADED:
+            headers["Retry-After"] = str(WeatherService.providers.resets_in())
             return jsonify({
-                "data": weather,
-                "status": "success"
-            }), 200
-            
+                "error": "Weather providers' call budget is used up",
+                "status": "error"
+            }), 503, headers
+
         return jsonify({
-            "error": f"Weather data not found for {city}",
+            "error": f"Weather data not found for {place}",
             "status": "error"
-        }), 404
+        }), 404, headers
         
     except Exception as e:
-        logger.error(f"Error getting weather data: {str(e)}")
+        logger.error("Error getting weather data: %s", e)
         return jsonify({
             "error": "Failed to fetch weather data",
             "status": "error"
-        }), 500
\ No newline at end of file
+        }), 500
+
+@weather_bp.route("/weather/history", methods=["GET"])
+def get_weather_history() -> Tuple[Dict[str, Any], int]:
+    """
+    Get min/max/mean weather for a city over a time range
+    
+    Query Parameters:
+        city (str): Name of the city
+        from (str, optional): ISO 8601 start, defaults to HISTORY_DEFAULT_DAYS before 'to'
+        to (str, optional): ISO 8601 end, defaults to now
+        resolution (str, optional): raw, hour, day or a multiple such as 6h or 7d;
+            chosen automatically when omitted
+        
+    Returns:
+        Tuple[Dict[str, Any], int]: History points and HTTP status code
+    """
+    city = request.args.get("city", "").strip()
+    if not city:
+        return jsonify({
+            "error": "City parameter is required",
+            "status": "error"
+        }), 400
+
+    try:
+        end = parse_timestamp(request.args["to"]) if request.args.get("to") else datetime.utcnow()
+        start = (parse_timestamp(request.args["from"]) if request.args.get("from")
+                 else end - timedelta(days=config.HISTORY_DEFAULT_DAYS))
+        history = HistoryService.get_history(city, start, end, request.args.get("resolution"))
+    except ValueError as e:
+        return jsonify({
+            "error": str(e),
+            "status": "error"
+        }), 400
+    except Exception as e:
+        logger.error("Error getting weather history: %s", e)
+        return jsonify({
+            "error": "Failed to fetch weather history",
+            "status": "error"
+        }), 500
+
+    return _compressed(jsonify({
+        "data": history,
+        "status": "success"
+    })), 200
+
+@weather_bp.route("/weather/batch", methods=["POST"])
+def get_weather_batch():
+    """
+    Get current weather for many locations in one request
+    
+    Request Body:
+        cities (List[str], optional): City names
+        coordinates (List[Dict], optional): Objects with lat and lon
+        units (str, optional): Units of measurement (metric/imperial/standard)
+        lang (str, optional): Language code for weather descriptions
+        
+    Returns:
+        Response: NDJSON stream with one result object per unique location,
+        in completion order. Failed lookups are reported per item. The
+        stream is gzip or brotli compressed if the client accepts it.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({
+            "error": "Invalid request body",
+            "status": "error"
+        }), 400
+
+    cities = data.get("cities", [])
+    coordinates = data.get("coordinates", [])
+    units = data.get("units", "metric")
+    lang = data.get("lang", "en")
+
+    if not isinstance(cities, list) or not isinstance(coordinates, list) or not (cities or coordinates):
+        return jsonify({
+            "error": "Provide a list of cities and/or coordinates",
+            "status": "error"
+        }), 400
+
+    if len(cities) + len(coordinates) > config.WEATHER_BATCH_MAX:
+        return jsonify({
+            "error": f"At most {config.WEATHER_BATCH_MAX} locations per batch",
+            "status": "error"
+        }), 400
+
+    if units not in ["metric", "imperial", "standard"]:
+        return jsonify({
+            "error": "Invalid units parameter. Use 'metric', 'imperial', or 'standard'",
+            "status": "error"
+        }), 400
+
+    items, errors = BatchWeatherService.parse_items(cities, coordinates)
+
+    def generate():
+        for result in errors:
+            yield (json.dumps(result) + "\n").encode()
+        for result in BatchWeatherService.resolve(items, units, lang):
+            yield (json.dumps(result) + "\n").encode()
+
+    body = stream_with_context(generate())
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    if encoding:
+        body = compress_stream(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, mimetype="application/x-ndjson", headers=headers)
+
+@weather_bp.route("/weather/export", methods=["GET"])
+@token_required
+def export_weather():
+    """
+    Download a city's stored observations
+    
+    Query Parameters:
+        city (str): Name of the city
+        from (str): ISO 8601 start
+        to (str, optional): ISO 8601 end, defaults to now
+        format (str, optional): csv (default), ndjson or parquet
+        partitions (int, optional): Split the range into this many equal parts
+        partition (int, optional): Zero-based part to export, so parallel
+            readers can each fetch one
+        
+    Returns:
+        Response: The observations, oldest first, streamed in chunks
+    """
+    city = request.args.get("city", "").strip()
+    fmt = request.args.get("format", "csv").lower()
+    if not city or not request.args.get("from"):
+        return jsonify({
+            "error": "City and from parameters are required",
+            "status": "error"
+        }), 400
+
+    try:
+        end = parse_timestamp(request.args["to"]) if request.args.get("to") else datetime.utcnow()
+        start = parse_timestamp(request.args["from"])
+        ranges = DownloadService.partitions(start, end, int(request.args.get("partitions", 1)))
+        partition = int(request.args.get("partition", 0))
+        if not 0 <= partition < len(ranges):
+            raise ValueError(f"Partition must be between 0 and {len(ranges) - 1}")
+        start, end = ranges[partition]
+        body = DownloadService.stream(city, start, end, fmt)
+    except ValueError as e:
+        return jsonify({
+            "error": str(e),
+            "status": "error"
+        }), 400
+
+    filename = f"{normalize_city(city).replace(' ', '_')}-{start:%Y%m%dT%H%M%S}-{end:%Y%m%dT%H%M%S}.{fmt}"
+    return Response(body, content_type=CONTENT_TYPES[fmt],
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+def _compressed(response: Response) -> Response:
+    """Compress a buffered response if the client accepts it and it is worth it"""
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    if encoding and response.content_length >= config.COMPRESSION_MIN_SIZE:
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
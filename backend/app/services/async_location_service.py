@@ -0,0 +1,90 @@
+import asyncio
+from typing import Optional, Dict
+import httpx
+import requests
+import logging
+
+from backend.app.services.location_service import LocationService
+from backend.app.services.suggest_service import CitySuggestService
+from backend.app.utils.async_http_client import AsyncHttpClient
+from backend.app.utils.cache import geocode_cache, MISSING
+from backend.app.utils.quota import QuotaExhaustedError
+from backend.app.utils.rate_limit import nominatim_limiter
+from backend.app.utils.singleflight import AsyncSingleFlight
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+geocode_flight = AsyncSingleFlight("geocode")
+
+class AsyncLocationService:
+    """Async counterpart of LocationService for the ASGI app"""
+
+    # Outbound client, created by the ASGI app on startup
+    http_client: Optional[AsyncHttpClient] = None
+
+    @staticmethod
+    async def get_coordinates(city: str) -> Optional[Dict[str, float]]:
+        """
+        Get coordinates for a given city name
+        
+        Shares the geocode cache and rate limit with LocationService.
+        
+        Args:
+            city (str): Name of the city to geocode
+            
+        Returns:
+            Optional[Dict[str, float]]: Dictionary with lat/lon or None if not found
+
+        Raises:
+            QuotaExhaustedError: If the city is not cached and Nominatim's
+                call budget is used up
+        """
+        key = normalize_city(city)
+        location = await AsyncLocationService._resolve(key, city)
+        if location:
+            CitySuggestService.record(key, location)
+        return location
+
+    @staticmethod
+    async def _resolve(key: str, city: str) -> Optional[Dict[str, float]]:
+        cached = await geocode_cache.get_async(key)
+        if cached is not MISSING:
+            return cached
+
+        location = LocationService._offline_lookup(key)
+        if location:
+            return location
+
+        try:
+            return await geocode_flight.do(key, lambda: AsyncLocationService._geocode_and_cache(key, city))
+        except QuotaExhaustedError:
+            raise
+        except (httpx.HTTPError, requests.RequestException) as e:
+            logger.error("API request failed: %s", e)
+            return None
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error("Invalid response format: %s", e)
+            return None
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            return None
+
+    @staticmethod
+    async def _geocode_and_cache(key: str, city: str) -> Optional[Dict[str, float]]:
+        if AsyncLocationService.http_client is None:
+            AsyncLocationService.http_client = AsyncHttpClient()
+
+        params, headers = LocationService._request(city)
+        response = await AsyncLocationService.http_client.get(
+            LocationService.GEO_API_URL,
+            params=params,
+            headers=headers,
+            limiter=nominatim_limiter,
+            provider="nominatim"
+        )
+        response.raise_for_status()
+
+        location = LocationService._parse(response.json())
+        await asyncio.to_thread(LocationService._store, key, location)
+        return location
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from typing import Optional, Dict, Tuple
+import logging
+
+from backend.app.models.observation import Observation
+from backend.app.services.weather_service import (WeatherService, CACHE_HIT, CACHE_NEARBY, CACHE_STALE, CACHE_MISS,
+                                                  CACHE_DEGRADED, nearby_index, status_counters)
+from backend.app.utils.async_http_client import AsyncHttpClient
+from backend.app.utils.cache import weather_cache, MISSING
+from backend.app.utils.singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+weather_flight = AsyncSingleFlight("weather")
+
+class AsyncWeatherService:
+    """Async counterpart of WeatherService for the ASGI app"""
+
+    # Outbound client, created by the ASGI app on startup
+    http_client: Optional[AsyncHttpClient] = None
+
+    # Background refresh tasks by cache key
+    _refreshing = {}
+
+    @staticmethod
+    async def get_weather_with_status(lat: float, lon: float, units: str = "metric", lang: str = "en",
+                                      city_name: str = "",
+                                      country: Optional[str] = None) -> Tuple[Optional[Dict], str]:
+        """
+        Get weather data along with how it was served from the cache
+
+        Returns:
+            Tuple[Optional[Dict], str]: Weather data and HIT, STALE or MISS
+        """
+        observation, cache_status = await AsyncWeatherService.get_observation_with_status(
+            lat, lon, city_name, country)
+        return (observation.render(units, lang) if observation else None), cache_status
+
+    @staticmethod
+    async def get_observation_with_status(lat: float, lon: float, city_name: str = "",
+                                          country: Optional[str] = None) -> Tuple[Optional[Observation], str]:
+        """
+        Get the cached observation for a location along with how it was served
+
+        Shares the weather cache with WeatherService and follows the same
+        nearby, stale-while-revalidate, exhausted-budget and place naming
+        rules. Reads and writes that may reach Redis or the budget counters
+        run in worker threads, off the event loop.
+
+        Returns:
+            Tuple[Optional[Observation], str]: Observation and HIT, STALE,
+            MISS or DEGRADED
+        """
+        key, snapped_lat, snapped_lon = WeatherService._cache_key(lat, lon)
+
+        observation = await weather_cache.get_async(key)
+        if observation is not MISSING and observation.fresh_until > time.time():
+            if key not in nearby_index:
+                nearby_index.add(key, snapped_lat, snapped_lon)
+            status_counters[CACHE_HIT].inc()
+            return observation, CACHE_HIT
+
+        nearby = await asyncio.to_thread(WeatherService._nearby, lat, lon, key)
+        if nearby is not None:
+            status_counters[CACHE_NEARBY].inc()
+            return nearby, CACHE_HIT
+
+        if await asyncio.to_thread(WeatherService.providers.exhausted):
+            status_counters[CACHE_DEGRADED].inc()
+            return (None if observation is MISSING else observation), CACHE_DEGRADED
+
+        lat, lon = snapped_lat, snapped_lon
+        if observation is not MISSING:
+            if key not in AsyncWeatherService._refreshing:
+                task = asyncio.create_task(AsyncWeatherService._fetch_and_cache(
+                    key, lat, lon, city_name or observation.city_name, country or observation.country))
+                AsyncWeatherService._refreshing[key] = task
+                task.add_done_callback(lambda _: AsyncWeatherService._refreshing.pop(key, None))
+            status_counters[CACHE_STALE].inc()
+            return observation, CACHE_STALE
+
+        observation = await weather_flight.do(
+            key,
+            lambda: AsyncWeatherService._fetch_and_cache(key, lat, lon, city_name, country)
+        )
+        status_counters[CACHE_MISS].inc()
+        return observation, CACHE_MISS
+
+    @staticmethod
+    async def _fetch_and_cache(key: str, lat: float, lon: float, city_name: str = "",
+                               country: Optional[str] = None) -> Optional[Observation]:
+        observation = await AsyncWeatherService._fetch(lat, lon, city_name, country)
+        if observation is not None:
+            await asyncio.to_thread(WeatherService._store, key, observation, lat, lon)
+        return observation
+
+    @staticmethod
+    async def _fetch(lat: float, lon: float, city_name: str = "",
+                     country: Optional[str] = None) -> Optional[Observation]:
+        if AsyncWeatherService.http_client is None:
+            AsyncWeatherService.http_client = AsyncHttpClient()
+
+        try:
+            _, observation = await WeatherService.providers.fetch_async(AsyncWeatherService.http_client, lat, lon)
+        except Exception as e:
+            logger.error("Weather request failed: %s", e)
+            return None
+        observation = observation.at_place(city_name, country)
+        WeatherService._record(observation, lat, lon, city_name)
+        return observation
@@ -0,0 +1,173 @@
+import calendar
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+import logging
+
+from backend.app.config import config
+from backend.app.models.revoked_token import RevokedToken
+from backend.app.utils import tokens
+from backend.app.utils.tokens import TokenError
+
+logger = logging.getLogger(__name__)
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+class AuthService:
+    """
+    Stateless authentication with short-lived access tokens
+
+    Tokens are HS256 JWTs verified in-process, so authenticated requests
+    never touch Mongo. Revoked token ids are persisted to the
+    revoked_tokens collection and mirrored in an in-memory denylist.
+    Each worker refreshes the denylist every AUTH_DENYLIST_SYNC seconds,
+    so a token revoked on another worker stays usable until the next sync.
+    The denylist only holds ids of revoked tokens that have not expired.
+    """
+
+    # jti -> exp of revoked, unexpired tokens
+    _denylist = {}
+    _synced_until = datetime(1970, 1, 1)
+    _syncer = None
+    _lock = threading.Lock()
+    _secret = None
+
+    @staticmethod
+    def secret() -> bytes:
+        if AuthService._secret is None:
+            key = config.JWT_SECRET_KEY or config.SECRET_KEY
+            if not key:
+                logger.warning("JWT_SECRET_KEY is not set; tokens will only be valid in this process")
+                key = secrets.token_hex(32)
+            AuthService._secret = key.encode()
+        return AuthService._secret
+
+    @staticmethod
+    def issue_tokens(username: str) -> Dict:
+        """
+        Issue an access and refresh token pair
+
+        Args:
+            username (str): Authenticated username
+
+        Returns:
+            Dict: access_token, refresh_token, token_type and expires_in
+        """
+        return {
+            "access_token": AuthService._token(username, ACCESS, config.JWT_ACCESS_TTL),
+            "refresh_token": AuthService._token(username, REFRESH, config.JWT_REFRESH_TTL),
+            "token_type": "Bearer",
+            "expires_in": config.JWT_ACCESS_TTL
+        }
+
+    @staticmethod
+    def verify(token: str, token_type: str = ACCESS) -> Dict:
+        """
+        Validate a token without any database lookup
+
+        Args:
+            token (str): Compact JWT
+            token_type (str): Expected "access" or "refresh"
+
+        Returns:
+            Dict: Token claims
+
+        Raises:
+            TokenError: If the token is invalid, expired, revoked or of the wrong type
+        """
+        AuthService._ensure_syncing()
+        claims = tokens.decode(token, AuthService.secret(), leeway=config.JWT_LEEWAY)
+        if claims.get("type") != token_type:
+            raise TokenError(f"Expected a {token_type} token")
+        if claims.get("jti") in AuthService._denylist:
+            raise TokenError("Token has been revoked")
+        return claims
+
+    @staticmethod
+    def refresh(refresh_token: str) -> Dict:
+        """
+        Exchange a refresh token for a new token pair
+
+        The refresh token is rotated: the one presented is revoked, so a
+        stolen refresh token can be used at most once. The revocation is
+        an atomic insert in Mongo, so of concurrent refreshes with the
+        same token, on any workers, only the first gets a new pair.
+
+        Raises:
+            TokenError: If the refresh token is not valid or already used
+        """
+        claims = AuthService.verify(refresh_token, REFRESH)
+        if not AuthService.revoke(claims):
+            raise TokenError("Token has been revoked")
+        return AuthService.issue_tokens(claims["sub"])
+
+    @staticmethod
+    def revoke(claims: Dict) -> bool:
+        """
+        Revoke a token by its claims, locally at once and for other workers via Mongo
+
+        Returns:
+            bool: False if the token had already been revoked. While Mongo
+            is unreachable only this worker's revocations are known.
+        """
+        with AuthService._lock:
+            if claims["jti"] in AuthService._denylist:
+                return False
+            AuthService._denylist[claims["jti"]] = claims["exp"]
+        try:
+            return RevokedToken.add(claims["jti"], claims["exp"])
+        except Exception as e:
+            logger.error("Failed to persist token revocation: %s", e)
+            return True
+
+    @staticmethod
+    def sync() -> None:
+        """Pull revocations from Mongo and drop expired entries from the denylist"""
+        started = datetime.utcnow()
+        revoked = {}
+        try:
+            # Overlap the window to tolerate clock skew between workers
+            for doc in RevokedToken.since(AuthService._synced_until - timedelta(seconds=config.JWT_LEEWAY)):
+                revoked[doc["_id"]] = calendar.timegm(doc["exp"].timetuple())
+        except Exception as e:
+            logger.error("Failed to sync token denylist: %s", e)
+            return
+
+        now = time.time()
+        with AuthService._lock:
+            denylist = {jti: exp for jti, exp in AuthService._denylist.items()
+                        if exp + config.JWT_LEEWAY >= now}
+            denylist.update(revoked)
+            AuthService._denylist = denylist
+        AuthService._synced_until = started
+
+    @staticmethod
+    def _token(username: str, token_type: str, ttl: int) -> str:
+        now = int(time.time())
+        return tokens.encode({
+            "sub": username,
+            "type": token_type,
+            "iat": now,
+            "exp": now + ttl,
+            "jti": secrets.token_urlsafe(12)
+        }, AuthService.secret())
+
+    @staticmethod
+    def _ensure_syncing() -> None:
+        if AuthService._syncer is not None:
+            return
+        with AuthService._lock:
+            if AuthService._syncer is None:
+                AuthService._syncer = threading.Thread(target=AuthService._sync_periodically,
+                                                       name="denylist-sync", daemon=True)
+                AuthService._syncer.start()
+
+    @staticmethod
+    def _sync_periodically() -> None:
+        while True:
+            AuthService.sync()
+            time.sleep(config.AUTH_DENYLIST_SYNC)
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Tuple
+import logging
+
+from backend.app.config import config
+from backend.app.services.location_service import LocationService
+from backend.app.services.weather_service import WeatherService
+from backend.app.utils.quota import QuotaExhaustedError
+from backend.app.utils.validators import normalize_city, parse_coordinates
+
+logger = logging.getLogger(__name__)
+
+# Shared by all batch requests so total upstream concurrency stays bounded
+_executor = ThreadPoolExecutor(max_workers=config.WEATHER_BATCH_WORKERS, thread_name_prefix="weather-batch")
+
+class BatchWeatherService:
+    """Resolve weather for many locations concurrently"""
+
+    @staticmethod
+    def parse_items(cities: List[Any], coordinates: List[Any]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Validate and dedupe batch locations
+
+        Cities are deduped by normalized name and coordinates by weather
+        cache cell, so each distinct lookup runs once.
+
+        Args:
+            cities (List[Any]): City names
+            coordinates (List[Any]): Objects with lat and lon
+
+        Returns:
+            Tuple[List[Dict], List[Dict]]: Unique lookups and per-item errors
+        """
+        items, errors, seen = [], [], set()
+
+        for city in cities:
+            if not isinstance(city, str) or not city.strip():
+                errors.append({"query": city, "status": "error", "error": "Invalid city"})
+                continue
+            key = ("city", normalize_city(city))
+            if key not in seen:
+                seen.add(key)
+                items.append({"query": city.strip(), "city": city.strip()})
+
+        for point in coordinates:
+            try:
+                lat, lon = parse_coordinates(point["lat"], point["lon"])
+            except (TypeError, KeyError, ValueError):
+                errors.append({"query": point, "status": "error", "error": "Invalid coordinates"})
+                continue
+            key = ("coordinates", WeatherService._cache_key(lat, lon)[0])
+            if key not in seen:
+                seen.add(key)
+                items.append({"query": {"lat": lat, "lon": lon}, "lat": lat, "lon": lon})
+
+        return items, errors
+
+    @staticmethod
+    def resolve(items: List[Dict], units: str, lang: str) -> Iterator[Dict]:
+        """
+        Look up weather for each item, yielding results as they complete
+
+        Lookups go through the usual caches, single-flight and Nominatim
+        rate limit; a failure only affects its own item.
+
+        Yields:
+            Dict: Per-item result with status success or error
+        """
+        futures = {
+            _executor.submit(BatchWeatherService._resolve_one, item, units, lang): item
+            for item in items
+        }
+        try:
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.error("Batch lookup failed for %s: %s", item['query'], e)
+                    yield {"query": item["query"], "status": "error", "error": "Failed to fetch weather data"}
+        finally:
+            # Client went away: drop lookups that have not started yet
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _resolve_one(item: Dict, units: str, lang: str) -> Dict:
+        result = {"query": item["query"]}
+        if "city" in item:
+            try:
+                location = LocationService.get_coordinates(item["city"])
+            except QuotaExhaustedError:
+                return {**result, "status": "error", "error": "Geocoding call budget is used up"}
+            if not location:
+                return {**result, "status": "error", "error": f"Could not find coordinates for {item['city']}"}
+            lat, lon = location["lat"], location["lon"]
+            city_name, country = item["city"], location.get("country")
+        else:
+            lat, lon = item["lat"], item["lon"]
+            city_name, country = "", None
+
+        weather, cache_status = WeatherService.get_weather_with_status(lat=lat, lon=lon, units=units, lang=lang,
+                                                                       city_name=city_name, country=country)
+        if not weather:
+            return {**result, "status": "error", "error": "Weather data not found", "cache": cache_status}
+        return {**result, "status": "success", "data": weather, "cache": cache_status}
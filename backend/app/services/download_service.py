@@ -0,0 +1,193 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+import logging
+
+from backend.app.config import config
+from backend.app.models.weather import Weather
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional: CSV and NDJSON only
+    pyarrow = None
+
+# Exported columns, in order
+FIELDS = ("city", "timestamp", "temperature", "feels_like", "humidity", "pressure",
+          "wind_speed", "condition", "lat", "lon", "country")
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects bytes until drained; tell() keeps counting across drains"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class DownloadService:
+    """
+    Stream stored observations as CSV, NDJSON or Parquet
+
+    Observations are read through a server-side cursor EXPORT_BATCH_SIZE
+    documents at a time and each batch is encoded into one chunk, so
+    memory use depends on the batch size, not on the size of the export.
+    """
+
+    @staticmethod
+    def formats() -> Tuple[str, ...]:
+        """Formats we can produce; Parquet needs the optional pyarrow package"""
+        return tuple(fmt for fmt in CONTENT_TYPES if fmt != "parquet" or pyarrow is not None)
+
+    @staticmethod
+    def partitions(start: datetime, end: datetime, count: int) -> List[Tuple[datetime, datetime]]:
+        """
+        Split [start, end) into count contiguous ranges of equal length
+
+        Each range can be exported by a separate reader; concatenated in
+        order they give the same rows as the whole range.
+
+        Raises:
+            ValueError: If the range is empty or count is out of bounds
+        """
+        if end <= start:
+            raise ValueError("'from' must be before 'to'")
+        if not 1 <= count <= config.EXPORT_MAX_PARTITIONS:
+            raise ValueError(f"Partitions must be between 1 and {config.EXPORT_MAX_PARTITIONS}")
+        step = (end - start) / count
+        bounds = [start + step * i for i in range(count)] + [end]
+        return list(zip(bounds, bounds[1:]))
+
+    @staticmethod
+    def batches(city: str, start: datetime, end: datetime) -> Iterator[List[Dict]]:
+        """
+        Read a city's observations with start <= timestamp < end, oldest first
+
+        Yields:
+            List[Dict]: Up to EXPORT_BATCH_SIZE observations with the FIELDS
+        """
+        cursor = Weather.collection().find(
+            {"city": normalize_city(city), "timestamp": {"$gte": start, "$lt": end}},
+            {"_id": 0, **{field: 1 for field in FIELDS}}
+        ).sort("timestamp", 1).batch_size(config.EXPORT_BATCH_SIZE)
+
+        batch = []
+        try:
+            for document in cursor:
+                batch.append(document)
+                if len(batch) >= config.EXPORT_BATCH_SIZE:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            cursor.close()  # Also when the client disconnects mid-export
+
+    @staticmethod
+    def stream(city: str, start: datetime, end: datetime, fmt: str, header: bool = True) -> Iterator[bytes]:
+        """
+        Encode a city's observations in a time range, one chunk per batch
+
+        Args:
+            city (str): City name
+            start (datetime): Inclusive start (naive UTC)
+            end (datetime): Exclusive end (naive UTC)
+            fmt (str): csv, ndjson or parquet
+            header (bool): Start CSV output with the column names; turned
+                off for parts that are appended to an earlier one
+
+        Yields:
+            bytes: Consecutive pieces of the file
+
+        Raises:
+            ValueError: If the format is not available
+        """
+        if fmt not in DownloadService.formats():
+            raise ValueError(f"Invalid format. Use one of: {', '.join(DownloadService.formats())}")
+        batches = DownloadService.batches(city, start, end)
+        if fmt == "csv":
+            return DownloadService._csv(batches, header)
+        encoder = {"ndjson": DownloadService._ndjson, "parquet": DownloadService._parquet}[fmt]
+        return encoder(batches)
+
+    @staticmethod
+    def _rows(batch: List[Dict]) -> List[Dict]:
+        for document in batch:
+            timestamp = document.get("timestamp")
+            if timestamp is not None:
+                document["timestamp"] = timestamp.isoformat() + "Z"
+        return batch
+
+    @staticmethod
+    def _csv(batches: Iterator[List[Dict]], header: bool = True) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, FIELDS, extrasaction="ignore", lineterminator="\n")
+        if header:
+            writer.writeheader()
+        for batch in batches:
+            writer.writerows(DownloadService._rows(batch))
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()  # Header of an empty export
+
+    @staticmethod
+    def _ndjson(batches: Iterator[List[Dict]]) -> Iterator[bytes]:
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        for batch in batches:
+            yield "".join(encode(row) + "\n" for row in DownloadService._rows(batch)).encode()
+
+    @staticmethod
+    def _parquet(batches: Iterator[List[Dict]]) -> Iterator[bytes]:
+        """One row group per batch, flushed as soon as it is written"""
+        schema = pyarrow.schema([
+            ("city", pyarrow.string()),
+            ("timestamp", pyarrow.timestamp("ms", tz="UTC")),
+            ("temperature", pyarrow.float64()),
+            ("feels_like", pyarrow.float64()),
+            ("humidity", pyarrow.float64()),
+            ("pressure", pyarrow.float64()),
+            ("wind_speed", pyarrow.float64()),
+            ("condition", pyarrow.string()),
+            ("lat", pyarrow.float64()),
+            ("lon", pyarrow.float64()),
+            ("country", pyarrow.string()),
+        ])
+        sink = _ChunkSink()
+        writer = pyarrow.parquet.ParquetWriter(sink, schema, compression="snappy")
+        try:
+            for batch in batches:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()  # Writes the footer
+        yield sink.drain()
@@ -0,0 +1,157 @@
+import math
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+from backend.app.config import config
+from backend.app.models.rollup import METRICS, RESOLUTIONS, WeatherRollup, bucket_start
+from backend.app.models.weather import Weather
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+_RESOLUTION = re.compile(r"^(\d*)(h|d)$")
+_NAMED = {"raw": 0, "hour": 3600, "day": 86400}
+
+
+class HistoryService:
+    """Weather history served from the coarsest rollup that fits the request"""
+
+    @staticmethod
+    def parse_resolution(value: Optional[str]) -> Optional[int]:
+        """
+        Parse a resolution into a bucket width in seconds
+
+        Accepts "raw", "hour", "day" or a multiple such as "6h" or "7d".
+
+        Returns:
+            Optional[int]: Bucket width, 0 for raw observations, None if not given
+
+        Raises:
+            ValueError: If the resolution is not recognised
+        """
+        if not value:
+            return None
+        value = value.strip().lower()
+        if value in _NAMED:
+            return _NAMED[value]
+        match = _RESOLUTION.match(value)
+        if not match or match.group(1) and int(match.group(1)) == 0:
+            raise ValueError("Invalid resolution. Use 'raw', 'hour', 'day', or e.g. '6h', '7d'")
+        return int(match.group(1) or 1) * (3600 if match.group(2) == "h" else 86400)
+
+    @staticmethod
+    def auto_resolution(start: datetime, end: datetime) -> int:
+        """Finest hourly or daily width that keeps the range within HISTORY_MAX_POINTS"""
+        span = (end - start).total_seconds()
+        if span / RESOLUTIONS["hour"] <= config.HISTORY_MAX_POINTS:
+            return RESOLUTIONS["hour"]
+        days = math.ceil(span / RESOLUTIONS["day"] / config.HISTORY_MAX_POINTS)
+        return days * RESOLUTIONS["day"]
+
+    @staticmethod
+    def source_for(seconds: int) -> str:
+        """Coarsest stored rollup whose buckets tile the requested width"""
+        for resolution, width in sorted(RESOLUTIONS.items(), key=lambda item: -item[1]):
+            if seconds and seconds % width == 0:
+                return resolution
+        return "raw"
+
+    @staticmethod
+    def get_history(city: str, start: datetime, end: datetime, resolution: Optional[str] = None) -> Dict:
+        """
+        Get min/max/mean weather for a city over a time range
+
+        Args:
+            city (str): City name
+            start (datetime): Inclusive start (naive UTC)
+            end (datetime): Exclusive end (naive UTC)
+            resolution (Optional[str]): Bucket width, chosen automatically if omitted
+
+        Returns:
+            Dict: Resolution, source collection and points, oldest first
+
+        Raises:
+            ValueError: If the range or resolution is invalid
+        """
+        if end <= start:
+            raise ValueError("'from' must be before 'to'")
+
+        seconds = HistoryService.parse_resolution(resolution)
+        if seconds is None:
+            seconds = HistoryService.auto_resolution(start, end)
+        if seconds and (end - start).total_seconds() / seconds > config.HISTORY_MAX_POINTS:
+            raise ValueError(f"Range exceeds {config.HISTORY_MAX_POINTS} points, use a coarser resolution")
+
+        key = normalize_city(city)
+        source = HistoryService.source_for(seconds)
+        if source == "raw":
+            observations = Weather.find_range(key, start, end, limit=config.HISTORY_MAX_POINTS)
+            points = [HistoryService._raw_point(observation) for observation in observations]
+        else:
+            buckets = WeatherRollup.find_range(key, source, start, end)
+            points = [HistoryService._point(bucket["bucket"], bucket)
+                      for bucket in HistoryService.merge(buckets, seconds)]
+
+        return {
+            "city": key,
+            "from": start.isoformat() + "Z",
+            "to": end.isoformat() + "Z",
+            "resolution": HistoryService._label(seconds),
+            "source": source,
+            "points": points
+        }
+
+    @staticmethod
+    def merge(buckets: List[Dict], seconds: int) -> List[Dict]:
+        """Merge sorted rollup buckets into wider buckets of the given width"""
+        merged = []
+        for bucket in buckets:
+            start = bucket_start(bucket["bucket"], seconds)
+            if not merged or merged[-1]["bucket"] != start:
+                merged.append({"bucket": start, "count": 0})
+            target = merged[-1]
+            target["count"] += bucket["count"]
+            for metric in METRICS:
+                values = bucket.get(metric)
+                if not values:
+                    continue
+                stats = target.get(metric)
+                if stats is None:
+                    target[metric] = dict(values)
+                else:
+                    stats["n"] += values["n"]
+                    stats["sum"] += values["sum"]
+                    stats["min"] = min(stats["min"], values["min"])
+                    stats["max"] = max(stats["max"], values["max"])
+        return merged
+
+    @staticmethod
+    def _point(bucket: datetime, stats: Dict) -> Dict:
+        point = {"time": bucket.isoformat() + "Z", "count": stats["count"]}
+        for metric in METRICS:
+            values = stats.get(metric)
+            if values:
+                point[metric] = {
+                    "min": values["min"],
+                    "max": values["max"],
+                    "mean": round(values["sum"] / values["n"], 2)
+                }
+        return point
+
+    @staticmethod
+    def _raw_point(observation: Dict) -> Dict:
+        point = {"time": observation["timestamp"].isoformat() + "Z", "condition": observation.get("condition")}
+        for metric in METRICS:
+            if observation.get(metric) is not None:
+                point[metric] = observation[metric]
+        return point
+
+    @staticmethod
+    def _label(seconds: int) -> str:
+        if not seconds:
+            return "raw"
+        if seconds % RESOLUTIONS["day"] == 0:
+            return f"{seconds // RESOLUTIONS['day']}d"
+        return f"{seconds // RESOLUTIONS['hour']}h"
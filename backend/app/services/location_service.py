@@ -1,67 +1,285 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import requests
-from time import sleep
 from urllib.parse import quote
+import logging
+
+from backend.app.config import config
+from backend.app.services.suggest_service import CitySuggestService
+from backend.app.utils.cache import geocode_cache, MISSING
+from backend.app.utils.geo_index import get_geo_index
+from backend.app.utils.http_client import http_client
+from backend.app.utils.quota import QuotaExhaustedError, budget_for
+from backend.app.utils.rate_limit import nominatim_limiter
+from backend.app.utils.singleflight import SingleFlight
+from backend.app.utils.spatial_index import haversine_km
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+geocode_flight = SingleFlight("geocode", shared=config.SINGLEFLIGHT_SHARED)
 
 class LocationService:
     """Service for handling geolocation requests"""
     
-    GEO_API_URL = "https://nominatim.openstreetmap.org/search"
+    GEO_API_URL = config.NOMINATIM_URL
+    REVERSE_API_URL = config.NOMINATIM_REVERSE_URL
     USER_AGENT = "MeteorCloud/1.0"  # Required by Nominatim ToS
+
+    # Outbound client, replaceable in tests
+    http_client = http_client
     
     @staticmethod
     def get_coordinates(city: str) -> Optional[Dict[str, float]]:
         """
         Get coordinates for a given city name
         
+        The offline geocoding index (GEO_INDEX_PATH) is consulted first;
+        Nominatim is only called for cities it does not contain. Nominatim
+        results are cached by normalized city name. Cities that Nominatim
+        cannot resolve are cached for a shorter period so repeated lookups
+        of a bad name do not keep hitting the API. Resolved cities are
+        counted for autocomplete suggestions.
+        
         Args:
             city (str): Name of the city to geocode
             
         Returns:
-            Optional[Dict[str, float]]: Dictionary with lat/lon or None if not found
+            Optional[Dict[str, float]]: Dictionary with lat/lon, display_name
+            and country code (None if unknown), or None if not found
+
+        Raises:
+            QuotaExhaustedError: If the city is not cached and Nominatim's
+                call budget is used up
         """
+        key = normalize_city(city)
+        location = LocationService._resolve(key, city)
+        if location:
+            CitySuggestService.record(key, location)
+        return location
+
+    @staticmethod
+    def _resolve(key: str, city: str) -> Optional[Dict[str, float]]:
+        cached = geocode_cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        location = LocationService._offline_lookup(key)
+        if location:
+            return location
+
         try:
-            # Encode city name for URL
-            encoded_city = quote(city)
-            
-            # Required headers for Nominatim
-            headers = {
-                'User-Agent': LocationService.USER_AGENT
-            }
-            
-            params = {
-                "q": encoded_city,
-                "format": "json",
-                "limit": 1
-            }
-            
-            response = requests.get(
-                LocationService.GEO_API_URL,
-                params=params,
-                headers=headers,
-                timeout=10
+            # Concurrent lookups of the same city share one Nominatim request
+            return geocode_flight.do(
+                key,
+                lambda: LocationService._geocode_and_cache(key, city),
+                recheck=lambda: geocode_cache.get(key)
             )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            if data:
-                return {
-                    "lat": float(data[0]["lat"]),
-                    "lon": float(data[0]["lon"]),
-                    "display_name": data[0]["display_name"]
-                }
+        except QuotaExhaustedError:
+            raise
+        except requests.RequestException as e:
+            logger.error("API request failed: %s", e)
             return None
-            
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error("Invalid response format: %s", e)
+            return None
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            return None
+
+    @staticmethod
+    def reverse(lat: float, lon: float) -> Optional[Dict]:
+        """
+        Find the place at or nearest to given coordinates
+
+        The offline geocoding index is searched within GEO_REVERSE_RADIUS
+        km first; Nominatim's reverse endpoint is only called when it has
+        no place that close. Nominatim results are cached by position
+        rounded to about 100 m.
+
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+
+        Returns:
+            Optional[Dict]: lat, lon, display_name and distance_km of the
+            place, or None if none was found
+
+        Raises:
+            QuotaExhaustedError: If the position is not cached and
+                Nominatim's call budget is used up
+        """
+        place = LocationService._offline_reverse(lat, lon)
+        if place:
+            return place
+
+        key = LocationService._reverse_key(lat, lon)
+        cached = geocode_cache.get(key)
+        if cached is not MISSING:
+            return LocationService._with_distance(cached, lat, lon)
+
+        try:
+            location = geocode_flight.do(
+                key,
+                lambda: LocationService._reverse_and_cache(key, lat, lon),
+                recheck=lambda: geocode_cache.get(key)
+            )
+        except QuotaExhaustedError:
+            raise
         except requests.RequestException as e:
-            print(f"API request failed: {e}")
+            logger.error("API request failed: %s", e)
             return None
-        except (KeyError, IndexError) as e:
-            print(f"Invalid response format: {e}")
+        except (KeyError, ValueError) as e:
+            logger.error("Invalid response format: %s", e)
             return None
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            logger.error("Unexpected error: %s", e)
+            return None
+        return LocationService._with_distance(location, lat, lon)
+
+    @staticmethod
+    def _offline_reverse(lat: float, lon: float) -> Optional[Dict]:
+        index = get_geo_index()
+        if index is None:
+            return None
+        places = index.nearest(lat, lon, radius_km=config.GEO_REVERSE_RADIUS)
+        if not places:
+            return None
+        return {
+            "lat": places[0]["lat"],
+            "lon": places[0]["lon"],
+            "display_name": places[0]["display_name"],
+            "distance_km": places[0]["distance_km"]
+        }
+
+    @staticmethod
+    def _reverse_key(lat: float, lon: float) -> str:
+        return f"reverse:{lat:.3f}:{lon:.3f}"
+
+    @staticmethod
+    def _reverse_request(lat: float, lon: float) -> Tuple[Dict, Dict]:
+        """Build the Nominatim reverse query parameters and headers"""
+        # zoom 10 asks for the city rather than the street address
+        params = {"lat": lat, "lon": lon, "format": "json", "zoom": 10}
+        return params, {'User-Agent': LocationService.USER_AGENT}
+
+    @staticmethod
+    def _parse_reverse(data) -> Optional[Dict[str, float]]:
+        if not data or "error" in data:
             return None
-        finally:
-            # Rate limiting - Nominatim requires 1 second between requests
-            sleep(1)
\ No newline at end of file
+        return {
+            "lat": float(data["lat"]),
+            "lon": float(data["lon"]),
+            "display_name": data["display_name"]
+        }
+
+    @staticmethod
+    def _with_distance(location: Optional[Dict], lat: float, lon: float) -> Optional[Dict]:
+        if not location:
+            return None
+        distance = float(haversine_km(lat, lon, location["lat"], location["lon"]))
+        return dict(location, distance_km=round(distance, 3))
+
+    @staticmethod
+    def _reverse_and_cache(key: str, lat: float, lon: float) -> Optional[Dict[str, float]]:
+        params, headers = LocationService._reverse_request(lat, lon)
+        response = LocationService.http_client.get(
+            LocationService.REVERSE_API_URL,
+            params=params,
+            headers=headers,
+            limiter=nominatim_limiter,
+            provider="nominatim"
+        )
+        response.raise_for_status()
+        location = LocationService._parse_reverse(response.json())
+        LocationService._store(key, location)
+        return location
+
+    @staticmethod
+    def _offline_lookup(key: str) -> Optional[Dict[str, float]]:
+        """Resolve a city from the offline index, preferring the most populous match"""
+        index = get_geo_index()
+        if index is None:
+            return None
+        places = index.lookup(key)
+        if not places:
+            return None
+        return {
+            "lat": places[0]["lat"],
+            "lon": places[0]["lon"],
+            "display_name": places[0]["display_name"],
+            "country": LocationService._index_country(places[0]["display_name"])
+        }
+
+    @staticmethod
+    def _index_country(display_name: str) -> Optional[str]:
+        """Country code of an offline index place, named "<name>, <country code>" """
+        _, separator, country = display_name.rpartition(", ")
+        return country if separator else None
+
+    @staticmethod
+    def _geocode_and_cache(key: str, city: str) -> Optional[Dict[str, float]]:
+        location = LocationService._geocode(city)
+        LocationService._store(key, location)
+        return location
+
+    @staticmethod
+    def _store(key: str, location: Optional[Dict[str, float]]) -> None:
+        """Cache a lookup, for longer while Nominatim's call budget is tight"""
+        ttl = config.GEOCODE_CACHE_TTL if location else config.GEOCODE_NEGATIVE_TTL
+        budget = budget_for("nominatim")
+        if budget is not None:
+            ttl = int(ttl * budget.ttl_factor())
+        geocode_cache.set(key, location, ttl)
+
+    @staticmethod
+    def _request(city: str) -> Tuple[Dict, Dict]:
+        """Build the Nominatim query parameters and headers for a city"""
+        # Encode city name for URL
+        encoded_city = quote(city)
+        
+        # Required headers for Nominatim
+        headers = {
+            'User-Agent': LocationService.USER_AGENT
+        }
+        
+        params = {
+            "q": encoded_city,
+            "format": "json",
+            "addressdetails": 1,
+            "limit": 1
+        }
+        return params, headers
+
+    @staticmethod
+    def _parse(data) -> Optional[Dict[str, float]]:
+        if data:
+            return {
+                "lat": float(data[0]["lat"]),
+                "lon": float(data[0]["lon"]),
+                "display_name": data[0]["display_name"],
+                "country": data[0].get("address", {}).get("country_code", "").upper() or None
+            }
+        return None
+
+    @staticmethod
+    def _geocode(city: str) -> Optional[Dict[str, float]]:
+        """
+        Query Nominatim for a city
+
+        Every attempt waits on the shared token bucket first, as Nominatim
+        allows at most one request per second across all of our workers.
+
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        params, headers = LocationService._request(city)
+        response = LocationService.http_client.get(
+            LocationService.GEO_API_URL,
+            params=params,
+            headers=headers,
+            limiter=nominatim_limiter,
+            provider="nominatim"
+        )
+        
+        response.raise_for_status()
+        return LocationService._parse(response.json())
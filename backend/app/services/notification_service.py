@@ -0,0 +1,301 @@
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from backend.app.config import config
+from backend.app.models.observation import Observation
+from backend.app.models.rollup import METRICS
+from backend.app.models.subscription import AlertSubscription
+from backend.app.services.weather_service import WeatherService
+from backend.app.utils.cache import MISSING, weather_cache
+from backend.app.utils.http_client import http_client
+from backend.app.utils.leader import LeaderLease
+from backend.app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+METRIC_CODES = {metric: code for code, metric in enumerate(METRICS)}
+
+# operator -> (sign, strict); "x < t" is evaluated as "-x > -t" so one comparison covers all four
+OPERATOR_FORMS = {">": (1.0, True), ">=": (1.0, False), "<": (-1.0, True), "<=": (-1.0, False)}
+
+
+class SubscriptionIndex:
+    """
+    Active alert subscriptions held as columnar NumPy arrays
+
+    Each subscription is assigned to an ALERT_CELL_SIZE grid cell; one
+    weather reading per cell serves every subscription in it. Evaluation
+    gathers each subscription's reading from a (cells x metrics) array and
+    compares all thresholds in a single vectorized pass.
+
+    Notifications are edge-triggered: a subscription fires when its
+    condition starts to hold, not again while it keeps holding, and never
+    within its cooldown of the previous notification.
+    """
+
+    def __init__(self, subscriptions: Iterable[Dict], cell_size: float = config.ALERT_CELL_SIZE):
+        columns = {name: [] for name in ("ids", "usernames", "cities", "lat", "lon", "metric",
+                                         "operator", "sign", "strict", "threshold", "cooldown")}
+        for subscription in subscriptions:
+            sign, strict = OPERATOR_FORMS[subscription["operator"]]
+            columns["ids"].append(str(subscription["_id"]))
+            columns["usernames"].append(subscription["username"])
+            columns["cities"].append(subscription["city"])
+            columns["lat"].append(subscription["lat"])
+            columns["lon"].append(subscription["lon"])
+            columns["metric"].append(METRIC_CODES[subscription["metric"]])
+            columns["operator"].append(subscription["operator"])
+            columns["sign"].append(sign)
+            columns["strict"].append(strict)
+            columns["threshold"].append(subscription["threshold"])
+            columns["cooldown"].append(subscription.get("cooldown", config.ALERT_DEFAULT_COOLDOWN))
+
+        self.cell_size = cell_size
+        self.ids = np.array(columns["ids"], dtype=str)
+        self.usernames = np.array(columns["usernames"], dtype=object)
+        self.cities = np.array(columns["cities"], dtype=object)
+        self.metric_codes = np.array(columns["metric"], dtype=np.intp)
+        self.operators = np.array(columns["operator"], dtype=object)
+        self.signs = np.array(columns["sign"], dtype=np.float64)
+        self.strict = np.array(columns["strict"], dtype=bool)
+        self.thresholds = np.array(columns["threshold"], dtype=np.float64)
+        self.signed_thresholds = self.signs * self.thresholds
+        self.cooldowns = np.array(columns["cooldown"], dtype=np.float64)
+
+        lat = np.array(columns["lat"], dtype=np.float64)
+        lon = np.array(columns["lon"], dtype=np.float64)
+        rows = np.floor((lat + 90) / cell_size).astype(np.int64)
+        cols = np.floor((lon + 180) / cell_size).astype(np.int64)
+        width = math.ceil(360 / cell_size) + 1
+        cell_keys, self.cell_of = np.unique(rows * width + cols, return_inverse=True)
+        self.cell_of = self.cell_of.reshape(-1)
+        # Cell centres, where each cell's weather is fetched
+        self.cell_lat = (cell_keys // width + 0.5) * cell_size - 90
+        self.cell_lon = (cell_keys % width + 0.5) * cell_size - 180
+
+        self.firing = np.zeros(len(self.ids), dtype=bool)
+        self.last_sent = np.full(len(self.ids), -np.inf)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def cells(self) -> int:
+        return len(self.cell_lat)
+
+    def evaluate(self, observations: np.ndarray, now: float) -> np.ndarray:
+        """
+        Compare every subscription with its cell's reading
+
+        Args:
+            observations (np.ndarray): (cells, len(METRICS)) readings in
+                metric units, NaN where unknown
+            now (float): Current Unix time
+
+        Returns:
+            np.ndarray: Indices of subscriptions to notify; they are marked
+            as sent at ``now``
+        """
+        values = observations[self.cell_of, self.metric_codes]
+        signed = values * self.signs
+        # NaN compares False, so an unknown reading never breaches
+        breached = np.where(self.strict, signed > self.signed_thresholds, signed >= self.signed_thresholds)
+        notify = breached & ~self.firing & (now - self.last_sent >= self.cooldowns)
+        # Keep the previous state where there is no reading
+        self.firing = np.where(np.isnan(values), self.firing, breached)
+        self.last_sent[notify] = now
+        return np.flatnonzero(notify)
+
+    def carry_over(self, previous: "SubscriptionIndex") -> None:
+        """Copy firing state and send times from an older index for subscriptions in both"""
+        if not len(previous) or not len(self):
+            return
+        order = np.argsort(previous.ids)
+        sorted_ids = previous.ids[order]
+        positions = np.minimum(np.searchsorted(sorted_ids, self.ids), len(sorted_ids) - 1)
+        found = sorted_ids[positions] == self.ids
+        source = order[positions[found]]
+        self.firing[found] = previous.firing[source]
+        self.last_sent[found] = previous.last_sent[source]
+
+    def notification(self, index: int, observations: np.ndarray, observed_at: np.ndarray) -> Dict:
+        cell = self.cell_of[index]
+        return {
+            "subscription_id": str(self.ids[index]),
+            "username": self.usernames[index],
+            "city": self.cities[index],
+            "metric": METRICS[self.metric_codes[index]],
+            "operator": self.operators[index],
+            "threshold": float(self.thresholds[index]),
+            "value": float(observations[cell, self.metric_codes[index]]),
+            "observed_at": float(observed_at[cell])
+        }
+
+
+class LogSink:
+    """Log notifications; used when no webhook is configured"""
+
+    def send(self, notifications: List[Dict]) -> None:
+        for n in notifications:
+            logger.info("Alert for %s: %s %s %s %s in %s", n["username"], n["metric"], n["value"],
+                        n["operator"], n["threshold"], n["city"])
+
+
+class WebhookSink:
+    """POST each batch of notifications to a URL as {"notifications": [...]}"""
+
+    def __init__(self, url: str, session=None):
+        self.url = url
+        self.session = session or http_client.session
+
+    def send(self, notifications: List[Dict]) -> None:
+        response = self.session.post(self.url, json={"notifications": notifications}, timeout=http_client.timeout)
+        response.raise_for_status()
+
+
+class AlertService:
+    """
+    Evaluate weather threshold alerts and dispatch notifications
+
+    One elected worker runs the evaluation every ALERT_INTERVAL seconds,
+    so each notification is sent by one process only. It fetches one
+    reading per occupied grid cell through the weather cache (fresh
+    entries cost nothing; misses are limited to ALERT_FETCH_QPS), then
+    evaluates every subscription at once and hands notifications to
+    ``sink`` in batches of ALERT_BATCH_SIZE.
+
+    Delivery is at most once: a batch the sink fails to take is logged
+    and counted, not retried.
+    """
+
+    # Anything with send(notifications); replaceable
+    sink = WebhookSink(config.ALERT_WEBHOOK_URL) if config.ALERT_WEBHOOK_URL else LogSink()
+    lease = LeaderLease("alerts", ttl=config.ALERT_LEASE_TTL)
+    limiter = TokenBucket("alerts", rate=config.ALERT_FETCH_QPS, capacity=1)
+
+    index: Optional[SubscriptionIndex] = None
+    _loaded_at = 0.0
+    _scheduler = None
+    _lock = threading.Lock()
+    _stats = {"runs": 0, "notified": 0, "dispatch_failures": 0, "cells_observed": 0}
+
+    @staticmethod
+    def start() -> None:
+        """Start the evaluation loop in this process, if alerts are enabled"""
+        if not config.ALERTS_ENABLED:
+            return
+        with AlertService._lock:
+            if AlertService._scheduler is None:
+                AlertService._scheduler = threading.Thread(target=AlertService._run, name="alerts", daemon=True)
+                AlertService._scheduler.start()
+
+    @staticmethod
+    def reload() -> SubscriptionIndex:
+        """Rebuild the index from the subscription store, keeping the state of unchanged subscriptions"""
+        index = SubscriptionIndex(AlertSubscription.load_active())
+        if AlertService.index is not None:
+            index.carry_over(AlertService.index)
+        AlertService.index = index
+        AlertService._loaded_at = time.monotonic()
+        logger.info("Loaded %s alert subscriptions in %s cells", len(index), index.cells)
+        return index
+
+    @staticmethod
+    def observe(index: SubscriptionIndex) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the current reading for every cell of the index
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (cells, metrics) readings and
+            per-cell observation times, NaN where no reading is available
+        """
+        observations = np.full((index.cells, len(METRICS)), np.nan)
+        observed_at = np.full(index.cells, np.nan)
+        for cell, (lat, lon) in enumerate(zip(index.cell_lat.tolist(), index.cell_lon.tolist())):
+            observation = AlertService._cell_observation(lat, lon)
+            if observation is None:
+                continue
+            values = observation.values("metric")
+            observations[cell] = [np.nan if values[metric] is None else values[metric] for metric in METRICS]
+            observed_at[cell] = observation.observed_at
+        AlertService._stats["cells_observed"] = int(np.count_nonzero(~np.isnan(observed_at)))
+        return observations, observed_at
+
+    @staticmethod
+    def run_once(now: Optional[float] = None) -> int:
+        """
+        Evaluate all subscriptions and dispatch the resulting notifications
+
+        Returns:
+            int: Number of notifications handed to the sink
+        """
+        if (AlertService.index is None
+                or time.monotonic() - AlertService._loaded_at >= config.ALERT_RELOAD_INTERVAL):
+            AlertService.reload()
+        index = AlertService.index
+        observations, observed_at = AlertService.observe(index)
+        fired = index.evaluate(observations, time.time() if now is None else now)
+        AlertService._stats["runs"] += 1
+        return AlertService.dispatch(index.notification(i, observations, observed_at) for i in fired.tolist())
+
+    @staticmethod
+    def dispatch(notifications: Iterable[Dict]) -> int:
+        """Send notifications to the sink in batches, returning how many were accepted"""
+        sent, batch = 0, []
+        for notification in notifications:
+            batch.append(notification)
+            if len(batch) >= config.ALERT_BATCH_SIZE:
+                sent += AlertService._send(batch)
+                batch = []
+        if batch:
+            sent += AlertService._send(batch)
+        return sent
+
+    @staticmethod
+    def stats() -> Dict:
+        index = AlertService.index
+        return {
+            "enabled": config.ALERTS_ENABLED,
+            "leader": AlertService.lease.is_leader,
+            "subscriptions": len(index) if index is not None else None,
+            "cells": index.cells if index is not None else None,
+            **AlertService._stats
+        }
+
+    @staticmethod
+    def _send(batch: List[Dict]) -> int:
+        try:
+            AlertService.sink.send(batch)
+        except Exception as e:
+            logger.error("Failed to dispatch %s alerts: %s", len(batch), e)
+            AlertService._stats["dispatch_failures"] += 1
+            return 0
+        AlertService._stats["notified"] += len(batch)
+        return len(batch)
+
+    @staticmethod
+    def _cell_observation(lat: float, lon: float) -> Optional[Observation]:
+        """A cell's weather, fetching it only if the budget allows"""
+        key, _, _ = WeatherService._cache_key(lat, lon)
+        observation = weather_cache.peek(key)
+        if observation is not MISSING and observation.fresh_until > time.time():
+            return observation
+        if not AlertService.limiter.acquire(timeout=0):
+            return None if observation is MISSING else observation  # Over budget, a stale reading will do
+        observation, _ = WeatherService.get_observation_with_status(lat, lon)
+        return observation
+
+    @staticmethod
+    def _run() -> None:
+        while True:
+            time.sleep(config.ALERT_INTERVAL)
+            try:
+                if AlertService.lease.acquire():
+                    AlertService.run_once()
+            except Exception as e:
+                logger.error("Alert run failed: %s", e)
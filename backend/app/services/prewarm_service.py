@@ -0,0 +1,195 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from backend.app.config import config
+from backend.app.services.weather_service import WeatherService, CACHE_HIT, weather_flight
+from backend.app.utils.cache import MISSING, TTLCache, weather_cache
+from backend.app.utils.heavy_hitters import SpaceSaving
+from backend.app.utils.leader import LeaderLease
+from backend.app.utils.rate_limit import TokenBucket
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+PREVENTED_KEY = "meteorcloud:prewarm:prevented"
+
+
+class PrewarmService:
+    """
+    Refresh the weather of popular cities before their cache entries expire
+
+    Every worker counts /weather requests per normalized city in a
+    Space-Saving sketch. One elected worker runs the scheduler: every
+    PREWARM_INTERVAL seconds it takes the top PREWARM_TOP_K cities from
+    its own sketch (a sample of the overall traffic behind a load
+    balancer), finds entries within PREWARM_LEAD_TIME of expiry, and
+    refetches them soonest-expiring first. A token bucket holds the
+    refetches to PREWARM_QPS.
+
+    A refreshed entry records when the entry it replaced would have
+    expired. A later HIT on it counts as a prevented miss, once per entry
+    across all workers. Without prewarming, that request would have been
+    served stale or had to wait for the provider.
+    """
+
+    sketch = SpaceSaving(config.PREWARM_SKETCH_SIZE)
+    lease = LeaderLease("prewarm", ttl=config.PREWARM_LEASE_TTL)
+    limiter = TokenBucket("prewarm", rate=config.PREWARM_QPS, capacity=1)
+
+    # city -> {"lat", "lon"}
+    _targets = {}
+    _counted = TTLCache(maxsize=10000)
+    _lock = threading.Lock()
+    _scheduler = None
+    _stats = {"refreshes": 0, "failures": 0, "runs": 0}
+
+    @staticmethod
+    def record(city: str, location: Dict, cache_status: str) -> None:
+        """
+        Count a weather request for a city
+
+        Args:
+            city (str): City name as requested
+            location (Dict): Resolved location with lat and lon
+            cache_status (str): HIT, STALE or MISS as served
+        """
+        if not config.PREWARM_ENABLED:
+            return
+        key = normalize_city(city)
+        evicted = PrewarmService.sketch.offer(key)
+        with PrewarmService._lock:
+            if evicted is not None:
+                PrewarmService._targets.pop(evicted, None)
+            PrewarmService._targets[key] = {"lat": location["lat"], "lon": location["lon"],
+                                            "city": city.strip(), "country": location.get("country")}
+            if PrewarmService._scheduler is None:
+                PrewarmService._scheduler = threading.Thread(
+                    target=PrewarmService._run, name="prewarm", daemon=True)
+                PrewarmService._scheduler.start()
+
+        if cache_status == CACHE_HIT:
+            cache_key, _, _ = WeatherService._cache_key(location["lat"], location["lon"])
+            observation = weather_cache.local.get(cache_key)
+            if observation is not MISSING and (observation.prewarmed_over or math.inf) <= time.time():
+                PrewarmService._count_prevented(cache_key, observation.prewarmed_over)
+
+    @staticmethod
+    def candidates(now: Optional[float] = None) -> List[Tuple]:
+        """
+        Cache entries of the top cities that are due for a refresh
+
+        Returns:
+            List[Tuple]: (fresh_until, cache_key, lat, lon, target),
+            soonest to expire first; fresh_until is 0 for missing entries
+            and target is the city's name, country and coordinates
+        """
+        now = time.time() if now is None else now
+        due = []
+        for city, _, _ in PrewarmService.sketch.top(config.PREWARM_TOP_K):
+            target = PrewarmService._targets.get(city)
+            if target is None:
+                continue
+            cache_key, lat, lon = WeatherService._cache_key(target["lat"], target["lon"])
+            observation = weather_cache.peek(cache_key)
+            fresh_until = 0 if observation is MISSING else observation.fresh_until
+            if fresh_until - now <= config.PREWARM_LEAD_TIME:
+                due.append((fresh_until, cache_key, lat, lon, target))
+        due.sort(key=lambda candidate: candidate[0])
+        return due
+
+    @staticmethod
+    def run_once() -> int:
+        """
+        Refresh due entries within this interval's share of the QPS budget
+
+        The share shrinks by the providers' TTL factor as their call
+        budgets tighten, so user requests keep the calls that are left,
+        and nothing is refreshed once every budget is used up.
+
+        Returns:
+            int: Number of entries refreshed
+        """
+        if WeatherService.providers.exhausted():
+            PrewarmService._stats["runs"] += 1
+            return 0
+        factor = WeatherService.providers.ttl_factor()
+        budget = max(1, math.floor(config.PREWARM_QPS * config.PREWARM_INTERVAL / factor))
+        refreshed = 0
+        for fresh_until, cache_key, lat, lon, target in PrewarmService.candidates()[:budget]:
+            if weather_flight.in_flight(cache_key):
+                continue  # A user request is already fetching it
+            if not PrewarmService.limiter.acquire(timeout=config.PREWARM_INTERVAL):
+                break
+            if PrewarmService._refresh(cache_key, lat, lon, fresh_until, target):
+                refreshed += 1
+        PrewarmService._stats["runs"] += 1
+        return refreshed
+
+    @staticmethod
+    def stats() -> Dict:
+        """Scheduler counters for this worker plus the shared prevented-miss count"""
+        try:
+            prevented = int(weather_cache.store.get(PREVENTED_KEY) or 0)
+        except Exception as e:
+            logger.error("Failed to read prewarm stats: %s", e)
+            prevented = None
+        return {
+            "enabled": config.PREWARM_ENABLED,
+            "leader": PrewarmService.lease.is_leader,
+            "tracked_cities": len(PrewarmService.sketch),
+            "top": [
+                {"city": city, "count": count, "error": error}
+                for city, count, error in PrewarmService.sketch.top(config.PREWARM_TOP_K)
+            ],
+            "prevented_misses": prevented,
+            **PrewarmService._stats
+        }
+
+    @staticmethod
+    def _refresh(cache_key: str, lat: float, lon: float, fresh_until: float, target: Dict) -> bool:
+        def fetch():
+            observation = WeatherService._fetch(lat, lon, target.get("city", ""), target.get("country"))
+            if observation is not None:
+                observation.prewarmed_over = max(fresh_until, time.time())
+                WeatherService._store(cache_key, observation, lat, lon)
+            return observation
+
+        try:
+            # Shares the flight with user misses for the same key
+            observation = weather_flight.do(cache_key, fetch)
+        except Exception as e:
+            logger.error("Prewarm of %s failed: %s", cache_key, e)
+            observation = None
+        PrewarmService._stats["refreshes" if observation else "failures"] += 1
+        return observation is not None
+
+    @staticmethod
+    def _count_prevented(cache_key: str, prewarmed_over: float) -> None:
+        marker = f"{cache_key}@{prewarmed_over}"
+        if PrewarmService._counted.get(marker) is not MISSING:
+            return
+        PrewarmService._counted.set(marker, True, config.WEATHER_STALE_TTL)
+        store = weather_cache.store
+        try:
+            # Only the first worker to see the entry counts it
+            if store.set(f"{PREVENTED_KEY}:{marker}", 1, ex=config.WEATHER_STALE_TTL, nx=True):
+                store.incr(PREVENTED_KEY)
+        except Exception as e:
+            logger.error("Failed to count prevented miss: %s", e)
+
+    @staticmethod
+    def _run() -> None:
+        last_decay = time.monotonic()
+        while True:
+            time.sleep(config.PREWARM_INTERVAL)
+            if time.monotonic() - last_decay >= config.PREWARM_DECAY_INTERVAL:
+                PrewarmService.sketch.decay()
+                last_decay = time.monotonic()
+            try:
+                if PrewarmService.lease.acquire():
+                    PrewarmService.run_once()
+            except Exception as e:
+                logger.error("Prewarm run failed: %s", e)
@@ -0,0 +1,123 @@
+import math
+import threading
+import time
+from typing import Dict, List
+import logging
+
+from backend.app.config import config
+from backend.app.models.geocode import GeocodeHistory
+from backend.app.utils.geo_index import get_geo_index
+from backend.app.utils.prefix_index import PrefixIndex
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+class CitySuggestService:
+    """
+    City name autocomplete
+
+    Suggestions come from an in-memory PrefixIndex seeded from the geocode
+    history in Mongo and the offline geocoding index, then updated as
+    cities are looked up. Each lookup adds one to a city's score; places
+    from the offline index start with a small population-based score so
+    that frequently requested cities overtake them.
+    """
+
+    index = PrefixIndex(max_limit=config.SUGGEST_MAX_RESULTS)
+
+    _seed_started = False
+    _pending = {}
+    _lock = threading.Lock()
+    _flusher = None
+
+    @staticmethod
+    def suggest(query: str, limit: int = 10) -> List[Dict]:
+        """
+        Suggest cities whose name starts with query
+
+        Args:
+            query (str): Partial city name
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            List[Dict]: Suggestions with name, lat and lon, best first
+        """
+        CitySuggestService._ensure_seeded()
+        return CitySuggestService.index.suggest(normalize_city(query), limit)
+
+    @staticmethod
+    def record(key: str, location: Dict) -> None:
+        """
+        Count a successful lookup of a city
+
+        Updates the in-memory index immediately; the count is persisted to
+        the geocode history in batches by a background thread.
+
+        Args:
+            key (str): Normalized city name
+            location (Dict): Resolved location with lat, lon and display_name
+        """
+        CitySuggestService.index.add(key, CitySuggestService._suggestion(location), score=1)
+        with CitySuggestService._lock:
+            pending = CitySuggestService._pending.get(key)
+            if pending is None:
+                CitySuggestService._pending[key] = {**location, "count": 1}
+            else:
+                pending["count"] += 1
+            if CitySuggestService._flusher is None:
+                CitySuggestService._flusher = threading.Thread(
+                    target=CitySuggestService._flush_periodically, name="suggest-flush", daemon=True)
+                CitySuggestService._flusher.start()
+
+    @staticmethod
+    def flush() -> None:
+        """Write pending lookup counts to the geocode history"""
+        with CitySuggestService._lock:
+            pending, CitySuggestService._pending = CitySuggestService._pending, {}
+        try:
+            GeocodeHistory.record_many(pending)
+        except Exception as e:
+            logger.error("Failed to save geocode history (%s cities): %s", len(pending), e)
+
+    @staticmethod
+    def _flush_periodically() -> None:
+        while True:
+            time.sleep(config.SUGGEST_FLUSH_INTERVAL)
+            CitySuggestService.flush()
+
+    @staticmethod
+    def _suggestion(location: Dict) -> Dict:
+        return {
+            "name": location["display_name"],
+            "lat": location["lat"],
+            "lon": location["lon"]
+        }
+
+    @staticmethod
+    def _ensure_seeded() -> None:
+        with CitySuggestService._lock:
+            if CitySuggestService._seed_started:
+                return
+            CitySuggestService._seed_started = True
+        # Seeding reads Mongo and may scan the offline index, so keep it
+        # off the request; early queries see a partially seeded index
+        threading.Thread(target=CitySuggestService._seed, name="suggest-seed", daemon=True).start()
+
+    @staticmethod
+    def _seed() -> None:
+        started = time.perf_counter()
+        index = CitySuggestService.index
+
+        geo_index = get_geo_index()
+        if geo_index is not None and config.SUGGEST_SEED_LIMIT:
+            for place in geo_index.top_places(config.SUGGEST_SEED_LIMIT):
+                index.add(place["key"], CitySuggestService._suggestion(place),
+                          score=math.log10(place["population"] + 1))
+
+        try:
+            for doc in GeocodeHistory.all():
+                index.add(doc["_id"], CitySuggestService._suggestion(doc), score=doc.get("lookups", 0))
+        except Exception as e:
+            logger.error("Failed to load geocode history: %s", e)
+
+        logger.info("Seeded city suggestions with %s cities in %.2fs", len(index), time.perf_counter() - started)
@@ -0,0 +1,419 @@
+# Interchangeable current-weather providers, with hedged requests between them
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from backend.app.config import config
+from backend.app.models.observation import KELVIN_OFFSET, Observation
+from backend.app.utils.metrics import WEATHER_HEDGES
+from backend.app.utils.quota import BUDGET_EXHAUSTED, BUDGET_TIGHT, budget_for
+
+logger = logging.getLogger(__name__)
+
+# Hedged calls from request threads; a loser keeps its thread until it finishes
+_executor = ThreadPoolExecutor(max_workers=config.WEATHER_HEDGE_WORKERS, thread_name_prefix="weather-hedge")
+
+# WMO weather interpretation codes (Open-Meteo) -> OpenWeatherMap condition codes
+WMO_CONDITIONS = {
+    0: 800, 1: 801, 2: 802, 3: 804,
+    45: 741, 48: 741,
+    51: 300, 53: 301, 55: 302, 56: 511, 57: 511,
+    61: 500, 63: 501, 65: 502, 66: 511, 67: 511,
+    71: 600, 73: 601, 75: 602, 77: 600,
+    80: 520, 81: 521, 82: 522, 85: 620, 86: 622,
+    95: 211, 96: 201, 99: 202
+}
+
+
+class WeatherProvider:
+    """
+    A current-weather API
+
+    Subclasses build the request and normalize the response into an
+    Observation in canonical units, so the cache, rendering and storage
+    never see the provider's format.
+    """
+
+    name = ""
+    url = ""
+
+    def params(self, lat: float, lon: float) -> Dict:
+        raise NotImplementedError
+
+    def parse(self, data: Dict) -> Observation:
+        """
+        Raises:
+            KeyError: If the response is missing expected fields
+        """
+        raise NotImplementedError
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    name = "openweathermap"
+
+    def __init__(self):
+        self.url = config.OPENWEATHER_URL
+
+    def params(self, lat: float, lon: float) -> Dict:
+        # Standard units (kelvin, m/s) and English; responses are converted locally
+        return {
+            "lat": lat,
+            "lon": lon,
+            "appid": config.WEATHER_API_KEY or "",
+            "units": "standard"
+        }
+
+    def parse(self, data: Dict) -> Observation:
+        return Observation.from_provider(data)
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """
+    Open-Meteo's forecast API, current conditions only
+
+    It has no place names, so observations from it have an empty
+    city_name and no country.
+    """
+
+    name = "openmeteo"
+    CURRENT = "temperature_2m,apparent_temperature,relative_humidity_2m,surface_pressure,wind_speed_10m,weather_code"
+
+    def __init__(self):
+        self.url = config.OPEN_METEO_URL
+
+    def params(self, lat: float, lon: float) -> Dict:
+        return {
+            "latitude": lat,
+            "longitude": lon,
+            "current": self.CURRENT,
+            "wind_speed_unit": "ms",
+            "timeformat": "unixtime"
+        }
+
+    def parse(self, data: Dict) -> Observation:
+        current = data["current"]
+        return Observation(
+            observed_at=current.get("time", time.time()),
+            temperature=round(current["temperature_2m"] + KELVIN_OFFSET, 2),
+            feels_like=round(current["apparent_temperature"] + KELVIN_OFFSET, 2),
+            humidity=current["relative_humidity_2m"],
+            pressure=current.get("surface_pressure"),
+            wind_speed=current["wind_speed_10m"],
+            condition=WMO_CONDITIONS.get(current.get("weather_code")),
+            description=None,
+            city_name="",
+            country=None
+        )
+
+
+PROVIDERS = {provider.name: provider for provider in (OpenWeatherMapProvider, OpenMeteoProvider)}
+
+
+class LatencyTracker:
+    """Latency and error rate of a provider over its last ``window`` calls"""
+
+    def __init__(self, window: int):
+        self._calls = deque(maxlen=window)  # (seconds, failed)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self._calls.append((seconds, failed))
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(seconds for seconds, _ in self._calls)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(q * len(latencies)) - 1)]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            calls = list(self._calls)
+        return sum(failed for _, failed in calls) / len(calls) if calls else 0.0
+
+
+class ProviderPool:
+    """
+    Fetch current weather from the best of several providers
+
+    Providers are tried in order of health: those whose call budget is
+    used up go last, then those failing more than
+    WEATHER_PROVIDER_MAX_ERROR_RATE of recent calls, then those whose
+    budget is tight (see backend.app.utils.quota), and once
+    every provider has WEATHER_PROVIDER_MIN_SAMPLES calls the rest are
+    ordered by median latency (until then, in configured order).
+
+    When the first provider has not answered within its rolling
+    WEATHER_HEDGE_PERCENTILE latency, a hedged request goes to the next
+    one, and the first answer wins. A provider that fails is replaced by
+    the next one at once. Losing async requests are cancelled; losing
+    threaded requests cannot be interrupted and are left to finish, with
+    their result discarded.
+    """
+
+    def __init__(self, providers: List[WeatherProvider]):
+        if not providers:
+            raise ValueError("At least one weather provider is required")
+        self.providers = providers
+        self.trackers = {provider.name: LatencyTracker(config.WEATHER_PROVIDER_WINDOW) for provider in providers}
+
+    @staticmethod
+    def from_config() -> "ProviderPool":
+        """
+        Build the pool named by WEATHER_PROVIDERS
+
+        Raises:
+            ValueError: If a provider name is unknown
+        """
+        names = [name.strip() for name in config.WEATHER_PROVIDERS.split(",") if name.strip()]
+        unknown = [name for name in names if name not in PROVIDERS]
+        if unknown:
+            raise ValueError(f"Unknown weather providers: {', '.join(unknown)}")
+        return ProviderPool([PROVIDERS[name]() for name in names])
+
+    def order(self) -> List[WeatherProvider]:
+        """Providers, best first"""
+        measured = all(len(self.trackers[p.name]) >= config.WEATHER_PROVIDER_MIN_SAMPLES for p in self.providers)
+
+        def rank(item):
+            position, provider = item
+            tracker = self.trackers[provider.name]
+            unhealthy = (len(tracker) >= config.WEATHER_PROVIDER_MIN_SAMPLES
+                         and tracker.error_rate > config.WEATHER_PROVIDER_MAX_ERROR_RATE)
+            status = self._budget_status(provider)
+            return (status == BUDGET_EXHAUSTED, unhealthy, status == BUDGET_TIGHT,
+                    tracker.percentile(0.5) if measured else position)
+
+        return [provider for _, provider in sorted(enumerate(self.providers), key=rank)]
+
+    @staticmethod
+    def _budget_status(provider: WeatherProvider) -> Optional[str]:
+        budget = budget_for(provider.name)
+        return budget.state()["status"] if budget is not None else None
+
+    def ttl_factor(self) -> float:
+        """
+        How much longer to keep cached observations to stay within budget
+
+        The smallest factor among providers that can still be called, as
+        any of them can serve a refresh; 1 if one has no budget at all.
+        """
+        factors = []
+        for provider in self.providers:
+            budget = budget_for(provider.name)
+            if budget is None:
+                return 1.0
+            state = budget.state()
+            if state["status"] != BUDGET_EXHAUSTED:
+                factors.append(state["ttl_factor"])
+        return min(factors) if factors else config.QUOTA_MAX_TTL_FACTOR
+
+    def exhausted(self) -> bool:
+        """Whether every provider's call budget is used up"""
+        return all(self._budget_status(provider) == BUDGET_EXHAUSTED for provider in self.providers)
+
+    def resets_in(self) -> int:
+        """Seconds until the first provider's call budget starts again"""
+        budgets = [budget_for(provider.name) for provider in self.providers]
+        return min((budget.state()["resets_in"] for budget in budgets if budget is not None), default=0)
+
+    def hedge_delay(self, provider: WeatherProvider) -> float:
+        """Seconds to wait on a provider before hedging"""
+        tracker = self.trackers[provider.name]
+        if len(tracker) < config.WEATHER_PROVIDER_MIN_SAMPLES:
+            return config.WEATHER_HEDGE_MAX_DELAY
+        delay = tracker.percentile(config.WEATHER_HEDGE_PERCENTILE)
+        return min(max(delay, config.WEATHER_HEDGE_MIN_DELAY), config.WEATHER_HEDGE_MAX_DELAY)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Recent latency and error rate per provider, in current order"""
+        return {
+            provider.name: {
+                "calls": len(self.trackers[provider.name]),
+                "p50_ms": self._ms(self.trackers[provider.name].percentile(0.5)),
+                "p95_ms": self._ms(self.trackers[provider.name].percentile(0.95)),
+                "error_rate": round(self.trackers[provider.name].error_rate, 3),
+                "hedge_delay_ms": self._ms(self.hedge_delay(provider))
+            }
+            for provider in self.order()
+        }
+
+    @staticmethod
+    def _ms(seconds: Optional[float]) -> Optional[float]:
+        return None if seconds is None else round(seconds * 1000, 1)
+
+    def fetch(self, client, lat: float, lon: float) -> Tuple[str, Observation]:
+        """
+        Fetch the current observation for a location
+
+        Args:
+            client: HttpClient for the requests
+            lat (float): Latitude
+            lon (float): Longitude
+
+        Returns:
+            Tuple[str, Observation]: Name of the provider that answered and
+            its observation
+
+        Raises:
+            Exception: The last provider's error if every provider failed
+        """
+        if not config.WEATHER_HEDGE_ENABLED or len(self.providers) == 1:
+            error = None
+            for provider in self.order():
+                try:
+                    return provider.name, self._call(provider, client, lat, lon)
+                except Exception as e:
+                    logger.warning("Weather provider %s failed: %s", provider.name, e)
+                    error = e
+            raise error
+
+        providers = iter(self.order())
+        pending = {}  # future -> provider
+        launched, errors = [], []
+        reason = None
+
+        def launch() -> None:
+            provider = next(providers, None)
+            if provider is not None:
+                pending[_executor.submit(self._call, provider, client, lat, lon)] = provider
+                launched.append(provider)
+
+        launch()
+        while pending:
+            more = len(launched) < len(self.providers)
+            done, _ = wait(pending, timeout=self.hedge_delay(launched[-1]) if more else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                reason = reason or "slow"
+                launch()
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    observation = future.result()
+                except Exception as e:
+                    logger.warning("Weather provider %s failed: %s", provider.name, e)
+                    errors.append(e)
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if reason:
+                    WEATHER_HEDGES.labels(reason, provider.name).inc()
+                return provider.name, observation
+            if not pending:
+                reason = reason or "failed"
+                launch()
+        if reason:
+            WEATHER_HEDGES.labels(reason, "none").inc()
+        raise errors[-1]
+
+    def _call(self, provider: WeatherProvider, client, lat: float, lon: float) -> Observation:
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = client.get(provider.url, params=provider.params(lat, lon), provider=provider.name)
+            response.raise_for_status()
+            observation = provider.parse(response.json())
+            failed = False
+            return observation
+        finally:
+            self.trackers[provider.name].record(time.perf_counter() - started, failed)
+
+    async def fetch_async(self, client, lat: float, lon: float) -> Tuple[str, Observation]:
+        """
+        Async counterpart of ``fetch``, taking an AsyncHttpClient
+
+        The losing request is cancelled. A cancelled request that was sent
+        before the winner is recorded with the time it had taken, a lower
+        bound on its latency, so a provider that keeps losing is not
+        mistaken for one that is never slow.
+        """
+        # Ranking reads the call budgets, which can mean Redis or a locked file
+        order = await asyncio.to_thread(self.order)
+        if not config.WEATHER_HEDGE_ENABLED or len(self.providers) == 1:
+            error = None
+            for provider in order:
+                try:
+                    return provider.name, await self._call_async(provider, client, lat, lon)
+                except Exception as e:
+                    logger.warning("Weather provider %s failed: %s", provider.name, e)
+                    error = e
+            raise error
+
+        providers = iter(order)
+        pending = {}  # task -> (provider, started)
+        launched, errors = [], []
+        reason = None
+
+        def launch() -> None:
+            provider = next(providers, None)
+            if provider is not None:
+                task = asyncio.ensure_future(self._call_async(provider, client, lat, lon))
+                pending[task] = (provider, time.perf_counter())
+                launched.append(provider)
+
+        launch()
+        try:
+            while pending:
+                more = len(launched) < len(self.providers)
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay(launched[-1]) if more else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    reason = reason or "slow"
+                    launch()
+                    continue
+                for task in done:
+                    provider, started = pending.pop(task)
+                    try:
+                        observation = task.result()
+                    except Exception as e:
+                        logger.warning("Weather provider %s failed: %s", provider.name, e)
+                        errors.append(e)
+                        continue
+                    now = time.perf_counter()
+                    for loser, (loser_provider, loser_started) in pending.items():
+                        if loser_started < started:
+                            self.trackers[loser_provider.name].record(now - loser_started)
+                    if reason:
+                        WEATHER_HEDGES.labels(reason, provider.name).inc()
+                    return provider.name, observation
+                if not pending:
+                    reason = reason or "failed"
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        if reason:
+            WEATHER_HEDGES.labels(reason, "none").inc()
+        raise errors[-1]
+
+    async def _call_async(self, provider: WeatherProvider, client, lat: float, lon: float) -> Observation:
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = await client.get(provider.url, params=provider.params(lat, lon), provider=provider.name)
+            response.raise_for_status()
+            observation = provider.parse(response.json())
+            failed = False
+            return observation
+        except asyncio.CancelledError:
+            # Recorded by fetch_async if it tells us anything
+            started = None
+            raise
+        finally:
+            if started is not None:
+                self.trackers[provider.name].record(time.perf_counter() - started, failed)
+
+
+weather_providers = ProviderPool.from_config()
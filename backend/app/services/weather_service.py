@@ -1,12 +1,49 @@
-import requests
-from typing import Optional, Dict
+import threading
+import time
+from typing import Optional, Dict, Tuple
 import logging
 
+from backend.app.config import config
+from backend.app.models.observation import Observation
+from backend.app.models.weather import Weather
+from backend.app.services.weather_providers import weather_providers
+from backend.app.utils.cache import weather_cache, MISSING
+from backend.app.utils.http_client import http_client
+from backend.app.utils.metrics import WEATHER_CACHE_STATUS
+from backend.app.utils.singleflight import SingleFlight
+from backend.app.utils.spatial_index import GridIndex, KM_PER_DEGREE
+
 logger = logging.getLogger(__name__)
 
+# Cache status values reported to clients
+CACHE_HIT = "HIT"
+CACHE_STALE = "STALE"
+CACHE_MISS = "MISS"
+# Stale or missing because every provider's call budget is used up
+CACHE_DEGRADED = "DEGRADED"
+# Counted separately in metrics; reported to clients as a HIT
+CACHE_NEARBY = "NEARBY"
+
+status_counters = {status: WEATHER_CACHE_STATUS.labels(status)
+                   for status in (CACHE_HIT, CACHE_NEARBY, CACHE_STALE, CACHE_MISS, CACHE_DEGRADED)}
+
+weather_flight = SingleFlight("weather", shared=config.SINGLEFLIGHT_SHARED)
+
+# Cache keys of observations this worker has cached or served, by position
+nearby_index = GridIndex(cell_size=max(config.WEATHER_NEARBY_RADIUS / KM_PER_DEGREE, config.WEATHER_CACHE_GRID),
+                         maxsize=config.WEATHER_CACHE_SIZE)
+
+# Nearby entries checked before giving up and fetching
+NEARBY_CANDIDATES = 4
+
 class WeatherService:
-    BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
-    API_KEY = ""  # Move to config
+    # Outbound client and providers, replaceable in tests
+    http_client = http_client
+    providers = weather_providers
+
+    # Keys with a background refresh in flight
+    _refreshing = set()
+    _refreshing_lock = threading.Lock()
 
     @staticmethod
     def get_weather(lat: float, lon: float, units: str = "metric", lang: str = "en") -> Optional[Dict]:
@@ -22,40 +59,189 @@ class WeatherService:
         Returns:
             Optional[Dict]: Weather data or None if request fails
         """
-        try:
-            params = {
-                "lat": lat,
-                "lon": lon,
-                "appid": WeatherService.API_KEY,
-                "units": units,
-                "lang": lang
-            }
-            
-            response = requests.get(
-                WeatherService.BASE_URL,
-                params=params,
-                timeout=10
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "temperature": f"{data['main']['temp']}°{'C' if units == 'metric' else 'F'}",
-                "feels_like": f"{data['main']['feels_like']}°{'C' if units == 'metric' else 'F'}",
-                "humidity": f"{data['main']['humidity']}%",
-                "description": data['weather'][0]['description'],
-                "wind_speed": f"{data['wind']['speed']} {'m/s' if units == 'metric' else 'mph'}",
-                "city_name": data['name'],
-                "country": data['sys']['country']
-            }
-            
-        except requests.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
-            return None
-        except KeyError as e:
-            logger.error(f"Invalid response format: {str(e)}")
+        weather, _ = WeatherService.get_weather_with_status(lat, lon, units, lang)
+        return weather
+
+    @staticmethod
+    def get_weather_with_status(lat: float, lon: float, units: str = "metric", lang: str = "en",
+                                city_name: str = "", country: Optional[str] = None) -> Tuple[Optional[Dict], str]:
+        """
+        Get weather data along with how it was served from the cache
+
+        Returns:
+            Tuple[Optional[Dict], str]: Weather data and HIT, STALE or MISS
+        """
+        observation, cache_status = WeatherService.get_observation_with_status(lat, lon, city_name, country)
+        return (observation.render(units, lang) if observation else None), cache_status
+
+    @staticmethod
+    def get_observation_with_status(lat: float, lon: float, city_name: str = "",
+                                    country: Optional[str] = None) -> Tuple[Optional[Observation], str]:
+        """
+        Get the cached observation for a location along with how it was served
+
+        Coordinates are snapped to a WEATHER_CACHE_GRID grid so nearby
+        requests share an entry, and the entry is in canonical units so
+        every units/lang combination shares it too. Fresh entries are
+        returned as-is. Without one, a fresh observation cached within
+        WEATHER_NEARBY_RADIUS km is served as a HIT instead. Otherwise
+        stale entries are returned immediately while a single background
+        refresh fetches a new observation.
+
+        Once every provider's call budget is used up nothing is fetched:
+        stale entries are served as DEGRADED, and a location with no entry
+        gets None with DEGRADED.
+
+        Fetched observations are recorded under city_name, usually the
+        requested city, or else that of the stale entry they replace,
+        whichever provider answered; those the provider did not name are
+        also given city_name and country for the response.
+
+        Returns:
+            Tuple[Optional[Observation], str]: Observation and HIT, STALE,
+            MISS or DEGRADED
+        """
+        key, snapped_lat, snapped_lon = WeatherService._cache_key(lat, lon)
+
+        observation = weather_cache.get(key)
+        if observation is not MISSING and observation.fresh_until > time.time():
+            if key not in nearby_index:
+                nearby_index.add(key, snapped_lat, snapped_lon)
+            status_counters[CACHE_HIT].inc()
+            return observation, CACHE_HIT
+
+        nearby = WeatherService._nearby(lat, lon, key)
+        if nearby is not None:
+            status_counters[CACHE_NEARBY].inc()
+            return nearby, CACHE_HIT
+
+        if WeatherService.providers.exhausted():
+            status_counters[CACHE_DEGRADED].inc()
+            return (None if observation is MISSING else observation), CACHE_DEGRADED
+
+        lat, lon = snapped_lat, snapped_lon
+        if observation is not MISSING:
+            WeatherService._refresh_in_background(key, lat, lon, city_name or observation.city_name,
+                                                  country or observation.country)
+            status_counters[CACHE_STALE].inc()
+            return observation, CACHE_STALE
+
+        # Concurrent misses for the same key share one provider request
+        observation = weather_flight.do(
+            key,
+            lambda: WeatherService._fetch_and_cache(key, lat, lon, city_name, country),
+            recheck=lambda: WeatherService._fresh_entry(key)
+        )
+        status_counters[CACHE_MISS].inc()
+        return observation, CACHE_MISS
+
+    @staticmethod
+    def etag(observation: Observation, units: str, lang: str) -> str:
+        """ETag of an observation rendered in units and lang"""
+        return observation.tag(units, lang)
+
+    @staticmethod
+    def _cache_key(lat: float, lon: float) -> Tuple[str, float, float]:
+        """Snap coordinates to the cache grid and build the cache key"""
+        lat, lon = WeatherService._snap(lat), WeatherService._snap(lon)
+        return f"{lat:.4f}:{lon:.4f}", lat, lon
+
+    @staticmethod
+    def _nearby(lat: float, lon: float, key: str) -> Optional[Observation]:
+        """The closest fresh observation within WEATHER_NEARBY_RADIUS km, other than key's"""
+        if config.WEATHER_NEARBY_RADIUS <= 0:
             return None
+        now = time.time()
+        candidates = [other for _, other in nearby_index.within(lat, lon, config.WEATHER_NEARBY_RADIUS)
+                      if other != key]
+        for other in candidates[:NEARBY_CANDIDATES]:
+            observation = weather_cache.get(other)
+            if observation is MISSING:
+                nearby_index.discard(other)
+            elif observation.fresh_until > now:
+                return observation
+        return None
+
+    @staticmethod
+    def _fresh_entry(key: str):
+        observation = weather_cache.get(key)
+        if observation is not MISSING and observation.fresh_until > time.time():
+            return observation
+        return MISSING
+
+    @staticmethod
+    def _snap(value: float) -> float:
+        grid = config.WEATHER_CACHE_GRID
+        return round(round(value / grid) * grid, 6)
+
+    @staticmethod
+    def _refresh_in_background(key: str, lat: float, lon: float, city_name: str = "",
+                               country: Optional[str] = None) -> None:
+        with WeatherService._refreshing_lock:
+            if key in WeatherService._refreshing:
+                return
+            WeatherService._refreshing.add(key)
+
+        def refresh():
+            try:
+                WeatherService._fetch_and_cache(key, lat, lon, city_name, country)
+            finally:
+                with WeatherService._refreshing_lock:
+                    WeatherService._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"weather-refresh-{key}", daemon=True).start()
+
+    @staticmethod
+    def _fetch_and_cache(key: str, lat: float, lon: float, city_name: str = "",
+                         country: Optional[str] = None) -> Optional[Observation]:
+        observation = WeatherService._fetch(lat, lon, city_name, country)
+        if observation is not None:
+            WeatherService._store(key, observation, lat, lon)
+        return observation
+
+    @staticmethod
+    def _store(key: str, observation: Observation, lat: float, lon: float) -> None:
+        """
+        Cache a freshly fetched observation
+
+        It stays fresh until the provider's next observation is due
+        (observation time ``dt`` plus WEATHER_OBSERVATION_INTERVAL), and may
+        be served stale for WEATHER_STALE_TTL seconds after that. Both are
+        stretched by the providers' TTL factor while their call budgets
+        are tight.
+        """
+        now = time.time()
+        next_observation = observation.observed_at + config.WEATHER_OBSERVATION_INTERVAL
+        fresh_for = min(max(next_observation - now, config.WEATHER_MIN_TTL),
+                        config.WEATHER_OBSERVATION_INTERVAL)
+        factor = WeatherService.providers.ttl_factor()
+        fresh_for *= factor
+        observation.fresh_until = now + fresh_for
+        weather_cache.set(key, observation, fresh_for + config.WEATHER_STALE_TTL * factor)
+        nearby_index.add(key, lat, lon)
+
+    @staticmethod
+    def _record(observation: Observation, lat: float, lon: float, city: str = "") -> None:
+        """Queue the observation for storage under the requested city, if any; never fails the request"""
+        try:
+            Weather.from_observation(observation, lat, lon, city).save()
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
-            return None
\ No newline at end of file
+            logger.error("Failed to record observation: %s", e)
+
+    @staticmethod
+    def _fetch(lat: float, lon: float, city_name: str = "", country: Optional[str] = None) -> Optional[Observation]:
+        """
+        Fetch from the best provider, hedging to another one if it is slow or fails
+
+        The observation is recorded under city_name whichever provider
+        answered, and its place is filled in from city_name and country if
+        the provider does not name it.
+        """
+        try:
+            _, observation = WeatherService.providers.fetch(WeatherService.http_client, lat, lon)
+        except Exception as e:
+            logger.error("Weather request failed: %s", e)
+            return None
+        observation = observation.at_place(city_name, country)
+        WeatherService._record(observation, lat, lon, city_name)
+        return observation
@@ -0,0 +1,143 @@
+# Shared outbound HTTP client for the ASGI app
+import asyncio
+import itertools
+import logging
+import ssl
+import time
+from collections import defaultdict
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+import certifi
+import httpx
+
+from backend.app.config import config
+from backend.app.utils.http_client import CircuitBreaker, CircuitOpenError, RETRY_STATUSES, backoff_delay
+from backend.app.utils.metrics import UPSTREAM_DURATION, UPSTREAM_THROTTLE, outcome_for
+from backend.app.utils.quota import BUDGET_EXHAUSTED, QuotaExhaustedError, budget_for
+
+logger = logging.getLogger(__name__)
+
+# httpx logs every request at INFO, which is noise at our request rates
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+class AsyncHttpClient:
+    """
+    Async counterpart of HttpClient built on httpx
+
+    Same pooling, retry and circuit breaker behaviour, but waiting on a slow
+    provider suspends a coroutine instead of holding a worker thread, so
+    one process can keep thousands of upstream requests in flight.
+
+    Requests are spread round-robin over ``shards`` httpx clients of
+    ``pool_maxsize`` connections each. httpcore rescans its whole pool for
+    every queued request, so one large pool spends most of its time in that
+    scan once hundreds of requests are in flight; several small pools do not.
+    """
+
+    def __init__(self,
+                 shards: int = config.HTTP_ASYNC_SHARDS,
+                 pool_maxsize: int = config.HTTP_POOL_MAXSIZE,
+                 connect_timeout: float = config.HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = config.HTTP_READ_TIMEOUT,
+                 max_retries: int = config.HTTP_MAX_RETRIES,
+                 backoff_base: float = config.HTTP_BACKOFF_BASE,
+                 backoff_max: float = config.HTTP_BACKOFF_MAX,
+                 breaker_threshold: int = config.HTTP_BREAKER_THRESHOLD,
+                 breaker_reset: float = config.HTTP_BREAKER_RESET):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Loading the CA bundle is slow, so the shards share one context
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self.clients = [
+            httpx.AsyncClient(
+                verify=ssl_context,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+            )
+            for _ in range(shards)
+        ]
+        self._next_client = itertools.cycle(self.clients)
+        self._breakers = defaultdict(lambda: CircuitBreaker(breaker_threshold, breaker_reset))
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        return self._breakers[urlsplit(url).netloc]
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None, limiter=None,
+                  provider: Optional[str] = None) -> httpx.Response:
+        """
+        Send a GET request with retries, timed by provider and outcome
+
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open
+            QuotaExhaustedError: If the provider's budget is used up
+            httpx.HTTPError: If every attempt failed to connect
+        """
+        provider = provider or urlsplit(url).netloc
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._get(url, params, headers, limiter, provider)
+            outcome = outcome_for(response.status_code)
+            return response
+        except CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        except QuotaExhaustedError:
+            outcome = "quota_exhausted"
+            raise
+        finally:
+            UPSTREAM_DURATION.labels(provider, outcome).observe(time.perf_counter() - started)
+
+    async def _get(self, url: str, params, headers, limiter, provider: str) -> httpx.Response:
+        budget = budget_for(provider)
+        if budget is not None:
+            # Budgets are counted in Redis or a locked file
+            state = await asyncio.to_thread(budget.state)
+            if state["status"] == BUDGET_EXHAUSTED:
+                raise QuotaExhaustedError(f"Call budget for {provider} is used up", retry_after=state["resets_in"])
+        breaker = self.breaker(url)
+        allowed, trial = breaker.allow()
+        if not allowed:
+            raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}")
+
+        try:
+            attempt = 0
+            while True:
+                if limiter is not None:
+                    waited = time.perf_counter()
+                    await limiter.acquire_async()
+                    UPSTREAM_THROTTLE.labels(provider).observe(time.perf_counter() - waited)
+                if budget is not None:
+                    await asyncio.to_thread(budget.record)
+                try:
+                    response = await next(self._next_client).get(url, params=params, headers=headers)
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries:
+                        breaker.record_failure()
+                        raise
+                    logger.warning("Request to %s failed (%s), retrying", url, e)
+                    await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+                    attempt += 1
+                    continue
+
+                if response.status_code in RETRY_STATUSES:
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max,
+                                                          response.headers.get("Retry-After")))
+                        attempt += 1
+                        continue
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                return response
+        finally:
+            # Frees a half-open trial that ended in any other exception
+            if trial:
+                breaker.release()
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(client.aclose() for client in self.clients))
@@ -0,0 +1,64 @@
+# Request authentication
+from functools import wraps
+
+from flask import g, jsonify, request
+
+from backend.app.config import config
+from backend.app.services.auth_service import AuthService
+from backend.app.utils.tokens import TokenError
+
+
+def bearer_token(header: str) -> str:
+    """Extract the token from an Authorization header, or '' if there is none"""
+    scheme, _, token = (header or "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else ""
+
+
+def token_required(view):
+    """
+    Require a valid access token on a Flask view
+
+    The token is verified in-process. The username is available to the
+    view as ``g.username`` and the claims as ``g.token_claims``.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = bearer_token(request.headers.get("Authorization"))
+        if not token:
+            return jsonify({
+                "error": "Authorization token is required",
+                "status": "error"
+            }), 401, {"WWW-Authenticate": "Bearer"}
+        try:
+            claims = AuthService.verify(token)
+        except TokenError as e:
+            return jsonify({
+                "error": str(e),
+                "status": "error"
+            }), 401, {"WWW-Authenticate": 'Bearer error="invalid_token"'}
+
+        g.username = claims["sub"]
+        g.token_claims = claims
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def admin_required(view):
+    """
+    Require a valid access token of a user listed in ADMIN_USERS
+
+    Anyone else gets a 403; with ADMIN_USERS unset nobody is an admin.
+    """
+    @token_required
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        admins = {name.strip() for name in config.ADMIN_USERS.split(",") if name.strip()}
+        if g.username not in admins:
+            return jsonify({
+                "error": "Admin access is required",
+                "status": "error"
+            }), 403
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,108 @@
+# Buffered bulk inserts off the request path
+import atexit
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class BulkWriter:
+    """
+    Batch documents and insert them from a background thread
+
+    Request threads only put documents on a bounded queue. A writer thread
+    drains it and calls ``insert_many`` once ``batch_size`` documents are
+    waiting or ``flush_interval`` seconds have passed. When the queue is
+    full new documents are dropped and counted rather than blocking.
+    """
+
+    def __init__(self, get_collection: Callable, batch_size: int = 500,
+                 flush_interval: float = 1.0, max_queue: int = 10000):
+        self.get_collection = get_collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._wake = threading.Event()
+        self._listeners = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[List[Dict]], None]) -> None:
+        """Call listener with every batch after it has been inserted"""
+        self._listeners.append(listener)
+
+    def add(self, document: Dict) -> bool:
+        """
+        Queue a document for insertion
+
+        Returns:
+            bool: False if the queue was full and the document was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(document)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def flush(self) -> None:
+        """Insert everything queued so far on the calling thread"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        self._write(batch)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            # Also restarts the thread in a child process after fork
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="bulk-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        # Woken early by add() once a full batch is waiting
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _write(self, batch: List[Dict]) -> None:
+        if not batch:
+            return
+        try:
+            self.get_collection().insert_many(batch, ordered=False)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error("Bulk insert of %s documents failed: %s", len(batch), e)
+            return
+        for listener in self._listeners:
+            try:
+                listener(batch)
+            except Exception as e:
+                logger.error("Bulk write listener failed: %s", e)
+
+    def close(self) -> None:
+        self.flush()
+
+
+def register_writer(writer: BulkWriter) -> BulkWriter:
+    """Flush the writer at interpreter exit so queued documents are not lost"""
+    atexit.register(writer.close)
+    return writer
@@ -1 +1,269 @@
-# Caching mechanisms 
+# Caching mechanisms
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from backend.app.config import config
+from backend.app.models.observation import Observation
+from backend.app.utils.metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Sentinel returned on a cache miss so that falsy values (None, {}) can be cached
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """
+        Get a value from the cache
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Any: Cached value or MISSING if absent or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for ttl seconds, evicting the least recently used entry if full"""
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MemoryStore:
+    """
+    Local stand-in for a Redis server
+
+    Implements the subset of the redis-py client API used by the caching
+    layer, so it can be swapped for a real ``redis.Redis`` instance.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[name]
+                return None
+            return value
+
+    def set(self, name: str, value, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if isinstance(value, (str, int, float)):
+            value = str(value).encode()
+        with self._lock:
+            if nx and self._live(name):
+                return None
+            self._data[name] = (value, time.time() + ex if ex else None)
+        return True
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._data.get(name) if self._live(name) else None
+            value = int(entry[0]) + amount if entry else amount
+            self._data[name] = (str(value).encode(), entry[1] if entry else None)
+        return value
+
+    def _live(self, name: str) -> bool:
+        entry = self._data.get(name)
+        return entry is not None and (entry[1] is None or entry[1] > time.time())
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(1 for name in names if self._data.pop(name, None) is not None)
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+        return True
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """
+    Get the process-wide shared store
+
+    Uses Redis when REDIS_URL is configured and the redis package is
+    installed, otherwise falls back to an in-process MemoryStore.
+    """
+    global _shared_store
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = _create_shared_store()
+    return _shared_store
+
+
+def _create_shared_store():
+    if config.REDIS_URL:
+        try:
+            import redis
+            return redis.Redis.from_url(config.REDIS_URL, socket_timeout=1)
+        except ImportError:
+            logger.warning("REDIS_URL is set but redis is not installed, using in-process store")
+    return MemoryStore()
+
+
+class TwoTierCache:
+    """
+    Cache with an in-process LRU in front of a shared store
+
+    Values must be JSON serialisable, or be made so by ``encode`` (and
+    restored by ``decode``) when crossing the shared tier; the local tier
+    keeps them as they are. Shared store failures and undecodable values
+    are logged and treated as misses so that a Redis outage never fails a
+    request.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, store=None,
+                 encode: Optional[Callable[[Any], Any]] = None, decode: Optional[Callable[[Any], Any]] = None):
+        self.namespace = namespace
+        self.local = TTLCache(maxsize)
+        self._store = store
+        self.encode = encode
+        self.decode = decode
+        self._local_hits = CACHE_LOOKUPS.labels(namespace, "local_hit")
+        self._shared_hits = CACHE_LOOKUPS.labels(namespace, "shared_hit")
+        self._misses = CACHE_LOOKUPS.labels(namespace, "miss")
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_shared_store()
+        return self._store
+
+    def _key(self, key: str) -> str:
+        return f"meteorcloud:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Any:
+        """
+        Get a value, checking the local tier before the shared store
+
+        Args:
+            key (str): Cache key (already normalized)
+
+        Returns:
+            Any: Cached value or MISSING
+        """
+        value, counter = self._lookup(key)
+        counter.inc()
+        return value
+
+    async def get_async(self, key: str) -> Any:
+        """Like ``get``, reading a remote shared store in a worker thread so the event loop is not blocked"""
+        value = self.local.get(key)
+        if value is not MISSING:
+            self._local_hits.inc()
+            return value
+        if isinstance(self.store, MemoryStore):
+            return self.get(key)
+        value, counter = await asyncio.to_thread(self._lookup, key)
+        counter.inc()
+        return value
+
+    def peek(self, key: str) -> Any:
+        """Like ``get``, for background scans that must not count as lookups in metrics"""
+        return self._lookup(key)[0]
+
+    def _lookup(self, key: str) -> Tuple[Any, Any]:
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value, self._local_hits
+
+        try:
+            raw = self.store.get(self._key(key))
+        except Exception as e:
+            logger.error("Shared cache read failed: %s", e)
+            raw = None
+        value, ttl = MISSING, 0
+        if raw is not None:
+            try:
+                envelope = json.loads(raw)
+                ttl = envelope["exp"] - time.time()
+                if ttl > 0:
+                    value = envelope["v"]
+            except (TypeError, ValueError, KeyError) as e:
+                logger.warning("Discarding malformed %s cache entry: %s", self.namespace, e)
+                self._discard(key)
+                value, ttl = MISSING, 0
+        if value is not MISSING:
+            if self.decode is not None:
+                try:
+                    value = self.decode(value)
+                except (TypeError, ValueError, KeyError) as e:
+                    logger.warning("Discarding undecodable %s cache entry: %s", self.namespace, e)
+                    value = MISSING
+        if value is MISSING:
+            return MISSING, self._misses
+        self.local.set(key, value, ttl)
+        return value, self._shared_hits
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value in both tiers for ttl seconds"""
+        self.local.set(key, value, ttl)
+        encoded = self.encode(value) if self.encode is not None else value
+        envelope = json.dumps({"v": encoded, "exp": time.time() + ttl})
+        try:
+            self.store.set(self._key(key), envelope, ex=max(1, int(ttl + 0.999)))
+        except Exception as e:
+            logger.error("Shared cache write failed: %s", e)
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        """Remove key from the shared store only"""
+        try:
+            self.store.delete(self._key(key))
+        except Exception as e:
+            logger.error("Shared cache delete failed: %s", e)
+
+
+geocode_cache = TwoTierCache("geocode", maxsize=config.GEOCODE_CACHE_SIZE)
+weather_cache = TwoTierCache("weather", maxsize=config.WEATHER_CACHE_SIZE,
+                             encode=Observation.to_list, decode=Observation.from_list)
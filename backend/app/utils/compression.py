@@ -0,0 +1,85 @@
+# Response compression with gzip and, when installed, brotli
+import logging
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from backend.app.config import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS  # zlib stream with a gzip header
+
+
+def supported_encodings():
+    """Encodings we can produce, most preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a response encoding from an Accept-Encoding header
+
+    Args:
+        accept_encoding (Optional[str]): e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        Optional[str]: "br", "gzip" or None for an uncompressed response
+    """
+    if not accept_encoding or not config.COMPRESSION_ENABLED:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        return brotli.Compressor(quality=config.BROTLI_QUALITY)
+    return zlib.compressobj(config.GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a complete response body"""
+    if encoding == "br":
+        return brotli.compress(body, quality=config.BROTLI_QUALITY)
+    compressor = _compressor(encoding)
+    return compressor.compress(body) + compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed body, flushing after every chunk
+
+    Flushing costs a little compression ratio but lets the client decode
+    each chunk (e.g. one NDJSON line) as soon as it is sent.
+    """
+    compressor = _compressor(encoding)
+    for chunk in chunks:
+        if encoding == "br":
+            data = compressor.process(chunk) + compressor.flush()
+        else:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.finish() if encoding == "br" else compressor.flush()
@@ -0,0 +1,282 @@
+# Offline geocoding index
+import heapq
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app.config import config
+from backend.app.utils.spatial_index import PointIndex
+from backend.app.utils.validators import normalize_city
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MCGEO\x00\x00\x01"
+# magic, record count, records offset, strings offset
+HEADER = struct.Struct("<8sIQQ")
+# key offset, key length, display name offset, display name length, lat, lon, population
+RECORD = struct.Struct("<IHIHffI")
+RECORD_DTYPE = np.dtype({"names": ["display_offset", "lat", "lon"], "formats": ["<u4", "<f4", "<f4"],
+                         "offsets": [6, 12, 16], "itemsize": RECORD.size})
+
+# GeoNames dump columns used by the builder
+GEONAMES_NAME, GEONAMES_ASCIINAME, GEONAMES_ALTNAMES = 1, 2, 3
+GEONAMES_LAT, GEONAMES_LON, GEONAMES_CLASS, GEONAMES_COUNTRY, GEONAMES_POPULATION = 4, 5, 6, 8, 14
+
+# Upper bound on records examined by a prefix search
+PREFIX_SCAN_LIMIT = 20000
+
+
+def read_geonames(path: str, min_population: int = 0, alternate_names: bool = False
+                  ) -> Iterable[Tuple[str, str, float, float, int]]:
+    """
+    Read populated places from a GeoNames-style TSV dump
+
+    Yields:
+        Tuple: Name to index, display name, lat, lon and population
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) <= GEONAMES_POPULATION or fields[GEONAMES_CLASS] != "P":
+                continue
+            population = int(fields[GEONAMES_POPULATION] or 0)
+            if population < min_population:
+                continue
+            name = fields[GEONAMES_NAME]
+            display_name = f"{name}, {fields[GEONAMES_COUNTRY]}"
+            lat, lon = float(fields[GEONAMES_LAT]), float(fields[GEONAMES_LON])
+
+            names = {name, fields[GEONAMES_ASCIINAME]}
+            if alternate_names and fields[GEONAMES_ALTNAMES]:
+                names.update(fields[GEONAMES_ALTNAMES].split(","))
+            for indexed in names:
+                if indexed:
+                    yield indexed, display_name, lat, lon, population
+
+
+def build_index(places: Iterable[Tuple[str, str, float, float, int]], path: str) -> int:
+    """
+    Write a geocoding index file
+
+    Records are sorted by normalized name and then by descending
+    population, so the first match for a name is the most populous place.
+
+    Args:
+        places: Name, display name, lat, lon and population tuples
+        path (str): Output file
+
+    Returns:
+        int: Number of records written
+    """
+    rows = sorted(
+        ((normalize_city(name).encode(), display.encode(), lat, lon, population)
+         for name, display, lat, lon, population in places),
+        key=lambda row: (row[0], -row[4])
+    )
+
+    strings = bytearray()
+    display_offsets = {}
+    records = bytearray()
+    for key, display, lat, lon, population in rows:
+        key_offset = len(strings)
+        strings += key
+        if display not in display_offsets:
+            display_offsets[display] = len(strings)
+            strings += display
+        records += RECORD.pack(key_offset, len(key), display_offsets[display], len(display),
+                               lat, lon, min(population, 2 ** 32 - 1))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        records_offset = HEADER.size
+        f.write(HEADER.pack(MAGIC, len(rows), records_offset, records_offset + len(records)))
+        f.write(records)
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+class GeoIndex:
+    """
+    Read-only geocoding index backed by a memory-mapped file
+
+    Opening only maps the file and reads its header; pages are loaded by
+    the OS as lookups touch them and shared between worker processes.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._records, self._strings = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a geocoding index")
+        self._points = None
+        self._points_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key(self, i: int) -> bytes:
+        key_offset, key_len = struct.unpack_from("<IH", self._mmap, self._records + i * RECORD.size)
+        start = self._strings + key_offset
+        return self._mmap[start:start + key_len]
+
+    def _place(self, i: int) -> Dict:
+        _, _, display_offset, display_len, lat, lon, population = RECORD.unpack_from(
+            self._mmap, self._records + i * RECORD.size)
+        start = self._strings + display_offset
+        return {
+            "lat": round(lat, 5),
+            "lon": round(lon, 5),
+            "display_name": self._mmap[start:start + display_len].decode(),
+            "population": population
+        }
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, name: str, limit: int = 1) -> List[Dict]:
+        """
+        Find places with exactly this name, most populous first
+
+        Args:
+            name (str): Place name (normalized internally)
+            limit (int): Maximum number of places to return
+
+        Returns:
+            List[Dict]: Places with lat, lon, display_name and population
+        """
+        key = normalize_city(name).encode()
+        i = self._lower_bound(key)
+        places = []
+        while i < self.count and len(places) < limit and self._key(i) == key:
+            places.append(self._place(i))
+            i += 1
+        return places
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Find the most populous places whose name starts with prefix
+
+        Very short prefixes are ranked over the first PREFIX_SCAN_LIMIT
+        matching records only.
+        """
+        key = normalize_city(prefix).encode()
+        if not key:
+            return []
+        start = self._lower_bound(key)
+        end = min(self.count, start + PREFIX_SCAN_LIMIT)
+        matches = []
+        for i in range(start, end):
+            if not self._key(i).startswith(key):
+                break
+            population = struct.unpack_from("<I", self._mmap, self._records + i * RECORD.size + 20)[0]
+            matches.append((population, i))
+
+        places, seen = [], set()
+        for _, i in sorted(matches, reverse=True):
+            place = self._place(i)
+            # Alternate spellings of one place share a display name and position
+            identity = (place["display_name"], place["lat"], place["lon"])
+            if identity not in seen:
+                seen.add(identity)
+                places.append(place)
+                if len(places) == limit:
+                    break
+        return places
+
+    def top_places(self, limit: int) -> List[Dict]:
+        """
+        Get the most populous places, one per distinct name
+
+        Scans every record, so it is meant for one-off seeding.
+        """
+        best, previous = [], None
+        for i in range(self.count):
+            key = self._key(i)
+            if key == previous:
+                continue  # Same name, less populous
+            previous = key
+            population = struct.unpack_from("<I", self._mmap, self._records + i * RECORD.size + 20)[0]
+            best.append((population, i))
+        places = []
+        for _, i in heapq.nlargest(limit, best):
+            place = self._place(i)
+            place["key"] = self._key(i).decode()
+            places.append(place)
+        return places
+
+    def nearest(self, lat: float, lon: float, limit: int = 1, radius_km: Optional[float] = None) -> List[Dict]:
+        """
+        Find the places nearest to a location, for reverse geocoding
+
+        The spatial index is built on first use, over one record per place
+        (alternate names of a place share its position).
+
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            limit (int): Maximum number of places to return
+            radius_km (Optional[float]): Only return places this close
+
+        Returns:
+            List[Dict]: Places with lat, lon, display_name, population and
+            distance_km, nearest first
+        """
+        if self._points is None:
+            with self._points_lock:
+                if self._points is None:
+                    self._points = self._build_points()
+        records, points = self._points
+        places = []
+        for i, distance in points.nearest(lat, lon, limit, radius_km):
+            place = self._place(int(records[i]))
+            place["distance_km"] = round(distance, 3)
+            places.append(place)
+        return places
+
+    def _build_points(self) -> Tuple[np.ndarray, PointIndex]:
+        view = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=self.count, offset=self._records)
+        identity = np.stack([view["display_offset"], view["lat"].view(np.uint32), view["lon"].view(np.uint32)], axis=1)
+        lat, lon = view["lat"].astype(np.float64), view["lon"].astype(np.float64)
+        del view  # Holds a buffer export that would stop close() from unmapping
+        _, records = np.unique(identity, axis=0, return_index=True)
+        return records, PointIndex(lat[records], lon[records])
+
+    def close(self) -> None:
+        self._points = None
+        self._mmap.close()
+
+
+_geo_index = None
+_geo_index_lock = threading.Lock()
+
+
+def get_geo_index() -> Optional[GeoIndex]:
+    """
+    Get the process-wide index, or None if GEO_INDEX_PATH is not configured
+
+    A missing or invalid file is logged once and treated as no index.
+    """
+    global _geo_index
+    if _geo_index is None and config.GEO_INDEX_PATH:
+        with _geo_index_lock:
+            if _geo_index is None:
+                try:
+                    _geo_index = GeoIndex(config.GEO_INDEX_PATH)
+                except (OSError, ValueError) as e:
+                    logger.error("Could not load geocoding index: %s", e)
+                    _geo_index = False
+    return _geo_index or None
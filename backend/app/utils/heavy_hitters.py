@@ -0,0 +1,60 @@
+# Bounded frequency tracking
+import threading
+from typing import Hashable, List, Optional, Tuple
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters sketch (Metwally et al.)
+
+    Tracks at most ``capacity`` keys. When a new key arrives and the sketch
+    is full, it replaces the key with the smallest count and inherits that
+    count as its error bound, so any key seen more than N / capacity times
+    in a stream of N is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._counts = {}  # key -> [count, error]
+        self._lock = threading.Lock()
+
+    def offer(self, key: Hashable, count: int = 1) -> Optional[Hashable]:
+        """
+        Count an occurrence of key
+
+        Returns:
+            Optional[Hashable]: Key evicted to make room, if any
+        """
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None:
+                entry[0] += count
+                return None
+            if len(self._counts) < self.capacity:
+                self._counts[key] = [count, 0]
+                return None
+            # O(capacity) scan; offers of new keys to a full sketch are the rare case
+            evicted = min(self._counts, key=lambda k: self._counts[k][0])
+            floor = self._counts.pop(evicted)[0]
+            self._counts[key] = [floor + count, floor]
+            return evicted
+
+    def top(self, k: int) -> List[Tuple[Hashable, int, int]]:
+        """Get the k most frequent keys as (key, count, error), most frequent first"""
+        with self._lock:
+            items = [(key, count, error) for key, (count, error) in self._counts.items()]
+        items.sort(key=lambda item: -item[1])
+        return items[:k]
+
+    def decay(self, factor: float = 0.5) -> None:
+        """Scale all counts down so that past popularity fades"""
+        with self._lock:
+            for entry in self._counts.values():
+                entry[0] = int(entry[0] * factor)
+                entry[1] = int(entry[1] * factor)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._counts
+
+    def __len__(self) -> int:
+        return len(self._counts)
@@ -0,0 +1,83 @@
+# HTTP validators and freshness headers for cached responses
+import hashlib
+import json
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+
+def make_etag(data: Dict, observed_at: float) -> str:
+    """
+    Build a strong ETag for a payload and the observation it came from
+
+    The payload is serialized with sorted keys so that equal payloads
+    always get the same tag, whichever worker or cache tier served them.
+
+    Args:
+        data (Dict): JSON-serialisable response payload
+        observed_at (float): Provider observation time (Unix seconds)
+
+    Returns:
+        str: Quoted entity tag
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    digest = hashlib.blake2b(f"{int(observed_at)}:{canonical}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def is_not_modified(etag: str, last_modified: float, if_none_match: Optional[str],
+                    if_modified_since: Optional[str]) -> bool:
+    """
+    Evaluate conditional request headers (RFC 9110 section 13.2.2)
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the client sent no entity tags.
+
+    Args:
+        etag (str): Current entity tag
+        last_modified (float): Current Last-Modified time (Unix seconds)
+        if_none_match (Optional[str]): Request If-None-Match header
+        if_modified_since (Optional[str]): Request If-Modified-Since header
+
+    Returns:
+        bool: True if a 304 Not Modified should be sent
+    """
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/"x" matches "x"
+        tags = (tag.strip() for tag in if_none_match.split(","))
+        return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False  # Unparseable dates are ignored
+        return int(last_modified) <= since
+    return False
+
+
+def cache_headers(etag: str, last_modified: float, fresh_until: float,
+                  now: Optional[float] = None) -> Dict[str, str]:
+    """
+    Validator and freshness headers for a cached entry
+
+    ``max-age`` is the entry's remaining freshness, so downstream caches
+    never hold a response longer than we would serve it as a HIT.
+
+    Args:
+        etag (str): Entity tag
+        last_modified (float): Observation time (Unix seconds)
+        fresh_until (float): Time the entry goes stale (Unix seconds)
+        now (Optional[float]): Current time, defaults to time.time()
+
+    Returns:
+        Dict[str, str]: ETag, Last-Modified and Cache-Control headers
+    """
+    now = time.time() if now is None else now
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(min(last_modified, now), usegmt=True),
+        "Cache-Control": f"public, max-age={max(int(fresh_until - now), 0)}"
+    }
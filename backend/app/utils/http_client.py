@@ -0,0 +1,221 @@
+# Shared outbound HTTP client
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.app.config import config
+from backend.app.utils.metrics import UPSTREAM_DURATION, UPSTREAM_THROTTLE, outcome_for
+from backend.app.utils.quota import QuotaExhaustedError, budget_for
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited or a server-side failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, stretched to honour a Retry-After header"""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, min(float(retry_after), cap))
+    return delay
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a host whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker
+
+    Opens after ``threshold`` consecutive failures and rejects calls for
+    ``reset_timeout`` seconds. After that a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> Tuple[bool, bool]:
+        """
+        Whether a call may go ahead, and whether it is the half-open trial
+
+        Returns:
+            Tuple[bool, bool]: (allowed, trial); only the trial call may
+                ``release`` the circuit
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True, False
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True, True
+            return False, False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End the trial call without an outcome, so a half-open circuit can try again"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class HttpClient:
+    """
+    Pooled keep-alive HTTP client for calls to third-party providers
+
+    One requests.Session holds a connection pool per host, so repeated calls
+    to the same provider reuse TCP/TLS connections. Connection errors and
+    429/5xx responses are retried with jittered exponential backoff, and a
+    circuit breaker per host fails fast while a provider is down. Every
+    attempt is counted against the provider's budget, if it has one, and
+    a provider whose budget is used up is not called.
+    """
+
+    def __init__(self,
+                 pool_connections: int = config.HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = config.HTTP_POOL_MAXSIZE,
+                 connect_timeout: float = config.HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = config.HTTP_READ_TIMEOUT,
+                 max_retries: int = config.HTTP_MAX_RETRIES,
+                 backoff_base: float = config.HTTP_BACKOFF_BASE,
+                 backoff_max: float = config.HTTP_BACKOFF_MAX,
+                 breaker_threshold: int = config.HTTP_BREAKER_THRESHOLD,
+                 breaker_reset: float = config.HTTP_BREAKER_RESET):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._breakers = defaultdict(lambda: CircuitBreaker(breaker_threshold, breaker_reset))
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        return self._breakers[urlsplit(url).netloc]
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None, limiter=None,
+            provider: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Send a GET request with retries
+
+        The call's total time, including retries and backoff, is recorded
+        by provider and outcome; time spent waiting on the limiter is
+        recorded separately.
+
+        Args:
+            url (str): Request URL
+            params (Optional[Dict]): Query parameters
+            headers (Optional[Dict]): Request headers
+            limiter: Optional TokenBucket acquired before every attempt
+            provider (Optional[str]): Metrics label, defaults to the host
+
+        Returns:
+            requests.Response: Final response (possibly a non-retryable error)
+
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open
+            QuotaExhaustedError: If the provider's budget is used up
+            requests.RequestException: If every attempt failed to connect
+        """
+        provider = provider or urlsplit(url).netloc
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self._get(url, params, headers, limiter, provider, **kwargs)
+            outcome = outcome_for(response.status_code)
+            return response
+        except CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        except QuotaExhaustedError:
+            outcome = "quota_exhausted"
+            raise
+        finally:
+            UPSTREAM_DURATION.labels(provider, outcome).observe(time.perf_counter() - started)
+
+    def _get(self, url: str, params, headers, limiter, provider: str, **kwargs) -> requests.Response:
+        budget = budget_for(provider)
+        if budget is not None and budget.exhausted:
+            raise QuotaExhaustedError(f"Call budget for {provider} is used up",
+                                      retry_after=budget.state()["resets_in"])
+        breaker = self.breaker(url)
+        allowed, trial = breaker.allow()
+        if not allowed:
+            raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}")
+        kwargs.setdefault("timeout", self.timeout)
+
+        try:
+            attempt = 0
+            while True:
+                if limiter is not None:
+                    waited = time.perf_counter()
+                    limiter.acquire()
+                    UPSTREAM_THROTTLE.labels(provider).observe(time.perf_counter() - waited)
+                if budget is not None:
+                    budget.record()
+                try:
+                    response = self.session.get(url, params=params, headers=headers, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt >= self.max_retries:
+                        breaker.record_failure()
+                        raise
+                    logger.warning("Request to %s failed (%s), retrying", url, e)
+                    self._backoff(attempt)
+                    attempt += 1
+                    continue
+
+                if response.status_code in RETRY_STATUSES:
+                    if attempt < self.max_retries:
+                        self._backoff(attempt, response.headers.get("Retry-After"))
+                        attempt += 1
+                        continue
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                return response
+        finally:
+            # Frees a half-open trial that ended in any other exception
+            if trial:
+                breaker.release()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> None:
+        time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+
+
+http_client = HttpClient()
@@ -0,0 +1,81 @@
+# Leader election for background jobs
+import logging
+import os
+import socket
+import uuid
+from typing import Optional
+
+from backend.app.config import config
+from backend.app.utils.cache import MemoryStore, get_shared_store
+from backend.app.utils.filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """
+    Elect one process to run a background job
+
+    With Redis configured the lease is a key set with NX and an expiry, so
+    one process across all nodes holds it and a crashed leader is replaced
+    after ``ttl`` seconds. Without Redis the lease is a non-blocking file
+    lock in LOCK_DIR, held until the process exits, which elects one
+    worker per host.
+    """
+
+    def __init__(self, name: str, ttl: float = 30, store=None, directory: Optional[str] = None):
+        self.name = name
+        self.ttl = ttl
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        self._store = store
+        self._lock = FileLock(os.path.join(directory or config.LOCK_DIR, f"{name}.leader"))
+        self._held = False
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_shared_store()
+        return self._store
+
+    def acquire(self) -> bool:
+        """
+        Take or renew the lease; call more often than every ``ttl`` seconds
+
+        Returns:
+            bool: True if this process is the leader
+        """
+        if isinstance(self.store, MemoryStore):
+            if not self._held:
+                self._held = self._lock.acquire(blocking=False)
+            return self._held
+
+        key = f"meteorcloud:leader:{self.name}"
+        ex = max(1, int(self.ttl))
+        try:
+            current = self.store.get(key)
+            if current is not None and current.decode() == self.token:
+                # A lease that expires between the get and set is simply retaken
+                self.store.set(key, self.token, ex=ex)
+                self._held = True
+            else:
+                self._held = bool(self.store.set(key, self.token, ex=ex, nx=True))
+        except Exception as e:
+            logger.error("Leader lease %s check failed: %s", self.name, e)
+            self._held = False
+        return self._held
+
+    def release(self) -> None:
+        if not self._held:
+            return
+        if isinstance(self.store, MemoryStore):
+            self._lock.release()
+        else:
+            key = f"meteorcloud:leader:{self.name}"
+            current = self.store.get(key)
+            if current is not None and current.decode() == self.token:
+                self.store.delete(key)
+        self._held = False
+
+    @property
+    def is_leader(self) -> bool:
+        return self._held
@@ -0,0 +1,109 @@
+# Localized weather descriptions from OpenWeatherMap condition codes
+from typing import Optional
+
+# Languages with descriptions in CONDITIONS, in column order
+LANGUAGES = ("en", "fr", "es", "de", "pt")
+
+# https://openweathermap.org/weather-conditions
+CONDITIONS = {
+    200: ("thunderstorm with light rain", "orage et pluie fine", "tormenta con lluvia ligera",
+          "Gewitter mit leichtem Regen", "trovoada com chuva fraca"),
+    201: ("thunderstorm with rain", "orage et pluie", "tormenta con lluvia",
+          "Gewitter mit Regen", "trovoada com chuva"),
+    202: ("thunderstorm with heavy rain", "orage et fortes pluies", "tormenta con lluvia intensa",
+          "Gewitter mit Starkregen", "trovoada com chuva forte"),
+    210: ("light thunderstorm", "orage léger", "tormenta ligera", "leichtes Gewitter", "trovoada fraca"),
+    211: ("thunderstorm", "orage", "tormenta", "Gewitter", "trovoada"),
+    212: ("heavy thunderstorm", "violent orage", "tormenta fuerte", "schweres Gewitter", "trovoada forte"),
+    221: ("ragged thunderstorm", "orages locaux", "tormenta irregular", "vereinzelte Gewitter", "trovoada irregular"),
+    230: ("thunderstorm with light drizzle", "orage et bruine légère", "tormenta con llovizna ligera",
+          "Gewitter mit leichtem Nieselregen", "trovoada com chuvisco fraco"),
+    231: ("thunderstorm with drizzle", "orage et bruine", "tormenta con llovizna",
+          "Gewitter mit Nieselregen", "trovoada com chuvisco"),
+    232: ("thunderstorm with heavy drizzle", "orage et forte bruine", "tormenta con llovizna intensa",
+          "Gewitter mit starkem Nieselregen", "trovoada com chuvisco forte"),
+    300: ("light intensity drizzle", "bruine légère", "llovizna ligera", "leichter Nieselregen", "chuvisco fraco"),
+    301: ("drizzle", "bruine", "llovizna", "Nieselregen", "chuvisco"),
+    302: ("heavy intensity drizzle", "forte bruine", "llovizna intensa", "starker Nieselregen", "chuvisco forte"),
+    310: ("light intensity drizzle rain", "pluie et bruine légères", "lluvia y llovizna ligera",
+          "leichter Nieselregen mit Regen", "chuva e chuvisco fracos"),
+    311: ("drizzle rain", "pluie et bruine", "lluvia y llovizna", "Nieselregen mit Regen", "chuva e chuvisco"),
+    312: ("heavy intensity drizzle rain", "fortes pluie et bruine", "lluvia y llovizna intensa",
+          "starker Nieselregen mit Regen", "chuva e chuvisco fortes"),
+    313: ("shower rain and drizzle", "averses et bruine", "chubascos y llovizna",
+          "Regenschauer und Nieselregen", "aguaceiros e chuvisco"),
+    314: ("heavy shower rain and drizzle", "fortes averses et bruine", "chubascos intensos y llovizna",
+          "starke Regenschauer und Nieselregen", "aguaceiros fortes e chuvisco"),
+    321: ("shower drizzle", "averses de bruine", "chubascos de llovizna", "Nieselschauer", "aguaceiros de chuvisco"),
+    500: ("light rain", "pluie légère", "lluvia ligera", "leichter Regen", "chuva fraca"),
+    501: ("moderate rain", "pluie modérée", "lluvia moderada", "mäßiger Regen", "chuva moderada"),
+    502: ("heavy intensity rain", "forte pluie", "lluvia intensa", "starker Regen", "chuva forte"),
+    503: ("very heavy rain", "très forte pluie", "lluvia muy intensa", "sehr starker Regen", "chuva muito forte"),
+    504: ("extreme rain", "pluie extrême", "lluvia extrema", "extremer Regen", "chuva extrema"),
+    511: ("freezing rain", "pluie verglaçante", "lluvia helada", "gefrierender Regen", "chuva congelante"),
+    520: ("light intensity shower rain", "averses légères", "chubascos ligeros", "leichte Regenschauer",
+          "aguaceiros fracos"),
+    521: ("shower rain", "averses", "chubascos", "Regenschauer", "aguaceiros"),
+    522: ("heavy intensity shower rain", "fortes averses", "chubascos intensos", "starke Regenschauer",
+          "aguaceiros fortes"),
+    531: ("ragged shower rain", "averses éparses", "chubascos irregulares", "vereinzelte Regenschauer",
+          "aguaceiros irregulares"),
+    600: ("light snow", "neige légère", "nevada ligera", "leichter Schneefall", "neve fraca"),
+    601: ("snow", "neige", "nieve", "Schnee", "neve"),
+    602: ("heavy snow", "fortes chutes de neige", "nevada intensa", "starker Schneefall", "neve forte"),
+    611: ("sleet", "neige fondue", "aguanieve", "Schneeregen", "granizo miúdo"),
+    612: ("light shower sleet", "averses de neige fondue légères", "chubascos ligeros de aguanieve",
+          "leichte Schneeregenschauer", "aguaceiros fracos de granizo miúdo"),
+    613: ("shower sleet", "averses de neige fondue", "chubascos de aguanieve", "Schneeregenschauer",
+          "aguaceiros de granizo miúdo"),
+    615: ("light rain and snow", "pluie et neige légères", "lluvia y nieve ligeras",
+          "leichter Regen und Schnee", "chuva e neve fracas"),
+    616: ("rain and snow", "pluie et neige", "lluvia y nieve", "Regen und Schnee", "chuva e neve"),
+    620: ("light shower snow", "averses de neige légères", "chubascos ligeros de nieve",
+          "leichte Schneeschauer", "aguaceiros fracos de neve"),
+    621: ("shower snow", "averses de neige", "chubascos de nieve", "Schneeschauer", "aguaceiros de neve"),
+    622: ("heavy shower snow", "fortes averses de neige", "chubascos intensos de nieve",
+          "starke Schneeschauer", "aguaceiros fortes de neve"),
+    701: ("mist", "brume", "neblina", "Dunst", "névoa"),
+    711: ("smoke", "fumée", "humo", "Rauch", "fumo"),
+    721: ("haze", "brume sèche", "calima", "Dunst", "neblina seca"),
+    731: ("sand/dust whirls", "tourbillons de sable/poussière", "remolinos de arena/polvo",
+          "Sand-/Staubwirbel", "redemoinhos de areia/poeira"),
+    741: ("fog", "brouillard", "niebla", "Nebel", "nevoeiro"),
+    751: ("sand", "sable", "arena", "Sand", "areia"),
+    761: ("dust", "poussière", "polvo", "Staub", "poeira"),
+    762: ("volcanic ash", "cendres volcaniques", "ceniza volcánica", "Vulkanasche", "cinza vulcânica"),
+    771: ("squalls", "grains", "turbonadas", "Sturmböen", "rajadas"),
+    781: ("tornado", "tornade", "tornado", "Tornado", "tornado"),
+    800: ("clear sky", "ciel dégagé", "cielo claro", "klarer Himmel", "céu limpo"),
+    801: ("few clouds", "peu nuageux", "algunas nubes", "ein paar Wolken", "algumas nuvens"),
+    802: ("scattered clouds", "partiellement nuageux", "nubes dispersas", "Mäßig bewölkt", "nuvens dispersas"),
+    803: ("broken clouds", "nuageux", "muy nuboso", "überwiegend bewölkt", "nublado"),
+    804: ("overcast clouds", "couvert", "cielo cubierto", "bedeckt", "céu encoberto"),
+}
+
+_COLUMNS = {lang: column for column, lang in enumerate(LANGUAGES)}
+
+
+def language(lang: Optional[str]) -> str:
+    """Best supported language for a requested code such as "fr" or "pt_BR", English if none"""
+    primary = (lang or "").strip().lower().replace("-", "_").split("_", 1)[0]
+    return primary if primary in _COLUMNS else "en"
+
+
+def describe(code: Optional[int], lang: str, fallback: str = "") -> str:
+    """
+    Describe a weather condition in a language
+
+    Args:
+        code (Optional[int]): OpenWeatherMap condition code
+        lang (str): Language code, see ``language``
+        fallback (str): Used for codes missing from the table
+
+    Returns:
+        str: Localized description
+    """
+    descriptions = CONDITIONS.get(code)
+    if descriptions is None:
+        return fallback
+    return descriptions[_COLUMNS[language(lang)]]
@@ -0,0 +1,202 @@
+# Prometheus-style metrics
+import bisect
+import math
+import threading
+from typing import List, Sequence, Tuple
+
+# Latency buckets in seconds, fine enough for sub-millisecond Mongo commands
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Metric family keyed by label values
+
+    ``labels()`` returns a child that can be kept and reused; hot paths
+    should hold on to children rather than look them up per call.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._child())
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def render(self, name: str, labelnames, values) -> List[str]:
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def render(self, name: str, labelnames, values) -> List[str]:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds + (math.inf,), counts):
+            cumulative += count
+            le = f'le="{_format_value(float(bound))}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        labels = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def _child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+
+def outcome_for(status_code: int) -> str:
+    """Classify an upstream HTTP status for the ``outcome`` label"""
+    if status_code < 400:
+        return "ok"
+    if status_code == 429:
+        return "throttled"
+    return "client_error" if status_code < 500 else "server_error"
+
+
+def render() -> str:
+    """
+    Render every metric in the Prometheus text exposition format
+
+    Metrics are per process; with several workers each scrape sees the
+    worker that served it, so scrape workers individually or run one.
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "meteorcloud_http_request_duration_seconds",
+    "Time to handle an API request, by route template, method and status",
+    ("route", "method", "status")
+)
+UPSTREAM_DURATION = Histogram(
+    "meteorcloud_upstream_request_duration_seconds",
+    "Time for an outbound provider call including retries, by provider and outcome",
+    ("provider", "outcome")
+)
+UPSTREAM_THROTTLE = Histogram(
+    "meteorcloud_upstream_throttle_seconds",
+    "Time spent waiting on an outbound rate limiter before a provider call",
+    ("provider",)
+)
+MONGO_DURATION = Histogram(
+    "meteorcloud_mongo_command_duration_seconds",
+    "MongoDB command time reported by the driver, by command and outcome",
+    ("command", "outcome")
+)
+CACHE_LOOKUPS = Counter(
+    "meteorcloud_cache_lookups_total",
+    "Cache lookups by cache and result (local_hit, shared_hit, miss)",
+    ("cache", "result")
+)
+WEATHER_HEDGES = Counter(
+    "meteorcloud_weather_hedges_total",
+    "Weather fetches that called a second provider, by reason (slow, failed) and provider that answered",
+    ("reason", "winner")
+)
+LOG_RECORDS_DROPPED = Counter(
+    "meteorcloud_log_records_dropped_total",
+    "Log records not written, by reason (queue_full, sampled)",
+    ("reason",)
+)
+RATE_LIMITED = Counter(
+    "meteorcloud_rate_limited_total",
+    "Requests rejected by the inbound rate limiter, by rule",
+    ("rule",)
+)
+WEATHER_CACHE_STATUS = Counter(
+    "meteorcloud_weather_cache_status_total",
+    "Weather responses by cache status (HIT, NEARBY, STALE, MISS, DEGRADED)",
+    ("status",)
+)
@@ -0,0 +1,17 @@
+# MongoDB command timings from the driver's monitoring hooks
+from pymongo import monitoring
+
+from backend.app.utils.metrics import MONGO_DURATION
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Record the duration of every command the driver runs"""
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        MONGO_DURATION.labels(event.command_name, "ok").observe(event.duration_micros / 1e6)
+
+    def failed(self, event) -> None:
+        MONGO_DURATION.labels(event.command_name, "error").observe(event.duration_micros / 1e6)
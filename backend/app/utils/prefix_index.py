@@ -0,0 +1,82 @@
+# In-memory prefix index for autocomplete
+import bisect
+import heapq
+import threading
+from typing import Any, Dict, List, Optional
+
+from backend.app.utils.cache import TTLCache, MISSING
+
+# Cached suggestion lists never expire on their own, updates invalidate them
+_RESULT_TTL = 365 * 24 * 3600
+
+
+class PrefixIndex:
+    """
+    Ranked prefix search over a sorted array of keys
+
+    Keys are kept sorted so the entries matching a prefix form one
+    contiguous slice found by two binary searches. Results per prefix are
+    memoized, and an update only invalidates the prefixes of the key it
+    touches, so the index never needs a full rebuild.
+    """
+
+    def __init__(self, max_limit: int = 20, result_cache_size: int = 4096):
+        self.max_limit = max_limit
+        self._keys = []
+        self._entries = {}
+        self._results = TTLCache(result_cache_size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str, value: Dict[str, Any], score: float = 0.0) -> None:
+        """
+        Insert or update an entry, adding score to its current score
+
+        Args:
+            key (str): Normalized search key
+            value (Dict): Payload returned in suggestions
+            score (float): Amount to add to the entry's ranking score
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                bisect.insort(self._keys, key)
+                self._entries[key] = [score, value]
+            else:
+                entry[0] += score
+                entry[1] = value
+            for i in range(1, len(key) + 1):
+                self._results.delete(key[:i])
+
+    def score(self, key: str) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get the highest scoring entries whose key starts with prefix
+
+        Args:
+            prefix (str): Normalized prefix
+            limit (int): Maximum number of suggestions, capped at max_limit
+
+        Returns:
+            List[Dict]: Entry payloads, best first
+        """
+        if not prefix:
+            return []
+        limit = min(limit, self.max_limit)
+        cached = self._results.get(prefix)
+        if cached is not MISSING:
+            return cached[:limit]
+
+        with self._lock:
+            lo = bisect.bisect_left(self._keys, prefix)
+            hi = bisect.bisect_left(self._keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo)
+            entries = self._entries
+            best = heapq.nlargest(self.max_limit, self._keys[lo:hi], key=lambda k: entries[k][0])
+            results = [entries[k][1] for k in best]
+            self._results.set(prefix, results, _RESULT_TTL)
+        return results[:limit]
@@ -0,0 +1,232 @@
+# Upstream call budgets shared by every worker
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from backend.app.config import config
+from backend.app.utils.cache import MemoryStore, get_shared_store
+from backend.app.utils.filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+# Budget states, from most to least headroom
+BUDGET_OK = "ok"
+BUDGET_TIGHT = "tight"
+BUDGET_EXHAUSTED = "exhausted"
+
+# Count on disk without Redis: start of the period and calls in it
+_COUNT = struct.Struct("dq")
+
+
+class QuotaExhaustedError(requests.RequestException):
+    """Raised instead of calling a provider whose budget for the period is used up"""
+
+    def __init__(self, message: str = "", retry_after: int = 0):
+        super().__init__(message)
+        self.retry_after = retry_after  # seconds until the budget starts again
+
+
+class UsageBudget:
+    """
+    Calls to one provider with one API key, counted against a quota per period
+
+    Every worker increments the same counter in the shared store, keyed by
+    provider, a hash of the key and the period, so the count is global and
+    starts again when the period (aligned to the epoch, i.e. UTC midnight
+    for a day) or the key changes. Without Redis the counter is a small
+    file in LOCK_DIR guarded by an exclusive lock, like ``TokenBucket``,
+    so the workers on the host still share one count.
+
+    The call rate is averaged over about QUOTA_RATE_WINDOW seconds from
+    the counter's growth, read at most every QUOTA_REFRESH seconds, and
+    projected to the end of the period. When the projection exceeds what
+    is left, ``ttl_factor`` says how much longer cached data must be kept
+    to make it last. A store outage is logged and the budget treated as
+    unknown, never as exhausted.
+    """
+
+    def __init__(self, provider: str, limit: int, period: float, key: Optional[str] = None, store=None,
+                 directory: Optional[str] = None):
+        self.provider = provider
+        self.limit = limit
+        self.period = period
+        self.key_id = hashlib.sha256(key.encode()).hexdigest()[:12] if key else "default"
+        self.path = os.path.join(directory or config.LOCK_DIR, f"{provider}-{self.key_id}.quota")
+        self._store = store
+        self._lock = threading.Lock()
+        self._period_start = None
+        self._used = 0
+        self._rate = None  # calls per second
+        self._sampled_at = None
+        self._sampled_used = 0
+        self._read_at = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_shared_store()
+        return self._store
+
+    def _counter(self, period_start: float) -> str:
+        return f"meteorcloud:quota:{self.provider}:{self.key_id}:{int(period_start)}"
+
+    def _current_period(self, now: float) -> float:
+        return math.floor(now / self.period) * self.period
+
+    def record(self, calls: int = 1) -> None:
+        """Count calls about to be made"""
+        now = time.time()
+        period_start = self._current_period(now)
+        try:
+            if isinstance(self.store, MemoryStore):
+                used = self._count_on_disk(period_start, calls)
+            else:
+                counter = self._counter(period_start)
+                if period_start != self._period_start:
+                    # Expires a period after it stops counting
+                    self.store.set(counter, 0, ex=int(self.period * 2), nx=True)
+                used = self.store.incr(counter, calls)
+        except Exception as e:
+            logger.error("Failed to count %s calls: %s", self.provider, e)
+            return
+        with self._lock:
+            if period_start != self._period_start:
+                self._start_period(period_start)
+            self._used = max(self._used, used)
+
+    def _count_on_disk(self, period_start: float, calls: int = 0) -> int:
+        """
+        Add calls to the host-wide count in LOCK_DIR
+
+        Returns:
+            int: Calls counted in the period so far
+        """
+        with FileLock(self.path) as lock:
+            handle = lock.handle
+            handle.seek(0)
+            raw = handle.read(_COUNT.size)
+            used = 0
+            if len(raw) == _COUNT.size:
+                counted_start, counted = _COUNT.unpack(raw)
+                if counted_start == period_start:
+                    used = counted
+            if calls:
+                used += calls
+                # Fixed-size record, so overwriting in place needs no truncate
+                handle.seek(0)
+                handle.write(_COUNT.pack(period_start, used))
+                handle.flush()
+            return used
+
+    def _start_period(self, period_start: float) -> None:
+        self._period_start = period_start
+        self._used = self._sampled_used = 0
+        self._sampled_at = None
+
+    def _refresh(self, now: float) -> None:
+        period_start = self._current_period(now)
+        try:
+            if isinstance(self.store, MemoryStore):
+                used = self._count_on_disk(period_start)
+            else:
+                used = int(self.store.get(self._counter(period_start)) or 0)
+        except Exception as e:
+            logger.error("Failed to read %s usage: %s", self.provider, e)
+            return
+        with self._lock:
+            if period_start != self._period_start:
+                self._start_period(period_start)
+            self._used = max(self._used, used)
+            if self._sampled_at is None:
+                if self._rate is None:
+                    # Average so far, at least over a minute
+                    self._rate = used / max(now - period_start, 60)
+            elif now > self._sampled_at:
+                elapsed = now - self._sampled_at
+                current = (used - self._sampled_used) / elapsed
+                weight = 1 - math.exp(-elapsed / config.QUOTA_RATE_WINDOW)
+                self._rate += weight * (current - self._rate)
+            self._sampled_at = now
+            self._sampled_used = used
+
+    def state(self) -> Dict:
+        """
+        Current usage and projection
+
+        Returns:
+            Dict: used, limit, remaining, resets_in (seconds),
+            rate_per_hour, projected (calls by the end of the period),
+            ttl_factor and status (ok, tight or exhausted)
+        """
+        now = time.time()
+        if self._read_at is None or now - self._read_at >= config.QUOTA_REFRESH \
+                or self._current_period(now) != self._period_start:
+            self._read_at = now
+            self._refresh(now)
+        with self._lock:
+            used, rate = self._used, self._rate or 0.0
+        resets_in = self._current_period(now) + self.period - now
+        remaining = max(0, self.limit - used)
+        demand = rate * resets_in
+        if remaining == 0:
+            factor = config.QUOTA_MAX_TTL_FACTOR
+            status = BUDGET_EXHAUSTED
+        else:
+            factor = min(max(demand / remaining, 1.0), config.QUOTA_MAX_TTL_FACTOR)
+            status = BUDGET_TIGHT if factor > 1 else BUDGET_OK
+        return {
+            "provider": self.provider,
+            "key": self.key_id,
+            "used": used,
+            "limit": self.limit,
+            "remaining": remaining,
+            "resets_in": round(resets_in),
+            "rate_per_hour": round(rate * 3600, 1),
+            "projected": round(used + demand),
+            "ttl_factor": round(factor, 2),
+            "status": status
+        }
+
+    @property
+    def exhausted(self) -> bool:
+        return self.state()["status"] == BUDGET_EXHAUSTED
+
+    def ttl_factor(self) -> float:
+        return self.state()["ttl_factor"]
+
+
+def parse_quotas(value: str) -> Dict[str, int]:
+    """
+    Parse PROVIDER_QUOTAS, e.g. "openweathermap=1000,nominatim=86400"
+
+    Raises:
+        ValueError: If an entry is not provider=calls
+    """
+    quotas = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, separator, limit = entry.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid PROVIDER_QUOTAS entry: {entry}")
+        quotas[name.strip()] = int(limit)
+    return quotas
+
+
+# API keys by provider; budgets are kept per key
+PROVIDER_KEYS = {"openweathermap": config.WEATHER_API_KEY}
+
+budgets = {
+    provider: UsageBudget(provider, limit, config.QUOTA_PERIOD, key=PROVIDER_KEYS.get(provider))
+    for provider, limit in parse_quotas(config.PROVIDER_QUOTAS).items()
+}
+
+
+def budget_for(provider: Optional[str]) -> Optional[UsageBudget]:
+    """The budget of a provider, or None if its calls are not limited"""
+    return budgets.get(provider)
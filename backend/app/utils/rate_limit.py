@@ -0,0 +1,97 @@
+# Outbound rate limiting
+import asyncio
+import os
+import struct
+import time
+from typing import Optional
+
+from backend.app.config import config
+from backend.app.utils.filelock import FileLock
+
+# Bucket state on disk: available tokens and time of last refill
+_STATE = struct.Struct("dd")
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every worker process on the host
+
+    State lives in a small file guarded by an exclusive lock, so N gunicorn
+    workers together stay within ``rate`` requests per second instead of
+    each getting their own budget.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float = 1, directory: Optional[str] = None):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.path = os.path.join(directory or config.LOCK_DIR, f"{name}.bucket")
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one will be
+        """
+        with FileLock(self.path) as lock:
+            handle = lock.handle
+            handle.seek(0)
+            raw = handle.read(_STATE.size)
+            now = time.time()
+            if len(raw) == _STATE.size:
+                tokens, updated = _STATE.unpack(raw)
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+            else:
+                tokens = self.capacity
+
+            if tokens >= 1:
+                wait = 0.0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+
+            # Fixed-size record, so overwriting in place needs no truncate
+            handle.seek(0)
+            handle.write(_STATE.pack(tokens, now))
+            handle.flush()
+            return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a token is available
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait, None to wait forever
+
+        Returns:
+            bool: True if a token was taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait for a token without blocking the event loop"""
+        while True:
+            # The state file's lock can be held by another worker
+            wait = await asyncio.to_thread(self.try_acquire)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+
+# Nominatim usage policy: at most 1 request per second per application
+nominatim_limiter = TokenBucket(
+    "nominatim",
+    rate=config.NOMINATIM_RATE_LIMIT,
+    capacity=config.NOMINATIM_BURST
+)
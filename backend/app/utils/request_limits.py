@@ -0,0 +1,305 @@
+# Inbound per-client rate limiting for the Flask and ASGI apps
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from backend.app.config import config
+from backend.app.services.auth_service import AuthService
+from backend.app.utils import tokens
+from backend.app.utils.auth import bearer_token
+from backend.app.utils.cache import MemoryStore, get_shared_store
+from backend.app.utils.metrics import RATE_LIMITED
+from backend.app.utils.tokens import TokenError
+
+logger = logging.getLogger(__name__)
+
+TOO_MANY_REQUESTS = json.dumps({"error": "Too many requests", "status": "error"}).encode()
+
+
+class _Window:
+    """One client's counts in the current fixed window, as this worker knows them"""
+
+    __slots__ = ("start", "previous", "counted", "pending", "synced_at")
+
+    def __init__(self, start: float, previous: int = 0):
+        self.start = start
+        self.previous = previous  # requests in the window before
+        self.counted = 0  # requests in the store at the last sync, plus those being pushed
+        self.pending = 0  # requests admitted here since
+        self.synced_at = None
+
+
+class SlidingWindowLimiter:
+    """
+    At most ``limit`` requests per client in any ``window`` seconds
+
+    Time is split into fixed windows whose counts are kept in the shared
+    store, and the count over the last ``window`` seconds is estimated as
+    the current window's plus the previous window's weighted by how much
+    of it still overlaps. Rejected requests are not counted, so a client
+    that waits as told by Retry-After gets through.
+
+    Each worker decides from its own copy of the counts and pushes the
+    requests it admitted to the store at most every RATE_LIMIT_SYNC
+    seconds per client, so most requests never leave the process; in
+    between, several workers together can admit a little more than the
+    limit. A store outage is logged and the limit applied per worker.
+    ``hit_async`` makes the same decision and pushes to the store in a
+    worker thread, so a slow Redis never stalls the event loop.
+    """
+
+    def __init__(self, name: str, limit: int, window: float, store=None,
+                 sync_interval: float = config.RATE_LIMIT_SYNC,
+                 max_clients: int = config.RATE_LIMIT_MAX_CLIENTS):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.sync_interval = sync_interval
+        self.max_clients = max_clients
+        self._store = store
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_shared_store()
+        return self._store
+
+    def _counter(self, client: str, start: float) -> str:
+        return f"meteorcloud:ratelimit:{self.name}:{client}:{int(start)}"
+
+    def hit(self, client: str, now: Optional[float] = None) -> float:
+        """
+        Count a request from a client if it is within the limit
+
+        Returns:
+            float: 0 if the request is allowed, otherwise seconds until
+            one will be
+        """
+        wait, sync = self._admit(client, now)
+        if sync is not None:
+            self._sync(*sync)
+        return wait
+
+    async def hit_async(self, client: str, now: Optional[float] = None) -> float:
+        """Like ``hit``, syncing with the shared store off the event loop"""
+        wait, sync = self._admit(client, now)
+        if sync is not None:
+            await asyncio.to_thread(self._sync, *sync)
+        return wait
+
+    def _admit(self, client: str, now: Optional[float]) -> Tuple[float, Optional[tuple]]:
+        """
+        Decide on a request from this worker's copy of the counts
+
+        Returns:
+            Tuple[float, Optional[tuple]]: Seconds to wait (0 if allowed)
+            and the arguments of ``_sync`` if it is time to push
+        """
+        now = time.time() if now is None else now
+        start = math.floor(now / self.window) * self.window
+        with self._lock:
+            state = self._clients.get(client)
+            if state is None:
+                state = self._clients[client] = _Window(start)
+                if len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(client)
+                if state.start != start:
+                    previous = state.counted + state.pending if start - state.start == self.window else 0
+                    state = self._clients[client] = _Window(start, previous)
+
+            current = state.counted + state.pending
+            if state.previous * (start + self.window - now) / self.window + current + 1 > self.limit:
+                return self._retry_after(state, current, now), None
+
+            state.pending += 1
+            first = state.synced_at is None
+            if not first and now - state.synced_at < self.sync_interval:
+                return 0.0, None
+            pushed, state.pending = state.pending, 0
+            state.counted += pushed
+            state.synced_at = now
+
+        return 0.0, (client, state, start, pushed, first)
+
+    def _retry_after(self, state: _Window, current: int, now: float) -> float:
+        """Seconds until the previous window's weight leaves room for one more request"""
+        end = state.start + self.window
+        if current >= self.limit:
+            # This window becomes the previous one
+            return end - now + self.window * (1 - (self.limit - 1) / current)
+        return end - self.window * (self.limit - current - 1) / state.previous - now
+
+    def _sync(self, client: str, state: _Window, start: float, pushed: int, first: bool) -> None:
+        """Push admitted requests to the store and take in other workers' counts"""
+        counter = self._counter(client, start)
+        try:
+            previous = None
+            if first:
+                # Kept until the next window no longer looks back at it
+                self.store.set(counter, 0, ex=int(self.window * 2) + 1, nx=True)
+                previous = int(self.store.get(self._counter(client, start - self.window)) or 0)
+            counted = self.store.incr(counter, pushed)
+        except Exception as e:
+            logger.error("Failed to sync rate limit %s: %s", self.name, e)
+            return
+        with self._lock:
+            if state.start == start:
+                state.counted = max(state.counted, counted)
+                if previous is not None:
+                    state.previous = max(state.previous, previous)
+
+
+def parse_limits(value: str) -> List[Tuple[str, int, float]]:
+    """
+    Parse RATE_LIMITS, e.g. "/api/v1/login=10/60,/api/v1=600/60"
+
+    Returns:
+        List[Tuple[str, int, float]]: (path prefix, requests, seconds),
+        longest prefix first
+
+    Raises:
+        ValueError: If an entry is not prefix=requests/seconds
+    """
+    rules = []
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        prefix, separator, rate = entry.partition("=")
+        limit, slash, window = rate.partition("/")
+        if not separator or not slash or not prefix.startswith("/"):
+            raise ValueError(f"Invalid RATE_LIMITS entry: {entry}")
+        rules.append((prefix.rstrip("/") or "/", int(limit), float(window)))
+    rules.sort(key=lambda rule: len(rule[0]), reverse=True)
+    return rules
+
+
+class RequestLimits:
+    """
+    Rate limits by path prefix, each counted per client
+
+    A client is the user of a valid bearer token, or else the remote
+    address (after ProxyFix or the ASGI server's proxy header handling),
+    so an invalid token cannot buy a fresh allowance.
+    """
+
+    def __init__(self, rules: List[Tuple[str, int, float]], store=None):
+        self.rules = [(prefix, SlidingWindowLimiter(prefix, limit, window, store))
+                      for prefix, limit, window in rules]
+
+    @staticmethod
+    def from_config() -> "RequestLimits":
+        if isinstance(get_shared_store(), MemoryStore):
+            logger.warning("REDIS_URL is not set: rate limits are counted per worker process, "
+                           "so N workers together admit up to N times each limit")
+        return RequestLimits(parse_limits(config.RATE_LIMITS))
+
+    def limiter_for(self, path: str) -> Optional[SlidingWindowLimiter]:
+        """The limiter of the longest prefix matching path, if any"""
+        for prefix, limiter in self.rules:
+            if path == prefix or path.startswith(prefix + "/") or prefix == "/":
+                return limiter
+        return None
+
+    @staticmethod
+    def client(remote_addr: Optional[str], authorization: Optional[str]) -> str:
+        token = bearer_token(authorization) if authorization else ""
+        if token:
+            try:
+                return "user:" + tokens.decode(token, AuthService.secret(), leeway=config.JWT_LEEWAY)["sub"]
+            except (TokenError, KeyError, TypeError):
+                pass
+        return "ip:" + (remote_addr or "unknown")
+
+    def check(self, path: str, remote_addr: Optional[str], authorization: Optional[str]) -> float:
+        """
+        Count a request against its path's limit
+
+        Returns:
+            float: 0 if it is allowed, otherwise seconds until the client
+            may retry
+        """
+        limiter = self.limiter_for(path)
+        if limiter is None:
+            return 0.0
+        wait = limiter.hit(self.client(remote_addr, authorization))
+        if wait:
+            RATE_LIMITED.labels(limiter.name).inc()
+        return wait
+
+    async def check_async(self, path: str, remote_addr: Optional[str], authorization: Optional[str]) -> float:
+        """Like ``check``, syncing with the shared store off the event loop"""
+        limiter = self.limiter_for(path)
+        if limiter is None:
+            return 0.0
+        wait = await limiter.hit_async(self.client(remote_addr, authorization))
+        if wait:
+            RATE_LIMITED.labels(limiter.name).inc()
+        return wait
+
+
+def _retry_after_header(wait: float) -> str:
+    return str(max(1, math.ceil(wait)))
+
+
+def limit_flask(app, limits: Optional[RequestLimits] = None) -> None:
+    """
+    Reject requests over their client's limit with a 429 and Retry-After
+
+    Wraps ``app.wsgi_app``; apply before ProxyFix so that the client's
+    address is already taken from X-Forwarded-For.
+    """
+    limits = limits or RequestLimits.from_config()
+    wsgi_app = app.wsgi_app
+
+    def limited_wsgi_app(environ, start_response):
+        wait = limits.check(environ.get("PATH_INFO", ""), environ.get("REMOTE_ADDR"),
+                            environ.get("HTTP_AUTHORIZATION"))
+        if not wait:
+            return wsgi_app(environ, start_response)
+        start_response("429 Too Many Requests", [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(TOO_MANY_REQUESTS))),
+            ("Retry-After", _retry_after_header(wait))
+        ])
+        return [TOO_MANY_REQUESTS]
+
+    app.wsgi_app = limited_wsgi_app
+
+
+class RateLimitMiddleware:
+    """Pure ASGI counterpart of ``limit_flask``"""
+
+    def __init__(self, app, limits: Optional[RequestLimits] = None):
+        self.app = app
+        self.limits = limits or RequestLimits.from_config()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        authorization = next((value.decode("latin-1") for name, value in scope["headers"]
+                              if name == b"authorization"), None)
+        wait = await self.limits.check_async(scope["path"], client[0] if client else None, authorization)
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(TOO_MANY_REQUESTS)).encode()),
+                (b"retry-after", _retry_after_header(wait).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": TOO_MANY_REQUESTS})
@@ -0,0 +1,94 @@
+# Per-route request latency for the Flask and ASGI apps
+import time
+
+from backend.app.utils.metrics import REQUEST_DURATION
+
+UNMATCHED = "unmatched"
+
+# Environ key the Flask hook stores the matched url_rule under
+ROUTE_KEY = "meteorcloud.url_rule"
+
+
+def instrument_flask(app) -> None:
+    """
+    Record every request's latency under its route template
+
+    Timing is done in a wrapper around ``app.wsgi_app``; a single
+    after_request hook only notes the matched rule, since each Flask
+    context-local lookup costs about as much as the measurement itself.
+    For streamed responses this is the time until the body starts.
+    """
+    from flask import request
+
+    @app.after_request
+    def _note_route(response):
+        current = request._get_current_object()
+        current.environ[ROUTE_KEY] = current.url_rule
+        return response
+
+    wsgi_app = app.wsgi_app
+
+    def timed_wsgi_app(environ, start_response):
+        started = time.perf_counter()
+        status = "500"
+
+        def start_response_with_status(status_line, headers, exc_info=None):
+            nonlocal status
+            status = status_line[:3]
+            return start_response(status_line, headers, exc_info)
+
+        try:
+            return wsgi_app(environ, start_response_with_status)
+        finally:
+            rule = environ.get(ROUTE_KEY)
+            REQUEST_DURATION.labels(
+                rule.rule if rule is not None else UNMATCHED, environ["REQUEST_METHOD"], status
+            ).observe(time.perf_counter() - started)
+
+    app.wsgi_app = timed_wsgi_app
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency by route template
+
+    Measures until the response is complete. Routes mounted under a
+    prefix are reported with the prefix.
+    """
+
+    def __init__(self, app, mounts=()):
+        self.app = app
+        # (router, prefix it is included under) pairs
+        self.mounts = list(mounts)
+        # Route labels by id(route); routes are unhashable and live as long as the app
+        self._labels = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            label = self._labels.get(id(route)) if route is not None else UNMATCHED
+            if label is None:
+                label = self._labels[id(route)] = self._label(route)
+            REQUEST_DURATION.labels(label, scope["method"], str(status)).observe(time.perf_counter() - started)
+
+    def _label(self, route) -> str:
+        path = getattr(route, "path", UNMATCHED)
+        for router, prefix in self.mounts:
+            if route in router.routes:
+                return prefix + path
+        return path
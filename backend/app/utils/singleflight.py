@@ -0,0 +1,134 @@
+# Request coalescing
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+from backend.app.config import config
+from backend.app.utils.cache import MISSING
+from backend.app.utils.filelock import FileLock
+
+# Number of lock files per SingleFlight when coalescing across processes
+LOCK_STRIPES = 64
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive the same result or exception.
+
+    With ``shared`` enabled the leader also takes a per-key file lock, so
+    leaders in other worker processes queue behind it. After getting the
+    lock they call ``recheck`` first and skip the upstream call when it
+    returns a value, typically one the previous holder just cached.
+    """
+
+    def __init__(self, name: str, shared: bool = False, directory: Optional[str] = None):
+        self.name = name
+        self.shared = shared
+        self.directory = directory or config.LOCK_DIR
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], recheck: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key (str): Normalized request key
+            fn (Callable): Function performing the upstream call
+            recheck (Optional[Callable]): Returns a cached value or MISSING,
+                consulted after the cross-process lock is acquired
+
+        Returns:
+            Any: Result of fn (or recheck) shared by all callers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, recheck)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def _run(self, key: str, fn: Callable[[], Any], recheck: Optional[Callable[[], Any]]) -> Any:
+        if not self.shared:
+            return fn()
+
+        stripe = int(hashlib.sha1(key.encode()).hexdigest(), 16) % LOCK_STRIPES
+        with FileLock(os.path.join(self.directory, f"{self.name}-{stripe}.lock")):
+            if recheck is not None:
+                value = recheck()
+                if value is not MISSING:
+                    return value
+            return fn()
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines sharing one event loop"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once for all concurrent callers with the same key
+
+        Args:
+            key (str): Normalized request key
+            fn (Callable): Coroutine function performing the upstream call
+
+        Returns:
+            Any: Result of fn shared by all callers
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            # Shielded so a cancelled follower does not cancel the leader
+            return await asyncio.shield(future)
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody else waited on is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
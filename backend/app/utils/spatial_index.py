@@ -0,0 +1,207 @@
+# Nearest-neighbour lookups over latitude/longitude points
+import math
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Farthest two points on the earth can be apart
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; accepts floats or NumPy arrays"""
+    lat1, lon1, lat2, lon2 = np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Latitude band and longitude ranges that contain every point within radius_km
+
+    Longitude ranges are split at the antimeridian, so each lies within
+    [-180, 180].
+
+    Returns:
+        Tuple: lat_min, lat_max and a list of (lon_min, lon_max)
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    lat_min = lat - math.degrees(angle)
+    lat_max = lat + math.degrees(angle)
+    if lat_min <= -90 or lat_max >= 90 or math.sin(angle) >= math.cos(math.radians(lat)):
+        # The circle contains a pole or is wide enough to span every longitude
+        return max(lat_min, -90.0), min(lat_max, 90.0), [(-180.0, 180.0)]
+
+    delta = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    lon_min, lon_max = lon - delta, lon + delta
+    if lon_min < -180:
+        return lat_min, lat_max, [(lon_min + 360, 180.0), (-180.0, lon_max)]
+    if lon_max > 180:
+        return lat_min, lat_max, [(lon_min, 180.0), (-180.0, lon_max - 360)]
+    return lat_min, lat_max, [(lon_min, lon_max)]
+
+
+class PointIndex:
+    """
+    Static index over many points, held as NumPy arrays sorted by grid cell
+
+    Points are bucketed into cell_size-degree cells and sorted by cell, so
+    the points of a row of adjacent cells are one contiguous slice found
+    with a binary search. A query examines only the cells overlapping the
+    search circle's bounding box. Built once, e.g. over a geocoding index;
+    use GridIndex for points that come and go.
+    """
+
+    def __init__(self, lat, lon, cell_size: float = 0.1):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.cell_size = cell_size
+        self.rows = math.ceil(180 / cell_size) + 1
+        self.width = math.ceil(360 / cell_size) + 1
+
+        keys = self._rows(lat) * self.width + self._cols(lon)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        self.lat = lat[self.order]
+        self.lon = lon[self.order]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rows(self, lat):
+        return np.clip(np.floor((lat + 90) / self.cell_size), 0, self.rows - 1).astype(np.int64)
+
+    def _cols(self, lon):
+        return np.clip(np.floor((lon + 180) / self.cell_size), 0, self.width - 1).astype(np.int64)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Sorted positions of the points in cells overlapping the search circle"""
+        lat_min, lat_max, lon_ranges = bounding_box(lat, lon, radius_km)
+        rows = np.arange(self._rows(lat_min), self._rows(lat_max) + 1) * self.width
+        starts, ends = [], []
+        for lon_min, lon_max in lon_ranges:
+            starts.append(np.searchsorted(self.keys, rows + self._cols(lon_min)))
+            ends.append(np.searchsorted(self.keys, rows + self._cols(lon_max) + 1))
+        starts, ends = np.concatenate(starts), np.concatenate(ends)
+
+        # Concatenate the ranges starts[i]:ends[i] without a Python loop
+        sizes = ends - starts
+        offsets = np.cumsum(sizes) - sizes
+        return np.arange(sizes.sum()) - np.repeat(offsets - starts, sizes)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Points within radius_km of a location
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Indices of the points as passed to
+            the constructor and their distances in km, in no particular order
+        """
+        candidates = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        inside = distances <= radius_km
+        return self.order[candidates[inside]], distances[inside]
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                radius_km: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        The k points nearest to a location
+
+        The search radius starts at one cell and grows fourfold until it
+        holds k points, or reaches radius_km.
+
+        Returns:
+            List[Tuple[int, float]]: (index, distance in km), nearest first;
+            fewer than k if radius_km holds fewer points
+        """
+        limit = MAX_DISTANCE_KM if radius_km is None else min(radius_km, MAX_DISTANCE_KM)
+        radius = min(self.cell_size * KM_PER_DEGREE, limit)
+        while True:
+            indices, distances = self.within(lat, lon, radius)
+            if len(indices) >= k or radius >= limit:
+                break
+            radius = min(radius * 4, limit)
+        best = np.argsort(distances, kind="stable")[:k]
+        return [(int(indices[i]), float(distances[i])) for i in best]
+
+
+class GridIndex:
+    """
+    Bounded, thread-safe index of keyed points that can be added and removed
+
+    Points are bucketed into cell_size-degree cells in a dict; a query
+    scans the few cells around the location, so cell_size should be about
+    the usual query radius. Beyond maxsize points the least recently added
+    is dropped.
+    """
+
+    def __init__(self, cell_size: float, maxsize: int):
+        self.cell_size = cell_size
+        self.maxsize = maxsize
+        self._points = OrderedDict()  # key -> (lat, lon, cell)
+        self._cells = {}  # cell -> set of keys
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor((lat + 90) / self.cell_size), math.floor((lon + 180) / self.cell_size)
+
+    def add(self, key: Hashable, lat: float, lon: float) -> None:
+        with self._lock:
+            if key in self._points:
+                self._remove(key)
+            cell = self._cell(lat, lon)
+            self._points[key] = (lat, lon, cell)
+            self._cells.setdefault(cell, set()).add(key)
+            while len(self._points) > self.maxsize:
+                self._remove(next(iter(self._points)))
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._points:
+                self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, cell = self._points.pop(key)
+        keys = self._cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self._cells[cell]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, Hashable]]:
+        """
+        Keys of the points within radius_km of a location
+
+        Returns:
+            List[Tuple[float, Hashable]]: (distance in km, key), nearest first
+        """
+        lat_min, lat_max, lon_ranges = bounding_box(lat, lon, radius_km)
+        row_min, row_max = self._cell(lat_min, 0)[0], self._cell(lat_max, 0)[0]
+        found = []
+        with self._lock:
+            if (row_max - row_min + 1) * sum(hi - lo for lo, hi in lon_ranges) / self.cell_size > len(self._cells):
+                # Fewer occupied cells than cells in the box
+                keys = [key for cell_keys in self._cells.values() for key in cell_keys]
+            else:
+                keys = []
+                for lon_min, lon_max in lon_ranges:
+                    col_min, col_max = self._cell(0, lon_min)[1], self._cell(0, lon_max)[1]
+                    for row in range(row_min, row_max + 1):
+                        for col in range(col_min, col_max + 1):
+                            keys.extend(self._cells.get((row, col), ()))
+            for key in keys:
+                point_lat, point_lon, _ = self._points[key]
+                distance = float(haversine_km(lat, lon, point_lat, point_lon))
+                if distance <= radius_km:
+                    found.append((distance, key))
+        found.sort(key=lambda item: item[0])
+        return found
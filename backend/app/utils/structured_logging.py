@@ -0,0 +1,280 @@
+# Structured logging written by a background thread
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from werkzeug.wsgi import ClosingIterator
+
+from backend.app.config import config
+from backend.app.utils.metrics import LOG_RECORDS_DROPPED
+
+ACCESS_LOGGER = "meteorcloud.access"
+REQUEST_ID_HEADER = "X-Request-ID"
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Incoming request IDs are echoed only if they look like one
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+# ID of the request being handled by the current thread or task
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed in ``extra``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+_exception_formatter = logging.Formatter()
+
+queue_full = LOG_RECORDS_DROPPED.labels("queue_full")
+sampled_out = LOG_RECORDS_DROPPED.labels("sampled")
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including the request ID and any ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")[:-6] + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the records below WARNING from configured loggers
+
+    Rates apply to a logger and its children; the most specific
+    configured name wins. A rate of 0.1 keeps every tenth record, so a
+    steady stream is thinned evenly rather than at random. Warnings and
+    errors are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        # logger name -> keep one in this many (0 keeps none), resolved on first use
+        self._intervals = {}
+        self._counters = {}
+
+    def _interval(self, name: str) -> int:
+        matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+        if not matches:
+            return 1
+        rate = self.rates[max(matches, key=len)]
+        return 0 if rate <= 0 else max(1, round(1 / rate))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        interval = self._intervals.get(record.name)
+        if interval is None:
+            interval = self._intervals.setdefault(record.name, self._interval(record.name))
+            self._counters.setdefault(record.name, itertools.count())
+        if interval == 1:
+            return True
+        # next() on itertools.count is atomic, so concurrent threads never share a slot
+        if interval and next(self._counters[record.name]) % interval == 0:
+            return True
+        sampled_out.inc()
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to a bounded queue without waiting
+
+    The message is not formatted here; the listener thread does that, so
+    the calling thread only pays for creating the record. When the queue is
+    full the record is dropped and counted rather than blocking the request.
+    Arguments are therefore formatted later, and should not be objects the
+    caller goes on to modify.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Capture what belongs to the calling thread
+        record.request_id = request_id.get()
+        if record.exc_info:
+            # Tracebacks keep frames alive; render them now and let go
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            queue_full.inc()
+
+
+class _WriterListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full; wait for the writer to make room rather than raise
+        self.queue.put(self._sentinel)
+
+
+def parse_sampling(value: str) -> Dict[str, float]:
+    """
+    Parse LOG_SAMPLING, e.g. "meteorcloud.access=0.1,backend.app.services=0.5"
+
+    Raises:
+        ValueError: If an entry is not logger=fraction
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, separator, rate = entry.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid LOG_SAMPLING entry: {entry}")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+
+def configure_logging(stream=None) -> None:
+    """
+    Send all logging through a bounded queue to a background writer thread
+
+    Replaces the root logger's handlers. Records are written to stream
+    (stderr by default) as JSON, or as text when LOG_FORMAT is "text".
+    Calling it again does nothing until ``stop_logging``.
+    """
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if config.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+        _handler = NonBlockingQueueHandler(queue.Queue(config.LOG_QUEUE_SIZE))
+        _handler.addFilter(SamplingFilter(parse_sampling(config.LOG_SAMPLING)))
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(_handler)
+        root.setLevel(config.LOG_LEVEL)
+
+        _listener = _WriterListener(_handler.queue, output, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the writer thread"""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener = _handler = None
+
+
+atexit.register(stop_logging)
+
+
+def _new_request_id(incoming: Optional[str]) -> str:
+    if incoming and _VALID_REQUEST_ID.fullmatch(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def _log_access(method: str, path: str, status: int, started: float) -> None:
+    level = logging.WARNING if status >= 500 else logging.INFO
+    if access_logger.isEnabledFor(level):
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        access_logger.log(level, "%s %s %s %.2fms", method, path, status, duration_ms,
+                          extra={"method": method, "path": path, "status": status, "duration_ms": duration_ms})
+
+
+def assign_request_ids(app) -> None:
+    """
+    Give every Flask request an ID and write an access log record
+
+    The ID is taken from a valid X-Request-ID request header or
+    generated, is attached to every record logged while handling the
+    request, and is returned in the X-Request-ID response header. The
+    access record is written when the server closes the response, so a
+    streamed body is included in its duration and keeps the ID.
+    """
+    wsgi_app = app.wsgi_app
+
+    def wsgi_app_with_request_id(environ, start_response):
+        started = time.perf_counter()
+        value = _new_request_id(environ.get("HTTP_X_REQUEST_ID"))
+        token = request_id.set(value)
+        status = 500
+
+        def start_response_with_id(status_line, headers, exc_info=None):
+            nonlocal status
+            status = int(status_line[:3])
+            headers.append((REQUEST_ID_HEADER, value))
+            return start_response(status_line, headers, exc_info)
+
+        def finish():
+            _log_access(environ["REQUEST_METHOD"], environ.get("PATH_INFO", ""), status, started)
+            request_id.reset(token)
+
+        try:
+            body = wsgi_app(environ, start_response_with_id)
+        except BaseException:
+            finish()
+            raise
+        return ClosingIterator(body, finish)
+
+    app.wsgi_app = wsgi_app_with_request_id
+
+
+class RequestIdMiddleware:
+    """Pure ASGI counterpart of ``assign_request_ids``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        incoming = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"x-request-id"), None)
+        value = _new_request_id(incoming)
+        token = request_id.set(value)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _log_access(scope["method"], scope["path"], status, started)
+            request_id.reset(token)
@@ -0,0 +1,82 @@
+# Signed access and refresh tokens
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional
+
+# JWS header for HS256, encoded once
+_HEADER = base64.urlsafe_b64encode(
+    json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode()
+).rstrip(b"=")
+
+
+class TokenError(ValueError):
+    """Raised when a token is malformed, has a bad signature or has expired"""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def encode(claims: Dict[str, Any], secret: bytes) -> str:
+    """
+    Sign claims as a compact HS256 JWT
+
+    Args:
+        claims (Dict[str, Any]): JSON serialisable claims
+        secret (bytes): HMAC key
+
+    Returns:
+        str: header.payload.signature
+    """
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = _HEADER + b"." + payload
+    signature = _b64encode(hmac.new(secret, signing_input, hashlib.sha256).digest())
+    return (signing_input + b"." + signature).decode()
+
+
+def decode(token: str, secret: bytes, leeway: float = 0, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Verify a token's signature and expiry and return its claims
+
+    Only HS256 tokens with the header produced by encode() are accepted,
+    so the algorithm cannot be downgraded by the client.
+
+    Args:
+        token (str): Compact JWT
+        secret (bytes): HMAC key
+        leeway (float): Seconds of clock skew tolerated on exp
+        now (Optional[float]): Current time, for testing
+
+    Returns:
+        Dict[str, Any]: Claims
+
+    Raises:
+        TokenError: If the token is invalid or expired
+    """
+    try:
+        header, payload, signature = token.encode().split(b".")
+    except (AttributeError, UnicodeEncodeError, ValueError):
+        raise TokenError("Malformed token")
+    if header != _HEADER:
+        raise TokenError("Unsupported token header")
+
+    expected = _b64encode(hmac.new(secret, header + b"." + payload, hashlib.sha256).digest())
+    if not hmac.compare_digest(signature, expected):
+        raise TokenError("Invalid token signature")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise TokenError("Malformed token payload")
+    if not isinstance(claims, dict) or not isinstance(claims.get("exp"), (int, float)):
+        raise TokenError("Token has no expiry")
+    if claims["exp"] + leeway < (time.time() if now is None else now):
+        raise TokenError("Token has expired")
+    return claims
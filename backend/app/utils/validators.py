@@ -1 +1,61 @@
-# Input validation utilities 
+# Input validation utilities
+import re
+from datetime import datetime, timezone
+from typing import Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_city(city: str) -> str:
+    """
+    Normalize a city name for use as a lookup key
+
+    Collapses whitespace and case so that "london", " London " and
+    "LONDON" all map to the same key.
+
+    Args:
+        city (str): City name as supplied by the client
+
+    Returns:
+        str: Normalized city name
+    """
+    return _WHITESPACE.sub(" ", city).strip().casefold()
+
+
+def parse_coordinates(lat, lon) -> Tuple[float, float]:
+    """
+    Parse and range-check a latitude/longitude pair
+
+    Args:
+        lat: Latitude as a number or numeric string
+        lon: Longitude as a number or numeric string
+
+    Returns:
+        Tuple[float, float]: Latitude and longitude
+
+    Raises:
+        ValueError: If either value is not a number or is out of range
+    """
+    lat, lon = float(lat), float(lon)
+    if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        raise ValueError("Coordinates out of range")
+    return lat, lon
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse an ISO 8601 date or datetime into a naive UTC datetime
+
+    Args:
+        value (str): e.g. "2024-05-01" or "2024-05-01T12:00:00+01:00"
+
+    Returns:
+        datetime: Naive datetime in UTC
+
+    Raises:
+        ValueError: If the value is not ISO 8601
+    """
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
@@ -0,0 +1,63 @@
+"""
+Load test the Flask and ASGI serving paths against a local mock upstream
+
+Every request uses a distinct city so each one makes both upstream calls.
+
+Usage:
+    python -m backend.benchmarks.bench_asgi [--requests 2000] [--concurrency 200] [--latency 0.1]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+
+from backend.benchmarks.loadgen import drive, free_port, serve_asgi, serve_flask, summarize, wait_for_port
+from backend.benchmarks.stubs import serve_stub, stub_environment
+
+
+def run(total: int, concurrency: int, latency: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    stub_port = free_port()
+    os.environ.update(stub_environment(stub_port))
+    os.environ.update({
+        "LOCK_DIR": tempfile.mkdtemp(prefix="meteorcloud-bench-"),
+        "HTTP_POOL_MAXSIZE": str(concurrency),
+    })
+
+    stub = ctx.Process(target=serve_stub, args=(stub_port, latency), daemon=True)
+    stub.start()
+    wait_for_port(stub_port)
+
+    results = {}
+    try:
+        for name, target in (("flask", serve_flask), ("asgi", serve_asgi)):
+            port = free_port()
+            server = ctx.Process(target=target, args=(port,), daemon=True)
+            server.start()
+            try:
+                wait_for_port(port)
+                paths = [f"/api/v1/weather?city={name}-{i}" for i in range(total)]
+                summary = summarize(asyncio.run(drive(f"127.0.0.1:{port}", paths, concurrency)))
+                results[name] = {key: summary[key] for key in ("requests", "failures", "req_per_s", "p50_ms", "p99_ms")}
+            finally:
+                server.terminate()
+                server.join()
+    finally:
+        stub.terminate()
+        stub.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.1, help="upstream latency in seconds")
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.concurrency, args.latency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark authenticated request overhead with and without a DB lookup
+
+Serves three views through the Flask test client: no authentication,
+@token_required (in-process signature check) and a session-style check
+that loads the user from Mongo on every request. Overhead is reported
+relative to the unauthenticated view. Runs against mongomock by default;
+pass --mongo-uri to include real network round trips.
+
+Usage:
+    python -m backend.benchmarks.bench_auth [--requests 5000]
+"""
+import argparse
+import json
+import time
+
+from flask import Flask, g, jsonify, request
+
+from backend.app.database import database
+from backend.app.models.user import User
+from backend.app.services.auth_service import AuthService
+from backend.app.utils.auth import bearer_token, token_required
+from backend.app.utils.tokens import TokenError
+from backend.benchmarks.bench_observations import percentile
+
+
+def create_app() -> Flask:
+    app = Flask(__name__)
+
+    @app.route("/open")
+    def open_view():
+        return jsonify({"username": None})
+
+    @app.route("/token")
+    @token_required
+    def token_view():
+        return jsonify({"username": g.username})
+
+    @app.route("/db")
+    def db_view():
+        # Token still verified, but the user is then loaded on every call
+        try:
+            claims = AuthService.verify(bearer_token(request.headers.get("Authorization")))
+        except TokenError:
+            return jsonify({"error": "unauthorized"}), 401
+        user = User.find_by_username(claims["sub"])
+        if not user or not user.get("active"):
+            return jsonify({"error": "unauthorized"}), 401
+        return jsonify({"username": user["username"]})
+
+    return app
+
+
+def measure(client, path: str, headers: dict, requests: int) -> list:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.get_json()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-uri", default="")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+    database.client, database.db = client, client["MeteorCloudBench"]
+    users = database.get_collection("users")
+    users.drop()
+    users.create_index("username", unique=True)
+    users.insert_many([User(f"user{i}", "Secret123!").__dict__ for i in range(args.users)])
+
+    AuthService._syncer = True  # No denylist sync thread in the benchmark
+    token = AuthService.issue_tokens(f"user{args.users // 2}")["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    http = create_app().test_client()
+
+    results = {"backend": "mongodb" if args.mongo_uri else "mongomock", "requests": args.requests}
+    for path in ("/open", "/token", "/db"):
+        measure(http, path, headers, min(500, args.requests))  # Warm up
+        samples = measure(http, path, headers, args.requests)
+        results[path.strip("/")] = {
+            "p50_us": round(percentile(samples, 0.5) * 1e6, 1),
+            "p99_us": round(percentile(samples, 0.99) * 1e6, 1)
+        }
+
+    verify = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        AuthService.verify(token)
+        verify.append(time.perf_counter() - started)
+    results["verify_p50_us"] = round(percentile(verify, 0.5) * 1e6, 1)
+    for name in ("token", "db"):
+        results[f"{name}_overhead_p50_us"] = round(results[name]["p50_us"] - results["open"]["p50_us"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
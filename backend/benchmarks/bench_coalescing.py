@@ -0,0 +1,96 @@
+"""
+Fire N concurrent identical /api/v1/weather requests and count upstream calls
+
+Usage:
+    python -m backend.benchmarks.bench_coalescing [--requests 200] [--latency 0.2]
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+from backend.app.config import config
+from backend.app.main import create_app
+from backend.app.services.location_service import LocationService
+from backend.app.services.weather_service import WeatherService
+from backend.app.utils.cache import geocode_cache, weather_cache, MemoryStore
+
+
+def fake_upstream(latency: float, calls: Counter):
+    """Build an HttpClient.get replacement that emulates both providers"""
+    lock = threading.Lock()
+
+    def get(url, params=None, **kwargs):
+        with lock:
+            calls[url] += 1
+        time.sleep(latency)
+        response = MagicMock()
+        if url == LocationService.GEO_API_URL:
+            response.json.return_value = [{"lat": "5.03", "lon": "7.92", "display_name": "Uyo, Nigeria"}]
+        else:
+            response.json.return_value = {
+                "dt": time.time(),
+                "main": {"temp": 27.1, "feels_like": 30.2, "humidity": 84},
+                "weather": [{"description": "scattered clouds"}],
+                "wind": {"speed": 2.4},
+                "name": "Uyo",
+                "sys": {"country": "NG"}
+            }
+        return response
+    return get
+
+
+def run(requests_count: int, latency: float) -> dict:
+    for cache in (geocode_cache, weather_cache):
+        cache.local.clear()
+        cache._store = MemoryStore()
+
+    client = create_app().test_client()
+    calls = Counter()
+    statuses = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(requests_count)
+
+    def worker():
+        barrier.wait()
+        status = client.get("/api/v1/weather?city=Uyo").status_code
+        with lock:
+            statuses[status] += 1
+
+    upstream = MagicMock()
+    upstream.get.side_effect = fake_upstream(latency, calls)
+    with patch.object(LocationService, "http_client", upstream), \
+            patch.object(WeatherService, "http_client", upstream):
+        threads = [threading.Thread(target=worker) for _ in range(requests_count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests_count,
+        "elapsed_s": round(elapsed, 3),
+        "statuses": dict(statuses),
+        "geocode_calls": calls[LocationService.GEO_API_URL],
+        "weather_calls": calls[config.OPENWEATHER_URL],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="upstream latency in seconds")
+    args = parser.parse_args()
+
+    result = run(args.requests, args.latency)
+    print(json.dumps(result, indent=2))
+    assert result["geocode_calls"] == 1, "geocode requests were not coalesced"
+    assert result["weather_calls"] == 1, "weather requests were not coalesced"
+
+
+if __name__ == "__main__":
+    main()
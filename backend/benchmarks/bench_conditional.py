@@ -0,0 +1,113 @@
+"""
+Benchmark conditional GETs and response compression
+
+Serves /weather from a warm cache entry through the Flask test client
+and compares full 200 responses with 304s for a matching If-None-Match.
+Then reports body size and compression time for a year of daily history
+points and for an NDJSON batch of 100 results.
+
+Usage:
+    python -m backend.benchmarks.bench_conditional [--requests 3000]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from flask import Flask
+
+from backend.app.models.observation import Observation
+from backend.app.routes.weather_routes import weather_bp
+from backend.app.utils import compression
+from backend.benchmarks.bench_observations import percentile
+
+LAGOS = {"lat": 6.45, "lon": 3.39, "display_name": "Lagos"}
+
+
+def weather_observation() -> Observation:
+    now = time.time()
+    observation = Observation.from_provider({
+        "dt": int(now) - 60,
+        "main": {"temp": 303.25, "feels_like": 307.35, "humidity": 79},
+        "weather": [{"id": 802, "description": "scattered clouds"}],
+        "wind": {"speed": 3.6},
+        "name": "Lagos",
+        "sys": {"country": "NG"}
+    })
+    observation.fresh_until = now + 540
+    return observation
+
+
+def history_payload(days: int = 365) -> dict:
+    start = datetime(2024, 1, 1)
+    points = []
+    for day in range(days):
+        temperature = 27 + random.uniform(-3, 3)
+        points.append({
+            "time": (start + timedelta(days=day)).isoformat() + "Z",
+            "count": 144,
+            "temperature": {"min": round(temperature - 4, 2), "max": round(temperature + 4, 2),
+                            "mean": round(temperature, 2)},
+            "humidity": {"min": 60, "max": 95, "mean": round(random.uniform(70, 90), 2)}
+        })
+    return {"data": {"city": "lagos", "resolution": "day", "source": "day", "points": points},
+            "status": "success"}
+
+
+def measure(client, headers: dict, requests: int) -> tuple:
+    samples, size = [], 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get("/weather?city=Lagos", headers=headers)
+        samples.append(time.perf_counter() - started)
+        size = len(response.data)
+    return samples, size, response.status_code
+
+
+def size_and_time(body: bytes, encoding: str, repeat: int = 20) -> dict:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        compressed = compression.compress(body, encoding)
+    return {"bytes": len(compressed), "ms": round((time.perf_counter() - started) / repeat * 1e3, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.register_blueprint(weather_bp)
+    client = app.test_client()
+    observation = weather_observation()
+    results = {}
+
+    with patch("backend.app.routes.weather_routes.LocationService.get_coordinates", return_value=LAGOS), \
+            patch("backend.app.routes.weather_routes.WeatherService.get_observation_with_status",
+                  return_value=(observation, "HIT")), \
+            patch("backend.app.routes.weather_routes.PrewarmService.record"):
+        etag = client.get("/weather?city=Lagos").headers["ETag"]
+        for name, headers in (("full", {}), ("not_modified", {"If-None-Match": etag})):
+            measure(client, headers, min(300, args.requests))  # Warm up
+            samples, size, status = measure(client, headers, args.requests)
+            results[name] = {"status": status, "body_bytes": size,
+                             "p50_us": round(percentile(samples, 0.5) * 1e6, 1)}
+
+    history = json.dumps(history_payload()).encode()
+    batch = b"".join((json.dumps({
+        "query": f"city-{i}", "status": "success", "cache": "HIT",
+        "data": dict(observation.render(), temperature=f"{random.uniform(-10, 40):.2f}°C", city_name=f"City {i}")
+    }) + "\n").encode() for i in range(100))
+    for name, body in (("history_365d", history), ("batch_100", batch)):
+        results[name] = {"identity_bytes": len(body)}
+        for encoding in compression.supported_encodings():
+            results[name][encoding] = size_and_time(body, encoding)
+    streamed = b"".join(compression.compress_stream(iter(batch.splitlines(keepends=True)), "gzip"))
+    results["batch_100"]["gzip_streamed_bytes"] = len(streamed)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
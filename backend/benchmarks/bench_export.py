@@ -0,0 +1,153 @@
+"""
+Benchmark streaming observation export
+
+Exports --rows observations of one city in each format and reports
+throughput, peak RSS growth and CPU utilisation (CPU time / wall time;
+near 1.0 means the encoder, not the database or the output, is the
+bottleneck). Each run is a fresh process, since peak RSS only grows. A
+buffered export (the whole result built in memory before sending) at
+--buffered-rows shows what streaming avoids.
+
+By default documents come from a generator behaving like a Mongo cursor,
+because mongomock keeps every document in memory and would hide the
+export's own footprint. Pass --mongo-uri to seed and read a real server.
+
+Usage:
+    python -m backend.benchmarks.bench_export [--rows 10000000] [--formats csv,ndjson,parquet]
+    python -m backend.benchmarks.bench_export --mongo-uri mongodb://localhost:27017 --output-dir /tmp/export
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import resource
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+START = datetime(2024, 1, 1)
+
+
+class GeneratedCursor:
+    """Yields synthetic observations one at a time, like a server-side cursor"""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+
+    def sort(self, *args):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        rng = random.Random(42)
+        for i in range(self.rows):
+            yield {"city": "lagos", "timestamp": START + timedelta(seconds=60 * i),
+                   "temperature": round(rng.uniform(20, 35), 2), "feels_like": round(rng.uniform(20, 38), 2),
+                   "humidity": rng.randint(40, 100), "pressure": rng.randint(1000, 1020),
+                   "wind_speed": round(rng.uniform(0, 12), 2), "condition": "scattered clouds",
+                   "lat": 6.45, "lon": 3.39, "country": "NG"}
+
+
+class GeneratedCollection:
+    def __init__(self, rows: int):
+        self.rows = rows
+
+    def find(self, *args, **kwargs):
+        return GeneratedCursor(self.rows)
+
+
+def seed(mongo_uri: str, rows: int) -> None:
+    from backend.app.models.weather import Weather
+    from backend.benchmarks.bench_observations import connect
+    connect(mongo_uri)
+    collection = Weather.collection()
+    batch = []
+    for document in GeneratedCursor(rows):
+        batch.append(document)
+        if len(batch) == 10000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+
+def export(fmt: str, rows: int, buffered: bool, mongo_uri: str, output_dir: str, results) -> None:
+    from backend.app.database import database
+    from backend.app.models.weather import Weather
+    from backend.app.services.download_service import DownloadService
+
+    if mongo_uri:
+        from pymongo import MongoClient
+        database.client = MongoClient(mongo_uri)
+        database.db = database.client["MeteorCloudBench"]
+        Weather._collection_ready = True
+        source = contextlib.nullcontext()
+    else:
+        source = patch.object(Weather, "collection", return_value=GeneratedCollection(rows))
+
+    path = os.path.join(output_dir, f"export.{fmt}") if output_dir else os.devnull
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started, cpu_started = time.perf_counter(), time.process_time()
+    written = 0
+    with source, open(path, "wb") as f:
+        chunks = DownloadService.stream("lagos", START, START + timedelta(seconds=60 * rows), fmt)
+        if buffered:
+            chunks = [b"".join(list(chunks))]
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+
+    results.put({
+        "format": fmt,
+        "mode": "buffered" if buffered else "streaming",
+        "rows": rows,
+        "mb": round(written / 1e6, 1),
+        "seconds": round(elapsed, 1),
+        "rows_per_s": round(rows / elapsed),
+        "mb_per_s": round(written / 1e6 / elapsed, 1),
+        "peak_rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb) / 1024, 1),
+        "cpu_utilisation": round(cpu / elapsed, 2),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--buffered-rows", type=int, default=1000000, help="0 to skip the buffered runs")
+    parser.add_argument("--formats", default="csv,ndjson,parquet")
+    parser.add_argument("--mongo-uri", default="")
+    parser.add_argument("--output-dir", default="", help="write files here instead of /dev/null")
+    args = parser.parse_args()
+
+    from backend.app.services.download_service import DownloadService
+    formats = [fmt for fmt in args.formats.split(",") if fmt in DownloadService.formats()]
+
+    runs = [(fmt, args.rows, False) for fmt in formats]
+    if args.buffered_rows:
+        runs += [(fmt, args.buffered_rows, buffered) for fmt in formats for buffered in (False, True)]
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    seeded = None
+    report = []
+    for fmt, rows, buffered in runs:
+        if args.mongo_uri and seeded != rows:
+            seed(args.mongo_uri, rows)
+            seeded = rows
+        process = ctx.Process(target=export, args=(fmt, rows, buffered, args.mongo_uri, args.output_dir, results))
+        process.start()
+        report.append(results.get())
+        process.join()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the offline geocoding index on a synthetic GeoNames dump
+
+Reports build time, file size, open time, exact and prefix lookup latency
+and the resident memory added by opening and querying the index.
+
+Usage:
+    python -m backend.benchmarks.bench_geo_index [--places 200000] [--lookups 20000]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import tempfile
+import time
+
+from backend.app.utils.geo_index import GeoIndex, build_index, read_geonames
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def write_dump(path: str, places: int, rng: random.Random) -> list:
+    names = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(places):
+            name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))).title()
+            names.append(name)
+            row = [str(i), name, name, "", f"{rng.uniform(-90, 90):.5f}", f"{rng.uniform(-180, 180):.5f}",
+                   "P", "PPL", rng.choice(["NG", "GB", "US", "IN", "BR"])] + [""] * 5 + [str(rng.randint(0, 10 ** 7))]
+            f.write("\t".join(row) + "\n")
+    return names
+
+
+def percentile(samples: list, fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "places.txt")
+        path = os.path.join(directory, "geo_index.bin")
+        names = write_dump(source, args.places, rng)
+
+        started = time.perf_counter()
+        build_index(read_geonames(source), path)
+        build_s = time.perf_counter() - started
+
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        index = GeoIndex(path)
+        open_ms = (time.perf_counter() - started) * 1000
+
+        exact = []
+        for name in rng.sample(names, min(args.lookups, len(names))):
+            started = time.perf_counter()
+            index.lookup(name)
+            exact.append((time.perf_counter() - started) * 1e6)
+
+        prefix = []
+        for name in rng.sample(names, min(args.lookups // 10, len(names))):
+            started = time.perf_counter()
+            index.search_prefix(name[:3])
+            prefix.append((time.perf_counter() - started) * 1e6)
+
+        result = {
+            "places": args.places,
+            "build_s": round(build_s, 2),
+            "file_mb": round(os.path.getsize(path) / 2 ** 20, 1),
+            "open_ms": round(open_ms, 3),
+            "exact_p50_us": round(percentile(exact, 0.5), 1),
+            "exact_p99_us": round(percentile(exact, 0.99), 1),
+            "prefix3_p50_us": round(percentile(prefix, 0.5), 1),
+            "prefix3_p99_us": round(percentile(prefix, 0.99), 1),
+            "rss_added_mb": round((rss_bytes() - rss_before) / 2 ** 20, 1),
+        }
+        index.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark hedged weather requests against providers with latency spikes
+
+Serves OpenWeatherMap and Open-Meteo stand-ins from two local stub
+processes, each answering in --latency seconds except for --spike-rate
+of requests that take --spike seconds longer, independently. Fetches
+--requests observations through ProviderPool, from --concurrency
+threads (HttpClient) and then as many coroutines (AsyncHttpClient), with
+hedging off (failover only) and on, and reports latency percentiles,
+how often a hedge was sent and the extra upstream requests it cost.
+
+Usage:
+    python -m backend.benchmarks.bench_hedging [--requests 2000] [--concurrency 16]
+        [--latency 0.03] [--spike 0.5] [--spike-rate 0.03]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from backend.app.config import config
+from backend.app.services.weather_providers import OpenMeteoProvider, OpenWeatherMapProvider, ProviderPool
+from backend.app.utils.async_http_client import AsyncHttpClient
+from backend.app.utils.http_client import HttpClient
+from backend.benchmarks.bench_observations import percentile
+from backend.benchmarks.loadgen import free_port, wait_for_port
+from backend.benchmarks.stubs import serve_stub, stub_stats
+
+
+def make_pool(ports: dict) -> ProviderPool:
+    openweathermap, openmeteo = OpenWeatherMapProvider(), OpenMeteoProvider()
+    openweathermap.url = f"http://127.0.0.1:{ports['openweathermap']}/data/2.5/weather"
+    openmeteo.url = f"http://127.0.0.1:{ports['openmeteo']}/v1/forecast"
+    return ProviderPool([openweathermap, openmeteo])
+
+
+def locations(count: int) -> list:
+    return [(random.uniform(-60, 60), random.uniform(-180, 180)) for _ in range(count)]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    return {"p50_ms": round(percentile(samples, 0.5) * 1000, 1),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+            "max_ms": round(max(samples) * 1000, 1),
+            "req_per_s": round(len(samples) / elapsed)}
+
+
+def run_threads(pool: ProviderPool, count: int, concurrency: int) -> tuple:
+    client = HttpClient(pool_maxsize=concurrency * 2, max_retries=0)
+
+    def fetch(location):
+        started = time.perf_counter()
+        pool.fetch(client, *location)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(fetch, locations(min(200, count))))  # Warm up and measure the providers
+        started = time.perf_counter()
+        samples = list(executor.map(fetch, locations(count)))
+    return samples, time.perf_counter() - started
+
+
+async def run_async(pool: ProviderPool, count: int, concurrency: int) -> tuple:
+    client = AsyncHttpClient(shards=1, pool_maxsize=concurrency * 2, max_retries=0)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(location):
+        async with semaphore:
+            started = time.perf_counter()
+            await pool.fetch_async(client, *location)
+            return time.perf_counter() - started
+
+    await asyncio.gather(*(fetch(location) for location in locations(min(200, count))))
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(fetch(location) for location in locations(count)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    return samples, elapsed
+
+
+def upstream_requests(ports: dict) -> int:
+    return sum(stub_stats(port)["requests"] for port in ports.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--spike", type=float, default=0.5)
+    parser.add_argument("--spike-rate", type=float, default=0.03)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    ports = {"openweathermap": free_port(), "openmeteo": free_port()}
+    profile = {"spike_rate": args.spike_rate, "spike_latency": args.spike}
+    stubs = [ctx.Process(target=serve_stub, args=(port, args.latency, 0.0, 0.0, {name: profile}), daemon=True)
+             for name, port in ports.items()]
+    for stub in stubs:
+        stub.start()
+    for port in ports.values():
+        wait_for_port(port)
+
+    results = {}
+    try:
+        for mode in ("threads", "async"):
+            for hedging in (False, True):
+                pool = make_pool(ports)
+                before = upstream_requests(ports)
+                with patch.object(config, "WEATHER_HEDGE_ENABLED", hedging):
+                    if mode == "threads":
+                        samples, elapsed = run_threads(pool, args.requests, args.concurrency)
+                    else:
+                        samples, elapsed = asyncio.run(run_async(pool, args.requests, args.concurrency))
+                warmup = min(200, args.requests)
+                result = summarize(samples, elapsed)
+                result["upstream_per_request"] = round((upstream_requests(ports) - before) / (args.requests + warmup), 3)
+                result["providers"] = pool.stats()
+                results[f"{mode}_{'hedged' if hedging else 'single'}"] = result
+    finally:
+        for stub in stubs:
+            stub.terminate()
+            stub.join()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
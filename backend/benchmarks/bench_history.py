@@ -0,0 +1,119 @@
+"""
+Benchmark history queries served from rollups against a raw scan
+
+Loads a year of 10-minute observations for one city (plus noise cities),
+then compares a 1-year daily
+history query from the rollups with aggregating the raw observations.
+Runs against mongomock by default; pass --mongo-uri for a real server.
+
+Rollups are bulk-inserted in their final state unless --incremental is
+given, which replays every batch through WeatherRollup.apply as the app
+does (too slow for mongomock's unindexed upserts at a year of data).
+
+Usage:
+    python -m backend.benchmarks.bench_history [--days 365] [--cities 10] [--queries 20]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.app.database import database
+from backend.app.models.rollup import RESOLUTIONS, WeatherRollup
+from backend.app.models.weather import Weather
+from backend.app.services.history_service import HistoryService
+from backend.benchmarks.bench_observations import connect, percentile
+
+
+def first_day(days: int) -> datetime:
+    # Keep every observation inside the collection's TTL
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+
+
+def seed_rollups(observations: list) -> None:
+    for resolution, seconds in RESOLUTIONS.items():
+        WeatherRollup.collection(resolution).insert_many([
+            {"city": city, "bucket": bucket, **stats}
+            for (city, bucket), stats in WeatherRollup.aggregate(observations, seconds).items()
+        ])
+
+
+def load(days: int, cities: int, batch_size: int, incremental: bool) -> int:
+    rng = random.Random(42)
+    start = first_day(days)
+    collection = Weather.collection()
+    batch, loaded = [], []
+    for step in range(days * 144):
+        timestamp = start + timedelta(minutes=10 * step)
+        for city in range(cities):
+            batch.append({
+                "city": "uyo" if city == 0 else f"city-{city}",
+                "timestamp": timestamp,
+                "temperature": round(rng.uniform(20, 35), 2),
+                "humidity": rng.randint(40, 100),
+                "condition": "clear sky"
+            })
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            if incremental:
+                WeatherRollup.apply(batch)
+            loaded.extend(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        if incremental:
+            WeatherRollup.apply(batch)
+        loaded.extend(batch)
+    if not incremental:
+        seed_rollups(loaded)
+    return len(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-uri", default="")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--cities", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--incremental", action="store_true")
+    args = parser.parse_args()
+
+    connect(args.mongo_uri)
+    for resolution in RESOLUTIONS:
+        database.db.drop_collection(f"weather_rollup_{resolution}")
+    WeatherRollup._indexes_ready = False
+
+    started = time.perf_counter()
+    total = load(args.days, args.cities, args.batch_size, args.incremental)
+    load_s = time.perf_counter() - started
+
+    start = first_day(args.days)
+    end = start + timedelta(days=args.days)
+    rollup, raw = [], []
+    for _ in range(args.queries):
+        t0 = time.perf_counter()
+        history = HistoryService.get_history("Uyo", start, end, "day")
+        rollup.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        scanned = Weather.find_range("uyo", start, end)
+        WeatherRollup.aggregate(scanned, RESOLUTIONS["day"])
+        raw.append(time.perf_counter() - t0)
+
+    print(json.dumps({
+        "backend": "mongodb" if args.mongo_uri else "mongomock",
+        "observations": total,
+        "load_s": round(load_s, 1),
+        "points": len(history["points"]),
+        "raw_rows_scanned": len(scanned),
+        "rollup_p50_ms": round(percentile(rollup, 0.5) * 1000, 2),
+        "rollup_p99_ms": round(percentile(rollup, 0.99) * 1000, 2),
+        "raw_scan_p50_ms": round(percentile(raw, 0.5) * 1000, 2),
+        "raw_scan_p99_ms": round(percentile(raw, 0.99) * 1000, 2)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
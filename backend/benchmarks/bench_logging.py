@@ -0,0 +1,152 @@
+"""
+Benchmark the per-request cost of logging
+
+Serves a small Flask route that logs like the weather services do (an
+INFO line with a rendered observation and a DEBUG line with the raw
+provider payload) plus one access log line, through the Flask test
+client, with:
+
+- none: logging disabled, the floor
+- sync: the previous setup, basicConfig's StreamHandler writing text to a
+  file on the request thread, with eagerly formatted f-string messages
+- queue: configure_logging's pipeline, JSON written by a background
+  thread, lazy %-style arguments and the access log sampled at 10%
+- sync_slow_sink and queue_slow_sink: both writing to a sink that takes
+  --sink-ms per record, like a congested log shipper. Requests wait for
+  the sync handler; with the queue (--queue-size records) they do not,
+  and records that do not fit are dropped and counted
+
+The writer thread competes with requests for the GIL and, on a single
+core, for the CPU, so the queue's gain is largest when the sink is slow.
+
+Usage:
+    python -m backend.benchmarks.bench_logging [--requests 5000] [--sink-ms 2] [--queue-size 1000]
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from flask import Flask, request
+
+from backend.app.utils.structured_logging import (
+    access_logger, assign_request_ids, configure_logging, queue_full, sampled_out, stop_logging
+)
+from backend.benchmarks.bench_conditional import weather_observation
+from backend.benchmarks.bench_observations import percentile
+
+logger = logging.getLogger("backend.app.services.weather_service")
+
+
+class SlowFile:
+    """File whose writes take a fixed time"""
+
+    def __init__(self, path: str, delay: float):
+        self.file = open(path, "w")
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def make_app(observation, payload: dict, lazy: bool) -> Flask:
+    app = Flask(__name__)
+
+    @app.route("/weather")
+    def weather():
+        city = request.args["city"]
+        if lazy:
+            logger.debug("Provider response for %s: %s", city, payload)
+            logger.info("Weather for %s: %s", city, observation.render())
+        else:
+            logger.debug(f"Provider response for {city}: {payload}")
+            logger.info(f"Weather for {city}: {observation.render()}")
+        return {"status": "success"}
+
+    if lazy:
+        assign_request_ids(app)
+    else:
+        @app.after_request
+        def log_access(response):
+            access_logger.info(f"{request.method} {request.path} {response.status_code}")
+            return response
+
+    return app
+
+
+def measure(client, requests: int) -> dict:
+    for _ in range(min(300, requests)):  # Warm up
+        client.get("/weather?city=Lagos")
+    samples = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        begin = time.perf_counter()
+        client.get("/weather?city=Lagos")
+        samples.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+    return {"p50_us": round(percentile(samples, 0.5) * 1e6, 1),
+            "p99_us": round(percentile(samples, 0.99) * 1e6, 1),
+            "requests_per_s": round(requests / elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sink-ms", type=float, default=2)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    observation = weather_observation()
+    payload = {"coord": {"lat": 6.45, "lon": 3.39}, "main": {"temp": 303.25, "humidity": 79},
+               "weather": [{"id": 802, "description": "scattered clouds"}], "hourly": list(range(48))}
+    root = logging.getLogger()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "app.log")
+
+        logging.disable(logging.CRITICAL)
+        results["none"] = measure(make_app(observation, payload, lazy=False).test_client(), args.requests)
+        logging.disable(logging.NOTSET)
+
+        root.setLevel(logging.INFO)
+        for name, stream in (("sync", open(path, "w")),
+                             ("sync_slow_sink", SlowFile(path, args.sink_ms / 1000))):
+            handler = logging.StreamHandler(stream)
+            handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+            root.addHandler(handler)
+            results[name] = measure(make_app(observation, payload, lazy=False).test_client(), args.requests)
+            root.removeHandler(handler)
+            stream.close()
+
+        for name, stream, size in (("queue", open(path, "w"), 10000),
+                                   ("queue_slow_sink", SlowFile(path, args.sink_ms / 1000), args.queue_size)):
+            dropped, sampled = queue_full.value, sampled_out.value
+            with patch("backend.app.utils.structured_logging.config.LOG_FORMAT", "json"), \
+                    patch("backend.app.utils.structured_logging.config.LOG_LEVEL", "INFO"), \
+                    patch("backend.app.utils.structured_logging.config.LOG_QUEUE_SIZE", size), \
+                    patch("backend.app.utils.structured_logging.config.LOG_SAMPLING", "meteorcloud.access=0.1"):
+                configure_logging(stream)
+            results[name] = measure(make_app(observation, payload, lazy=True).test_client(), args.requests)
+            results[name]["queue_full"] = queue_full.value - dropped
+            results[name]["sampled_out"] = sampled_out.value - sampled
+            stop_logging()
+            stream.close()
+
+    for name in ("sync", "sync_slow_sink", "queue", "queue_slow_sink"):
+        results[name]["overhead_us"] = round(results[name]["p50_us"] - results["none"]["p50_us"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
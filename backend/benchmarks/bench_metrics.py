@@ -0,0 +1,118 @@
+"""
+Benchmark the cost of metrics collection
+
+Times the primitives (histogram observe, counter inc, label lookup) and
+the per-request overhead of the Flask hooks and the ASGI middleware.
+Instrumented and plain apps are measured in alternating rounds so that
+drift on a noisy machine affects both equally.
+
+Usage:
+    python -m backend.benchmarks.bench_metrics [--requests 5000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from flask import Flask, jsonify
+
+from backend.app.utils.metrics import REQUEST_DURATION, CACHE_LOOKUPS
+from backend.app.utils.request_metrics import MetricsMiddleware, instrument_flask
+from backend.benchmarks.bench_observations import percentile
+
+
+def per_call_ns(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def create_app(instrumented: bool) -> Flask:
+    app = Flask(__name__)
+
+    @app.route("/weather/<city>")
+    def weather(city):
+        return jsonify({"city": city})
+
+    if instrumented:
+        instrument_flask(app)
+    return app
+
+
+async def asgi_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def measure_flask(client, requests: int) -> list:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get("/weather/lagos")
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure_asgi(app, requests: int) -> list:
+    route = type("Route", (), {"path": "/weather/{city}"})()
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run():
+        samples = []
+        for _ in range(requests):
+            scope = {"type": "http", "method": "GET", "route": route}
+            started = time.perf_counter()
+            await app(scope, receive, send)
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    return asyncio.run(run())
+
+
+def overhead(measure, plain, instrumented, requests: int, rounds: int) -> dict:
+    samples = {"plain": [], "instrumented": []}
+    measure(plain, min(500, requests))  # Warm up
+    measure(instrumented, min(500, requests))
+    for _ in range(rounds):
+        samples["plain"] += measure(plain, requests // rounds)
+        samples["instrumented"] += measure(instrumented, requests // rounds)
+    p50 = {name: percentile(values, 0.5) * 1e6 for name, values in samples.items()}
+    return {
+        "plain_p50_us": round(p50["plain"], 2),
+        "instrumented_p50_us": round(p50["instrumented"], 2),
+        "overhead_p50_us": round(p50["instrumented"] - p50["plain"], 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    child = REQUEST_DURATION.labels("/bench", "GET", "200")
+    counter = CACHE_LOOKUPS.labels("bench", "local_hit")
+    results = {
+        "observe_ns": round(per_call_ns(lambda: child.observe(0.0042), args.calls)),
+        "inc_ns": round(per_call_ns(counter.inc, args.calls)),
+        "labels_ns": round(per_call_ns(lambda: REQUEST_DURATION.labels("/bench", "GET", "200"), args.calls)),
+        "flask": overhead(
+            measure_flask,
+            create_app(False).test_client(),
+            create_app(True).test_client(),
+            args.requests, args.rounds
+        ),
+        "asgi": overhead(measure_asgi, asgi_app, MetricsMiddleware(asgi_app), args.requests, args.rounds)
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark observation ingest and per-city queries
+
+Reports bulk ingest throughput through the BulkWriter and latency of the
+latest-observation and range queries. Runs against mongomock by default;
+pass --mongo-uri to measure a real server (time-series collections need
+MongoDB 5.0+), where 10M observations is a reasonable run.
+
+Usage:
+    python -m backend.benchmarks.bench_observations [--observations 100000] [--cities 1000]
+    python -m backend.benchmarks.bench_observations --mongo-uri mongodb://localhost:27017 --observations 10000000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.app.database import database
+from backend.app.models.weather import COLLECTION, Weather
+from backend.app.utils.bulk_writer import BulkWriter
+
+
+def percentile(samples: list, fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def replay_bulk_write(collection, requests, ordered=True):
+    for request in requests:
+        collection.update_one(request._filter, request._doc, upsert=request._upsert)
+
+
+def connect(mongo_uri: str):
+    if mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(mongo_uri)
+    else:
+        import mongomock
+        # mongomock cannot build bulk ops from current pymongo UpdateOne objects
+        mongomock.Collection.bulk_write = replay_bulk_write
+        client = mongomock.MongoClient()
+    database.client = client
+    database.db = client["MeteorCloudBench"]
+    database.db.drop_collection(COLLECTION)
+    Weather._collection_ready = False
+    if not mongo_uri:
+        # mongomock enforces TTL indexes by scanning every document on each write
+        Weather.ensure_collection()
+        database.get_collection(COLLECTION).drop_index("timestamp_1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-uri", default="")
+    parser.add_argument("--observations", type=int, default=100000)
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    connect(args.mongo_uri)
+    rng = random.Random(42)
+    cities = [f"city-{i}" for i in range(args.cities)]
+    # Keep every observation inside the collection's TTL
+    start = datetime.utcnow() - timedelta(minutes=10 * (args.observations // args.cities + 1))
+    writer = BulkWriter(Weather.collection, batch_size=args.batch_size, flush_interval=0.05,
+                        max_queue=args.observations + 1)
+
+    started = time.perf_counter()
+    for i in range(args.observations):
+        writer.add({
+            "city": cities[i % args.cities],
+            "timestamp": start + timedelta(minutes=10 * (i // args.cities)),
+            "temperature": rng.uniform(-20, 40),
+            "condition": "clear sky",
+            "humidity": rng.randint(0, 100)
+        })
+    enqueue_s = time.perf_counter() - started
+    # Let the writer thread drain the queue, as it would in the app
+    while writer.written + writer.dropped + writer.failed < args.observations:
+        time.sleep(0.001)
+    ingest_s = time.perf_counter() - started
+
+    latest, ranged = [], []
+    span = timedelta(minutes=10 * (args.observations // args.cities))
+    for _ in range(args.queries):
+        city = rng.choice(cities)
+        t0 = time.perf_counter()
+        Weather.find_latest(city)
+        latest.append(time.perf_counter() - t0)
+
+        lower = start + span * rng.random()
+        t0 = time.perf_counter()
+        Weather.find_range(city, lower, lower + timedelta(days=1))
+        ranged.append(time.perf_counter() - t0)
+
+    print(json.dumps({
+        "backend": "mongodb" if args.mongo_uri else "mongomock",
+        "observations": writer.written,
+        "enqueue_per_s": round(args.observations / enqueue_s),
+        "ingest_per_s": round(writer.written / ingest_s),
+        "latest_p50_ms": round(percentile(latest, 0.5) * 1000, 3),
+        "latest_p99_ms": round(percentile(latest, 0.99) * 1000, 3),
+        "range_p50_ms": round(percentile(ranged, 0.5) * 1000, 3),
+        "range_p99_ms": round(percentile(ranged, 0.99) * 1000, 3)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
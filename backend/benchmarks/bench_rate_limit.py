@@ -0,0 +1,108 @@
+"""
+Benchmark the per-request cost of inbound rate limiting
+
+Times RequestLimits.check for:
+
+- ip: one client well under its limit, the common case
+- ip_rejected: one client over its limit
+- token: a client identified by a valid bearer token
+- forged_token: an invalid token, verified and then keyed by address
+- many_clients: --clients addresses in turn, each synced with the store
+  on its first request in a window
+
+and the per-request overhead of the Flask wrapper and the ASGI
+middleware, measured against plain apps in alternating rounds. Counts
+are kept in the shared store: in-process unless REDIS_URL is set.
+
+Usage:
+    python -m backend.benchmarks.bench_rate_limit [--requests 5000] [--calls 100000] [--clients 10000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from flask import Flask, jsonify
+
+from backend.app.services.auth_service import AuthService
+from backend.app.utils.request_limits import RateLimitMiddleware, RequestLimits, limit_flask
+from backend.benchmarks.bench_metrics import asgi_app, measure_flask, overhead
+
+
+def per_call_us(fn, calls: int) -> float:
+    fn()  # Warm up
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def create_app(limits) -> Flask:
+    app = Flask(__name__)
+
+    @app.route("/weather/<city>")
+    def weather(city):
+        return jsonify({"city": city})
+
+    if limits is not None:
+        limit_flask(app, limits)
+    return app
+
+
+def measure_asgi(app, requests: int) -> list:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run():
+        samples = []
+        for _ in range(requests):
+            scope = {"type": "http", "method": "GET", "path": "/weather/lagos",
+                     "headers": [(b"host", b"localhost"), (b"accept", b"*/*")], "client": ("10.0.0.2", 50000)}
+            started = time.perf_counter()
+            await app(scope, receive, send)
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=10000)
+    args = parser.parse_args()
+
+    limits = RequestLimits([("/weather", 10 ** 9, 60), ("/login", 10, 60)])
+    token = "Bearer " + AuthService.issue_tokens("bench")["access_token"]
+    addresses = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.clients)]
+    turn = iter(range(10 ** 9))
+
+    results = {
+        "check_us": {
+            "ip": round(per_call_us(lambda: limits.check("/weather/lagos", "10.0.0.1", None), args.calls), 2),
+            "ip_rejected": round(per_call_us(lambda: limits.check("/login", "10.0.0.1", None), args.calls), 2),
+            "token": round(per_call_us(lambda: limits.check("/weather/lagos", "10.0.0.1", token), args.calls), 2),
+            "forged_token": round(per_call_us(
+                lambda: limits.check("/weather/lagos", "10.0.0.1", "Bearer a.b.c"), args.calls), 2),
+            "many_clients": round(per_call_us(
+                lambda: limits.check("/weather/lagos", addresses[next(turn) % args.clients], None),
+                args.calls), 2)
+        },
+        "flask": overhead(
+            measure_flask,
+            create_app(None).test_client(),
+            create_app(limits).test_client(),
+            args.requests, args.rounds
+        ),
+        "asgi": overhead(measure_asgi, asgi_app, RateLimitMiddleware(asgi_app, limits), args.requests, args.rounds)
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
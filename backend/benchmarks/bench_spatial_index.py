@@ -0,0 +1,115 @@
+"""
+Benchmark nearest-neighbour lookups over latitude/longitude points
+
+Indexes --points positions, mostly clustered around a few thousand
+synthetic towns with the rest spread uniformly, and reports:
+
+- PointIndex (reverse geocoding): build time, nearest-place and 25 km
+  radius query latency, compared with a brute-force NumPy scan
+- GridIndex (nearby cached observations): insert rate, 2 km radius
+  query latency and resident memory added
+- GeoIndex.nearest end to end over a geocoding index file, with
+  --geo-places records
+
+Usage:
+    python -m backend.benchmarks.bench_spatial_index [--points 1000000] [--queries 20000]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from backend.app.utils.geo_index import GeoIndex, build_index
+from backend.app.utils.spatial_index import GridIndex, PointIndex, haversine_km
+from backend.benchmarks.bench_geo_index import percentile, rss_bytes
+
+
+def positions(count: int, rng: np.random.Generator) -> tuple:
+    """Points within ~20 km of 5000 towns, plus 10% uniform over the globe"""
+    towns_lat = np.degrees(np.arcsin(rng.uniform(-0.9, 0.95, 5000)))
+    towns_lon = rng.uniform(-180, 180, 5000)
+    clustered = count - count // 10
+    town = rng.integers(0, 5000, clustered)
+    lat = np.concatenate([towns_lat[town] + rng.normal(0, 0.1, clustered),
+                          np.degrees(np.arcsin(rng.uniform(-1, 1, count // 10)))])
+    lon = np.concatenate([towns_lon[town] + rng.normal(0, 0.1, clustered), rng.uniform(-180, 180, count // 10)])
+    return np.clip(lat, -90, 90), (lon + 180) % 360 - 180
+
+
+def timed(queries, lookup) -> dict:
+    samples = []
+    for lat, lon in queries:
+        started = time.perf_counter()
+        lookup(lat, lon)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return {"p50_us": round(percentile(samples, 0.5), 1), "p99_us": round(percentile(samples, 0.99), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--geo-places", type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    lat, lon = positions(args.points, rng)
+    # Queries near indexed points, like users in towns
+    sample = rng.integers(0, args.points, args.queries)
+    queries = list(zip((lat[sample] + rng.normal(0, 0.05, args.queries)).clip(-90, 90).tolist(),
+                       (lon[sample] + rng.normal(0, 0.05, args.queries)).tolist()))
+    results = {"points": args.points}
+
+    started = time.perf_counter()
+    points = PointIndex(lat, lon)
+    build_s = time.perf_counter() - started
+    results["point_index"] = {
+        "build_s": round(build_s, 2),
+        "nearest": timed(queries, points.nearest),
+        "within_25km": timed(queries, lambda a, b: points.within(a, b, 25)),
+        "brute_force_nearest": timed(queries[:200], lambda a, b: np.argmin(haversine_km(a, b, lat, lon)))
+    }
+    for a, b in queries[:200]:
+        assert points.nearest(a, b)[0][0] == int(np.argmin(haversine_km(a, b, lat, lon)))
+    del points
+
+    rss_before = rss_bytes()
+    grid = GridIndex(cell_size=2 / 111.19, maxsize=args.points)
+    keys = [f"{a:.4f}:{b:.4f}" for a, b in zip(lat.tolist(), lon.tolist())]
+    started = time.perf_counter()
+    for key, a, b in zip(keys, lat.tolist(), lon.tolist()):
+        grid.add(key, a, b)
+    insert_s = time.perf_counter() - started
+    results["grid_index"] = {
+        "inserts_per_s": round(args.points / insert_s),
+        "within_2km": timed(queries, lambda a, b: grid.within(a, b, 2)),
+        "rss_mb": round((rss_bytes() - rss_before) / 2 ** 20, 1)
+    }
+    del grid, keys
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "geo_index.bin")
+        geo_lat, geo_lon = positions(args.geo_places, rng)
+        build_index(((f"place{i}", f"Place {i}, ST", a, b, random.randint(0, 10 ** 6))
+                     for i, (a, b) in enumerate(zip(geo_lat.tolist(), geo_lon.tolist()))), path)
+        index = GeoIndex(path)
+        started = time.perf_counter()
+        index.nearest(0.0, 0.0)
+        first_s = time.perf_counter() - started
+        results["geo_index"] = {
+            "places": args.geo_places,
+            "first_query_s": round(first_s, 2),
+            "nearest": timed(queries, index.nearest),
+            "nearest_25km": timed(queries, lambda a, b: index.nearest(a, b, radius_km=25))
+        }
+        index.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark cold start of the Flask app
+
+Starts a fresh interpreter per run and times importing backend.app.main
+and calling create_app(), reporting medians. Run from the repository
+root, or point --root at another checkout to compare revisions.
+
+Usage:
+    python -m backend.benchmarks.bench_startup [--runs 21] [--root .]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from backend.app.main import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "create_app_ms": (done - imported) * 1000,
+                  "total_ms": (done - started) * 1000, "pymongo_loaded": "pymongo" in sys.modules}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=21)
+    parser.add_argument("--root", default=".")
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], cwd=args.root, capture_output=True,
+                                text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(json.dumps({
+        "runs": args.runs,
+        **{name: round(statistics.median(sample[name] for sample in samples), 1)
+           for name in ("import_ms", "create_app_ms", "total_ms")},
+        "pymongo_loaded": samples[-1]["pymongo_loaded"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
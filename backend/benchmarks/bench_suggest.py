@@ -0,0 +1,78 @@
+"""
+Benchmark city autocomplete latency on a large prefix index
+
+Measures the cold (first query for a prefix) and warm latency of
+PrefixIndex.suggest, and the cost of incremental updates.
+
+Usage:
+    python -m backend.benchmarks.bench_suggest [--entries 100000] [--queries 50000]
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from backend.app.utils.prefix_index import PrefixIndex
+
+
+def percentile(samples: list, fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def timed_us(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - started) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    names = list({
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+        for _ in range(args.entries)
+    })
+
+    index = PrefixIndex()
+    started = time.perf_counter()
+    for name in names:
+        index.add(name, {"name": name.title()}, score=rng.paretovariate(1.2))
+    build_s = time.perf_counter() - started
+
+    # Typing simulation: prefixes of length 1-5 of popular-ish names
+    queries = [rng.choice(names)[:rng.randint(1, 5)] for _ in range(args.queries)]
+    cold, warm = {}, []
+    for prefix in queries:
+        elapsed = timed_us(index.suggest, prefix, 10)
+        if prefix in cold:
+            warm.append(elapsed)
+        else:
+            cold[prefix] = elapsed
+    cold = list(cold.values())
+    overall = cold + warm
+
+    updates = [timed_us(index.add, rng.choice(names), {"name": "x"}, 1.0) for _ in range(10000)]
+    after_update = [timed_us(index.suggest, rng.choice(names)[:rng.randint(1, 5)], 10) for _ in range(10000)]
+
+    print(json.dumps({
+        "entries": len(index),
+        "build_s": round(build_s, 2),
+        "queries": len(overall),
+        "p50_us": round(percentile(overall, 0.5), 1),
+        "p99_us": round(percentile(overall, 0.99), 1),
+        "cold_p99_us": round(percentile(cold, 0.99), 1),
+        "cold_max_us": round(max(cold), 1),
+        "warm_p99_us": round(percentile(warm, 0.99), 1),
+        "update_p99_us": round(percentile(updates, 0.99), 1),
+        "query_after_updates_p99_us": round(percentile(after_update, 0.99), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
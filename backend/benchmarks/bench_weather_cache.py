@@ -0,0 +1,98 @@
+"""
+Benchmark the canonical weather cache
+
+Replays a workload of /weather lookups whose units and lang vary per
+request against two caches: one entry per (location, units, lang) as the
+cache used to be keyed, and one canonical observation per location that is
+rendered on every hit. Reports upstream fetches, local-tier memory and
+shared-tier bytes per location, and the cost of rendering a hit.
+
+Usage:
+    python -m backend.benchmarks.bench_weather_cache [--locations 5000] [--requests 200000]
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from backend.app.models.observation import Observation
+from backend.app.utils.localization import LANGUAGES
+
+UNITS = ("metric", "imperial", "standard")
+
+
+def observation(i: int) -> Observation:
+    return Observation.from_provider({
+        "dt": 1700000000 + i,
+        "main": {"temp": 280 + i % 30 + 0.15, "feels_like": 279 + i % 30 + 0.35, "humidity": 40 + i % 50,
+                 "pressure": 1000 + i % 30},
+        "weather": [{"id": (500, 800, 802)[i % 3], "description": ""}],
+        "wind": {"speed": round(i % 15 * 0.7, 2)},
+        "name": f"City {i}",
+        "sys": {"country": "ST"}
+    })
+
+
+def variant_entry(i: int, units: str, lang: str) -> dict:
+    """A cache entry as stored per units/lang before the canonical cache"""
+    return {"data": observation(i).render(units, lang), "observed_at": 1700000000 + i,
+            "fresh_until": time.time() + 600, "etag": f'"{i:016x}{units}{lang}"'}
+
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    entries = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return entries, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Most requests want metric English, the rest are spread over the other variants
+    weights = [20 if (units, lang) == ("metric", "en") else 1 for units in UNITS for lang in LANGUAGES]
+    variants = rng.choices([(units, lang) for units in UNITS for lang in LANGUAGES], weights, k=args.requests)
+    workload = [(rng.randrange(args.locations), units, lang) for units, lang in variants]
+
+    seen_variants = set((i, units, lang) for i, units, lang in workload)
+    seen_locations = set(i for i, _, _ in workload)
+
+    variant_cache, variant_bytes = measure(
+        lambda: {key: variant_entry(*key) for key in seen_variants})
+    canonical_cache, canonical_bytes = measure(
+        lambda: {i: observation(i) for i in seen_locations})
+
+    start = time.perf_counter()
+    for i, units, lang in workload:
+        variant_cache[(i, units, lang)]["data"]
+    lookup = time.perf_counter() - start
+    start = time.perf_counter()
+    for i, units, lang in workload:
+        canonical_cache[i].render(units, lang)
+    render = time.perf_counter() - start
+
+    shared_variant = sum(len(json.dumps(entry)) for entry in variant_cache.values())
+    shared_canonical = sum(len(json.dumps(entry.to_list())) for entry in canonical_cache.values())
+
+    print(json.dumps({
+        "requests": args.requests,
+        "locations": len(seen_locations),
+        "upstream_fetches": {"per_variant": len(seen_variants), "canonical": len(seen_locations)},
+        "local_bytes_per_location": {"per_variant": round(variant_bytes / len(seen_locations)),
+                                     "canonical": round(canonical_bytes / len(seen_locations))},
+        "shared_bytes_per_location": {"per_variant": round(shared_variant / len(seen_locations)),
+                                      "canonical": round(shared_canonical / len(seen_locations))},
+        "hit_us": {"per_variant": round(lookup / args.requests * 1e6, 2),
+                   "canonical_render": round(render / args.requests * 1e6, 2)}
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
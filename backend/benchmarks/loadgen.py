@@ -0,0 +1,129 @@
+"""
+Servers and a load generator shared by the end-to-end benchmarks
+
+Servers run in spawned processes so each one imports the app with the
+environment (stub URLs, pool sizes) set by the benchmark.
+"""
+import asyncio
+import socket
+import time
+from collections import Counter
+from typing import Dict, List
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def use_database(mongo_uri: str) -> None:
+    """Point the app at mongod, or at an in-memory mongomock when mongo_uri is empty"""
+    from backend.benchmarks.bench_observations import connect
+    connect(mongo_uri)
+
+
+def serve_flask(port: int, mongo_uri: str = None) -> None:
+    import logging
+    from werkzeug.serving import make_server
+    from backend.app.main import create_app
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # Otherwise one access log line per request
+    if mongo_uri is not None:
+        use_database(mongo_uri)
+    make_server("127.0.0.1", port, create_app(), threaded=True).serve_forever()
+
+
+def serve_asgi(port: int, mongo_uri: str = None) -> None:
+    import uvicorn
+    from backend.app.asgi import create_asgi_app
+    if mongo_uri is not None:
+        use_database(mongo_uri)
+    uvicorn.run(create_asgi_app(), host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+# Servers the benchmarks can drive, by name
+SERVERS = {"flask": serve_flask, "asgi": serve_asgi}
+
+
+async def _get(conn, host: str, path: str):
+    """Send one GET over a raw keep-alive connection, reconnecting when the server closes it"""
+    port = int(host.rsplit(":", 1)[1])
+    if conn is None:
+        conn = await asyncio.open_connection("127.0.0.1", port)
+    reader, writer = conn
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").lower()
+    status = int(head.split(" ", 2)[1])
+    length = int(head.split("content-length:", 1)[1].split("\r\n", 1)[0])
+    await reader.readexactly(length)
+    if head.startswith("http/1.0") or "connection: close" in head:
+        writer.close()
+        conn = None
+    return conn, status
+
+
+async def drive(host: str, paths: List[str], concurrency: int) -> Dict:
+    """
+    Request every path with at most concurrency requests in flight
+
+    Uses bare asyncio streams rather than an HTTP library so the load
+    generator, which shares the machine with the servers, stays cheap.
+
+    Returns:
+        Dict: Per-request latencies in seconds, status counts (0 for a
+        connection error) and the elapsed wall time
+    """
+    latencies, statuses = [], Counter()
+    queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+
+    async def worker():
+        conn = None
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                conn, status = await _get(conn, host, path)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                status, conn = 0, None
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+        if conn is not None:
+            conn[1].close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"latencies": latencies, "statuses": statuses, "elapsed": time.perf_counter() - started}
+
+
+def summarize(run: Dict) -> Dict:
+    """Throughput and latency percentiles of a drive() run"""
+    latencies = sorted(run["latencies"])
+    total = len(latencies)
+
+    def percentile(fraction: float) -> float:
+        return round(latencies[min(int(total * fraction), total - 1)] * 1000, 1)
+
+    return {
+        "requests": total,
+        "failures": total - run["statuses"].get(200, 0),
+        "statuses": {str(status): count for status, count in sorted(run["statuses"].items())},
+        "req_per_s": round(total / run["elapsed"], 1),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
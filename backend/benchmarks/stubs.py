@@ -0,0 +1,156 @@
+"""
+Local stand-ins for Nominatim, OpenWeatherMap and Open-Meteo
+
+The stub is a plain ASGI app served by uvicorn, so a single process can
+emulate slow providers for thousands of concurrent connections.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+from urllib.request import urlopen
+
+
+def _coordinates(name: str):
+    """Stable pseudo-random coordinates for a place name"""
+    digest = hashlib.sha1(name.encode()).digest()
+    lat = int.from_bytes(digest[:4], "big") / 2 ** 32 * 140 - 70
+    lon = int.from_bytes(digest[4:8], "big") / 2 ** 32 * 360 - 180
+    return round(lat, 4), round(lon, 4)
+
+
+def nominatim_response(query: dict) -> list:
+    name = query.get("q", [""])[0]
+    lat, lon = _coordinates(name.lower())
+    return [{"lat": str(lat), "lon": str(lon), "display_name": f"{name}, Stubland"}]
+
+
+def openweather_response(query: dict) -> dict:
+    lat = float(query.get("lat", ["0"])[0])
+    lon = float(query.get("lon", ["0"])[0])
+    return {
+        "coord": {"lat": lat, "lon": lon},
+        "dt": int(time.time()),
+        "main": {"temp": 294.65, "feels_like": 295.25, "humidity": 64, "pressure": 1012},
+        "weather": [{"id": 802, "description": "scattered clouds"}],
+        "wind": {"speed": 3.6, "deg": 210},
+        "name": "Stubville",
+        "sys": {"country": "ST"}
+    }
+
+
+def openmeteo_response(query: dict) -> dict:
+    return {
+        "latitude": float(query.get("latitude", ["0"])[0]),
+        "longitude": float(query.get("longitude", ["0"])[0]),
+        "current": {
+            "time": int(time.time()),
+            "temperature_2m": 21.5,
+            "apparent_temperature": 22.1,
+            "relative_humidity_2m": 64,
+            "surface_pressure": 1012.0,
+            "wind_speed_10m": 3.6,
+            "weather_code": 2
+        }
+    }
+
+
+# Stubbed request paths and the provider each one emulates
+PROVIDERS = {"/search": "nominatim", "/data/2.5/weather": "openweathermap", "/v1/forecast": "openmeteo"}
+
+
+def create_stub_app(latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                    profiles: Optional[Dict[str, dict]] = None):
+    """
+    Build the stub ASGI app
+
+    Args:
+        latency (float): Seconds added to every response
+        jitter (float): Extra uniformly distributed latency in seconds
+        error_rate (float): Fraction of requests answered with a 503
+        profiles (Optional[Dict[str, dict]]): Per-provider overrides of
+            latency, jitter and error_rate, e.g. {"nominatim": {"latency": 0.3}}.
+            A profile can also add latency spikes: spike_rate of its
+            requests take spike_latency seconds longer
+
+    ``GET /stats`` returns request and error counts, in total and per provider.
+    """
+    defaults = {"latency": latency, "jitter": jitter, "error_rate": error_rate, "spike_rate": 0.0, "spike_latency": 0.0}
+    settings = {name: dict(defaults, **(profiles or {}).get(name, {})) for name in PROVIDERS.values()}
+    stats = {"requests": 0, "errors": 0,
+             "providers": {name: {"requests": 0, "errors": 0} for name in PROVIDERS.values()}}
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+
+        provider = PROVIDERS.get(scope["path"])
+        if scope["path"] == "/stats":
+            status, body = 200, stats
+        elif provider is None:
+            status, body = 404, {"message": "not found"}
+        else:
+            profile = settings[provider]
+            stats["requests"] += 1
+            stats["providers"][provider]["requests"] += 1
+            delay = profile["latency"] + random.uniform(0, profile["jitter"])
+            if random.random() < profile["spike_rate"]:
+                delay += profile["spike_latency"]
+            await asyncio.sleep(delay)
+            query = parse_qs(scope["query_string"].decode())
+            if random.random() < profile["error_rate"]:
+                stats["errors"] += 1
+                stats["providers"][provider]["errors"] += 1
+                status, body = 503, {"message": "service unavailable"}
+            elif provider == "nominatim":
+                status, body = 200, nominatim_response(query)
+            elif provider == "openmeteo":
+                status, body = 200, openmeteo_response(query)
+            else:
+                status, body = 200, openweather_response(query)
+
+        payload = json.dumps(body).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"),
+                        (b"content-length", str(len(payload)).encode())]
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    app.stats = stats
+    return app
+
+
+def serve_stub(port: int, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+               profiles: Optional[Dict[str, dict]] = None) -> None:
+    """Serve the stub on 127.0.0.1 (blocks, run it in a separate process)"""
+    import uvicorn
+    uvicorn.run(create_stub_app(latency, jitter, error_rate, profiles), host="127.0.0.1", port=port,
+                log_level="warning", access_log=False)
+
+
+def stub_stats(port: int) -> dict:
+    """Fetch the stub's request counters"""
+    with urlopen(f"http://127.0.0.1:{port}/stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def stub_environment(port: int) -> dict:
+    """Environment variables pointing the backend at a stub on port"""
+    base = f"http://127.0.0.1:{port}"
+    return {
+        "NOMINATIM_URL": f"{base}/search",
+        "OPENWEATHER_URL": f"{base}/data/2.5/weather",
+        "OPEN_METEO_URL": f"{base}/v1/forecast",
+        # The stub has no usage policy to respect
+        "NOMINATIM_RATE_LIMIT": "1000000",
+        "NOMINATIM_BURST": "1000000",
+    }
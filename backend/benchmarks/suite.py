@@ -0,0 +1,237 @@
+"""
+End-to-end benchmark of /api/v1/weather with regression checking
+
+Starts a stub Nominatim/OpenWeatherMap server with configurable latency
+and error profiles, then for each server under test (the Flask app, the
+ASGI app) starts a fresh process backed by mongomock or --mongo-uri and
+drives it with a concurrent load generator. City names are drawn from a
+seeded Zipf distribution, so repeated cities exercise the caches the way
+real traffic does and every run sends the same requests.
+
+Each server is run --repeat times from cold and the median run (by
+throughput) is reported as JSON with throughput, p50/p95/p99 latency and
+upstream calls per provider. With --baseline, the report is compared with
+an earlier one and the exit status is 1 if any metric regressed by more
+than --threshold.
+
+Usage:
+    python -m backend.benchmarks.suite [--servers flask,asgi] [--requests 2000]
+        [--output current.json] [--baseline main.json --threshold 0.1]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from backend.benchmarks.loadgen import SERVERS, drive, free_port, summarize, wait_for_port
+from backend.benchmarks.stubs import PROVIDERS, serve_stub, stub_environment, stub_stats
+
+# Parameters that change what is measured; reports are only comparable if they match
+WORKLOAD_KEYS = (
+    "requests", "concurrency", "cities", "zipf", "seed", "warmup", "mongo",
+    "nominatim_latency", "nominatim_error_rate", "openweather_latency", "openweather_error_rate", "jitter",
+)
+
+# Metrics checked against the baseline, and whether higher is better
+CHECKED_METRICS = {
+    "req_per_s": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "upstream_per_request": False,
+}
+
+
+def workload(requests: int, cities: int, zipf: float, seed: int) -> List[str]:
+    """Request paths with city popularity following a Zipf distribution (zipf=0 is uniform)"""
+    rng = random.Random(seed)
+    names = [f"city-{i}" for i in range(cities)]
+    weights = [1 / (rank + 1) ** zipf for rank in range(cities)]
+    return [f"/api/v1/weather?city={city}" for city in rng.choices(names, weights, k=requests)]
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return revision + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_server(ctx, name: str, args, stub_port: int, paths: List[str]) -> Dict:
+    """Start a cold server process, warm it up and drive the workload once"""
+    port = free_port()
+    server = ctx.Process(target=SERVERS[name], args=(port, args.mongo_uri), daemon=True)
+    server.start()
+    try:
+        wait_for_port(port)
+        host = f"127.0.0.1:{port}"
+        # Warm-up cities are disjoint from the workload so the caches start cold
+        warmup = [f"/api/v1/weather?city=warmup-{i}" for i in range(args.warmup)]
+        if warmup:
+            asyncio.run(drive(host, warmup, args.concurrency))
+
+        before = stub_stats(stub_port)
+        summary = summarize(asyncio.run(drive(host, paths, args.concurrency)))
+        after = stub_stats(stub_port)
+    finally:
+        server.terminate()
+        server.join()
+
+    upstream = {
+        provider: after["providers"][provider]["requests"] - before["providers"][provider]["requests"]
+        for provider in PROVIDERS.values()
+    }
+    upstream["errors"] = after["errors"] - before["errors"]
+    summary["upstream"] = upstream
+    summary["upstream_per_request"] = round(
+        sum(upstream[provider] for provider in PROVIDERS.values()) / summary["requests"], 3
+    )
+    return summary
+
+
+def run(args) -> Dict:
+    ctx = multiprocessing.get_context("spawn")
+    stub_port = free_port()
+    os.environ.update(stub_environment(stub_port))
+    os.environ.update({
+        "LOCK_DIR": tempfile.mkdtemp(prefix="meteorcloud-bench-"),
+        "HTTP_POOL_MAXSIZE": str(args.concurrency),
+        # Background refreshes would add upstream calls that depend on timing
+        "PREWARM_ENABLED": "False",
+    })
+
+    profiles = {
+        "nominatim": {"latency": args.nominatim_latency, "error_rate": args.nominatim_error_rate},
+        "openweathermap": {"latency": args.openweather_latency, "error_rate": args.openweather_error_rate},
+    }
+    stub = ctx.Process(target=serve_stub, args=(stub_port, 0.0, args.jitter, 0.0, profiles), daemon=True)
+    stub.start()
+    wait_for_port(stub_port)
+
+    paths = workload(args.requests, args.cities, args.zipf, args.seed)
+    results = {}
+    try:
+        for name in args.servers.split(","):
+            runs = [run_server(ctx, name, args, stub_port, paths) for _ in range(args.repeat)]
+            runs.sort(key=lambda summary: summary["req_per_s"])
+            results[name] = dict(runs[len(runs) // 2], runs_req_per_s=[run["req_per_s"] for run in runs])
+    finally:
+        stub.terminate()
+        stub.join()
+
+    params = {key: getattr(args, key) for key in WORKLOAD_KEYS if key != "mongo"}
+    params["mongo"] = "mongodb" if args.mongo_uri else "mongomock"
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "workload": params,
+        "results": results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Find metrics that regressed by more than threshold (a fraction)
+
+    Args:
+        report (Dict): Current report
+        baseline (Dict): Report to compare against
+        threshold (float): Tolerated relative change, e.g. 0.1 for 10%
+
+    Returns:
+        List[Dict]: One entry per regressed server metric
+
+    Raises:
+        ValueError: If the reports were produced with different workloads
+    """
+    if report["workload"] != baseline["workload"]:
+        changed = sorted(key for key in WORKLOAD_KEYS
+                         if report["workload"].get(key) != baseline["workload"].get(key))
+        raise ValueError(f"Workloads differ ({', '.join(changed)}), results are not comparable")
+
+    regressions = []
+    for server, current in report["results"].items():
+        previous = baseline["results"].get(server)
+        if previous is None:
+            continue
+        for metric, higher_is_better in CHECKED_METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append({"server": server, "metric": metric, "baseline": old,
+                                    "current": new, "change": round(change, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--servers", default=",".join(SERVERS), help=f"comma separated, from {sorted(SERVERS)}")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cities", type=int, default=500, help="distinct cities in the workload")
+    parser.add_argument("--zipf", type=float, default=1.0, help="popularity skew, 0 for uniform")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--warmup", type=int, default=100, help="requests before measuring")
+    parser.add_argument("--repeat", type=int, default=3, help="cold runs per server, median reported")
+    parser.add_argument("--mongo-uri", default="", help="mongod to use instead of mongomock")
+    parser.add_argument("--nominatim-latency", type=float, default=0.05)
+    parser.add_argument("--nominatim-error-rate", type=float, default=0.0)
+    parser.add_argument("--openweather-latency", type=float, default=0.05)
+    parser.add_argument("--openweather-error-rate", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform upstream latency")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="report to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated relative regression")
+    args = parser.parse_args()
+
+    unknown = set(args.servers.split(",")) - set(SERVERS)
+    if unknown:
+        parser.error(f"unknown servers: {', '.join(sorted(unknown))}")
+
+    started = time.monotonic()
+    report = run(args)
+    report["meta"]["duration_s"] = round(time.monotonic() - started, 1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            report["regressions"] = compare(report, baseline, args.threshold)
+        except ValueError as e:
+            print(json.dumps(report, indent=2))
+            print(f"error: {e}", file=sys.stderr)
+            sys.exit(2)
+        report["baseline_revision"] = baseline["meta"]["revision"]
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
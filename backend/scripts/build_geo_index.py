@@ -0,0 +1,32 @@
+"""
+Build the offline geocoding index from a GeoNames-style TSV dump
+
+Usage:
+    python -m backend.scripts.build_geo_index cities15000.txt geo_index.bin [--min-population 1000]
+
+Point GEO_INDEX_PATH at the output file to have LocationService use it.
+"""
+import argparse
+import time
+
+from backend.app.utils.geo_index import build_index, read_geonames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline geocoding index")
+    parser.add_argument("source", help="GeoNames TSV dump (e.g. cities15000.txt or allCountries.txt)")
+    parser.add_argument("output", help="Index file to write")
+    parser.add_argument("--min-population", type=int, default=0,
+                        help="Skip places with a smaller population")
+    parser.add_argument("--alternate-names", action="store_true",
+                        help="Also index the alternate names column")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    places = read_geonames(args.source, args.min_population, args.alternate_names)
+    count = build_index(places, args.output)
+    print(f"Indexed {count} names into {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
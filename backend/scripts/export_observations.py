@@ -0,0 +1,63 @@
+"""
+Export a city's stored observations to CSV, NDJSON or Parquet
+
+Usage:
+    python -m backend.scripts.export_observations Lagos lagos.csv --from 2024-01-01 [--to 2024-07-01]
+        [--format csv] [--partitions 4]
+
+The database is the one configured by MONGO_URI. With --partitions N the
+range is split into N equal parts exported in parallel, to lagos.part00.csv,
+lagos.part01.csv and so on. CSV and NDJSON parts concatenated in order hold
+the full range (only part 00 has the CSV header); Parquet parts are
+standalone files, to be read together as one dataset.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from backend.app.services.download_service import DownloadService
+from backend.app.utils.validators import parse_timestamp
+
+
+def export(city: str, start: datetime, end: datetime, fmt: str, path: str, header: bool = True) -> int:
+    """Stream one range to a file, returning the number of bytes written"""
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in DownloadService.stream(city, start, end, fmt, header):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored weather observations")
+    parser.add_argument("city")
+    parser.add_argument("output", help="File to write")
+    parser.add_argument("--from", dest="start", required=True, type=parse_timestamp, help="ISO 8601 start")
+    parser.add_argument("--to", dest="end", type=parse_timestamp, help="ISO 8601 end, defaults to now")
+    parser.add_argument("--format", choices=DownloadService.formats(),
+                        help="defaults to the output file's extension")
+    parser.add_argument("--partitions", type=int, default=1, help="parallel readers")
+    args = parser.parse_args()
+
+    root, extension = os.path.splitext(args.output)
+    fmt = args.format or extension.lstrip(".").lower()
+    if fmt not in DownloadService.formats():
+        parser.error(f"unknown format {fmt!r}, use --format")
+    try:
+        ranges = DownloadService.partitions(args.start, args.end or datetime.utcnow(), args.partitions)
+    except ValueError as e:
+        parser.error(str(e))
+
+    paths = [args.output] if len(ranges) == 1 else [f"{root}.part{i:02d}{extension}" for i in range(len(ranges))]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        sizes = list(executor.map(lambda i: export(args.city, *ranges[i], fmt, paths[i], header=i == 0),
+                                  range(len(ranges))))
+    print(f"Wrote {sum(sizes)} bytes to {len(paths)} file(s) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
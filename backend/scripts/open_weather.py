@@ -1,5 +1,7 @@
 import requests
 
+from backend.app.utils.http_client import http_client
+
 def get_weather(city_name, units="metric"):
     """
     Fetch weather data for a given city using OpenWeatherMap API.
@@ -20,7 +22,7 @@ def get_weather(city_name, units="metric"):
     }
     
     try:
-        response = requests.get(base_url, params=params)
+        response = http_client.get(base_url, params=params)
         data = response.json()
         print(data)
 
@@ -62,14 +64,3 @@ if __name__ == "__main__":
     print("\nWeather Information:")
     for key, value in weather_data.items():
         print(f"{key}: {value}")
-from pymongo import MongoClient
-import os
-from pathlib import Path
-from typing import Optional
-
-# Get the project root directory
-ROOT_DIR = Path(__file__).parent.parent.parent
-import sys
-sys.path.append(str(ROOT_DIR))
-
-from backend.app.config import config
\ No newline at end of file
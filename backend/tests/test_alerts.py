@@ -0,0 +1,196 @@
+# Test cases for weather threshold alerts
+import json
+import threading
+import time
+import unittest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from flask import Flask
+
+from backend.app.models.observation import Observation
+from backend.app.models.rollup import METRICS
+from backend.app.routes.alert_routes import alert_bp
+from backend.app.services.auth_service import AuthService
+from backend.app.services.notification_service import AlertService, SubscriptionIndex, WebhookSink
+from backend.app.services.weather_service import WeatherService
+from backend.app.utils.cache import weather_cache
+
+LAGOS = (6.45, 3.39)
+UYO = (5.03, 7.92)
+
+
+def subscription(i, location, metric, operator, threshold, cooldown=0):
+    return {"_id": f"sub-{i}", "username": f"user-{i}", "city": "somewhere", "lat": location[0],
+            "lon": location[1], "metric": metric, "operator": operator, "threshold": threshold,
+            "cooldown": cooldown}
+
+
+def readings(index, by_location):
+    """(cells, metrics) observations with NaN for cells not in by_location"""
+    observations = np.full((index.cells, len(METRICS)), np.nan)
+    for cell, (lat, lon) in enumerate(zip(index.cell_lat, index.cell_lon)):
+        for (loc_lat, loc_lon), values in by_location.items():
+            if abs(lat - loc_lat) <= index.cell_size and abs(lon - loc_lon) <= index.cell_size:
+                observations[cell] = [values.get(metric, np.nan) for metric in METRICS]
+    return observations
+
+
+class WebhookStub:
+    """Local HTTP endpoint recording the JSON bodies posted to it"""
+
+    def __init__(self):
+        received = self.received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/alerts"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestSubscriptionIndex(unittest.TestCase):
+    def test_evaluates_every_operator_against_its_cell(self):
+        index = SubscriptionIndex([
+            subscription(0, LAGOS, "wind_speed", ">", 15),
+            subscription(1, LAGOS, "wind_speed", ">", 16),
+            subscription(2, LAGOS, "temperature", "<=", 30),
+            subscription(3, UYO, "humidity", ">=", 80),
+            subscription(4, UYO, "temperature", "<", 20),
+            subscription(5, (6.46, 3.38), "wind_speed", ">", 10),
+        ], cell_size=0.1)
+        self.assertEqual(index.cells, 2)
+
+        observations = readings(index, {LAGOS: {"wind_speed": 16, "temperature": 30},
+                                        UYO: {"humidity": 80, "temperature": 25}})
+        fired = index.evaluate(observations, now=1000)
+        self.assertEqual(sorted(index.ids[fired]), ["sub-0", "sub-2", "sub-3", "sub-5"])
+
+    def test_notifies_on_onset_then_respects_cooldown(self):
+        index = SubscriptionIndex([subscription(0, LAGOS, "wind_speed", ">", 15, cooldown=600)])
+        windy = readings(index, {LAGOS: {"wind_speed": 20}})
+        calm = readings(index, {LAGOS: {"wind_speed": 5}})
+        unknown = readings(index, {})
+
+        self.assertEqual(len(index.evaluate(windy, now=0)), 1)
+        self.assertEqual(len(index.evaluate(windy, now=60)), 0)  # Still windy
+        self.assertEqual(len(index.evaluate(unknown, now=120)), 0)  # No reading keeps the state
+        self.assertEqual(len(index.evaluate(windy, now=180)), 0)
+        index.evaluate(calm, now=240)
+        self.assertEqual(len(index.evaluate(windy, now=300)), 0)  # Within the cooldown
+        index.evaluate(calm, now=660)
+        self.assertEqual(len(index.evaluate(windy, now=720)), 1)
+
+    def test_reload_keeps_state_of_unchanged_subscriptions(self):
+        old = SubscriptionIndex([subscription(0, LAGOS, "wind_speed", ">", 15),
+                                 subscription(1, LAGOS, "wind_speed", ">", 15)])
+        old.evaluate(readings(old, {LAGOS: {"wind_speed": 20}}), now=0)
+
+        new = SubscriptionIndex([subscription(1, LAGOS, "wind_speed", ">", 15),
+                                 subscription(2, LAGOS, "wind_speed", ">", 15)])
+        new.carry_over(old)
+        fired = new.evaluate(readings(new, {LAGOS: {"wind_speed": 20}}), now=60)
+        self.assertEqual(list(new.ids[fired]), ["sub-2"])
+
+
+class TestAlertService(unittest.TestCase):
+    def setUp(self):
+        self.webhook = WebhookStub()
+        self.addCleanup(self.webhook.close)
+        subscriptions = [subscription(i, LAGOS, "wind_speed", ">", 15) for i in range(5)]
+        for p in (patch.object(AlertService, "sink", WebhookSink(self.webhook.url)),
+                  patch.object(AlertService, "index", None),
+                  patch.object(AlertService, "_loaded_at", 0.0),
+                  patch("backend.app.services.notification_service.AlertSubscription.load_active",
+                        return_value=subscriptions),
+                  patch("backend.app.services.notification_service.config.ALERT_BATCH_SIZE", 2)):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def cache_reading(self, wind_speed):
+        """Put a fresh reading for the Lagos cell in the weather cache"""
+        index = SubscriptionIndex([subscription(0, LAGOS, "wind_speed", ">", 0)])
+        key, _, _ = WeatherService._cache_key(index.cell_lat[0], index.cell_lon[0])
+        observation = Observation(time.time(), 300.0, 302.0, 70, 1010, wind_speed, 800, "clear sky", "Lagos", "NG")
+        observation.fresh_until = time.time() + 600
+        weather_cache.set(key, observation, 600)
+        self.addCleanup(weather_cache.delete, key)
+
+    def test_dispatches_in_batches_without_duplicates(self):
+        self.cache_reading(20)
+        with patch.object(WeatherService, "get_observation_with_status") as mock_fetch:
+            self.assertEqual(AlertService.run_once(), 5)
+            self.assertEqual(AlertService.run_once(), 0)
+        mock_fetch.assert_not_called()  # Served from the weather cache
+
+        self.assertEqual([len(body["notifications"]) for body in self.webhook.received], [2, 2, 1])
+        notification = self.webhook.received[0]["notifications"][0]
+        self.assertEqual((notification["metric"], notification["operator"], notification["value"]),
+                         ("wind_speed", ">", 20.0))
+
+
+class TestAlertRoutes(unittest.TestCase):
+    def setUp(self):
+        for p in (patch.object(AuthService, "_secret", b"test-secret"),
+                  patch.object(AuthService, "_denylist", {}),
+                  patch.object(AuthService, "_synced_until", datetime(1970, 1, 1)),
+                  patch.object(AuthService, "_syncer", MagicMock())):
+            p.start()
+            self.addCleanup(p.stop)
+        app = Flask(__name__)
+        app.register_blueprint(alert_bp)
+        self.client = app.test_client()
+        token = AuthService.issue_tokens("ada")["access_token"]
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    @patch("backend.app.routes.alert_routes.LocationService.get_coordinates")
+    @patch("backend.app.routes.alert_routes.AlertSubscription")
+    def test_create_alert(self, mock_subscription, mock_location):
+        mock_subscription.validate.return_value = None
+        mock_subscription.count_by_user.return_value = 0
+        mock_subscription.return_value.save.return_value = "abc123"
+        mock_location.return_value = {"lat": LAGOS[0], "lon": LAGOS[1]}
+
+        rule = {"city": "Lagos", "metric": "wind_speed", "operator": ">", "threshold": 15}
+        response = self.client.post("/alerts", json=rule, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["id"], "abc123")
+        self.assertEqual(mock_subscription.call_args[0][:7], ("ada", "Lagos", *LAGOS, "wind_speed", ">", 15))
+
+        self.assertEqual(self.client.post("/alerts", json=rule).status_code, 401)
+        mock_subscription.return_value.save.return_value = None
+        self.assertEqual(self.client.post("/alerts", json=rule, headers=self.headers).status_code, 409)
+
+    def test_create_alert_validation(self):
+        for rule in ({"city": "Lagos", "metric": "rain", "operator": ">", "threshold": 1},
+                     {"city": "Lagos", "metric": "wind_speed", "operator": "!=", "threshold": 1},
+                     {"city": "Lagos", "metric": "wind_speed", "operator": ">", "threshold": "high"},
+                     {"city": "", "metric": "wind_speed", "operator": ">", "threshold": 1},
+                     {"city": "Lagos", "metric": "wind_speed", "operator": ">", "threshold": 1, "cooldown": -5}):
+            response = self.client.post("/alerts", json=rule, headers=self.headers)
+            self.assertEqual(response.status_code, 400, rule)
+
+    @patch("backend.app.routes.alert_routes.AlertSubscription")
+    def test_database_errors_are_reported(self, mock_subscription):
+        mock_subscription.find_by_user.side_effect = mock_subscription.delete.side_effect = Exception("down")
+        for response in (self.client.get("/alerts", headers=self.headers),
+                         self.client.delete("/alerts/abc123", headers=self.headers)):
+            self.assertEqual(response.status_code, 500)
+            self.assertEqual(response.get_json()["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import time
+import unittest
+from unittest.mock import patch, AsyncMock
+from fastapi.testclient import TestClient
+from backend.app.asgi import create_asgi_app
+from backend.app.models.observation import Observation
+
+class TestAsgiApp(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(create_asgi_app())
+
+    def test_not_found(self):
+        response = self.client.get('/nonexistent')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["status"], "error")
+
+    def test_get_weather_no_city(self):
+        response = self.client.get('/api/v1/weather')
+        self.assertEqual(response.status_code, 400)
+
+    @patch('backend.app.asgi.AsyncWeatherService.get_observation_with_status', new_callable=AsyncMock)
+    @patch('backend.app.asgi.AsyncLocationService.get_coordinates', new_callable=AsyncMock)
+    def test_get_weather(self, mock_location, mock_weather):
+        mock_location.return_value = {"lat": 51.5, "lon": -0.12, "display_name": "London"}
+        observation = Observation(time.time() - 60, 285.45, 284.15, 80, 1012, 4.1, 500, "light rain", "London", "GB")
+        observation.fresh_until = time.time() + 300
+        mock_weather.return_value = (observation, "MISS")
+        response = self.client.get('/api/v1/weather?city=London')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["temperature"], "12.3°C")
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        mock_weather.assert_called_with(lat=51.5, lon=-0.12, city_name="London", country=None)
+
+        response = self.client.get('/api/v1/weather?city=London',
+                                   headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get('/api/v1/weather?lat=51.5&lon=-0.12')
+        self.assertEqual(response.status_code, 200)
+        mock_weather.assert_called_with(lat=51.5, lon=-0.12, city_name="", country=None)
+        self.assertEqual(mock_location.call_count, 2)
+        self.assertEqual(self.client.get('/api/v1/weather?lat=51.5&lon=x').status_code, 400)
+
+    def test_register_invalid_password(self):
+        response = self.client.post('/api/v1/register',
+            json={"username": "testuser", "password": "weak"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_routes(self):
+        response = self.client.get('/api/v1/routes')
+        paths = [route["path"] for route in response.json()["routes"]["weather"]]
+        self.assertEqual(paths, ["/api/v1/weather"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# Test cases for token authentication
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import mongomock
+from flask import Flask
+
+from backend.app.models.revoked_token import RevokedToken
+from backend.app.routes.user_routes import user_bp
+from backend.app.services.auth_service import AuthService
+from backend.app.utils import tokens
+from backend.app.utils.tokens import TokenError
+
+SECRET = b"test-secret"
+
+
+class TestTokens(unittest.TestCase):
+    def test_round_trip(self):
+        token = tokens.encode({"sub": "ada", "exp": time.time() + 60}, SECRET)
+        self.assertEqual(tokens.decode(token, SECRET)["sub"], "ada")
+
+    def test_rejects_tampering_expiry_and_other_algorithms(self):
+        token = tokens.encode({"sub": "ada", "exp": time.time() + 60}, SECRET)
+        header, payload, signature = token.split(".")
+        forged = tokens.encode({"sub": "root", "exp": time.time() + 60}, b"other").split(".")[1]
+        unsigned = "eyJhbGciOiJub25lIiwidHlwIjoiSldUIn0"  # {"alg":"none","typ":"JWT"}
+
+        for bad in (f"{header}.{forged}.{signature}", f"{unsigned}.{payload}.", "garbage", token + "x"):
+            with self.assertRaises(TokenError):
+                tokens.decode(bad, SECRET)
+        with self.assertRaises(TokenError):
+            tokens.decode(token, SECRET, now=time.time() + 120)
+        self.assertEqual(tokens.decode(token, SECRET, leeway=90, now=time.time() + 120)["sub"], "ada")
+
+
+class TestAuth(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            patch.object(AuthService, "_secret", SECRET),
+            patch.object(AuthService, "_denylist", {}),
+            patch.object(AuthService, "_synced_until", datetime(1970, 1, 1)),
+            patch.object(AuthService, "_syncer", MagicMock()),
+            patch("backend.app.services.auth_service.RevokedToken"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.app = Flask(__name__)
+        self.app.register_blueprint(user_bp)
+        self.client = self.app.test_client()
+
+    @patch("backend.app.routes.user_routes.User.find_by_username")
+    def test_login_issues_tokens_used_without_db(self, mock_find):
+        mock_find.return_value = {"username": "ada", "salt": "ab", "password": "hash"}
+        with patch("backend.app.routes.user_routes.User.check_password", return_value=True):
+            response = self.client.post('/login', json={"username": "ada", "password": "Secret123!"})
+        self.assertEqual(response.status_code, 200)
+        access = response.get_json()["access_token"]
+
+        mock_find.reset_mock()
+        response = self.client.get('/me', headers={"Authorization": f"Bearer {access}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["username"], "ada")
+        mock_find.assert_not_called()
+
+    def test_missing_or_invalid_token_is_401(self):
+        self.assertEqual(self.client.get('/me').status_code, 401)
+        refresh = AuthService.issue_tokens("ada")["refresh_token"]
+        response = self.client.get('/me', headers={"Authorization": f"Bearer {refresh}"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_rotates_and_logout_revokes(self):
+        session = AuthService.issue_tokens("ada")
+        response = self.client.post('/token/refresh', json={"refresh_token": session["refresh_token"]})
+        self.assertEqual(response.status_code, 200)
+        renewed = response.get_json()
+
+        # The old refresh token was rotated out
+        response = self.client.post('/token/refresh', json={"refresh_token": session["refresh_token"]})
+        self.assertEqual(response.status_code, 401)
+
+        headers = {"Authorization": f"Bearer {renewed['access_token']}"}
+        self.assertEqual(self.client.post('/logout', headers=headers).status_code, 200)
+        self.assertEqual(self.client.get('/me', headers=headers).status_code, 401)
+
+    def test_refresh_token_is_redeemed_once_across_workers(self):
+        collection = mongomock.MongoClient().db.revoked_tokens
+        refresh = AuthService.issue_tokens("ada")["refresh_token"]
+        with patch.object(RevokedToken, "collection", return_value=collection), \
+                patch("backend.app.services.auth_service.RevokedToken", RevokedToken):
+            self.assertIn("access_token", AuthService.refresh(refresh))
+            # Another worker, whose denylist has not synced yet
+            AuthService._denylist.clear()
+            with self.assertRaises(TokenError):
+                AuthService.refresh(refresh)
+        self.assertEqual(collection.count_documents({}), 1)
+
+    @patch("backend.app.services.auth_service.RevokedToken.since")
+    def test_sync_merges_remote_revocations_and_prunes_expired(self, mock_since):
+        mock_since.return_value = [{"_id": "remote", "exp": datetime.utcnow() + timedelta(minutes=5)}]
+        AuthService._denylist["expired"] = time.time() - 3600
+
+        AuthService.sync()
+        self.assertEqual(set(AuthService._denylist), {"remote"})
+
+
+if __name__ == "__main__":
+    unittest.main()
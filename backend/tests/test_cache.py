@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+from backend.app.utils.cache import TTLCache, TwoTierCache, MemoryStore, MISSING
+
+class TestTTLCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIs(cache.get("b"), MISSING)
+
+    @patch('backend.app.utils.cache.time.time')
+    def test_expiry(self, mock_time):
+        mock_time.return_value = 1000
+        cache = TTLCache()
+        cache.set("a", None, ttl=10)
+        self.assertIsNone(cache.get("a"))
+        mock_time.return_value = 1011
+        self.assertIs(cache.get("a"), MISSING)
+
+class TestTwoTierCache(unittest.TestCase):
+    def test_shared_store_populates_local_tier(self):
+        store = MemoryStore()
+        writer = TwoTierCache("test", store=store)
+        reader = TwoTierCache("test", store=store)
+        writer.set("london", {"lat": 51.5}, ttl=60)
+        self.assertEqual(reader.get("london"), {"lat": 51.5})
+        self.assertEqual(reader.local.get("london"), {"lat": 51.5})
+
+    def test_store_failure_is_a_miss(self):
+        store = MemoryStore()
+        cache = TwoTierCache("test", store=store)
+        with patch.object(store, 'get', side_effect=ConnectionError):
+            self.assertIs(cache.get("london"), MISSING)
+
+    def test_malformed_entry_is_a_miss_and_discarded(self):
+        store = MemoryStore()
+        cache = TwoTierCache("test", store=store)
+        for raw in ("not json", '{"v": 1}', "[1, 2]"):
+            store.set(cache._key("london"), raw)
+            self.assertIs(cache.get("london"), MISSING)
+            self.assertIsNone(store.get(cache._key("london")))
+
+    def test_async_get_reads_remote_store_off_the_loop(self):
+        store = MemoryStore()
+        TwoTierCache("test", store=store).set("london", {"lat": 51.5}, ttl=60)
+        threads = []
+
+        class RemoteStore:
+            """Stands in for a Redis client (anything that is not a MemoryStore)"""
+            def get(self, key):
+                threads.append(threading.current_thread())
+                return store.get(key)
+
+        cache = TwoTierCache("test", store=RemoteStore())
+        self.assertEqual(asyncio.run(cache.get_async("london")), {"lat": 51.5})
+        self.assertEqual(asyncio.run(cache.get_async("london")), {"lat": 51.5})
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1 +1,98 @@
-# Database-related tests 
+# Database-related tests
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from backend.app.database import Database
+from backend.app.models.observation import Observation
+from backend.app.models.weather import Weather
+from backend.app.utils.bulk_writer import BulkWriter
+
+
+class TestDatabase(unittest.TestCase):
+    @patch.object(Database, "_connect")
+    def test_client_created_on_first_use_and_after_fork(self, mock_connect):
+        database = Database()
+        mock_connect.assert_not_called()
+
+        database.get_collection("users")
+        database.get_collection("weather")
+        self.assertEqual(mock_connect.call_count, 1)
+
+        database._forget()  # What runs in a forked child
+        database.get_collection("users")
+        self.assertEqual(mock_connect.call_count, 2)
+
+    def test_ping(self):
+        database = Database()
+        database.client = MagicMock()
+        self.assertEqual(database.ping()["status"], "ok")
+        database.client.admin.command.side_effect = Exception("No servers found")
+        self.assertEqual(database.ping(), {"status": "unavailable", "error": "No servers found"})
+
+
+class TestBulkWriter(unittest.TestCase):
+    def setUp(self):
+        self.collection = MagicMock()
+        self.writer = BulkWriter(lambda: self.collection, batch_size=3, flush_interval=60, max_queue=5)
+
+    def test_flush_inserts_in_batches(self):
+        for i in range(7):
+            self.writer.add({"i": i})
+        self.writer.flush()
+
+        sizes = [len(c.args[0]) for c in self.collection.insert_many.call_args_list]
+        self.assertEqual(sum(sizes), 5)  # Two dropped by the bounded queue
+        self.assertTrue(all(size <= 3 for size in sizes))
+        self.assertEqual(self.writer.dropped, 2)
+        self.assertEqual(self.writer.written, 5)
+
+    def test_full_batch_wakes_writer_thread(self):
+        batches = []
+        self.writer.add_listener(batches.append)
+        for i in range(3):
+            self.writer.add({"i": i})
+
+        deadline = time.time() + 2
+        while not batches and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(batches, [[{"i": 0}, {"i": 1}, {"i": 2}]])
+
+    def test_insert_failure_is_logged_not_raised(self):
+        self.collection.insert_many.side_effect = Exception("down")
+        self.writer.add({"i": 1})
+        with self.assertLogs("backend.app.utils.bulk_writer", level="ERROR"):
+            self.writer.flush()
+        self.assertEqual(self.writer.written, 0)
+
+
+class TestWeatherModel(unittest.TestCase):
+    def provider_response(self, **main):
+        return {
+            "dt": 1700000000,
+            "name": "  New  York ",
+            "main": {"temp": 283.15, "feels_like": 278.15, "humidity": 70, **main},
+            "weather": [{"id": 800, "description": "clear sky"}],
+            "wind": {"speed": 4.47},
+            "sys": {"country": "US"}
+        }
+
+    def test_from_observation_normalizes_to_metric(self):
+        weather = Weather.from_observation(Observation.from_provider(self.provider_response()), 40.7, -74.0)
+
+        self.assertEqual(weather.city, "new york")
+        self.assertEqual(weather.temperature, 10.0)
+        self.assertEqual(weather.feels_like, 5.0)
+        self.assertEqual(weather.wind_speed, 4.47)
+        self.assertEqual(weather.timestamp.year, 2023)
+
+    def test_save_queues_document(self):
+        weather = Weather("Lagos", 30, "sunny", None)
+        with patch("backend.app.models.weather.writer") as writer:
+            weather.save()
+        writer.add.assert_called_once_with({"city": "lagos", "temperature": 30,
+                                            "condition": "sunny", "timestamp": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
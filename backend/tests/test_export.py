@@ -0,0 +1,104 @@
+# Test cases for observation export
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import mongomock
+from flask import Flask
+
+from backend.app.models.weather import Weather
+from backend.app.routes.weather_routes import weather_bp
+from backend.app.services.download_service import DownloadService, pyarrow
+
+START = datetime(2024, 5, 1)
+
+
+class TestDownloadService(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.weather_observations
+        self.collection.insert_many([
+            {"city": "lagos", "timestamp": START + timedelta(minutes=10 * i), "temperature": 25.0 + i,
+             "humidity": 80, "condition": "clear sky", "lat": 6.45, "lon": 3.39, "country": "NG"}
+            for i in range(25)
+        ] + [{"city": "uyo", "timestamp": START, "temperature": 30.0}])
+        for p in (patch.object(Weather, "collection", return_value=self.collection),
+                  patch("backend.app.services.download_service.config.EXPORT_BATCH_SIZE", 10)):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_csv_streams_one_chunk_per_batch(self):
+        chunks = list(DownloadService.stream("Lagos", START, START + timedelta(days=1), "csv"))
+        self.assertEqual(len(chunks), 3)
+
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]["timestamp"], "2024-05-01T00:00:00Z")
+        self.assertEqual((rows[24]["temperature"], rows[24]["pressure"]), ("49.0", ""))
+
+    def test_ndjson_respects_range(self):
+        body = b"".join(DownloadService.stream("lagos", START + timedelta(minutes=30),
+                                               START + timedelta(minutes=60), "ndjson"))
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row["temperature"] for row in rows], [28.0, 29.0, 30.0])
+        self.assertNotIn("_id", rows[0])
+
+    def test_empty_csv_has_header(self):
+        body = b"".join(DownloadService.stream("nowhere", START, START + timedelta(days=1), "csv"))
+        self.assertTrue(body.startswith(b"city,timestamp,"))
+
+    def test_csv_parts_after_the_first_have_no_header(self):
+        ranges = DownloadService.partitions(START, START + timedelta(hours=4), 2)
+        parts = [b"".join(DownloadService.stream("lagos", *r, "csv", header=i == 0))
+                 for i, r in enumerate(ranges)]
+        whole = b"".join(DownloadService.stream("lagos", START, START + timedelta(hours=4), "csv"))
+        self.assertEqual(b"".join(parts), whole)
+
+    def test_partitions_cover_the_range(self):
+        ranges = DownloadService.partitions(START, START + timedelta(hours=4), 3)
+        self.assertEqual(len(ranges), 3)
+        self.assertEqual((ranges[0][0], ranges[-1][1]), (START, START + timedelta(hours=4)))
+        self.assertTrue(all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+
+        parts = [b"".join(DownloadService.stream("lagos", *r, "ndjson")) for r in ranges]
+        whole = b"".join(DownloadService.stream("lagos", START, START + timedelta(hours=4), "ndjson"))
+        self.assertEqual(b"".join(parts), whole)
+
+        with self.assertRaises(ValueError):
+            DownloadService.partitions(START, START, 2)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_row_groups(self):
+        import pyarrow.parquet
+        body = b"".join(DownloadService.stream("lagos", START, START + timedelta(days=1), "parquet"))
+        parquet = pyarrow.parquet.ParquetFile(io.BytesIO(body))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(table.column("temperature")[0].as_py(), 25.0)
+        self.assertEqual(table.column("timestamp")[0].as_py().isoformat(), "2024-05-01T00:00:00+00:00")
+
+    @patch("backend.app.utils.auth.AuthService.verify", return_value={"sub": "ada"})
+    def test_export_route(self, mock_verify):
+        app = Flask(__name__)
+        app.register_blueprint(weather_bp)
+        client = app.test_client()
+        headers = {"Authorization": "Bearer token"}
+
+        response = client.get("/weather/export?city=Lagos&from=2024-05-01&to=2024-05-02&format=ndjson"
+                              "&partitions=2&partition=0", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertIn("lagos-20240501T000000-20240501T120000.ndjson", response.headers["Content-Disposition"])
+        self.assertEqual(len(response.get_data().splitlines()), 25)
+
+        for query in ("city=Lagos", "city=Lagos&from=2024-05-01&format=xml",
+                      "city=Lagos&from=2024-05-01&partitions=2&partition=2"):
+            self.assertEqual(client.get(f"/weather/export?{query}", headers=headers).status_code, 400)
+        self.assertEqual(client.get("/weather/export?city=Lagos&from=2024-05-01").status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
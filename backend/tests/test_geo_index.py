@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from backend.app.routes.city_routes import city_bp
+from backend.app.services.location_service import LocationService
+from backend.app.utils.cache import geocode_cache, MemoryStore
+from backend.app.utils.geo_index import GeoIndex, build_index, read_geonames
+
+ROWS = [
+    # geonameid, name, asciiname, alternatenames, lat, lon, class, code, country, ..., population
+    ["2643743", "London", "London", "Londres,Lundun", "51.50853", "-0.12574", "P", "PPLC", "GB"] + [""] * 5 + ["8961989"],
+    ["6058560", "London", "London", "", "42.98339", "-81.23304", "P", "PPL", "CA"] + [""] * 5 + ["346765"],
+    ["2338660", "Londrina", "Londrina", "", "-23.31028", "-51.16278", "P", "PPLA2", "BR"] + [""] * 5 + ["575377"],
+    ["2596934", "Uyo", "Uyo", "", "5.05127", "7.9335", "P", "PPLA", "NG"] + [""] * 5 + ["436606"],
+    ["2635167", "United Kingdom", "United Kingdom", "", "54.75844", "-2.69531", "A", "PCLI", "GB"] + [""] * 5 + ["66488991"],
+]
+
+class TestGeoIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        source = os.path.join(self.tmpdir.name, "cities.txt")
+        with open(source, "w", encoding="utf-8") as f:
+            f.writelines("\t".join(row) + "\n" for row in ROWS)
+        self.path = os.path.join(self.tmpdir.name, "geo_index.bin")
+        build_index(read_geonames(source, alternate_names=True), self.path)
+        self.index = GeoIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmpdir.cleanup()
+
+    def test_lookup_ranks_by_population(self):
+        places = self.index.lookup(" LONDON ", limit=5)
+        self.assertEqual([p["display_name"] for p in places], ["London, GB", "London, CA"])
+        self.assertAlmostEqual(places[0]["lat"], 51.50853, places=4)
+        self.assertEqual(self.index.lookup("londres")[0]["display_name"], "London, GB")
+        self.assertEqual(self.index.lookup("United Kingdom"), [])
+
+    def test_prefix_search(self):
+        places = self.index.search_prefix("lond")
+        self.assertEqual([p["display_name"] for p in places], ["London, GB", "Londrina, BR", "London, CA"])
+
+    def test_nearest_places(self):
+        places = self.index.nearest(51.3, -0.3, limit=3)
+        # One result per place, not per indexed name
+        self.assertEqual([p["display_name"] for p in places], ["London, GB", "Uyo, NG", "London, CA"])
+        self.assertAlmostEqual(places[0]["distance_km"], 26.5, delta=0.5)
+        self.assertEqual(self.index.nearest(0, 0, radius_km=100), [])
+
+    @patch.object(LocationService, 'http_client')
+    def test_reverse_geocoding(self, mock_client):
+        geocode_cache.local.clear()
+        geocode_cache._store = MemoryStore()
+        mock_client.get.return_value.json.return_value = {
+            "lat": "-0.5", "lon": "0.5", "display_name": "Gulf of Guinea"}
+        with patch('backend.app.services.location_service.get_geo_index', return_value=self.index):
+            self.assertEqual(LocationService.reverse(5.0, 7.9)["display_name"], "Uyo, NG")
+            mock_client.get.assert_not_called()
+
+            # Nothing within GEO_REVERSE_RADIUS: ask Nominatim once, then cache
+            place = LocationService.reverse(0.0, 0.0)
+            self.assertEqual(place["display_name"], "Gulf of Guinea")
+            self.assertAlmostEqual(place["distance_km"], 78.6, delta=0.5)
+            LocationService.reverse(0.0001, 0.0)
+        self.assertEqual(mock_client.get.call_count, 1)
+        self.assertEqual(mock_client.get.call_args.kwargs["params"]["lat"], 0.0)
+
+    def test_reverse_route(self):
+        app = Flask(__name__)
+        app.register_blueprint(city_bp)
+        client = app.test_client()
+        self.assertEqual(client.get('/cities/reverse?lat=95&lon=0').status_code, 400)
+        with patch('backend.app.services.location_service.get_geo_index', return_value=self.index):
+            response = client.get('/cities/reverse?lat=42.9&lon=-81.2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["data"]["display_name"], "London, CA")
+
+    @patch.object(LocationService, 'http_client')
+    def test_location_service_uses_index(self, mock_client):
+        geocode_cache.local.clear()
+        geocode_cache._store = MemoryStore()
+        with patch('backend.app.services.location_service.get_geo_index', return_value=self.index):
+            location = LocationService.get_coordinates("Uyo")
+        self.assertEqual(location["display_name"], "Uyo, NG")
+        mock_client.get.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
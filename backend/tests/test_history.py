@@ -0,0 +1,88 @@
+# Test cases for weather rollups and history
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from backend.app.models.rollup import WeatherRollup
+from backend.app.services.history_service import HistoryService
+
+
+def observation(hour, minute, temperature, humidity=None):
+    return {"city": "uyo", "timestamp": datetime(2024, 5, 1, hour, minute),
+            "temperature": temperature, "humidity": humidity}
+
+
+class TestWeatherRollup(unittest.TestCase):
+    def test_aggregate_by_hour(self):
+        buckets = WeatherRollup.aggregate([
+            observation(10, 0, 25.0, 80),
+            observation(10, 50, 27.0),
+            observation(11, 10, 30.0, 70)
+        ], 3600)
+
+        ten = buckets[("uyo", datetime(2024, 5, 1, 10))]
+        self.assertEqual(ten["count"], 2)
+        self.assertEqual(ten["temperature"], {"n": 2, "sum": 52.0, "min": 25.0, "max": 27.0})
+        self.assertEqual(ten["humidity"]["n"], 1)
+        self.assertIn(("uyo", datetime(2024, 5, 1, 11)), buckets)
+
+    def test_apply_upserts_only_touched_buckets(self):
+        collection = MagicMock()
+        with patch.object(WeatherRollup, "collection", return_value=collection):
+            WeatherRollup.apply([observation(10, 0, 25.0), observation(10, 30, 27.0)])
+
+        # One hourly and one daily bucket touched
+        self.assertEqual(collection.bulk_write.call_count, 2)
+        update = collection.bulk_write.call_args_list[0].args[0][0]._doc
+        self.assertEqual(update["$inc"], {"count": 2, "temperature.n": 2, "temperature.sum": 52.0})
+        self.assertEqual(update["$min"], {"temperature.min": 25.0})
+        self.assertEqual(update["$max"], {"temperature.max": 27.0})
+
+
+class TestHistoryService(unittest.TestCase):
+    def test_parse_resolution(self):
+        self.assertEqual(HistoryService.parse_resolution("raw"), 0)
+        self.assertEqual(HistoryService.parse_resolution("6h"), 6 * 3600)
+        self.assertEqual(HistoryService.parse_resolution("7d"), 7 * 86400)
+        self.assertIsNone(HistoryService.parse_resolution(None))
+        for value in ("0h", "5m", "weekly"):
+            with self.assertRaises(ValueError):
+                HistoryService.parse_resolution(value)
+
+    def test_coarsest_rollup_chosen(self):
+        self.assertEqual(HistoryService.source_for(6 * 3600), "hour")
+        self.assertEqual(HistoryService.source_for(7 * 86400), "day")
+        self.assertEqual(HistoryService.source_for(0), "raw")
+
+    @patch.object(WeatherRollup, "find_range")
+    def test_year_served_from_daily_rollup(self, mock_find):
+        mock_find.return_value = [
+            {"bucket": datetime(2024, 1, 1), "count": 144, "temperature": {"n": 144, "sum": 3600.0, "min": 20.0, "max": 30.0}},
+            {"bucket": datetime(2024, 1, 2), "count": 144, "temperature": {"n": 144, "sum": 4320.0, "min": 25.0, "max": 35.0}}
+        ]
+        end = datetime(2024, 12, 31)
+        history = HistoryService.get_history("Uyo", end - timedelta(days=365), end)
+
+        mock_find.assert_called_once()
+        self.assertEqual(mock_find.call_args.args[1], "day")
+        self.assertEqual(history["source"], "day")
+        self.assertEqual(history["resolution"], "1d")
+        self.assertEqual(history["points"][1]["temperature"], {"min": 25.0, "max": 35.0, "mean": 30.0})
+
+    def test_merge_into_wider_buckets(self):
+        merged = HistoryService.merge([
+            {"bucket": datetime(2024, 1, 1), "count": 1, "temperature": {"n": 1, "sum": 10.0, "min": 10.0, "max": 10.0}},
+            {"bucket": datetime(2024, 1, 2), "count": 1, "temperature": {"n": 1, "sum": 20.0, "min": 20.0, "max": 20.0}}
+        ], 7 * 86400)
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]["temperature"], {"n": 2, "sum": 30.0, "min": 10.0, "max": 20.0})
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            HistoryService.get_history("Uyo", datetime(2024, 2, 1), datetime(2024, 1, 1))
+        with self.assertRaises(ValueError):
+            HistoryService.get_history("Uyo", datetime(2020, 1, 1), datetime(2024, 1, 1), "hour")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# Test cases for conditional requests and compression
+import gzip
+import unittest
+import zlib
+from email.utils import formatdate
+from unittest.mock import patch
+
+from backend.app.utils import compression
+from backend.app.utils.http_cache import make_etag, is_not_modified, cache_headers
+
+
+class TestHttpCache(unittest.TestCase):
+    def test_etag_ignores_key_order(self):
+        etag = make_etag({"temperature": "30°C", "humidity": "80%"}, 1700000000)
+        self.assertEqual(etag, make_etag({"humidity": "80%", "temperature": "30°C"}, 1700000000.4))
+        self.assertNotEqual(etag, make_etag({"humidity": "80%", "temperature": "30°C"}, 1700000600))
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+
+    def test_is_not_modified(self):
+        etag = '"abc"'
+        self.assertTrue(is_not_modified(etag, 1000, '"x", W/"abc"', None))
+        self.assertTrue(is_not_modified(etag, 1000, "*", None))
+        self.assertFalse(is_not_modified(etag, 1000, '"x"', None))
+
+        self.assertTrue(is_not_modified(etag, 1000, None, formatdate(1000, usegmt=True)))
+        self.assertFalse(is_not_modified(etag, 1000, None, formatdate(999, usegmt=True)))
+        self.assertFalse(is_not_modified(etag, 1000, None, "yesterday"))
+        # If-None-Match wins over If-Modified-Since
+        self.assertFalse(is_not_modified(etag, 1000, '"x"', formatdate(2000, usegmt=True)))
+
+    def test_cache_headers(self):
+        headers = cache_headers('"abc"', 1000, fresh_until=1300.5, now=1060)
+        self.assertEqual(headers["Cache-Control"], "public, max-age=240")
+        self.assertEqual(headers["Last-Modified"], "Thu, 01 Jan 1970 00:16:40 GMT")
+        self.assertEqual(cache_headers('"abc"', 1000, 1300, now=1400)["Cache-Control"], "public, max-age=0")
+
+
+class TestCompression(unittest.TestCase):
+    def test_choose_encoding(self):
+        with patch.object(compression, "brotli", None):
+            self.assertEqual(compression.choose_encoding("gzip, deflate, br"), "gzip")
+            self.assertIsNone(compression.choose_encoding("br"))
+            self.assertIsNone(compression.choose_encoding("gzip;q=0"))
+            self.assertEqual(compression.choose_encoding("*"), "gzip")
+            self.assertIsNone(compression.choose_encoding(None))
+        with patch.object(compression, "brotli", object()):
+            self.assertEqual(compression.choose_encoding("gzip, br"), "br")
+            self.assertEqual(compression.choose_encoding("gzip, br;q=0.5"), "gzip")
+
+    def test_compress_stream_is_decodable_per_chunk(self):
+        lines = [f'{{"city": "city-{i}"}}\n'.encode() for i in range(50)]
+        chunks = list(compression.compress_stream(iter(lines), "gzip"))
+        self.assertEqual(gzip.decompress(b"".join(chunks)), b"".join(lines))
+        # Each flushed chunk can be decoded without waiting for the rest
+        self.assertIn(b"city-0", zlib.decompressobj(compression.GZIP_WBITS).decompress(chunks[0]))
+
+    def test_compress(self):
+        body = b"x" * 4096
+        self.assertEqual(gzip.decompress(compression.compress(body, "gzip")), body)
+
+
+if __name__ == "__main__":
+    unittest.main()
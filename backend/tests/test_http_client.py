@@ -0,0 +1,115 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+from backend.app.utils.http_client import HttpClient, CircuitOpenError
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def handle(self):
+        # Called once per TCP connection
+        self.server.connections += 1
+        super().handle()
+
+    def do_GET(self):
+        self.server.requests += 1
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.connections = 0
+        self.server.requests = 0
+        self.server.statuses = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/data"
+        self.client = HttpClient(backoff_base=0, breaker_threshold=2)
+
+    def tearDown(self):
+        self.client.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reuse(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_retries_server_errors(self):
+        self.server.statuses = [503, 429]
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_circuit_opens_after_failures(self):
+        self.server.statuses = [500] * 6
+        self.assertEqual(self.client.get(self.url).status_code, 500)
+        self.assertEqual(self.client.get(self.url).status_code, 500)
+        with self.assertRaises(CircuitOpenError):
+            self.client.get(self.url)
+        self.assertEqual(self.server.requests, 6)
+
+    def test_half_open_trial_is_released_on_any_error(self):
+        breaker = self.client.breaker(self.url)
+        breaker.opened_at = 0  # Long past its reset timeout, so half-open
+        with patch.object(self.client.session, "get", side_effect=requests.TooManyRedirects("loop")):
+            with self.assertRaises(requests.TooManyRedirects):
+                self.client.get(self.url)
+        self.assertEqual(breaker.state, "half-open")
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_closed_era_call_does_not_release_the_trial(self):
+        breaker = self.client.breaker(self.url)
+        slow_started, slow_finish = threading.Event(), threading.Event()
+        trial_started, trial_finish = threading.Event(), threading.Event()
+
+        def get(url, **kwargs):
+            if not slow_started.is_set():
+                slow_started.set()
+                slow_finish.wait(5)
+                raise requests.TooManyRedirects("loop")
+            trial_started.set()
+            trial_finish.wait(5)
+            return requests.Response()
+
+        errors = []
+
+        def call():
+            try:
+                self.client.get(self.url)
+            except requests.TooManyRedirects as e:
+                errors.append(e)
+
+        with patch.object(self.client.session, "get", side_effect=get):
+            slow = threading.Thread(target=call)
+            slow.start()
+            slow_started.wait(5)
+            breaker.opened_at = 0  # Opened and past its reset timeout while the call was out
+            trial = threading.Thread(target=call)
+            trial.start()
+            trial_started.wait(5)
+            slow_finish.set()
+            slow.join(5)
+            self.assertEqual(len(errors), 1)
+            # The trial is still in flight, so no second one is let through
+            with self.assertRaises(CircuitOpenError):
+                self.client.get(self.url)
+            trial_finish.set()
+            trial.join(5)
+
+if __name__ == '__main__':
+    unittest.main()
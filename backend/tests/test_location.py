@@ -1,13 +1,18 @@
 import unittest
 from unittest.mock import patch
 from backend.app.services.location_service import LocationService
+from backend.app.utils.cache import geocode_cache, MemoryStore
 
 class TestLocationService(unittest.TestCase):
-    @patch('requests.get')
-    def test_get_coordinates(self, mock_get):
+    def setUp(self):
+        geocode_cache.local.clear()
+        geocode_cache._store = MemoryStore()
+
+    @patch.object(LocationService, 'http_client')
+    def test_get_coordinates(self, mock_client):
         # Mock successful API response
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = [{
+        mock_client.get.return_value.status_code = 200
+        mock_client.get.return_value.json.return_value = [{
             "lat": "51.5074",
             "lon": "-0.1278",
             "display_name": "London, Greater London, England, UK"
@@ -19,5 +24,27 @@ class TestLocationService(unittest.TestCase):
         self.assertEqual(result["lat"], 51.5074)
         self.assertEqual(result["lon"], -0.1278)
 
+    @patch.object(LocationService, 'http_client')
+    def test_cache_hit_skips_request(self, mock_client):
+        mock_client.get.return_value.json.return_value = [{
+            "lat": "51.5074",
+            "lon": "-0.1278",
+            "display_name": "London, Greater London, England, UK"
+        }]
+
+        LocationService.get_coordinates("London")
+        result = LocationService.get_coordinates(" london ")
+
+        self.assertEqual(result["lat"], 51.5074)
+        self.assertEqual(mock_client.get.call_count, 1)
+
+    @patch.object(LocationService, 'http_client')
+    def test_not_found_is_cached(self, mock_client):
+        mock_client.get.return_value.json.return_value = []
+
+        self.assertIsNone(LocationService.get_coordinates("Atlantis"))
+        self.assertIsNone(LocationService.get_coordinates("Atlantis"))
+        self.assertEqual(mock_client.get.call_count, 1)
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import logging
+import queue
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from flask import Flask, Response
+from backend.app.asgi import create_asgi_app
+from backend.app.main import create_app
+from backend.app.utils.structured_logging import (
+    JsonFormatter, NonBlockingQueueHandler, SamplingFilter, assign_request_ids, parse_sampling,
+    queue_full, request_id, sampled_out
+)
+
+class Unformattable:
+    """Argument that fails the test if it is ever converted to text"""
+    def __str__(self):
+        raise AssertionError("sampled-out record was formatted")
+
+class TestStructuredLogging(unittest.TestCase):
+    def record(self, name="test", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+        record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter(self):
+        line = JsonFormatter().format(self.record(request_id="abc", city="London"))
+        entry = json.loads(line)
+        self.assertEqual(entry["message"], "hello world")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["request_id"], "abc")
+        self.assertEqual(entry["city"], "London")
+        self.assertTrue(entry["time"].endswith("Z"))
+
+    def test_sampling_keeps_one_in_n(self):
+        sampling = SamplingFilter(parse_sampling("meteorcloud.access=0.25, meteorcloud.access.health=0"))
+        before = sampled_out.value
+        kept = sum(sampling.filter(self.record("meteorcloud.access")) for _ in range(100))
+        self.assertEqual(kept, 25)
+        self.assertFalse(sampling.filter(self.record("meteorcloud.access.health")))
+        self.assertTrue(sampling.filter(self.record("meteorcloud.access.health", logging.WARNING)))
+        self.assertTrue(all(sampling.filter(self.record("backend.app")) for _ in range(10)))
+        self.assertEqual(sampled_out.value - before, 76)
+
+    def test_parse_sampling_rejects_bad_entries(self):
+        self.assertEqual(parse_sampling(""), {})
+        with self.assertRaises(ValueError):
+            parse_sampling("meteorcloud.access")
+
+    def test_full_queue_drops_without_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(2))
+        before = queue_full.value
+        token = request_id.set("req-1")
+        try:
+            for _ in range(5):
+                handler.handle(self.record())
+        finally:
+            request_id.reset(token)
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(queue_full.value - before, 3)
+        # Queued unformatted, with the caller's request ID
+        record = handler.queue.get_nowait()
+        self.assertEqual(record.args, ("world",))
+        self.assertEqual(record.request_id, "req-1")
+
+    def test_sampled_out_arguments_are_not_formatted(self):
+        logger = logging.getLogger("meteorcloud.test.lazy")
+        handler = NonBlockingQueueHandler(queue.Queue(10))
+        handler.addFilter(SamplingFilter({"meteorcloud.test.lazy": 0.5}))
+        logger.addHandler(handler)
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        try:
+            for _ in range(4):
+                logger.info("value %s", Unformattable())
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+        self.assertEqual(handler.queue.qsize(), 2)
+
+class TestRequestIds(unittest.TestCase):
+    def test_flask_request_id(self):
+        client = create_app().test_client()
+        response = client.get('/nonexistent', headers={"X-Request-ID": "client-id-1"})
+        self.assertEqual(response.headers["X-Request-ID"], "client-id-1")
+
+        response = client.get('/nonexistent', headers={"X-Request-ID": "not valid\x7f"})
+        self.assertEqual(len(response.headers["X-Request-ID"]), 32)
+        self.assertNotEqual(client.get('/nonexistent').headers["X-Request-ID"], response.headers["X-Request-ID"])
+
+    def test_flask_streamed_body_is_logged_on_close(self):
+        app = Flask(__name__)
+        seen = []
+
+        @app.route("/export")
+        def export():
+            def generate():
+                seen.append(request_id.get())
+                yield "a,b\n"
+            return Response(generate())
+
+        assign_request_ids(app)
+        with patch("backend.app.utils.structured_logging._log_access") as log_access:
+            response = app.test_client().get("/export", headers={"X-Request-ID": "stream-1"})
+            log_access.assert_not_called()
+            self.assertEqual(response.get_data(), b"a,b\n")
+            response.close()
+        self.assertEqual(seen, ["stream-1"])
+        self.assertEqual(log_access.call_args[0][1:3], ("/export", 200))
+
+    def test_asgi_request_id(self):
+        client = TestClient(create_asgi_app())
+        response = client.get('/api/v1/nonexistent', headers={"X-Request-ID": "client-id-2"})
+        self.assertEqual(response.headers["X-Request-ID"], "client-id-2")
+        self.assertEqual(len(client.get('/nonexistent').headers["X-Request-ID"]), 32)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# Test cases for metrics and request instrumentation
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import requests
+
+from backend.app.main import create_app
+from backend.app.utils import metrics
+from backend.app.utils.cache import MemoryStore, TwoTierCache, MISSING
+from backend.app.utils.http_client import HttpClient
+from backend.app.utils.mongo_metrics import CommandMetrics
+
+
+def sample(name: str, **labels) -> float:
+    """Read one sample's value back from the rendered exposition"""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    prefix = f"{name}{{{wanted}}} " if wanted else f"{name} "
+    for line in metrics.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1))
+        child = histogram.labels("/a")
+        for value in (0.05, 0.5, 0.5, 5):
+            child.observe(value)
+
+        lines = histogram.render()
+        self.assertIn("# TYPE test_latency_seconds histogram", lines)
+        self.assertIn('test_latency_seconds_bucket{route="/a",le="0.1"} 1', lines)
+        self.assertIn('test_latency_seconds_bucket{route="/a",le="1.0"} 3', lines)
+        self.assertIn('test_latency_seconds_bucket{route="/a",le="+Inf"} 4', lines)
+        self.assertIn('test_latency_seconds_count{route="/a"} 4', lines)
+        self.assertIn('test_latency_seconds_sum{route="/a"} 6.05', lines)
+
+    def test_labels(self):
+        counter = metrics.Counter("test_events_total", "Test events", ("kind",))
+        self.assertIs(counter.labels("a"), counter.labels("a"))
+        counter.labels('say "hi"').inc(2)
+        self.assertIn('test_events_total{kind="say \\"hi\\""} 2', counter.render())
+        with self.assertRaises(ValueError):
+            counter.labels("a", "b")
+
+    def test_outcome_for(self):
+        self.assertEqual(metrics.outcome_for(200), "ok")
+        self.assertEqual(metrics.outcome_for(404), "client_error")
+        self.assertEqual(metrics.outcome_for(429), "throttled")
+        self.assertEqual(metrics.outcome_for(503), "server_error")
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_flask_requests_are_labelled_by_route_template(self):
+        client = create_app().test_client()
+        name = "meteorcloud_http_request_duration_seconds_count"
+        before = sample(name, route="/api/v1/weather", method="GET", status="400")
+        unmatched = sample(name, route="unmatched", method="GET", status="404")
+
+        client.get("/api/v1/weather")
+        client.get("/api/v1/no-such-route")
+
+        self.assertEqual(sample(name, route="/api/v1/weather", method="GET", status="400"), before + 1)
+        self.assertEqual(sample(name, route="unmatched", method="GET", status="404"), unmatched + 1)
+
+    def test_metrics_endpoint(self):
+        response = create_app().test_client().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, metrics.CONTENT_TYPE)
+        self.assertIn("# TYPE meteorcloud_upstream_request_duration_seconds histogram",
+                      response.get_data(as_text=True))
+
+    def test_upstream_calls_are_timed_by_provider_and_outcome(self):
+        client = HttpClient(max_retries=0)
+        client.session = MagicMock()
+        client.session.get.return_value = MagicMock(status_code=429, headers={})
+        limiter = MagicMock()
+        name = "meteorcloud_upstream_request_duration_seconds_count"
+        throttled = sample(name, provider="test-provider", outcome="throttled")
+        errors = sample(name, provider="test-provider", outcome="error")
+        waits = sample("meteorcloud_upstream_throttle_seconds_count", provider="test-provider")
+
+        client.get("http://provider.test/a", limiter=limiter, provider="test-provider")
+        client.session.get.side_effect = requests.ConnectionError("refused")
+        with self.assertRaises(requests.ConnectionError):
+            client.get("http://provider.test/a", provider="test-provider")
+
+        self.assertEqual(sample(name, provider="test-provider", outcome="throttled"), throttled + 1)
+        self.assertEqual(sample(name, provider="test-provider", outcome="error"), errors + 1)
+        self.assertEqual(sample("meteorcloud_upstream_throttle_seconds_count", provider="test-provider"),
+                         waits + 1)
+
+    def test_cache_lookups_are_counted_by_tier(self):
+        store = MemoryStore()
+        cache = TwoTierCache("test-tiers", maxsize=10, store=store)
+        cache.set("lagos", 1, 60)
+        TwoTierCache("test-tiers", maxsize=10, store=store).get("lagos")
+        cache.get("lagos")
+        self.assertIs(cache.get("uyo"), MISSING)
+
+        name = "meteorcloud_cache_lookups_total"
+        self.assertEqual(sample(name, cache="test-tiers", result="shared_hit"), 1)
+        self.assertEqual(sample(name, cache="test-tiers", result="local_hit"), 1)
+        self.assertEqual(sample(name, cache="test-tiers", result="miss"), 1)
+
+    def test_mongo_commands_are_timed(self):
+        listener = CommandMetrics()
+        name = "meteorcloud_mongo_command_duration_seconds_count"
+        before = sample(name, command="testcmd", outcome="ok")
+        listener.succeeded(SimpleNamespace(command_name="testcmd", duration_micros=1500))
+        listener.failed(SimpleNamespace(command_name="testcmd", duration_micros=100))
+        self.assertEqual(sample(name, command="testcmd", outcome="ok"), before + 1)
+        self.assertEqual(sample(name, command="testcmd", outcome="error"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
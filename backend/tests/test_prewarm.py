@@ -0,0 +1,122 @@
+# Test cases for the cache pre-warmer
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from backend.app.models.observation import Observation
+from backend.app.services.prewarm_service import PrewarmService
+from backend.app.services.weather_service import WeatherService, CACHE_HIT, CACHE_MISS
+from backend.app.utils.cache import MemoryStore, TTLCache, weather_cache
+from backend.app.utils.heavy_hitters import SpaceSaving
+from backend.app.utils.leader import LeaderLease
+
+LAGOS = {"lat": 6.45, "lon": 3.39, "display_name": "Lagos"}
+
+
+def observation_at(observed_at):
+    return Observation(observed_at, 303.15, 305.0, 70, 1010, 3.0, 800, "clear sky", "Lagos", "NG")
+
+
+class RemoteStore:
+    """Stands in for a Redis client (anything that is not a MemoryStore)"""
+
+    def __init__(self):
+        self._store = MemoryStore()
+        self.get, self.set, self.delete = self._store.get, self._store.set, self._store.delete
+
+
+class TestSpaceSaving(unittest.TestCase):
+    def test_heavy_hitters_survive_eviction(self):
+        sketch = SpaceSaving(capacity=3)
+        for i in range(100):
+            sketch.offer("lagos")
+            sketch.offer(f"rare-{i}")
+            if i % 2 == 0:
+                sketch.offer("uyo")
+
+        top = sketch.top(2)
+        self.assertEqual([city for city, _, _ in top], ["lagos", "uyo"])
+        self.assertEqual(top[0][1], 100)
+        self.assertEqual(len(sketch), 3)
+
+    def test_decay(self):
+        sketch = SpaceSaving(capacity=3)
+        sketch.offer("lagos", 10)
+        sketch.decay(0.5)
+        self.assertEqual(sketch.top(1), [("lagos", 5, 0)])
+
+
+class TestLeaderLease(unittest.TestCase):
+    def test_file_lock_elects_one_process(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = LeaderLease("job", store=MemoryStore(), directory=directory)
+            second = LeaderLease("job", store=MemoryStore(), directory=directory)
+            self.assertTrue(first.acquire())
+            self.assertFalse(second.acquire())
+            first.release()
+            self.assertTrue(second.acquire())
+            second.release()
+
+    def test_shared_store_lease_renews_and_expires(self):
+        store = RemoteStore()
+        first = LeaderLease("job", ttl=1, store=store)
+        second = LeaderLease("job", ttl=1, store=store)
+        self.assertTrue(first.acquire())
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        time.sleep(1.1)
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.acquire())
+
+
+class TestPrewarmService(unittest.TestCase):
+    def setUp(self):
+        weather_cache.local.clear()
+        weather_cache._store = MemoryStore()
+        patches = [
+            patch.object(PrewarmService, "sketch", SpaceSaving(100)),
+            patch.object(PrewarmService, "_targets", {}),
+            patch.object(PrewarmService, "_counted", TTLCache(100)),
+            patch.object(PrewarmService, "_scheduler", MagicMock()),
+            patch.object(PrewarmService, "limiter", MagicMock()),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def cache_entry(self, fresh_for):
+        key, _, _ = WeatherService._cache_key(LAGOS["lat"], LAGOS["lon"])
+        observation = observation_at(time.time())
+        observation.fresh_until = time.time() + fresh_for
+        weather_cache.set(key, observation, 600)
+        return key
+
+    def test_only_entries_near_expiry_are_due(self):
+        PrewarmService.record("Lagos", LAGOS, CACHE_MISS)
+        self.cache_entry(fresh_for=300)
+        self.assertEqual(PrewarmService.candidates(), [])
+        self.cache_entry(fresh_for=5)
+        lookups = [weather_cache._local_hits.value, weather_cache._misses.value]
+        self.assertEqual(len(PrewarmService.candidates()), 1)
+        # Scans do not count as cache lookups
+        self.assertEqual([weather_cache._local_hits.value, weather_cache._misses.value], lookups)
+
+    @patch.object(WeatherService, "_fetch")
+    def test_refresh_counts_prevented_miss_once(self, mock_fetch):
+        mock_fetch.return_value = observation_at(time.time())
+        PrewarmService.record("Lagos", LAGOS, CACHE_MISS)
+        key = self.cache_entry(fresh_for=-1)
+
+        self.assertEqual(PrewarmService.run_once(), 1)
+        self.assertIsNotNone(weather_cache.get(key).prewarmed_over)
+
+        PrewarmService.record(" lagos", LAGOS, CACHE_HIT)
+        PrewarmService.record("LAGOS", LAGOS, CACHE_HIT)
+        stats = PrewarmService.stats()
+        self.assertEqual(stats["prevented_misses"], 1)
+        self.assertEqual(stats["top"][0], {"city": "lagos", "count": 3, "error": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+# Test cases for upstream call budgets
+import multiprocessing
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from backend.app.asgi import create_asgi_app
+from backend.app.config import config
+from backend.app.main import create_app
+from backend.app.models.observation import Observation
+from backend.app.services.auth_service import AuthService
+from backend.app.services.prewarm_service import PrewarmService
+from backend.app.services.weather_service import WeatherService, CACHE_DEGRADED
+from backend.app.utils import quota
+from backend.app.utils.cache import MemoryStore, geocode_cache, weather_cache
+from backend.app.utils.http_client import HttpClient
+from backend.app.utils.quota import (BUDGET_EXHAUSTED, BUDGET_OK, BUDGET_TIGHT, QuotaExhaustedError,
+                                     UsageBudget, parse_quotas)
+
+PERIOD = 3600
+# Ten percent into a period
+NOW = 1700000000 // PERIOD * PERIOD + 360
+
+
+def exhausted_budgets(directory, providers=("openweathermap", "openmeteo")):
+    budgets = {}
+    for provider in providers:
+        budgets[provider] = UsageBudget(provider, 10, PERIOD, store=MemoryStore(), directory=directory)
+        budgets[provider].record(10)
+    return budgets
+
+
+def record_in_worker(directory, calls):
+    # A worker process has an in-process store of its own
+    UsageBudget("openweathermap", 100, PERIOD, key="secret", store=MemoryStore(), directory=directory).record(calls)
+
+
+class TestUsageBudget(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def budget(self, provider, limit, key=None):
+        return UsageBudget(provider, limit, PERIOD, key=key, store=MemoryStore(), directory=self.directory)
+
+    def test_workers_share_one_count_per_key(self):
+        worker = multiprocessing.Process(target=record_in_worker, args=(self.directory, 3))
+        worker.start()
+        worker.join(10)
+        self.assertEqual(worker.exitcode, 0)
+
+        first = self.budget("openweathermap", 100, key="secret")
+        other_key = self.budget("openweathermap", 100, key="rotated")
+        first.record()
+        self.assertEqual(first.state()["used"], 4)
+        self.assertEqual(self.budget("openweathermap", 100, key="secret").state()["remaining"], 96)
+        self.assertEqual(other_key.state()["used"], 0)
+        self.assertNotIn("secret", first.state()["key"])
+
+    def test_shared_store_is_used_when_configured(self):
+        store = MagicMock()
+        store.incr.return_value = 5
+        budget = UsageBudget("openweathermap", 100, PERIOD, store=store, directory=self.directory)
+        budget.record()
+        store.incr.assert_called_once()
+        self.assertEqual(budget._used, 5)
+
+    @patch("backend.app.utils.quota.time.time", return_value=NOW)
+    def test_projection_stretches_ttl(self, _):
+        budget = self.budget("openweathermap", 1000)
+        budget.record(10)
+        self.assertEqual(budget.state()["status"], BUDGET_OK)
+        self.assertEqual(budget.ttl_factor(), 1.0)
+
+        # 50 calls in the first 10% of the period project to 500, against 50 left
+        budget = self.budget("openmeteo", 100)
+        budget.record(50)
+        state = budget.state()
+        self.assertEqual(state["projected"], 500)
+        self.assertEqual(state["status"], BUDGET_TIGHT)
+        self.assertEqual(state["ttl_factor"], 9.0)
+        self.assertEqual(state["resets_in"], PERIOD - 360)
+
+        budget.record(50)
+        self.assertTrue(budget.exhausted)
+        self.assertEqual(budget.ttl_factor(), config.QUOTA_MAX_TTL_FACTOR)
+
+    def test_store_outage_is_not_exhaustion(self):
+        store = MagicMock()
+        store.get.side_effect = store.incr.side_effect = ConnectionError("down")
+        budget = UsageBudget("openweathermap", 1, PERIOD, store=store)
+        budget.record()
+        self.assertEqual(budget.state()["status"], BUDGET_OK)
+
+    def test_parse_quotas(self):
+        self.assertEqual(parse_quotas("openweathermap=1000, nominatim=86400"),
+                         {"openweathermap": 1000, "nominatim": 86400})
+        with self.assertRaises(ValueError):
+            parse_quotas("openweathermap")
+
+
+class TestBudgetEnforcement(unittest.TestCase):
+    def setUp(self):
+        weather_cache.local.clear()
+        weather_cache._store = MemoryStore()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        budgets = patch.dict(quota.budgets, exhausted_budgets(directory.name))
+        budgets.start()
+        self.addCleanup(budgets.stop)
+
+    def test_exhausted_provider_is_not_called(self):
+        client = HttpClient(max_retries=0)
+        with patch.object(client.session, "get") as get:
+            with self.assertRaises(QuotaExhaustedError):
+                client.get("https://api.openweathermap.org/data/2.5/weather", provider="openweathermap")
+            get.assert_not_called()
+        self.assertEqual(quota.budgets["openweathermap"].state()["status"], BUDGET_EXHAUSTED)
+
+    @patch.object(WeatherService, "http_client")
+    def test_stale_weather_is_served_degraded(self, mock_client):
+        observation = Observation(time.time() - 7200, 285.45, 284.15, 80, 1012, 4.1, 500, "light rain", "London", "GB")
+        observation.fresh_until = time.time() - 60
+        key, _, _ = WeatherService._cache_key(51.5, -0.12)
+        weather_cache.set(key, observation, 600)
+
+        self.assertEqual(WeatherService.get_observation_with_status(51.5, -0.12), (observation, CACHE_DEGRADED))
+        self.assertEqual(WeatherService.get_observation_with_status(-33.9, 18.4), (None, CACHE_DEGRADED))
+        mock_client.get.assert_not_called()
+        self.assertEqual(PrewarmService.run_once(), 0)
+
+        client = create_app().test_client()
+        response = client.get("/api/v1/weather?lat=51.5&lon=-0.12")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Cache"], CACHE_DEGRADED)
+        self.assertTrue(response.get_json()["degraded"])
+
+        response = client.get("/api/v1/weather?lat=-33.9&lon=18.4")
+        self.assertEqual(response.status_code, 503)
+        self.assertGreater(int(response.headers["Retry-After"]), 0)
+
+    def test_exhausted_geocoding_is_reported(self):
+        geocode_cache.local.clear()
+        geocode_cache._store = MemoryStore()
+        quota.budgets.update(exhausted_budgets(self.directory, ("nominatim",)))
+
+        for client in (create_app().test_client(), TestClient(create_asgi_app())):
+            response = client.get("/api/v1/weather?city=Atlantis")
+            self.assertEqual(response.status_code, 503)
+            self.assertGreater(int(response.headers["Retry-After"]), 0)
+
+    @patch.object(config, "ADMIN_USERS", "ops, ada")
+    def test_admin_endpoint_reports_budgets(self):
+        for p in (patch.object(AuthService, "_secret", b"test-secret"),
+                  patch.object(AuthService, "_denylist", {}),
+                  patch.object(AuthService, "_synced_until", datetime(1970, 1, 1)),
+                  patch.object(AuthService, "_syncer", MagicMock())):
+            p.start()
+            self.addCleanup(p.stop)
+        client = create_app().test_client()
+
+        for path in ("/api/v1/admin/budget", "/api/v1/admin/prewarm", "/api/v1/admin/alerts"):
+            self.assertEqual(client.get(path).status_code, 401)
+        user = AuthService.issue_tokens("grace")["access_token"]
+        response = client.get("/api/v1/admin/budget", headers={"Authorization": f"Bearer {user}"})
+        self.assertEqual(response.status_code, 403)
+
+        admin = AuthService.issue_tokens("ada")["access_token"]
+        response = client.get("/api/v1/admin/budget", headers={"Authorization": f"Bearer {admin}"})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()["data"]
+        statuses = {budget["provider"]: budget["status"] for budget in data["budgets"]}
+        self.assertEqual(statuses["openweathermap"], BUDGET_EXHAUSTED)
+        self.assertEqual(data["ttl_factor"], config.QUOTA_MAX_TTL_FACTOR)
+        self.assertIn("openmeteo", data["weather_providers"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import multiprocessing
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from backend.app.utils.rate_limit import TokenBucket
+
+def _take_tokens(directory, count, queue):
+    bucket = TokenBucket("test", rate=50, capacity=1, directory=directory)
+    for _ in range(count):
+        bucket.acquire()
+        queue.put(time.time())
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_first_token_is_immediate(self):
+        bucket = TokenBucket("test", rate=1, capacity=1, directory=self.tmpdir.name)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertGreater(bucket.try_acquire(), 0.9)
+
+    def test_timeout(self):
+        bucket = TokenBucket("test", rate=0.1, capacity=1, directory=self.tmpdir.name)
+        bucket.acquire()
+        self.assertFalse(bucket.acquire(timeout=0.05))
+
+    def test_async_acquire_takes_the_lock_off_the_loop(self):
+        bucket = TokenBucket("test", rate=1, capacity=1, directory=self.tmpdir.name)
+        threads = []
+
+        def try_acquire():
+            threads.append(threading.current_thread())
+            return 0.0
+
+        with patch.object(bucket, "try_acquire", try_acquire):
+            asyncio.run(bucket.acquire_async())
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+    def test_budget_shared_across_processes(self):
+        queue = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_take_tokens, args=(self.tmpdir.name, 10, queue))
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        stamps = sorted(queue.get(timeout=10) for _ in range(30))
+        for worker in workers:
+            worker.join()
+
+        # 30 tokens at 50/s with a burst of 1 need at least 29/50 seconds
+        self.assertGreaterEqual(stamps[-1] - stamps[0], 29 / 50 * 0.95)
+        # and no 200 ms window may see more than its share plus the burst
+        for i, start in enumerate(stamps):
+            in_window = sum(1 for t in stamps[i:] if t - start < 0.2)
+            self.assertLessEqual(in_window, 0.2 * 50 + 1 + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# Test cases for inbound rate limiting
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.app.asgi import create_asgi_app
+from backend.app.config import config
+from backend.app.main import create_app
+from backend.app.services.auth_service import AuthService
+from backend.app.utils import tokens
+from backend.app.utils.cache import MemoryStore
+from backend.app.utils.request_limits import RequestLimits, SlidingWindowLimiter, parse_limits
+
+NOW = 1700000000 // 60 * 60
+
+
+class TestSlidingWindowLimiter(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryStore()
+
+    def test_limit_and_retry_after(self):
+        limiter = SlidingWindowLimiter("weather", 3, 60, store=self.store, sync_interval=0)
+        for second in range(3):
+            self.assertEqual(limiter.hit("ip:1.2.3.4", now=NOW + second), 0)
+        # Allowed again once a third of the full window has slid out of view
+        wait = limiter.hit("ip:1.2.3.4", now=NOW + 3)
+        self.assertEqual(wait, 77)
+        self.assertEqual(limiter.hit("ip:5.6.7.8", now=NOW + 3), 0)
+
+        # Rejected requests are not counted
+        self.assertGreater(limiter.hit("ip:1.2.3.4", now=NOW + 60), 0)
+        self.assertEqual(limiter.hit("ip:1.2.3.4", now=NOW + 3 + wait), 0)
+        # Half of the previous window still weighs 1.5 requests
+        self.assertEqual(limiter.hit("ip:1.2.3.4", now=NOW + 90), 10)
+        self.assertEqual(limiter.hit("ip:1.2.3.4", now=NOW + 100), 0)
+
+    def test_workers_share_counts(self):
+        first = SlidingWindowLimiter("login", 3, 60, store=self.store, sync_interval=0)
+        second = SlidingWindowLimiter("login", 3, 60, store=self.store, sync_interval=0)
+        self.assertEqual(first.hit("ip:1.2.3.4", now=NOW), 0)
+        self.assertEqual(first.hit("ip:1.2.3.4", now=NOW + 1), 0)
+        self.assertEqual(second.hit("ip:1.2.3.4", now=NOW + 2), 0)
+        self.assertGreater(second.hit("ip:1.2.3.4", now=NOW + 3), 0)
+
+    def test_counts_are_pushed_in_batches(self):
+        limiter = SlidingWindowLimiter("weather", 100, 60, store=self.store, sync_interval=10)
+        for second in range(5):
+            limiter.hit("ip:1.2.3.4", now=NOW + second)
+        self.assertEqual(int(self.store.get(limiter._counter("ip:1.2.3.4", NOW))), 1)
+        limiter.hit("ip:1.2.3.4", now=NOW + 10)
+        self.assertEqual(int(self.store.get(limiter._counter("ip:1.2.3.4", NOW))), 6)
+
+    def test_async_hit_syncs_off_the_loop(self):
+        threads = []
+        incr = self.store.incr
+
+        def tracked_incr(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return incr(*args, **kwargs)
+
+        limiter = SlidingWindowLimiter("weather", 2, 60, store=self.store, sync_interval=0)
+        with patch.object(self.store, "incr", tracked_incr):
+            self.assertEqual(asyncio.run(limiter.hit_async("ip:1.2.3.4", now=NOW)), 0)
+            self.assertEqual(asyncio.run(limiter.hit_async("ip:1.2.3.4", now=NOW + 1)), 0)
+            self.assertGreater(asyncio.run(limiter.hit_async("ip:1.2.3.4", now=NOW + 2)), 0)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+        self.assertEqual(int(self.store.get(limiter._counter("ip:1.2.3.4", NOW))), 2)
+
+    def test_parse_limits(self):
+        self.assertEqual(parse_limits("/api/v1=600/60, /api/v1/login=10/60"),
+                         [("/api/v1/login", 10, 60.0), ("/api/v1", 600, 60.0)])
+        with self.assertRaises(ValueError):
+            parse_limits("/api/v1=600")
+
+
+class TestRequestLimits(unittest.TestCase):
+    def test_rule_and_client(self):
+        limits = RequestLimits(parse_limits("/api/v1/weather=1/60,/api/v1=100/60"), store=MemoryStore())
+        self.assertEqual(limits.limiter_for("/api/v1/weather/history").name, "/api/v1/weather")
+        self.assertEqual(limits.limiter_for("/api/v1/weatherx").name, "/api/v1")
+        self.assertIsNone(limits.limiter_for("/metrics"))
+
+        with patch.object(AuthService, "_secret", b"secret"):
+            token = tokens.encode({"sub": "ada", "type": "access", "exp": 4102444800}, b"secret")
+            self.assertEqual(limits.client("1.2.3.4", f"Bearer {token}"), "user:ada")
+            self.assertEqual(limits.client("1.2.3.4", "Bearer forged"), "ip:1.2.3.4")
+        self.assertEqual(limits.client("1.2.3.4", None), "ip:1.2.3.4")
+
+    def test_per_worker_counting_is_warned_about(self):
+        with patch("backend.app.utils.request_limits.get_shared_store", return_value=MemoryStore()):
+            with self.assertLogs("backend.app.utils.request_limits", level="WARNING") as logs:
+                RequestLimits.from_config()
+        self.assertIn("per worker process", logs.output[0])
+
+    @patch.object(config, "RATE_LIMITS", "/api/v1=2/60")
+    def test_flask_app_returns_429(self):
+        client = create_app().test_client()
+        address = {"X-Forwarded-For": "10.0.0.1, 203.0.113.7"}
+        for _ in range(2):
+            self.assertEqual(client.get("/api/v1/nonexistent", headers=address).status_code, 404)
+        response = client.get("/api/v1/nonexistent", headers=address)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+        self.assertEqual(response.get_json()["status"], "error")
+        # ProxyFix takes the client from the last forwarded address
+        other = {"X-Forwarded-For": "10.0.0.1, 198.51.100.7"}
+        self.assertEqual(client.get("/api/v1/nonexistent", headers=other).status_code, 404)
+        self.assertEqual(client.get("/metrics", headers=address).status_code, 200)
+
+    @patch.object(config, "RATE_LIMITS", "/api/v1=2/60")
+    def test_asgi_app_returns_429(self):
+        client = TestClient(create_asgi_app(), client=("192.0.2.7", 50000))
+        for _ in range(2):
+            self.assertEqual(client.get("/api/v1/nonexistent").status_code, 404)
+        response = client.get("/api/v1/nonexistent")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("retry-after", response.headers)
+        self.assertIn("x-request-id", response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from backend.app.utils.cache import MISSING
+from backend.app.utils.singleflight import SingleFlight, AsyncSingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def _run_concurrently(self, flight, fn, count=10):
+        results, errors = [], []
+        barrier = threading.Barrier(count)
+
+        def worker():
+            barrier.wait()
+            try:
+                results.append(flight.do("london", fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_share_result(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"lat": 51.5}
+
+        results, errors = self._run_concurrently(SingleFlight("test"), fetch)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"lat": 51.5}] * 10)
+        self.assertEqual(errors, [])
+
+    def test_concurrent_calls_share_error(self):
+        def fetch():
+            time.sleep(0.1)
+            raise ConnectionError("upstream down")
+
+        results, errors = self._run_concurrently(SingleFlight("test"), fetch)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 10)
+
+    def test_shared_lock_rechecks_before_calling(self):
+        with tempfile.TemporaryDirectory() as directory:
+            flight = SingleFlight("test", shared=True, directory=directory)
+            self.assertEqual(flight.do("london", lambda: 1, recheck=lambda: MISSING), 1)
+            self.assertEqual(flight.do("london", lambda: 1, recheck=lambda: 2), 2)
+
+    def test_async_concurrent_calls_share_result(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"lat": 51.5}
+
+        async def run():
+            flight = AsyncSingleFlight("test")
+            return await asyncio.gather(*(flight.do("london", fetch) for _ in range(10)))
+
+        self.assertEqual(asyncio.run(run()), [{"lat": 51.5}] * 10)
+        self.assertEqual(len(calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
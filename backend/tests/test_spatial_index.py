@@ -0,0 +1,73 @@
+import random
+import unittest
+
+import numpy as np
+
+from backend.app.utils.spatial_index import GridIndex, PointIndex, bounding_box, haversine_km
+
+
+class TestPointIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        # Clustered and sparse points, some across the antimeridian and near the poles
+        self.lat = [rng.uniform(-90, 90) for _ in range(2000)] + [rng.gauss(6.4, 0.2) for _ in range(2000)]
+        self.lon = [rng.uniform(-180, 180) for _ in range(2000)] + [rng.gauss(3.4, 0.2) for _ in range(2000)]
+        self.lat += [-16.5, -16.6, 89.9, -89.95]
+        self.lon += [179.99, -179.98, 12.0, -150.0]
+        self.index = PointIndex(self.lat, self.lon, cell_size=0.5)
+
+    def brute_force(self, lat, lon, k):
+        distances = haversine_km(lat, lon, np.array(self.lat), np.array(self.lon))
+        order = np.argsort(distances, kind="stable")[:k]
+        return [(int(i), float(distances[i])) for i in order]
+
+    def test_nearest_matches_brute_force(self):
+        queries = [(6.45, 3.39), (-16.55, 179.995), (-16.55, -179.999), (89.99, -100.0),
+                   (-90.0, 0.0), (0.0, 0.0), (45.0, -30.0)]
+        for lat, lon in queries:
+            expected = self.brute_force(lat, lon, 5)
+            found = self.index.nearest(lat, lon, k=5)
+            self.assertEqual([i for i, _ in found], [i for i, _ in expected], (lat, lon))
+            self.assertAlmostEqual(found[0][1], expected[0][1], places=6)
+
+    def test_radius_limits_results(self):
+        self.assertEqual(self.index.nearest(-16.55, 179.995, k=10, radius_km=10),
+                         self.brute_force(-16.55, 179.995, 2))
+        indices, distances = self.index.within(6.45, 3.39, 5)
+        self.assertTrue(len(indices) > 0)
+        self.assertTrue((distances <= 5).all())
+        self.assertEqual(self.index.nearest(-60.0, -120.0, radius_km=1), [])
+
+    def test_bounding_box_splits_at_antimeridian(self):
+        _, _, ranges = bounding_box(0.0, 179.9, 50)
+        self.assertEqual(len(ranges), 2)
+        self.assertTrue(all(-180 <= lo <= hi <= 180 for lo, hi in ranges))
+        self.assertEqual(bounding_box(89.9, 0, 50)[2], [(-180.0, 180.0)])
+
+
+class TestGridIndex(unittest.TestCase):
+    def test_within_add_and_discard(self):
+        index = GridIndex(cell_size=0.02, maxsize=10)
+        index.add("a", 6.45, 3.39)
+        index.add("b", 6.46, 3.40)
+        index.add("c", 6.60, 3.39)
+        index.add("w", -16.5, 179.999)
+        self.assertEqual([key for _, key in index.within(6.451, 3.391, 2)], ["a", "b"])
+        self.assertEqual([key for _, key in index.within(-16.5, -179.999, 2)], ["w"])
+
+        index.add("a", 6.60, 3.40)  # Moved
+        index.discard("b")
+        self.assertEqual(index.within(6.451, 3.391, 2), [])
+        self.assertIn("a", index)
+        self.assertNotIn("b", index)
+
+    def test_bounded(self):
+        index = GridIndex(cell_size=0.1, maxsize=3)
+        for i in range(5):
+            index.add(i, 0.0, i * 0.001)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(sorted(key for _, key in index.within(0.0, 0.0, 5)), [2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from backend.app.routes.city_routes import city_bp
+from backend.app.services.suggest_service import CitySuggestService
+from backend.app.utils.prefix_index import PrefixIndex
+
+class TestPrefixIndex(unittest.TestCase):
+    def test_ranked_by_score(self):
+        index = PrefixIndex()
+        index.add("lagos", {"name": "Lagos"}, score=3)
+        index.add("lafia", {"name": "Lafia"}, score=1)
+        index.add("london", {"name": "London"}, score=5)
+        self.assertEqual(index.suggest("la"), [{"name": "Lagos"}, {"name": "Lafia"}])
+        self.assertEqual(index.suggest("l", limit=1), [{"name": "London"}])
+
+    def test_update_invalidates_cached_results(self):
+        index = PrefixIndex()
+        index.add("lagos", {"name": "Lagos"}, score=3)
+        index.add("lafia", {"name": "Lafia"}, score=1)
+        self.assertEqual(index.suggest("la")[0], {"name": "Lagos"})
+        index.add("lafia", {"name": "Lafia"}, score=5)
+        self.assertEqual(index.suggest("la")[0], {"name": "Lafia"})
+        index.add("lamu", {"name": "Lamu"}, score=10)
+        self.assertEqual(index.suggest("la")[0], {"name": "Lamu"})
+
+class TestSuggestRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(city_bp)
+        self.client = self.app.test_client()
+
+    def test_suggest_requires_query(self):
+        response = self.client.get('/cities/suggest')
+        self.assertEqual(response.status_code, 400)
+
+    @patch.object(CitySuggestService, '_ensure_seeded')
+    @patch.object(CitySuggestService, 'index', new_callable=PrefixIndex)
+    def test_suggest_recorded_cities(self, mock_index, mock_seeded):
+        CitySuggestService.record("uyo", {"lat": 5.05, "lon": 7.93, "display_name": "Uyo, Nigeria"})
+        CitySuggestService._pending.clear()
+        response = self.client.get('/cities/suggest?q=U')
+        self.assertEqual(response.json["suggestions"], [{"name": "Uyo, Nigeria", "lat": 5.05, "lon": 7.93}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,5 +7,10 @@ class TestUser(unittest.TestCase):
         self.assertTrue(user.verify_password("password123"))
         self.assertFalse(user.verify_password("wrongpassword"))
 
+    def test_check_password_against_stored_document(self):
+        user = User("testuser", "password123")
+        self.assertTrue(User.check_password(user.__dict__, "password123"))
+        self.assertFalse(User.check_password(user.__dict__, "wrongpassword"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
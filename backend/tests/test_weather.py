@@ -1 +1,127 @@
-# Test cases for weather features 
+# Test cases for weather features
+import time
+import unittest
+from unittest.mock import patch
+from backend.app.config import config
+from backend.app.models.observation import Observation
+from backend.app.services.weather_service import WeatherService, CACHE_HIT, CACHE_STALE, CACHE_MISS
+from backend.app.utils.cache import weather_cache, MemoryStore, MISSING
+from backend.app.utils.localization import describe, language
+
+def owm_response(dt, condition=500):
+    # Standard units, as requested by WeatherService
+    return {
+        "dt": dt,
+        "main": {"temp": 285.45, "feels_like": 284.15, "humidity": 80, "pressure": 1012},
+        "weather": [{"id": condition, "description": "light rain"}],
+        "wind": {"speed": 4.1},
+        "name": "London",
+        "sys": {"country": "GB"}
+    }
+
+class TestWeatherService(unittest.TestCase):
+    def setUp(self):
+        weather_cache.local.clear()
+        weather_cache._store = MemoryStore()
+        recorder = patch("backend.app.models.weather.writer")
+        self.writer = recorder.start()
+        self.addCleanup(recorder.stop)
+
+    @patch.object(WeatherService, 'http_client')
+    def test_nearby_coordinates_share_cache_entry(self, mock_client):
+        mock_client.get.return_value.json.return_value = owm_response(time.time())
+
+        weather, status = WeatherService.get_weather_with_status(51.5074, -0.1278)
+        self.assertEqual(status, CACHE_MISS)
+        self.assertEqual(weather["temperature"], "12.3°C")
+
+        _, status = WeatherService.get_weather_with_status(51.5071, -0.1281)
+        self.assertEqual(status, CACHE_HIT)
+        self.assertEqual(mock_client.get.call_count, 1)
+        self.assertEqual(self.writer.add.call_count, 1)
+
+    @patch.object(WeatherService, 'http_client')
+    def test_fresh_observation_nearby_answers_without_fetch(self, mock_client):
+        mock_client.get.return_value.json.return_value = owm_response(time.time())
+        WeatherService.get_weather_with_status(51.50, -0.12)
+
+        # 1.3 km away, in another grid cell
+        weather, status = WeatherService.get_weather_with_status(51.51, -0.13)
+        self.assertEqual((status, weather["city_name"]), (CACHE_HIT, "London"))
+        self.assertEqual(mock_client.get.call_count, 1)
+
+        _, status = WeatherService.get_weather_with_status(51.60, -0.12)
+        self.assertEqual(status, CACHE_MISS)
+        with patch.object(config, "WEATHER_NEARBY_RADIUS", 0):
+            _, status = WeatherService.get_weather_with_status(51.51, -0.14)
+        self.assertEqual(status, CACHE_MISS)
+        self.assertEqual(mock_client.get.call_count, 3)
+
+    @patch.object(WeatherService, 'http_client')
+    def test_one_fetch_serves_every_units_and_lang(self, mock_client):
+        mock_client.get.return_value.json.return_value = owm_response(time.time())
+
+        metric, _ = WeatherService.get_weather_with_status(51.5, -0.12)
+        imperial, status = WeatherService.get_weather_with_status(51.5, -0.12, units="imperial", lang="fr")
+        standard, _ = WeatherService.get_weather_with_status(51.5, -0.12, units="standard", lang="pt_BR")
+
+        self.assertEqual(status, CACHE_HIT)
+        self.assertEqual(mock_client.get.call_count, 1)
+        self.assertEqual(mock_client.get.call_args.kwargs["params"]["units"], "standard")
+        self.assertEqual((metric["temperature"], metric["feels_like"], metric["wind_speed"]),
+                         ("12.3°C", "11.0°C", "4.1 m/s"))
+        self.assertEqual((imperial["temperature"], imperial["wind_speed"], imperial["description"]),
+                         ("54.14°F", "9.17 mph", "pluie légère"))
+        self.assertEqual((standard["temperature"], standard["description"]), ("285.45 K", "chuva fraca"))
+        self.assertEqual(metric["description"], "light rain")
+
+    @patch.object(WeatherService, 'http_client')
+    def test_observation_survives_shared_tier(self, mock_client):
+        mock_client.get.return_value.json.return_value = owm_response(time.time(), condition=999)
+        WeatherService.get_weather_with_status(51.5, -0.12)
+        weather_cache.local.clear()
+
+        weather, status = WeatherService.get_weather_with_status(51.5, -0.12, lang="de")
+        self.assertEqual(status, CACHE_HIT)
+        # Unknown codes keep the provider's description
+        self.assertEqual((weather["temperature"], weather["description"]), ("12.3°C", "light rain"))
+
+        # Entries in an older format are misses, not errors
+        key, _, _ = WeatherService._cache_key(51.5, -0.12)
+        weather_cache.local.clear()
+        weather_cache.store.set(weather_cache._key(key), '{"v": {"data": {}}, "exp": 9999999999}')
+        self.assertIs(weather_cache.get(key), MISSING)
+
+    def test_observation_etag_per_rendering(self):
+        observation = Observation.from_provider(owm_response(1000))
+        self.assertNotEqual(observation.tag("metric", "en"), observation.tag("imperial", "en"))
+        self.assertEqual(observation.tag("metric", "xx"), observation.tag("metric", "en"))
+        self.assertEqual(Observation.from_list(observation.to_list()).tag("metric", "fr"),
+                         observation.tag("metric", "fr"))
+        self.assertNotEqual(Observation.from_provider(owm_response(1600)).etag, observation.etag)
+
+    def test_localization(self):
+        self.assertEqual(language("fr-CA"), "fr")
+        self.assertEqual(language("zz"), "en")
+        self.assertEqual(language(None), "en")
+        self.assertEqual(describe(800, "es"), "cielo claro")
+        self.assertEqual(describe(1, "es", "unknown"), "unknown")
+
+    @patch('backend.app.services.weather_service.threading.Thread')
+    @patch.object(WeatherService, 'http_client')
+    def test_stale_entry_served_with_single_refresh(self, mock_client, mock_thread):
+        # Observation old enough that the entry is only fresh for WEATHER_MIN_TTL
+        mock_client.get.return_value.json.return_value = owm_response(time.time() - 3600)
+        WeatherService.get_weather_with_status(51.5, -0.12)
+
+        with patch('backend.app.services.weather_service.time.time', return_value=time.time() + 120):
+            weather, status = WeatherService.get_weather_with_status(51.5, -0.12)
+            WeatherService.get_weather_with_status(51.5, -0.12)
+
+        self.assertEqual(status, CACHE_STALE)
+        self.assertIsNotNone(weather)
+        self.assertEqual(mock_thread.call_count, 1)
+        WeatherService._refreshing.clear()
+
+if __name__ == '__main__':
+    unittest.main()
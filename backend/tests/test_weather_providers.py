@@ -0,0 +1,153 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from backend.app.config import config
+from backend.app.services.weather_providers import OpenMeteoProvider, OpenWeatherMapProvider, ProviderPool
+from backend.app.services.weather_service import WeatherService, CACHE_MISS
+from backend.app.utils.cache import MemoryStore, weather_cache
+from backend.app.utils.metrics import WEATHER_HEDGES
+from backend.tests.test_weather import owm_response
+
+def openmeteo_response():
+    return {"current": {"time": 1700000000, "temperature_2m": 12.3, "apparent_temperature": 11.0,
+                        "relative_humidity_2m": 80, "surface_pressure": 1012.0, "wind_speed_10m": 4.1,
+                        "weather_code": 61}}
+
+class StubClient:
+    """HttpClient stand-in with a latency and optional failure per provider"""
+    def __init__(self, delays, failing=()):
+        self.delays = delays
+        self.failing = failing
+        self.calls = []
+        self.cancelled = []
+
+    def response(self, provider):
+        response = MagicMock()
+        if provider in self.failing:
+            response.raise_for_status.side_effect = Exception(f"{provider} is down")
+        response.json.return_value = owm_response(1700000000) if provider == "openweathermap" else openmeteo_response()
+        return response
+
+    def get(self, url, params=None, provider=None):
+        self.calls.append(provider)
+        time.sleep(self.delays[provider])
+        return self.response(provider)
+
+class AsyncStubClient(StubClient):
+    async def get(self, url, params=None, provider=None):
+        self.calls.append(provider)
+        try:
+            await asyncio.sleep(self.delays[provider])
+        except asyncio.CancelledError:
+            self.cancelled.append(provider)
+            raise
+        return self.response(provider)
+
+class TestWeatherProviders(unittest.TestCase):
+    def setUp(self):
+        self.pool = ProviderPool([OpenWeatherMapProvider(), OpenMeteoProvider()])
+        for setting, value in (("WEATHER_PROVIDER_MIN_SAMPLES", 5), ("WEATHER_HEDGE_MIN_DELAY", 0.01),
+                               ("WEATHER_HEDGE_ENABLED", True)):
+            patcher = patch.object(config, setting, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def warm(self, latencies):
+        for name, seconds in latencies.items():
+            for _ in range(10):
+                self.pool.trackers[name].record(seconds)
+
+    def test_providers_share_one_schema(self):
+        openweathermap = OpenWeatherMapProvider().parse(owm_response(1700000000)).render("imperial", "fr")
+        openmeteo = OpenMeteoProvider().parse(openmeteo_response()).render("imperial", "fr")
+        for field in ("temperature", "feels_like", "humidity", "wind_speed", "description"):
+            self.assertEqual(openmeteo[field], openweathermap[field])
+        self.assertEqual(openmeteo["city_name"], "")
+
+    def test_slow_primary_is_hedged(self):
+        self.warm({"openweathermap": 0.02, "openmeteo": 0.02})
+        client = StubClient({"openweathermap": 0.5, "openmeteo": 0.01})
+        hedges = WEATHER_HEDGES.labels("slow", "openmeteo").value
+
+        started = time.perf_counter()
+        provider, observation = self.pool.fetch(client, 51.5, -0.12)
+        self.assertLess(time.perf_counter() - started, 0.3)
+        self.assertEqual(provider, "openmeteo")
+        self.assertEqual(observation.temperature, 285.45)
+        self.assertEqual(client.calls, ["openweathermap", "openmeteo"])
+        self.assertEqual(WEATHER_HEDGES.labels("slow", "openmeteo").value - hedges, 1)
+
+    def test_openmeteo_observation_is_recorded_under_city(self):
+        weather_cache.local.clear()
+        weather_cache._store = MemoryStore()
+        self.warm({"openweathermap": 0.02, "openmeteo": 0.02})
+        client = StubClient({"openweathermap": 0.5, "openmeteo": 0.01})
+
+        with patch.object(WeatherService, "providers", self.pool), patch.object(WeatherService, "http_client", client), \
+                patch("backend.app.models.weather.writer") as writer:
+            observation, status = WeatherService.get_observation_with_status(6.45, 3.39, "Lagos", "NG")
+
+        self.assertEqual(status, CACHE_MISS)
+        self.assertEqual(client.calls, ["openweathermap", "openmeteo"])
+        self.assertEqual((observation.city_name, observation.country), ("Lagos", "NG"))
+        self.assertEqual(observation.render()["city_name"], "Lagos")
+        document = writer.add.call_args[0][0]
+        self.assertEqual((document["city"], document["country"]), ("lagos", "NG"))
+
+    def test_city_series_does_not_depend_on_provider(self):
+        clients = (StubClient({"openweathermap": 0, "openmeteo": 0}, failing=("openmeteo",)),
+                   StubClient({"openweathermap": 0, "openmeteo": 0}, failing=("openweathermap",)))
+        cities = []
+        for client in clients:
+            weather_cache.local.clear()
+            weather_cache._store = MemoryStore()
+            with patch.object(WeatherService, "providers", self.pool), \
+                    patch.object(WeatherService, "http_client", client), \
+                    patch("backend.app.models.weather.writer") as writer:
+                WeatherService.get_observation_with_status(6.45, 3.39, " Lagos", "NG")
+            cities.append(writer.add.call_args[0][0]["city"])
+        # OpenWeatherMap names the place London, Open-Meteo not at all
+        self.assertEqual(clients[0].calls[-1], "openweathermap")
+        self.assertEqual(clients[1].calls[-1], "openmeteo")
+        self.assertEqual(cities, ["lagos", "lagos"])
+
+    def test_fast_primary_is_not_hedged(self):
+        self.warm({"openweathermap": 0.05, "openmeteo": 0.05})
+        client = StubClient({"openweathermap": 0.001, "openmeteo": 0.001})
+        self.assertEqual(self.pool.fetch(client, 51.5, -0.12)[0], "openweathermap")
+        self.assertEqual(client.calls, ["openweathermap"])
+
+    def test_failed_primary_fails_over(self):
+        client = StubClient({"openweathermap": 0, "openmeteo": 0}, failing=("openweathermap",))
+        self.assertEqual(self.pool.fetch(client, 51.5, -0.12)[0], "openmeteo")
+
+        client = StubClient({"openweathermap": 0, "openmeteo": 0}, failing=("openweathermap", "openmeteo"))
+        with self.assertRaises(Exception):
+            self.pool.fetch(client, 51.5, -0.12)
+        with patch.object(WeatherService, "providers", self.pool), patch.object(WeatherService, "http_client", client):
+            self.assertIsNone(WeatherService._fetch(51.5, -0.12))
+
+    def test_order_follows_latency_and_errors(self):
+        self.assertEqual([p.name for p in self.pool.order()], ["openweathermap", "openmeteo"])
+        self.warm({"openweathermap": 0.4, "openmeteo": 0.1})
+        self.assertEqual([p.name for p in self.pool.order()], ["openmeteo", "openweathermap"])
+        for _ in range(10):
+            self.pool.trackers["openmeteo"].record(0.01, failed=True)
+        self.assertEqual([p.name for p in self.pool.order()], ["openweathermap", "openmeteo"])
+        self.assertEqual(self.pool.stats()["openweathermap"]["p95_ms"], 400.0)
+
+    def test_async_hedge_cancels_loser(self):
+        self.warm({"openweathermap": 0.02, "openmeteo": 0.02})
+        client = AsyncStubClient({"openweathermap": 5, "openmeteo": 0.01})
+
+        started = time.perf_counter()
+        provider, _ = asyncio.run(self.pool.fetch_async(client, 51.5, -0.12))
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(provider, "openmeteo")
+        self.assertEqual(client.cancelled, ["openweathermap"])
+        # The loser counts as at least as slow as it had been
+        self.assertGreater(self.pool.trackers["openweathermap"].percentile(1.0), 0.02)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,18 @@
+import gzip
+import json
+import time
 import unittest
+from unittest.mock import patch
 from flask import Flask
+from backend.app.models.observation import Observation
 from backend.app.routes.weather_routes import weather_bp
 
+def weather_observation(fresh_for: float = 300) -> Observation:
+    now = time.time()
+    observation = Observation(now - 60, 285.45, 284.15, 80, 1012, 4.1, 500, "light rain", "London", "GB")
+    observation.fresh_until = now + fresh_for
+    return observation
+
 class TestWeatherRoutes(unittest.TestCase):
     def setUp(self):
         self.app = Flask(__name__)
@@ -12,9 +23,99 @@ class TestWeatherRoutes(unittest.TestCase):
         response = self.client.get('/weather')
         self.assertEqual(response.status_code, 400)
         
+    @patch('backend.app.routes.weather_routes.WeatherService.get_observation_with_status')
+    @patch('backend.app.routes.weather_routes.LocationService.get_coordinates')
+    def test_get_weather_by_coordinates(self, mock_location, mock_weather):
+        mock_weather.return_value = (weather_observation(), "HIT")
+        response = self.client.get('/weather?lat=51.5&lon=-0.12')
+        self.assertEqual(response.status_code, 200)
+        mock_weather.assert_called_once_with(lat=51.5, lon=-0.12, city_name="", country=None)
+        mock_location.assert_not_called()
+        for query in ("lat=51.5", "lat=91&lon=0", "lat=north&lon=0"):
+            self.assertEqual(self.client.get(f'/weather?{query}').status_code, 400)
+
     def test_get_weather_invalid_units(self):
         response = self.client.get('/weather?city=London&units=invalid')
         self.assertEqual(response.status_code, 400)
 
+    def test_get_weather_history_invalid_params(self):
+        response = self.client.get('/weather/history?city=Uyo&from=yesterday')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/weather/history?city=Uyo&resolution=5m')
+        self.assertEqual(response.status_code, 400)
+
+    @patch('backend.app.routes.weather_routes.WeatherService.get_observation_with_status')
+    @patch('backend.app.routes.weather_routes.LocationService.get_coordinates')
+    def test_get_weather_cache_header(self, mock_location, mock_weather):
+        mock_location.return_value = {"lat": 51.5, "lon": -0.12, "display_name": "London"}
+        mock_weather.return_value = (weather_observation(), "HIT")
+        response = self.client.get('/weather?city=London')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Cache"], "HIT")
+
+    @patch('backend.app.routes.weather_routes.WeatherService.get_observation_with_status')
+    @patch('backend.app.routes.weather_routes.LocationService.get_coordinates')
+    def test_get_weather_conditional(self, mock_location, mock_weather):
+        mock_location.return_value = {"lat": 51.5, "lon": -0.12, "display_name": "London"}
+        mock_weather.return_value = (weather_observation(), "HIT")
+        response = self.client.get('/weather?city=London')
+        etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+        max_age = int(response.headers["Cache-Control"].rpartition("max-age=")[2])
+        self.assertTrue(295 <= max_age <= 300)
+
+        response = self.client.get('/weather?city=London', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        response = self.client.get('/weather?city=London', headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get('/weather?city=London', headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+        # Another rendering of the same observation has its own tag
+        response = self.client.get('/weather?city=London&units=imperial', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["data"]["temperature"], "54.14°F")
+
+    @patch('backend.app.routes.weather_routes.HistoryService.get_history')
+    def test_get_weather_history_compressed(self, mock_history):
+        mock_history.return_value = {"points": [{"temperature": {"min": 20, "max": 30}}] * 200}
+        response = self.client.get('/weather/history?city=Uyo', headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.data))["data"], mock_history.return_value)
+
+        response = self.client.get('/weather/history?city=Uyo')
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    @patch('backend.app.services.batch_service.WeatherService.get_weather_with_status')
+    @patch('backend.app.services.batch_service.LocationService.get_coordinates')
+    def test_weather_batch_streams_per_item_results(self, mock_location, mock_weather):
+        mock_location.side_effect = lambda city: None if city == "Atlantis" else {"lat": 51.5, "lon": -0.12}
+        mock_weather.return_value = ({"temperature": "12.3°C"}, "MISS")
+        response = self.client.post('/weather/batch', json={
+            "cities": ["London", " london ", "Atlantis", 42],
+            "coordinates": [{"lat": 5.03, "lon": 7.92}, {"lat": 95, "lon": 0}]
+        })
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        results = [json.loads(line) for line in response.data.decode().splitlines()]
+        statuses = sorted((str(r["query"]), r["status"]) for r in results)
+        self.assertEqual(statuses, [
+            ("42", "error"),
+            ("Atlantis", "error"),
+            ("London", "success"),
+            ("{'lat': 5.03, 'lon': 7.92}", "success"),
+            ("{'lat': 95, 'lon': 0}", "error"),
+        ])
+        self.assertEqual(mock_location.call_count, 2)
+
+        response = self.client.post('/weather/batch', json={"cities": ["London"]},
+                                    headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.data))["status"], "success")
+
+    def test_weather_batch_requires_locations(self):
+        response = self.client.post('/weather/batch', json={"cities": []})
+        self.assertEqual(response.status_code, 400)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file